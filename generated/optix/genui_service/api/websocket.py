@@ -3,23 +3,130 @@ WebSocket endpoint for real-time data updates in generated UIs.
 """
 
 import asyncio
+import itertools
 import json
+from collections import OrderedDict, deque
 from typing import Dict, Set, Optional
 from datetime import datetime
 from fastapi import WebSocket, WebSocketDisconnect, Query, HTTPException
+from starlette.websockets import WebSocketState
 from ..models.schemas import WSConnectionResponse, WSDataUpdate
+from ..config import settings
+
+
+# Channels whose updates supersede earlier ones; a slow client is only
+# sent the latest pending update per channel
+CONFLATED_CHANNEL_PREFIXES = ("quote:",)
+
+
+class ClientConnection:
+    """
+    A WebSocket with a bounded outgoing queue drained by its own task.
+
+    Data updates are queued as pre-serialised JSON. When the queue is full
+    the oldest update is dropped; updates on conflated channels replace the
+    pending update for the same channel. Control replies are never dropped;
+    a client with max_control replies unsent is refused further replies.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        generation_id: str,
+        max_queue: int,
+        max_control: int,
+    ):
+        self.websocket = websocket
+        self.generation_id = generation_id
+        self.max_queue = max_queue
+        self.max_control = max_control
+        self.dropped = 0
+        self.conflated = 0
+        self._control: deque[str] = deque()
+        self._pending: OrderedDict = OrderedDict()
+        self._sequence = itertools.count()
+        self._ready = asyncio.Event()
+        self.sender: Optional[asyncio.Task] = None
+
+    def enqueue(self, channel: str, payload: str):
+        """Queue a serialised data update."""
+        if channel.startswith(CONFLATED_CHANNEL_PREFIXES):
+            key = channel
+            if key in self._pending:
+                self._pending[key] = payload
+                self.conflated += 1
+                return
+        else:
+            key = (channel, next(self._sequence))
+
+        self._pending[key] = payload
+        if len(self._pending) > self.max_queue:
+            self._pending.popitem(last=False)
+            self.dropped += 1
+        self._ready.set()
+
+    def send_control(self, message: dict) -> bool:
+        """
+        Queue a control reply ahead of pending data updates.
+
+        Returns:
+            False if the control queue is full and the reply was not queued
+        """
+        if len(self._control) >= self.max_control:
+            return False
+        self._control.append(json.dumps(message, separators=(",", ":")))
+        self._ready.set()
+        return True
+
+    async def drain(self):
+        """Send queued messages until cancelled or the socket fails."""
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            while self._control or self._pending:
+                if self._control:
+                    payload = self._control.popleft()
+                else:
+                    _, payload = self._pending.popitem(last=False)
+                await self.websocket.send_text(payload)
 
 
 class ConnectionManager:
-    """Manages WebSocket connections for real-time updates."""
+    """
+    Channel-centric hub for real-time updates.
+
+    Each update is serialised once and queued on every subscribed
+    connection, whose sender task delivers it independently of the
+    others. Market data feeds run once per channel and are shared by all
+    generations subscribed to it.
+    """
 
-    def __init__(self):
-        # Map of generation_id -> set of WebSocket connections
-        self.active_connections: Dict[str, Set[WebSocket]] = {}
+    def __init__(
+        self,
+        max_queue: Optional[int] = None,
+        update_interval: Optional[float] = None,
+        max_control: Optional[int] = None,
+    ):
+        """
+        Initialize the connection manager.
+
+        Args:
+            max_queue: Pending updates kept per connection
+            update_interval: Seconds between market data updates
+            max_control: Pending control replies a connection may have
+                before it is disconnected
+        """
+        self.max_queue = max_queue or settings.ws_send_queue_size
+        self.max_control = max_control or settings.ws_control_queue_size
+        self.update_interval = update_interval or settings.ws_update_interval
+        # Map of generation_id -> connections by WebSocket
+        self.active_connections: Dict[str, Dict[WebSocket, ClientConnection]] = {}
         # Map of generation_id -> set of subscribed channels
         self.subscriptions: Dict[str, Set[str]] = {}
-        # Mock data update tasks
-        self._update_tasks: Dict[str, asyncio.Task] = {}
+        # Map of channel -> set of subscribed generation_ids
+        self.channel_subscribers: Dict[str, Set[str]] = {}
+        # Mock market data feed per channel
+        self._feeds: Dict[str, asyncio.Task] = {}
 
     async def connect(
         self,
@@ -38,11 +145,11 @@ class ConnectionManager:
         await websocket.accept()
 
         if generation_id not in self.active_connections:
-            self.active_connections[generation_id] = set()
+            self.active_connections[generation_id] = {}
             self.subscriptions[generation_id] = set()
 
-        self.active_connections[generation_id].add(websocket)
-        self.subscriptions[generation_id].update(channels)
+        for channel in channels:
+            self._add_subscription(generation_id, channel)
 
         # Send connection confirmation
         response = WSConnectionResponse(
@@ -52,11 +159,11 @@ class ConnectionManager:
         )
         await websocket.send_json(response.model_dump())
 
-        # Start mock data updates for demo
-        if generation_id not in self._update_tasks:
-            self._update_tasks[generation_id] = asyncio.create_task(
-                self._send_mock_updates(generation_id)
-            )
+        connection = ClientConnection(
+            websocket, generation_id, self.max_queue, self.max_control
+        )
+        connection.sender = asyncio.create_task(self._run_sender(connection))
+        self.active_connections[generation_id][websocket] = connection
 
     async def disconnect(self, websocket: WebSocket, generation_id: str):
         """
@@ -67,16 +174,15 @@ class ConnectionManager:
             generation_id: Generation ID
         """
         if generation_id in self.active_connections:
-            self.active_connections[generation_id].discard(websocket)
+            connection = self.active_connections[generation_id].pop(websocket, None)
+            if connection and connection.sender and connection.sender is not asyncio.current_task():
+                connection.sender.cancel()
 
             # Clean up if no more connections
             if not self.active_connections[generation_id]:
                 del self.active_connections[generation_id]
-                if generation_id in self.subscriptions:
-                    del self.subscriptions[generation_id]
-                if generation_id in self._update_tasks:
-                    self._update_tasks[generation_id].cancel()
-                    del self._update_tasks[generation_id]
+                for channel in self.subscriptions.pop(generation_id, set()):
+                    self._remove_subscriber(generation_id, channel)
 
     async def subscribe(
         self,
@@ -93,8 +199,8 @@ class ConnectionManager:
             websocket: The WebSocket connection
         """
         if generation_id in self.subscriptions:
-            self.subscriptions[generation_id].add(channel)
-            await websocket.send_json({
+            self._add_subscription(generation_id, channel)
+            await self.send(generation_id, websocket, {
                 "type": "subscribed",
                 "channel": channel,
             })
@@ -114,12 +220,53 @@ class ConnectionManager:
             websocket: The WebSocket connection
         """
         if generation_id in self.subscriptions:
-            self.subscriptions[generation_id].discard(channel)
-            await websocket.send_json({
+            if channel in self.subscriptions[generation_id]:
+                self.subscriptions[generation_id].discard(channel)
+                self._remove_subscriber(generation_id, channel)
+            await self.send(generation_id, websocket, {
                 "type": "unsubscribed",
                 "channel": channel,
             })
 
+    async def send(self, generation_id: str, websocket: WebSocket, message: dict):
+        """
+        Send a control message to one connection.
+
+        A connection that is not reading its replies is closed once its
+        control queue is full.
+
+        Args:
+            generation_id: Generation ID
+            websocket: The WebSocket connection
+            message: JSON-serialisable message
+        """
+        connection = self.active_connections.get(generation_id, {}).get(websocket)
+        if connection is None:
+            await websocket.send_json(message)
+        elif not connection.send_control(message):
+            await self.disconnect(websocket, generation_id)
+            try:
+                await websocket.close(code=1008, reason="Too many unread replies")
+            except Exception:
+                pass
+
+    async def publish(self, channel: str, data: dict):
+        """
+        Publish a data update to every generation subscribed to a channel.
+
+        Args:
+            channel: Data channel
+            data: Data to publish
+        """
+        generation_ids = self.channel_subscribers.get(channel)
+        if not generation_ids:
+            return
+
+        payload = self._serialize(channel, data)
+        for generation_id in generation_ids:
+            for connection in self.active_connections.get(generation_id, {}).values():
+                connection.enqueue(channel, payload)
+
     async def broadcast(
         self,
         generation_id: str,
@@ -141,52 +288,89 @@ class ConnectionManager:
             if channel not in self.subscriptions[generation_id]:
                 return
 
+        payload = self._serialize(channel, data)
+        for connection in self.active_connections[generation_id].values():
+            connection.enqueue(channel, payload)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get connection, channel and queue counters."""
+        connections = [
+            connection
+            for by_socket in self.active_connections.values()
+            for connection in by_socket.values()
+        ]
+        return {
+            "generations": len(self.active_connections),
+            "connections": len(connections),
+            "channels": len(self.channel_subscribers),
+            "feeds": len(self._feeds),
+            "dropped": sum(connection.dropped for connection in connections),
+            "conflated": sum(connection.conflated for connection in connections),
+        }
+
+    def _serialize(self, channel: str, data: dict) -> str:
+        """Serialise a data update once for all its recipients."""
         message = WSDataUpdate(
             type="data_update",
             channel=channel,
             data=data,
             timestamp=datetime.utcnow(),
         )
+        return message.model_dump_json()
+
+    def _add_subscription(self, generation_id: str, channel: str):
+        """Subscribe a generation and start the channel's feed if needed."""
+        self.subscriptions[generation_id].add(channel)
+        self.channel_subscribers.setdefault(channel, set()).add(generation_id)
+        if channel.startswith("quote:") and channel not in self._feeds:
+            self._feeds[channel] = asyncio.create_task(self._send_mock_updates(channel))
+
+    def _remove_subscriber(self, generation_id: str, channel: str):
+        """Unsubscribe a generation and stop the channel's feed if unused."""
+        subscribers = self.channel_subscribers.get(channel)
+        if subscribers is None:
+            return
+        subscribers.discard(generation_id)
+        if not subscribers:
+            del self.channel_subscribers[channel]
+            feed = self._feeds.pop(channel, None)
+            if feed:
+                feed.cancel()
+
+    async def _run_sender(self, connection: ClientConnection):
+        """Drain a connection's queue, disconnecting it if sending fails."""
+        try:
+            await connection.drain()
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            await self.disconnect(connection.websocket, connection.generation_id)
 
-        disconnected = set()
-        for websocket in self.active_connections[generation_id]:
-            try:
-                await websocket.send_json(message.model_dump(mode='json'))
-            except Exception:
-                disconnected.add(websocket)
-
-        # Clean up disconnected sockets
-        for ws in disconnected:
-            await self.disconnect(ws, generation_id)
-
-    async def _send_mock_updates(self, generation_id: str):
+    async def _send_mock_updates(self, channel: str):
         """Send mock data updates for demo purposes."""
         import random
 
         base_price = 185.50
+        symbol = channel.split(":")[1]
         try:
-            while generation_id in self.active_connections:
+            while channel in self.channel_subscribers:
                 # Simulate price updates
-                for channel in list(self.subscriptions.get(generation_id, [])):
-                    if channel.startswith("quote:"):
-                        symbol = channel.split(":")[1]
-                        change = random.uniform(-0.50, 0.50)
-                        price = base_price + change
-
-                        await self.broadcast(
-                            generation_id,
-                            channel,
-                            {
-                                "symbol": symbol,
-                                "price": round(price, 2),
-                                "change": round(change, 2),
-                                "change_percent": round((change / base_price) * 100, 2),
-                                "volume": random.randint(1000000, 5000000),
-                                "timestamp": datetime.utcnow().isoformat(),
-                            }
-                        )
-
-                await asyncio.sleep(1)  # Update every second
+                change = random.uniform(-0.50, 0.50)
+                price = base_price + change
+
+                await self.publish(
+                    channel,
+                    {
+                        "symbol": symbol,
+                        "price": round(price, 2),
+                        "change": round(change, 2),
+                        "change_percent": round((change / base_price) * 100, 2),
+                        "volume": random.randint(1000000, 5000000),
+                        "timestamp": datetime.utcnow().isoformat(),
+                    }
+                )
+
+                await asyncio.sleep(self.update_interval)
 
         except asyncio.CancelledError:
             pass
@@ -218,7 +402,8 @@ async def websocket_endpoint(
     try:
         await manager.connect(websocket, generation_id, initial_channels)
 
-        while True:
+        # Runs until the client leaves or is closed for not reading replies
+        while websocket.application_state != WebSocketState.DISCONNECTED:
             try:
                 # Receive and process client messages
                 data = await websocket.receive_json()
@@ -235,13 +420,13 @@ async def websocket_endpoint(
                         await manager.unsubscribe(generation_id, channel, websocket)
 
                 elif action == "ping":
-                    await websocket.send_json({
+                    await manager.send(generation_id, websocket, {
                         "type": "pong",
                         "timestamp": datetime.utcnow().isoformat(),
                     })
 
             except json.JSONDecodeError:
-                await websocket.send_json({
+                await manager.send(generation_id, websocket, {
                     "type": "error",
                     "error": "invalid_json",
                     "message": "Invalid JSON message",
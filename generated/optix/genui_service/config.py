@@ -51,6 +51,21 @@ class Settings(BaseSettings):
     target_score: float = 90.0
     generation_timeout: int = 60  # seconds
 
+    # Best-of-N generation (1 keeps sequential refinement)
+    num_candidates: int = 1
+    max_concurrent_generations: int = 3
+    generation_token_budget: Optional[int] = None  # tokens across all candidates
+
+    # Generation cache (in-memory LRU per level, persisted to Redis)
+    generation_cache_enabled: bool = True
+    generation_cache_size: int = 1000
+    generation_cache_persist: bool = True
+
+    # WebSocket fan-out
+    ws_send_queue_size: int = 256  # pending updates per connection
+    ws_control_queue_size: int = 64  # pending replies before a client is disconnected
+    ws_update_interval: float = 1.0  # seconds between market data updates
+
     # Rate limiting
     rate_limit_generations: int = 20  # per minute
     rate_limit_window: int = 60  # seconds
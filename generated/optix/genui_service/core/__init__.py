@@ -6,6 +6,7 @@ from .requirement_parser import RequirementParser
 from .fsm_builder import FSMBuilder
 from .code_synthesizer import CodeSynthesizer
 from .post_processor import PostProcessor
+from .generation_cache import GenerationCache
 from .engine import GenUIEngine
 
 __all__ = [
@@ -13,5 +14,6 @@ __all__ = [
     "FSMBuilder",
     "CodeSynthesizer",
     "PostProcessor",
+    "GenerationCache",
     "GenUIEngine",
 ]
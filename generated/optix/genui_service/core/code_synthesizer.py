@@ -5,7 +5,9 @@ Generates executable HTML/CSS/JS from structured requirements and FSM state.
 Uses iterative refinement with generation-evaluation cycles.
 """
 
+import asyncio
 import json
+import logging
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 from ..models.schemas import (
@@ -20,6 +22,8 @@ from ..llm.providers import LLMProvider, get_llm_provider
 from ..llm.prompts.generation import get_generation_prompt
 from ..config import settings
 
+logger = logging.getLogger(__name__)
+
 
 class GeneratedUI:
     """Container for generated UI output."""
@@ -66,10 +70,16 @@ class CodeSynthesizer:
         preferences: Optional[UserPreferences] = None,
         max_iterations: int = None,
         target_score: float = None,
+        num_candidates: int = None,
+        max_concurrency: int = None,
+        token_budget: int = None,
     ) -> GeneratedUI:
         """
         Generate UI code from requirements using iterative refinement.
 
+        With more than one candidate, generation switches to best-of-N:
+        candidates are requested concurrently and the best one is kept.
+
         Args:
             requirements: Structured requirements
             fsm: Component FSM definitions
@@ -77,12 +87,28 @@ class CodeSynthesizer:
             preferences: User UI preferences
             max_iterations: Maximum refinement iterations
             target_score: Target quality score (0-100)
+            num_candidates: Candidates to generate in best-of-N mode
+            max_concurrency: Candidates generated at the same time
+            token_budget: Tokens allowed across all candidates
 
         Returns:
             GeneratedUI with HTML/CSS/JS code
         """
         max_iterations = max_iterations or settings.max_iterations
         target_score = target_score or settings.target_score
+        num_candidates = num_candidates or settings.num_candidates
+
+        if num_candidates > 1:
+            return await self._synthesize_best_of_n(
+                requirements=requirements,
+                fsm=fsm,
+                context=context,
+                preferences=preferences,
+                num_candidates=num_candidates,
+                target_score=target_score,
+                max_concurrency=max_concurrency or settings.max_concurrent_generations,
+                token_budget=token_budget or settings.generation_token_budget,
+            )
 
         best_candidate = None
         best_score = 0.0
@@ -113,6 +139,107 @@ class CodeSynthesizer:
 
         return best_candidate
 
+    async def _synthesize_best_of_n(
+        self,
+        requirements: RequirementSpec,
+        fsm: Optional[Dict[str, ComponentFSM]],
+        context: Optional[GenerationContext],
+        preferences: Optional[UserPreferences],
+        num_candidates: int,
+        target_score: float,
+        max_concurrency: int,
+        token_budget: Optional[int],
+    ) -> GeneratedUI:
+        """
+        Generate candidates concurrently and keep the best one.
+
+        Up to max_concurrency candidates are in flight at once. Each in-flight
+        request reserves max_tokens of the token budget until its actual
+        token count is known. Candidates started after the first result
+        refine the best one so far. Once any candidate reaches the target
+        score, outstanding requests are cancelled.
+        """
+        best_candidate = None
+        last_error = None
+        pending = set()
+        launched = 0
+        tokens_committed = 0
+
+        def can_launch() -> bool:
+            if launched >= num_candidates or len(pending) >= max_concurrency:
+                return False
+            if token_budget is None or launched == 0:
+                return True
+            return tokens_committed + settings.max_tokens <= token_budget
+
+        try:
+            while True:
+                while can_launch():
+                    launched += 1
+                    tokens_committed += settings.max_tokens
+                    pending.add(asyncio.create_task(self._generate_and_evaluate(
+                        requirements=requirements,
+                        fsm=fsm,
+                        context=context,
+                        preferences=preferences,
+                        previous=best_candidate,
+                        iteration=launched,
+                    )))
+
+                if not pending:
+                    break
+
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    tokens_committed -= settings.max_tokens
+                    try:
+                        candidate = task.result()
+                    except Exception as e:
+                        logger.warning("Candidate generation failed: %s", e)
+                        last_error = e
+                        continue
+
+                    tokens_committed += candidate.metadata.get("token_count") or 0
+                    if best_candidate is None or candidate.score > best_candidate.score:
+                        best_candidate = candidate
+
+                if best_candidate is not None and best_candidate.score >= target_score:
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        if best_candidate is None and last_error is not None:
+            raise last_error
+
+        return best_candidate
+
+    async def _generate_and_evaluate(
+        self,
+        requirements: RequirementSpec,
+        fsm: Optional[Dict[str, ComponentFSM]],
+        context: Optional[GenerationContext],
+        preferences: Optional[UserPreferences],
+        previous: Optional[GeneratedUI],
+        iteration: int,
+    ) -> GeneratedUI:
+        """Generate one candidate and score it."""
+        candidate = await self._generate_candidate(
+            requirements=requirements,
+            fsm=fsm,
+            context=context,
+            preferences=preferences,
+            previous=previous,
+            iteration=iteration,
+        )
+        candidate.score = await self._evaluate_candidate(candidate, requirements)
+        candidate.iteration = iteration
+        return candidate
+
     async def _generate_candidate(
         self,
         requirements: RequirementSpec,
@@ -8,6 +8,7 @@ Coordinates the three-stage pipeline:
 """
 
 import asyncio
+import logging
 import time
 import uuid
 from typing import Optional, AsyncGenerator, Dict, Any
@@ -17,6 +18,7 @@ from .requirement_parser import RequirementParser, requirement_parser
 from .fsm_builder import FSMBuilder, fsm_builder
 from .code_synthesizer import CodeSynthesizer, GeneratedUI, get_code_synthesizer
 from .post_processor import PostProcessor, post_processor, ProcessedUI
+from .generation_cache import GenerationCache, CachedGeneration, generation_cache
 
 from ..models.schemas import (
     GenerateUIRequest,
@@ -32,6 +34,8 @@ from ..models.schemas import (
 )
 from ..config import settings
 
+logger = logging.getLogger(__name__)
+
 
 class GenerationResult:
     """Result of a complete generation."""
@@ -64,6 +68,7 @@ class GenUIEngine:
         fsm_builder: Optional[FSMBuilder] = None,
         code_synthesizer: Optional[CodeSynthesizer] = None,
         post_processor: Optional[PostProcessor] = None,
+        generation_cache: Optional[GenerationCache] = None,
     ):
         """
         Initialize the GenUI Engine.
@@ -73,11 +78,13 @@ class GenUIEngine:
             fsm_builder: Optional custom FSM builder
             code_synthesizer: Optional custom code synthesizer
             post_processor: Optional custom post-processor
+            generation_cache: Optional custom generation cache
         """
         self._parser = requirement_parser
         self._fsm_builder = fsm_builder
         self._synthesizer = code_synthesizer
         self._post_processor = post_processor
+        self._cache = generation_cache
 
     @property
     def parser(self) -> RequirementParser:
@@ -107,6 +114,56 @@ class GenUIEngine:
             self._post_processor = post_processor
         return self._post_processor
 
+    @property
+    def cache(self) -> Optional[GenerationCache]:
+        """Get the generation cache, or None if caching is disabled."""
+        if not settings.generation_cache_enabled:
+            return None
+        if self._cache is None:
+            self._cache = generation_cache
+        return self._cache
+
+    async def _get_cached(
+        self,
+        requirements: RequirementSpec,
+        context: Optional[GenerationContext],
+        preferences: Optional[UserPreferences],
+    ) -> Optional[CachedGeneration]:
+        """Look up a cached generation; cache errors count as misses."""
+        if self.cache is None:
+            return None
+        try:
+            return await self.cache.get(requirements, context, preferences)
+        except Exception as e:
+            logger.warning("Generation cache lookup failed: %s", e)
+            return None
+
+    async def _cache_generation(
+        self,
+        requirements: RequirementSpec,
+        context: Optional[GenerationContext],
+        preferences: Optional[UserPreferences],
+        processed: ProcessedUI,
+        metadata: GenerationMetadata,
+    ) -> None:
+        """Cache a valid generation for repeated and parameterised queries."""
+        if self.cache is None or not processed.is_valid:
+            return
+        try:
+            await self.cache.put(
+                requirements,
+                context,
+                preferences,
+                html=processed.html,
+                metadata=metadata.model_dump(mode="json"),
+            )
+        except Exception as e:
+            logger.warning("Caching generation failed: %s", e)
+
+    def _cached_metadata(self, cached: CachedGeneration) -> GenerationMetadata:
+        """Build metadata for a generation served from the cache."""
+        return GenerationMetadata(**{**cached.metadata, "cache_level": cached.level})
+
     async def generate(
         self,
         query: str,
@@ -137,6 +194,17 @@ class GenUIEngine:
                 preferences=preferences,
             )
 
+            # Repeated and parameterised queries are served from the cache
+            cached = await self._get_cached(requirements, context, preferences)
+            if cached is not None:
+                return GenerationResult(
+                    generation_id=generation_id,
+                    status=GenerationStatus.COMPLETE,
+                    html=cached.html,
+                    metadata=self._cached_metadata(cached),
+                    generation_time_ms=int((time.time() - start_time) * 1000),
+                )
+
             # Stage 2: Build FSM
             component_fsms = self.fsm.get_fsm_for_requirements(requirements)
             interaction_graph = self.fsm.build_interaction_graph(
@@ -176,6 +244,10 @@ class GenUIEngine:
                 iteration_count=generated_ui.metadata.get("iteration_count", 1),
             )
 
+            await self._cache_generation(
+                requirements, context, preferences, processed, metadata
+            )
+
             return GenerationResult(
                 generation_id=generation_id,
                 status=GenerationStatus.COMPLETE,
@@ -237,6 +309,17 @@ class GenUIEngine:
                 preferences=preferences,
             )
 
+            cached = await self._get_cached(requirements, context, preferences)
+            if cached is not None:
+                yield StreamEvent(
+                    event="complete",
+                    generation_id=generation_id,
+                    progress=100,
+                    html=cached.html,
+                    metadata=self._cached_metadata(cached),
+                )
+                return
+
             # Stage 2: Planning
             yield StreamEvent(
                 event="planning",
@@ -308,6 +391,10 @@ class GenUIEngine:
                 iteration_count=generated_ui.metadata.get("iteration_count", 1),
             )
 
+            await self._cache_generation(
+                requirements, context, preferences, processed, metadata
+            )
+
             # Complete event
             yield StreamEvent(
                 event="complete",
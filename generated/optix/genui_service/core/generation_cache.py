@@ -0,0 +1,405 @@
+"""
+Generation Cache Module
+
+Caches finished generations so repeated and parameterised queries skip
+FSM building, code synthesis and post-processing.
+
+Two levels are checked in order:
+1. Exact - the normalised requirement spec, context and preferences
+2. Template - the same with symbols abstracted out; the cached HTML is
+   re-bound to the request's symbols when served
+
+Each level has an in-process LRU tier backed by Redis. Keys include a
+fingerprint of the component registry, prompts and LLM model, so cached
+UIs are invalidated whenever any of them change. The fingerprint is
+computed once; call refresh() after changing any of them at runtime.
+"""
+
+import hashlib
+import inspect
+import json
+import logging
+import re
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List
+
+from ..models.schemas import (
+    RequirementSpec,
+    GenerationContext,
+    UserPreferences,
+)
+from ..components.registry import ComponentRegistry, component_registry
+from ..llm.prompts import generation as generation_prompts
+from ..llm.prompts.system import GENUI_SYSTEM_PROMPT
+from ..config import settings
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - redis is optional
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait before retrying Redis after a failure
+REDIS_RETRY_SECONDS = 30.0
+
+# List fields of the requirement spec whose order does not matter
+UNORDERED_SPEC_FIELDS = ("target_data", "visualizations", "interactions")
+
+
+class CachedGeneration:
+    """A generation served from the cache."""
+
+    def __init__(self, html: str, metadata: Dict[str, Any], level: str):
+        self.html = html
+        self.metadata = metadata
+        self.level = level
+
+
+def prompt_fingerprint() -> str:
+    """Hash of the system prompt and the generation prompt builder source."""
+    try:
+        builder_source = inspect.getsource(generation_prompts)
+    except (OSError, TypeError):
+        builder_source = ""
+    return hashlib.sha256(
+        (GENUI_SYSTEM_PROMPT + builder_source).encode()
+    ).hexdigest()
+
+
+def rebind_symbols(text: str, mapping: Dict[str, str]) -> str:
+    """
+    Replace whole-word symbols in text.
+
+    All symbols are replaced in a single pass, so swapping two symbols
+    (AAPL -> TSLA, TSLA -> AAPL) works.
+    """
+    mapping = {old: new for old, new in mapping.items() if old != new}
+    if not mapping:
+        return text
+
+    alternatives = "|".join(
+        re.escape(symbol) for symbol in sorted(mapping, key=len, reverse=True)
+    )
+    pattern = re.compile(rf"(?<![A-Za-z0-9])({alternatives})(?![A-Za-z0-9])")
+    return pattern.sub(lambda match: mapping[match.group(1)], text)
+
+
+class GenerationCache:
+    """
+    Multi-level cache of generated UIs.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = None,
+        ttl: int = None,
+        redis_url: Optional[str] = None,
+        persist: bool = None,
+        registry: Optional[ComponentRegistry] = None,
+    ):
+        """
+        Initialize the generation cache.
+
+        Args:
+            max_entries: Entries kept in memory per level
+            ttl: Seconds persisted entries live in Redis
+            redis_url: Redis connection URL
+            persist: Whether to use the Redis tier
+            registry: Component registry cached UIs depend on
+        """
+        self.max_entries = max_entries or settings.generation_cache_size
+        self.ttl = ttl or settings.cache_ttl
+        self.redis_url = redis_url or settings.redis_url
+        self.persist = settings.generation_cache_persist if persist is None else persist
+        self._registry = registry or component_registry
+        self._prompt_fingerprint = prompt_fingerprint()
+        self._levels: Dict[str, OrderedDict] = {
+            "exact": OrderedDict(),
+            "template": OrderedDict(),
+        }
+        self._version = self._fingerprint()
+        self._redis = None
+        self._redis_retry_at = 0.0
+        self._stats = {"exact_hits": 0, "template_hits": 0, "misses": 0}
+
+    async def get(
+        self,
+        requirements: RequirementSpec,
+        context: Optional[GenerationContext] = None,
+        preferences: Optional[UserPreferences] = None,
+    ) -> Optional[CachedGeneration]:
+        """
+        Look up a cached generation.
+
+        Args:
+            requirements: Parsed requirements
+            context: Generation context
+            preferences: User preferences
+
+        Returns:
+            CachedGeneration, or None on a miss
+        """
+        version = self.version()
+        exact_key = self._exact_key(version, requirements, context, preferences)
+        entry = await self._lookup("exact", exact_key)
+        if entry is not None:
+            self._stats["exact_hits"] += 1
+            return CachedGeneration(entry["html"], entry["metadata"], "exact")
+
+        symbols = self._symbol_params(requirements, context)
+        template_key = self._template_key(version, requirements, context, preferences, symbols)
+        entry = await self._lookup("template", template_key) if template_key else None
+        if entry is None:
+            self._stats["misses"] += 1
+            return None
+
+        mapping = dict(zip(entry["symbols"], symbols))
+        bound = {
+            "html": rebind_symbols(entry["html"], mapping),
+            "metadata": json.loads(rebind_symbols(json.dumps(entry["metadata"]), mapping)),
+        }
+        # Later exact repeats skip re-binding
+        await self._store("exact", exact_key, bound)
+
+        self._stats["template_hits"] += 1
+        return CachedGeneration(bound["html"], bound["metadata"], "template")
+
+    async def put(
+        self,
+        requirements: RequirementSpec,
+        context: Optional[GenerationContext],
+        preferences: Optional[UserPreferences],
+        html: str,
+        metadata: Dict[str, Any],
+    ) -> None:
+        """
+        Cache a finished generation at both levels.
+
+        Args:
+            requirements: Parsed requirements
+            context: Generation context
+            preferences: User preferences
+            html: Post-processed HTML
+            metadata: JSON-serialisable generation metadata
+        """
+        version = self.version()
+        entry = {"html": html, "metadata": metadata}
+        await self._store(
+            "exact", self._exact_key(version, requirements, context, preferences), entry
+        )
+
+        symbols = self._symbol_params(requirements, context)
+        template_key = self._template_key(version, requirements, context, preferences, symbols)
+        if template_key:
+            await self._store("template", template_key, {**entry, "symbols": symbols})
+
+    def version(self) -> str:
+        """Fingerprint of everything cached UIs depend on."""
+        return self._version
+
+    def refresh(self) -> str:
+        """
+        Re-fingerprint the registry, prompts and LLM model.
+
+        Call after any of them change at runtime. In-memory entries are
+        dropped when the fingerprint changes; persisted entries become
+        unreachable and expire.
+
+        Returns:
+            The current version
+        """
+        version = self._fingerprint()
+        if version != self._version:
+            self.clear()
+            self._version = version
+        return version
+
+    def refresh_prompts(self) -> None:
+        """Re-read the prompts after they are reloaded at runtime."""
+        self._prompt_fingerprint = prompt_fingerprint()
+        self.refresh()
+
+    def clear(self) -> None:
+        """Drop all in-memory entries."""
+        for entries in self._levels.values():
+            entries.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get hit and miss counters."""
+        return {
+            **self._stats,
+            "exact_entries": len(self._levels["exact"]),
+            "template_entries": len(self._levels["template"]),
+        }
+
+    def _fingerprint(self) -> str:
+        """Hash of the component registry, prompts and LLM model."""
+        components = [
+            component.model_dump(mode="json")
+            for component in self._registry.list_components()
+        ]
+        raw = json.dumps(
+            [
+                components,
+                self._prompt_fingerprint,
+                settings.default_llm_provider,
+                settings.default_llm_model,
+            ],
+            sort_keys=True,
+        )
+        return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+    def _exact_key(
+        self,
+        version: str,
+        requirements: RequirementSpec,
+        context: Optional[GenerationContext],
+        preferences: Optional[UserPreferences],
+    ) -> str:
+        """Key of the normalised spec, context and preferences."""
+        return self._hash(version, "exact", [
+            self._normalize_spec(requirements),
+            context.model_dump(mode="json") if context else None,
+            preferences.model_dump(mode="json") if preferences else None,
+        ])
+
+    def _template_key(
+        self,
+        version: str,
+        requirements: RequirementSpec,
+        context: Optional[GenerationContext],
+        preferences: Optional[UserPreferences],
+        symbols: List[str],
+    ) -> Optional[str]:
+        """
+        Key with symbols abstracted out.
+
+        Prices and other context values stay in the key, since the prompt
+        writes them into the HTML. Single-letter symbols are not templated;
+        whole-word replacement cannot tell them apart from ordinary text.
+        """
+        if any(len(symbol) < 2 for symbol in symbols):
+            return None
+
+        placeholders = {symbol: f"$SYMBOL{i}" for i, symbol in enumerate(symbols)}
+        return self._hash(version, "template", [
+            self._abstract(self._normalize_spec(requirements), placeholders),
+            self._abstract(context.model_dump(mode="json") if context else None, placeholders),
+            preferences.model_dump(mode="json") if preferences else None,
+        ])
+
+    def _normalize_spec(self, requirements: RequirementSpec) -> Dict[str, Any]:
+        """Requirement spec with order-insensitive lists sorted and symbols upper-cased."""
+        spec = requirements.model_dump(mode="json")
+        for field in UNORDERED_SPEC_FIELDS:
+            spec[field] = sorted(set(spec.get(field) or []))
+        if spec.get("symbol"):
+            spec["symbol"] = spec["symbol"].strip().upper()
+        if spec.get("symbols"):
+            spec["symbols"] = [symbol.strip().upper() for symbol in spec["symbols"]]
+        return spec
+
+    def _symbol_params(
+        self,
+        requirements: RequirementSpec,
+        context: Optional[GenerationContext],
+    ) -> List[str]:
+        """Symbols that parameterise a generation, in a stable order."""
+        candidates = [requirements.symbol, *(requirements.symbols or [])]
+        if context:
+            candidates.append(context.symbol)
+
+        symbols = []
+        for symbol in candidates:
+            if symbol:
+                symbol = symbol.strip().upper()
+                if symbol not in symbols:
+                    symbols.append(symbol)
+        return symbols
+
+    def _abstract(self, value: Any, placeholders: Dict[str, str]) -> Any:
+        """Replace symbol string values with their placeholders."""
+        if isinstance(value, str):
+            return placeholders.get(value.strip().upper(), value)
+        if isinstance(value, list):
+            return [self._abstract(item, placeholders) for item in value]
+        if isinstance(value, dict):
+            return {key: self._abstract(item, placeholders) for key, item in value.items()}
+        return value
+
+    def _hash(self, version: str, level: str, payload: Any) -> str:
+        """Stable key for a payload."""
+        raw = json.dumps([version, level, payload], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    async def _lookup(self, level: str, key: str) -> Optional[Dict[str, Any]]:
+        """Check the memory tier, then Redis."""
+        entries = self._levels[level]
+        entry = entries.get(key)
+        if entry is not None:
+            entries.move_to_end(key)
+            return entry
+
+        client = self._get_redis()
+        if client is None:
+            return None
+        try:
+            raw = await client.get(self._redis_key(level, key))
+        except Exception as e:
+            self._redis_failed(e)
+            return None
+        if raw is None:
+            return None
+
+        entry = json.loads(raw)
+        self._remember(level, key, entry)
+        return entry
+
+    async def _store(self, level: str, key: str, entry: Dict[str, Any]) -> None:
+        """Write to the memory tier and Redis."""
+        self._remember(level, key, entry)
+
+        client = self._get_redis()
+        if client is None:
+            return
+        try:
+            await client.set(self._redis_key(level, key), json.dumps(entry), ex=self.ttl)
+        except Exception as e:
+            self._redis_failed(e)
+
+    def _remember(self, level: str, key: str, entry: Dict[str, Any]) -> None:
+        """Insert into a level's LRU, evicting the least recently used entry."""
+        entries = self._levels[level]
+        entries[key] = entry
+        entries.move_to_end(key)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+    def _get_redis(self):
+        """Get the Redis client unless persistence is off or backing off."""
+        if not self.persist or aioredis is None:
+            return None
+        if time.monotonic() < self._redis_retry_at:
+            return None
+        if self._redis is None:
+            self._redis = aioredis.from_url(
+                self.redis_url,
+                socket_connect_timeout=0.5,
+                socket_timeout=0.5,
+            )
+        return self._redis
+
+    def _redis_failed(self, error: Exception) -> None:
+        """Stop using Redis for a while after an error."""
+        logger.warning("Generation cache persistence unavailable: %s", error)
+        self._redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+
+    def _redis_key(self, level: str, key: str) -> str:
+        """Redis key for an entry."""
+        return f"genui:cache:{level}:{key}"
+
+
+# Create singleton instance
+generation_cache = GenerationCache()
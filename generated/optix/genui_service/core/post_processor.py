@@ -48,6 +48,28 @@ class BaseProcessor(ABC):
         pass
 
 
+def _literal_prefix(pattern: str) -> str:
+    """Lower-cased literal text a pattern's matches must start with."""
+    if "|" in pattern:
+        return ""
+    prefix = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\" and pattern[i + 1:i + 2] == ".":
+            prefix.append(".")
+            i += 2
+        elif char in "\\.^$*+?{}[]()":
+            if char in "*?{" and prefix:
+                # The previous character is optional or repeated
+                prefix.pop()
+            break
+        else:
+            prefix.append(char)
+            i += 1
+    return "".join(prefix).lower()
+
+
 class SecuritySanitizer(BaseProcessor):
     """
     Ensures generated code is safe for sandboxed execution.
@@ -71,6 +93,21 @@ class SecuritySanitizer(BaseProcessor):
         (r'data:text/html', '/* BLOCKED: data:text/html */'),
     ]
 
+    # Compiled once, each with the literal text every match starts with.
+    # Documents skip patterns whose literal they do not contain.
+    COMPILED_PATTERNS = [
+        (pattern, re.compile(pattern, re.IGNORECASE), replacement, _literal_prefix(pattern))
+        for pattern, replacement in BLOCKED_PATTERNS
+    ]
+
+    # The only non-ASCII characters IGNORECASE matches against ASCII
+    # letters: dotted and dotless I, long S and the Kelvin sign
+    CASE_FOLDS = {"\u0130": "i", "\u0131": "i", "\u017f": "s", "\u212a": "k"}
+
+    # Equivalent to \bon\w+..., but starting with a literal lets the regex
+    # engine skip ahead to each "on"
+    INLINE_HANDLER_PATTERN = re.compile(r'on(?<=\bon)\w+\s*=\s*["\'][^"\']*["\']')
+
     REQUIRED_CSP = {
         "default-src": "'self'",
         "script-src": "'self' 'unsafe-inline'",
@@ -92,19 +129,18 @@ class SecuritySanitizer(BaseProcessor):
         modified = False
 
         # Check and replace blocked patterns
-        for pattern, replacement in self.BLOCKED_PATTERNS:
-            if re.search(pattern, result_html, re.IGNORECASE):
-                result_html = re.sub(
-                    pattern,
-                    replacement,
-                    result_html,
-                    flags=re.IGNORECASE
-                )
+        lowered = self._fold(result_html)
+        for pattern, compiled, replacement, literal in self.COMPILED_PATTERNS:
+            if literal not in lowered:
+                continue
+            result_html, count = compiled.subn(replacement, result_html)
+            if count:
                 warnings.append(f"Blocked pattern: {pattern}")
                 modified = True
+                lowered = self._fold(result_html)
 
         # Remove inline event handlers (onclick, onerror, etc.)
-        inline_handlers = re.findall(r'\bon\w+\s*=\s*["\'][^"\']*["\']', result_html)
+        inline_handlers = self.INLINE_HANDLER_PATTERN.findall(result_html)
         for handler in inline_handlers:
             result_html = result_html.replace(handler, '')
             warnings.append(f"Removed inline handler: {handler[:30]}...")
@@ -136,6 +172,14 @@ class SecuritySanitizer(BaseProcessor):
             warnings=warnings,
         )
 
+    def _fold(self, text: str) -> str:
+        """Lower-case text so it contains every literal a pattern could match."""
+        if not text.isascii():
+            for char, folded in self.CASE_FOLDS.items():
+                if char in text:
+                    text = text.replace(char, folded)
+        return text.lower()
+
 
 class StyleNormalizer(BaseProcessor):
     """Ensures consistent styling with OPTIX design system."""
@@ -231,6 +275,11 @@ class StyleNormalizer(BaseProcessor):
 class AccessibilityChecker(BaseProcessor):
     """Adds ARIA labels, roles, and checks accessibility."""
 
+    IMG_WITHOUT_ALT_PATTERN = re.compile(r'<img(?![^>]*alt=)[^>]*>')
+    BUTTON_WITHOUT_TEXT_PATTERN = re.compile(
+        r'<button[^>]*>\s*<(?:img|svg|i)[^>]*>\s*</button>'
+    )
+
     async def process(
         self,
         html_content: str,
@@ -247,7 +296,10 @@ class AccessibilityChecker(BaseProcessor):
             modified = True
 
         # Check for images without alt text
-        img_without_alt = re.findall(r'<img(?![^>]*alt=)[^>]*>', result_html)
+        img_without_alt = (
+            self.IMG_WITHOUT_ALT_PATTERN.findall(result_html)
+            if '<img' in result_html else []
+        )
         for img in img_without_alt:
             warnings.append(f"Image without alt text: {img[:50]}...")
 
@@ -257,9 +309,9 @@ class AccessibilityChecker(BaseProcessor):
             modified = True
 
         # Check for buttons without accessible names
-        button_without_text = re.findall(
-            r'<button[^>]*>\s*<(?:img|svg|i)[^>]*>\s*</button>',
-            result_html
+        button_without_text = (
+            self.BUTTON_WITHOUT_TEXT_PATTERN.findall(result_html)
+            if '<button' in result_html else []
         )
         for btn in button_without_text:
             warnings.append(f"Button without accessible name: {btn[:50]}...")
@@ -291,6 +343,8 @@ class AccessibilityChecker(BaseProcessor):
 class DataBindingResolver(BaseProcessor):
     """Resolves data placeholders in the generated UI."""
 
+    PLACEHOLDER_PATTERN = re.compile(r'\{\{DATA:([^}]+)\}\}')
+
     async def process(
         self,
         html_content: str,
@@ -301,19 +355,27 @@ class DataBindingResolver(BaseProcessor):
         modified = False
 
         # Find data placeholders {{DATA:endpoint:params}}
-        placeholders = re.findall(r'\{\{DATA:([^}]+)\}\}', result_html)
-
-        for placeholder in placeholders:
-            parts = placeholder.split(':')
-            endpoint = parts[0] if parts else 'unknown'
+        placeholders = (
+            self.PLACEHOLDER_PATTERN.findall(result_html)
+            if '{{DATA:' in result_html else []
+        )
 
-            # Replace with JavaScript data bridge call
-            replacement = f'<span data-bind="{endpoint}" data-params="{":".join(parts[1:])}">[Loading...]</span>'
-            result_html = result_html.replace(
-                f'{{{{DATA:{placeholder}}}}}',
-                replacement
+        if placeholders and not any('{' in placeholder for placeholder in placeholders):
+            # Without '{' placeholders cannot overlap each other or their
+            # replacements, so one pass equals replacing each in turn
+            result_html = self.PLACEHOLDER_PATTERN.sub(
+                lambda match: self._binding_span(match.group(1)),
+                result_html
             )
             modified = True
+        else:
+            for placeholder in placeholders:
+                # Replace with JavaScript data bridge call
+                result_html = result_html.replace(
+                    f'{{{{DATA:{placeholder}}}}}',
+                    self._binding_span(placeholder)
+                )
+                modified = True
 
         # Add data bridge initialization script if bindings exist
         if 'data-bind=' in result_html and 'initDataBindings' not in result_html:
@@ -361,6 +423,12 @@ class DataBindingResolver(BaseProcessor):
             modified=modified,
         )
 
+    def _binding_span(self, placeholder: str) -> str:
+        """Build the data bridge element for a placeholder."""
+        parts = placeholder.split(':')
+        endpoint = parts[0] if parts else 'unknown'
+        return f'<span data-bind="{endpoint}" data-params="{":".join(parts[1:])}">[Loading...]</span>'
+
 
 class ErrorBoundaryInjector(BaseProcessor):
     """Wraps components in error handling."""
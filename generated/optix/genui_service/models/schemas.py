@@ -207,6 +207,7 @@ class GenerationMetadata(BaseModel):
     iteration_count: int = 1
     refinement_applied: Optional[str] = None
     changes_made: Optional[List[str]] = None
+    cache_level: Optional[str] = None  # "exact" or "template" when served from cache
 
 
 class GenerateUIResponse(BaseModel):
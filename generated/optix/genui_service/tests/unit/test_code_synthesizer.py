@@ -0,0 +1,121 @@
+"""
+Unit tests for best-of-N code synthesis.
+"""
+
+import asyncio
+
+import pytest
+
+from genui_service.config import settings
+from genui_service.core.code_synthesizer import CodeSynthesizer
+from genui_service.llm.providers import LLMProvider, LLMResponse
+from genui_service.models.schemas import RequirementSpec
+
+
+class FakeLLM(LLMProvider):
+    """Provider whose calls return in order, optionally never finishing."""
+
+    def __init__(self, token_count: int = 100, stall_after: int = None):
+        self.token_count = token_count
+        self.stall_after = stall_after
+        self.calls = 0
+        self.cancelled = 0
+
+    @property
+    def provider_name(self) -> str:
+        return "fake"
+
+    async def generate(self, prompt, system_prompt=None, max_tokens=4096, temperature=0.7):
+        self.calls += 1
+        call = self.calls
+        if self.stall_after is not None and call > self.stall_after:
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                self.cancelled += 1
+                raise
+        return LLMResponse(
+            content=f"<div>candidate {call}</div>",
+            provider="fake",
+            model="fake-model",
+            token_count=self.token_count,
+        )
+
+
+def make_synthesizer(llm, score=50.0):
+    """Synthesizer scoring every candidate the same, or by a callable."""
+    synthesizer = CodeSynthesizer(llm_provider=llm)
+
+    async def evaluate(candidate, requirements):
+        return score(candidate) if callable(score) else score
+
+    synthesizer._evaluate_candidate = evaluate
+    return synthesizer
+
+
+REQUIREMENTS = RequirementSpec(intent="quote", symbol="AAPL")
+
+
+class TestBestOfN:
+    """Tests for concurrent candidate generation."""
+
+    @pytest.mark.asyncio
+    async def test_token_budget_stops_generation(self, monkeypatch):
+        """Test no candidate starts once its reservation would exceed the budget."""
+        monkeypatch.setattr(settings, "max_tokens", 1000)
+        llm = FakeLLM(token_count=600)
+        synthesizer = make_synthesizer(llm)
+
+        # 1000 reserved, then 600 + 1000, then 1200 + 1000 is over budget
+        result = await synthesizer.synthesize(
+            REQUIREMENTS, num_candidates=5, max_concurrency=1,
+            target_score=100, token_budget=2000,
+        )
+
+        assert llm.calls == 2
+        assert result.iteration == 1
+
+    @pytest.mark.asyncio
+    async def test_first_candidate_ignores_budget(self, monkeypatch):
+        """Test a budget below one request still generates a candidate."""
+        monkeypatch.setattr(settings, "max_tokens", 1000)
+        llm = FakeLLM()
+        synthesizer = make_synthesizer(llm)
+
+        result = await synthesizer.synthesize(
+            REQUIREMENTS, num_candidates=3, max_concurrency=3,
+            target_score=100, token_budget=500,
+        )
+
+        assert llm.calls == 1
+        assert result is not None
+
+    @pytest.mark.asyncio
+    async def test_losing_candidates_are_cancelled(self):
+        """Test outstanding requests are cancelled once one reaches the target."""
+        llm = FakeLLM(stall_after=1)
+        synthesizer = make_synthesizer(llm, score=100.0)
+
+        result = await synthesizer.synthesize(
+            REQUIREMENTS, num_candidates=3, max_concurrency=3, target_score=90,
+        )
+
+        assert result.html == "<div>candidate 1</div>"
+        assert llm.calls == 3
+        assert llm.cancelled == 2
+
+    @pytest.mark.asyncio
+    async def test_best_candidate_is_kept(self):
+        """Test the highest scoring candidate wins when none reach the target."""
+        llm = FakeLLM()
+        synthesizer = make_synthesizer(
+            llm, score=lambda candidate: 80.0 if "candidate 2" in candidate.html else 40.0
+        )
+
+        result = await synthesizer.synthesize(
+            REQUIREMENTS, num_candidates=3, max_concurrency=1, target_score=95,
+        )
+
+        assert llm.calls == 3
+        assert result.html == "<div>candidate 2</div>"
+        assert result.score == 80.0
@@ -0,0 +1,203 @@
+"""
+Unit tests for the generation cache.
+"""
+
+import pytest
+
+from genui_service.components.registry import ComponentRegistry, COMPONENT_DEFINITIONS
+from genui_service.core.generation_cache import GenerationCache, rebind_symbols
+from genui_service.models.schemas import (
+    RequirementSpec,
+    GenerationContext,
+    UserPreferences,
+)
+
+
+def make_cache(registry=None):
+    """In-memory cache with its own registry."""
+    if registry is None:
+        registry = ComponentRegistry()
+        registry._components = dict(COMPONENT_DEFINITIONS)
+    return GenerationCache(max_entries=10, ttl=60, persist=False, registry=registry)
+
+
+def make_requirements(symbol="AAPL", **kwargs):
+    """Options chain requirements for a symbol."""
+    return RequirementSpec(
+        intent="options_chain",
+        target_data=["options_chain", "greeks"],
+        symbol=symbol,
+        visualizations=["table"],
+        **kwargs,
+    )
+
+
+class TestRebindSymbols:
+    """Tests for whole-word symbol replacement."""
+
+    def test_whole_words_only(self):
+        """Test symbols inside other words are left alone."""
+        assert rebind_symbols("AAPL AAPLX xAAPL", {"AAPL": "TSLA"}) == "TSLA AAPLX xAAPL"
+
+    def test_swap(self):
+        """Test two symbols can be swapped in one pass."""
+        text = "AAPL vs TSLA"
+        assert rebind_symbols(text, {"AAPL": "TSLA", "TSLA": "AAPL"}) == "TSLA vs AAPL"
+
+
+class TestGenerationCache:
+    """Tests for exact and template lookups."""
+
+    @pytest.mark.asyncio
+    async def test_miss(self):
+        """Test an empty cache misses."""
+        cache = make_cache()
+
+        assert await cache.get(make_requirements()) is None
+        assert cache.get_stats()["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_exact_hit(self):
+        """Test the same spec is served, whatever its list order."""
+        cache = make_cache()
+        context = GenerationContext(symbol="AAPL", current_price=150.0)
+        await cache.put(make_requirements(), context, None, "<div>AAPL</div>", {"id": "1"})
+
+        requirements = make_requirements()
+        requirements.target_data.reverse()
+        cached = await cache.get(requirements, context)
+
+        assert cached.level == "exact"
+        assert cached.html == "<div>AAPL</div>"
+        assert cached.metadata == {"id": "1"}
+
+    @pytest.mark.asyncio
+    async def test_template_hit_rebinds_symbols(self):
+        """Test another symbol is served from the template with its symbol."""
+        cache = make_cache()
+        await cache.put(
+            make_requirements("AAPL"), None, None, "<h1>AAPL chain</h1>", {"symbol": "AAPL"}
+        )
+
+        cached = await cache.get(make_requirements("tsla"))
+
+        assert cached.level == "template"
+        assert cached.html == "<h1>TSLA chain</h1>"
+        assert cached.metadata == {"symbol": "TSLA"}
+
+        # The re-bound result is now an exact entry
+        assert (await cache.get(make_requirements("TSLA"))).level == "exact"
+
+    @pytest.mark.asyncio
+    async def test_template_keeps_price(self):
+        """Test another symbol's price is never served from a template."""
+        cache = make_cache()
+        await cache.put(
+            make_requirements("AAPL"),
+            GenerationContext(symbol="AAPL", current_price=150.0),
+            None,
+            "<p>AAPL $150.00</p>",
+            {},
+        )
+
+        cached = await cache.get(
+            make_requirements("TSLA"), GenerationContext(symbol="TSLA", current_price=250.0)
+        )
+        assert cached is None
+
+        cached = await cache.get(
+            make_requirements("TSLA"), GenerationContext(symbol="TSLA", current_price=150.0)
+        )
+        assert cached.html == "<p>TSLA $150.00</p>"
+
+    @pytest.mark.asyncio
+    async def test_preferences_are_part_of_the_key(self):
+        """Test different preferences miss."""
+        cache = make_cache()
+        await cache.put(make_requirements(), None, UserPreferences(), "<div></div>", {})
+
+        cached = await cache.get(make_requirements(), None, UserPreferences(theme="light"))
+
+        assert cached is None
+
+    @pytest.mark.asyncio
+    async def test_single_letter_symbols_are_not_templated(self):
+        """Test single-letter symbols only hit exactly."""
+        cache = make_cache()
+        await cache.put(make_requirements("F"), None, None, "<div>F</div>", {})
+
+        assert await cache.get(make_requirements("GM")) is None
+        assert (await cache.get(make_requirements("F"))).level == "exact"
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self):
+        """Test the least recently used entry is evicted."""
+        cache = make_cache()
+        cache.max_entries = 2
+        context = GenerationContext(current_price=1.0)
+        for symbol in ["F", "T", "X"]:
+            await cache.put(make_requirements(symbol), context, None, symbol, {})
+
+        assert await cache.get(make_requirements("F"), context) is None
+        assert (await cache.get(make_requirements("X"), context)).html == "X"
+
+
+class TestGenerationCacheInvalidation:
+    """Tests for version fingerprinting."""
+
+    def test_version_is_computed_once(self, monkeypatch):
+        """Test lookups do not re-serialise the registry."""
+        registry = ComponentRegistry()
+        cache = make_cache(registry)
+        calls = []
+        monkeypatch.setattr(
+            registry, "list_components", lambda: calls.append(1) or []
+        )
+
+        cache.version()
+        cache.version()
+
+        assert calls == []
+
+    @pytest.mark.asyncio
+    async def test_registry_change_invalidates(self):
+        """Test refreshing after a registry change drops cached UIs."""
+        registry = ComponentRegistry()
+        registry._components = dict(COMPONENT_DEFINITIONS)
+        cache = make_cache(registry)
+        await cache.put(make_requirements(), None, None, "<div>AAPL</div>", {})
+        version = cache.version()
+
+        registry._components["NewsFeed"] = {
+            "name": "NewsFeed",
+            "description": "Headlines for a symbol.",
+            "props": ["symbol"],
+            "fsm_states": ["loading", "ready", "error"],
+        }
+
+        assert cache.refresh() != version
+        assert cache.get_stats()["exact_entries"] == 0
+        assert await cache.get(make_requirements()) is None
+
+    @pytest.mark.asyncio
+    async def test_unchanged_refresh_keeps_entries(self):
+        """Test refreshing without a change keeps cached UIs."""
+        cache = make_cache()
+        await cache.put(make_requirements(), None, None, "<div>AAPL</div>", {})
+        version = cache.version()
+
+        assert cache.refresh() == version
+        assert (await cache.get(make_requirements())).level == "exact"
+
+    @pytest.mark.asyncio
+    async def test_prompt_change_invalidates(self, monkeypatch):
+        """Test reloading changed prompts drops cached UIs."""
+        from genui_service.core import generation_cache
+
+        cache = make_cache()
+        await cache.put(make_requirements(), None, None, "<div>AAPL</div>", {})
+        monkeypatch.setattr(generation_cache, "prompt_fingerprint", lambda: "changed")
+
+        cache.refresh_prompts()
+
+        assert await cache.get(make_requirements()) is None
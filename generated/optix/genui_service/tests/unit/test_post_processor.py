@@ -0,0 +1,96 @@
+"""
+Unit tests for the security sanitizer's pattern prefilter.
+"""
+
+import re
+import sys
+
+import pytest
+
+from genui_service.core.post_processor import SecuritySanitizer, _literal_prefix
+
+
+class TestLiteralPrefix:
+    """Tests for the literal text blocked patterns must start with."""
+
+    @pytest.mark.parametrize("pattern, literal", [
+        (r"eval\s*\(", "eval"),
+        (r"document\.write", "document.write"),
+        (r"window\.location\s*=", "window.location"),
+        (r"<script\s+src=", "<script"),
+        (r"javascript:", "javascript:"),
+        (r"XMLHttpRequest", "xmlhttprequest"),
+    ])
+    def test_blocked_pattern_literals(self, pattern, literal):
+        """Test literals stop at the first regex construct and are lower-cased."""
+        assert _literal_prefix(pattern) == literal
+
+    @pytest.mark.parametrize("pattern, literal", [
+        (r"evals?", "eval"),
+        (r"colou*r", "colo"),
+        (r"ab{2}", "a"),
+        (r"x?y", ""),
+        (r"eval|exec", ""),
+        (r"(eval)", ""),
+        (r"[Ee]val", ""),
+        (r"\beval", ""),
+    ])
+    def test_optional_and_unsafe_constructs(self, pattern, literal):
+        """Test optional characters, groups and alternation shorten the literal."""
+        assert _literal_prefix(pattern) == literal
+
+    def test_literals_prefix_every_match(self):
+        """Test each compiled pattern's literal begins every sample match."""
+        samples = [
+            "EVAL  (", "Function(", "document.WRITE", "innerHTML =",
+            "window.location=", "document.cookie", "localStorage.", "SessionStorage.",
+            "fetch (", "XMLHTTPREQUEST", "<SCRIPT  src=", "<IFRAME", "JavaScript:",
+            "DATA:TEXT/HTML",
+        ]
+        for (pattern, compiled, _, literal), sample in zip(
+            SecuritySanitizer.COMPILED_PATTERNS, samples
+        ):
+            assert compiled.fullmatch(sample), pattern
+            assert sample.lower().startswith(literal), pattern
+
+
+class TestCaseFolds:
+    """Tests for non-ASCII characters that IGNORECASE matches as ASCII."""
+
+    def test_case_folds_are_complete(self):
+        """Test every non-ASCII character matching an ASCII letter is folded."""
+        letter = re.compile("[a-z]", re.IGNORECASE)
+        matching = {
+            chr(code)
+            for code in range(128, sys.maxunicode + 1)
+            if letter.fullmatch(chr(code))
+        }
+
+        assert matching == set(SecuritySanitizer.CASE_FOLDS)
+        for char, folded in SecuritySanitizer.CASE_FOLDS.items():
+            assert re.fullmatch(folded, char, re.IGNORECASE)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("html_content", [
+        '<a href="javaſcript:alert(1)">x</a>',
+        "<ıframe src=x>",
+        "<İFRAME src=x>",
+        "new XMLHttpRequeſt()",
+    ])
+    async def test_folded_characters_are_still_blocked(self, html_content):
+        """Test the prefilter does not skip patterns matched through a fold."""
+        result = await SecuritySanitizer().process(html_content)
+
+        assert result.modified
+        assert "BLOCKED" in result.html
+
+    @pytest.mark.asyncio
+    async def test_other_non_ascii_text_is_kept(self):
+        """Test documents without blocked patterns pass through unchanged."""
+        html_content = "<p>Évaluation du marché — ΔΓ</p>"
+
+        result = await SecuritySanitizer().process(html_content)
+
+        assert not result.modified
+        assert result.html == html_content
+        assert result.warnings == []
@@ -0,0 +1,136 @@
+"""
+Unit tests for WebSocket fan-out and backpressure.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from genui_service.api.websocket import ClientConnection, ConnectionManager
+
+
+class FakeWebSocket:
+    """WebSocket that records sent text and can be stalled."""
+
+    def __init__(self, stalled: bool = False):
+        self.sent = []
+        self.closed = None
+        self._open = asyncio.Event()
+        if not stalled:
+            self._open.set()
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, message):
+        self.sent.append(message)
+
+    async def send_text(self, payload):
+        await self._open.wait()
+        self.sent.append(json.loads(payload))
+
+    async def close(self, code=1000, reason=None):
+        self.closed = code
+
+    def resume(self):
+        self._open.set()
+
+
+def make_connection(max_queue=3, max_control=2):
+    """Connection whose queue is inspected without a sender task."""
+    return ClientConnection(FakeWebSocket(), "gen-1", max_queue, max_control)
+
+
+async def drain(connection):
+    """Send everything queued on a connection."""
+    sender = asyncio.create_task(connection.drain())
+    await asyncio.sleep(0)
+    sender.cancel()
+    return connection.websocket.sent
+
+
+class TestClientConnection:
+    """Tests for the per-connection queue."""
+
+    @pytest.mark.asyncio
+    async def test_conflated_channel_keeps_latest(self):
+        """Test quote updates replace the pending update for their channel."""
+        connection = make_connection()
+        for price in (1, 2, 3):
+            connection.enqueue("quote:AAPL", json.dumps({"price": price}))
+        connection.enqueue("quote:TSLA", json.dumps({"price": 9}))
+
+        assert await drain(connection) == [{"price": 3}, {"price": 9}]
+        assert connection.conflated == 2
+        assert connection.dropped == 0
+
+    @pytest.mark.asyncio
+    async def test_full_queue_drops_oldest(self):
+        """Test a slow client loses its oldest pending updates."""
+        connection = make_connection(max_queue=3)
+        for i in range(5):
+            connection.enqueue("news", json.dumps({"i": i}))
+
+        assert await drain(connection) == [{"i": 2}, {"i": 3}, {"i": 4}]
+        assert connection.dropped == 2
+
+    @pytest.mark.asyncio
+    async def test_control_replies_go_first(self):
+        """Test control replies are sent ahead of pending data."""
+        connection = make_connection()
+        connection.enqueue("news", json.dumps({"i": 0}))
+
+        assert connection.send_control({"type": "pong"})
+
+        assert await drain(connection) == [{"type": "pong"}, {"i": 0}]
+
+    def test_control_queue_is_bounded(self):
+        """Test replies are refused once max_control are unsent."""
+        connection = make_connection(max_control=2)
+
+        assert connection.send_control({"type": "pong"})
+        assert connection.send_control({"type": "pong"})
+        assert not connection.send_control({"type": "pong"})
+        assert len(connection._control) == 2
+
+
+class TestConnectionManager:
+    """Tests for fan-out across connections."""
+
+    @pytest.mark.asyncio
+    async def test_slow_client_does_not_delay_others(self):
+        """Test a stalled connection only backs up its own queue."""
+        manager = ConnectionManager(max_queue=2, update_interval=60)
+        slow, fast = FakeWebSocket(stalled=True), FakeWebSocket()
+        await manager.connect(slow, "gen-1", ["news"])
+        await manager.connect(fast, "gen-1", [])
+
+        for i in range(4):
+            await manager.publish("news", {"i": i})
+            await asyncio.sleep(0)
+
+        assert [message["data"] for message in fast.sent[1:]] == [{"i": i} for i in range(4)]
+        assert len(slow.sent) == 1
+        assert manager.get_stats()["dropped"] == 1
+
+        slow.resume()
+        await asyncio.sleep(0.01)
+        # The first update was in flight; the newest two stayed queued
+        assert [message["data"] for message in slow.sent[1:]] == [{"i": 0}, {"i": 2}, {"i": 3}]
+        await manager.disconnect(slow, "gen-1")
+        await manager.disconnect(fast, "gen-1")
+
+    @pytest.mark.asyncio
+    async def test_unread_control_replies_disconnect(self):
+        """Test a client that never reads its replies is closed."""
+        manager = ConnectionManager(max_control=2)
+        websocket = FakeWebSocket(stalled=True)
+        await manager.connect(websocket, "gen-1", [])
+
+        for _ in range(4):
+            await manager.send("gen-1", websocket, {"type": "pong"})
+            await asyncio.sleep(0)
+
+        assert websocket.closed == 1008
+        assert "gen-1" not in manager.active_connections
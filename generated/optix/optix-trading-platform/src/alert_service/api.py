@@ -13,14 +13,20 @@ from .monitor import AlertMonitor
 router = APIRouter(prefix="/api/v1/alerts", tags=["alerts"])
 
 
+# One repository and monitor shared by all requests, so every alert is
+# indexed by the same monitor and sees its repository's change notifications
+alert_repository = AlertRepository()
+alert_monitor = AlertMonitor(alert_repository)
+
+
 def get_alert_repository() -> AlertRepository:
     """Get alert repository instance"""
-    return AlertRepository()
+    return alert_repository
 
 
 def get_alert_monitor() -> AlertMonitor:
     """Get alert monitor instance"""
-    return AlertMonitor()
+    return alert_monitor
 
 
 def get_current_user_id() -> uuid.UUID:
@@ -3,96 +3,341 @@ Alert Monitor
 Background service for monitoring price alerts
 """
 import asyncio
-from typing import Dict, Set
+import itertools
+import math
+import time
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
 import uuid
 from decimal import Decimal
-from datetime import datetime
+from datetime import datetime, timezone
 from .models import Alert, AlertStatus, AlertType, AlertTriggered
 from .repository import AlertRepository
 
 
+# Alert types triggered by the price crossing their threshold
+THRESHOLD_ALERT_TYPES = (AlertType.PRICE_ABOVE, AlertType.PRICE_BELOW)
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def utc_timestamp(when: datetime) -> float:
+    """Seconds since the epoch for a naive UTC or timezone-aware datetime"""
+    if when.tzinfo is not None:
+        when = when.astimezone(timezone.utc).replace(tzinfo=None)
+    return (when - EPOCH).total_seconds()
+
+
+class ThresholdBook:
+    """
+    Active threshold alerts for one symbol
+    
+    PRICE_ABOVE and PRICE_BELOW alerts are kept sorted by threshold, so the
+    alerts a price crosses are a prefix of the above side and a suffix of
+    the below side, each found with one binary search.
+    """
+    
+    def __init__(self):
+        # (threshold, sequence, alert_id), ascending
+        self.above: List[Tuple[Decimal, int, uuid.UUID]] = []
+        self.below: List[Tuple[Decimal, int, uuid.UUID]] = []
+    
+    def __len__(self) -> int:
+        return len(self.above) + len(self.below)
+    
+    def add(self, alert_type: AlertType, entry: Tuple[Decimal, int, uuid.UUID]):
+        """Insert an alert entry"""
+        insort(self._side(alert_type), entry)
+    
+    def remove(self, alert_type: AlertType, entry: Tuple[Decimal, int, uuid.UUID]):
+        """Remove an alert entry if present"""
+        side = self._side(alert_type)
+        index = bisect_left(side, entry)
+        if index < len(side) and side[index] == entry:
+            del side[index]
+    
+    def pop_crossed(self, price: Decimal) -> List[uuid.UUID]:
+        """Remove and return the alerts a price triggers"""
+        # PRICE_ABOVE triggers at price >= threshold
+        end = bisect_right(self.above, (price, math.inf))
+        # PRICE_BELOW triggers at price <= threshold
+        start = bisect_left(self.below, (price, -math.inf))
+        
+        crossed = [entry[2] for entry in self.above[:end]]
+        crossed.extend(entry[2] for entry in self.below[start:])
+        del self.above[:end]
+        del self.below[start:]
+        return crossed
+    
+    def _side(self, alert_type: AlertType) -> list:
+        return self.above if alert_type == AlertType.PRICE_ABOVE else self.below
+
+
+class TimerWheel:
+    """
+    Hashed timing wheel for alert expiry
+    
+    Timers are bucketed by tick, and advancing the wheel only visits the
+    buckets of elapsed ticks, so expiring an alert is O(1) instead of a scan
+    over every alert. A timer fires on the first advance at or after its
+    deadline.
+    """
+    
+    def __init__(self, tick_seconds: float = 1.0, slots: int = 3600,
+                 start: Optional[float] = None):
+        self.tick_seconds = tick_seconds
+        self.slots = slots
+        self._buckets: List[Dict[uuid.UUID, float]] = [{} for _ in range(slots)]
+        self._slot_of: Dict[uuid.UUID, int] = {}
+        # Last tick whose bucket has been processed
+        self._tick = self._tick_of(time.time() if start is None else start) - 1
+    
+    def __len__(self) -> int:
+        return len(self._slot_of)
+    
+    def schedule(self, key: uuid.UUID, deadline: float):
+        """Schedule or reschedule a timer"""
+        self.cancel(key)
+        # Deadlines already passed go in the current tick's bucket
+        tick = max(self._tick_of(deadline), self._tick + 1)
+        slot = tick % self.slots
+        self._buckets[slot][key] = deadline
+        self._slot_of[key] = slot
+    
+    def cancel(self, key: uuid.UUID):
+        """Cancel a timer if scheduled"""
+        slot = self._slot_of.pop(key, None)
+        if slot is not None:
+            del self._buckets[slot][key]
+    
+    def advance(self, now: float) -> List[uuid.UUID]:
+        """Advance to now and return the timers that expired"""
+        # The current tick's bucket is revisited until the tick is over
+        last = self._tick_of(now)
+        first = max(self._tick + 1, last - self.slots + 1)
+        
+        expired = []
+        for tick in range(first, last + 1):
+            bucket = self._buckets[tick % self.slots]
+            if not bucket:
+                continue
+            # Later rounds of the wheel share the bucket
+            due = [key for key, deadline in bucket.items() if deadline <= now]
+            for key in due:
+                del bucket[key]
+                del self._slot_of[key]
+            expired.extend(due)
+        
+        self._tick = max(self._tick, last - 1)
+        return expired
+    
+    def _tick_of(self, timestamp: float) -> int:
+        return int(timestamp // self.tick_seconds)
+
+
+class WatchedAlert(NamedTuple):
+    """Index entry of a monitored alert"""
+    symbol: str
+    alert_type: AlertType
+    entry: Tuple[Decimal, int, uuid.UUID]
+    expires_at: Optional[datetime]
+
+
 class AlertMonitor:
     """
     Alert monitoring service
     Checks prices and triggers alerts
+    
+    One event-driven monitor serves every alert. Active price alerts are
+    indexed in per-symbol threshold books, so a price tick triggers all
+    crossed alerts in O(log n + k). Each watched symbol has a single price
+    stream however many alerts it has, expiry runs on a timer wheel, and
+    repository changes reach the index as notifications instead of polling.
     """
     
-    def __init__(self):
-        self.repo = AlertRepository()
+    def __init__(
+        self,
+        repo: Optional[AlertRepository] = None,
+        poll_interval: float = 5.0,
+        tick_seconds: float = 1.0
+    ):
+        self.repo = repo or AlertRepository()
+        self.poll_interval = poll_interval
+        self.books: Dict[str, ThresholdBook] = {}
         self._monitoring: Set[uuid.UUID] = set()
-        self._tasks: Dict[uuid.UUID, asyncio.Task] = {}
+        self._watched: Dict[uuid.UUID, WatchedAlert] = {}
+        self._expiry = TimerWheel(tick_seconds)
+        self._sequence = itertools.count()
+        self._streams: Dict[str, asyncio.Task] = {}
+        self._expiry_task: Optional[asyncio.Task] = None
+        
+        self.repo.add_listener(self._on_change)
     
     async def start_monitoring(self, alert_id: uuid.UUID):
         """Start monitoring an alert"""
         if alert_id in self._monitoring:
             return  # Already monitoring
         
-        self._monitoring.add(alert_id)
-        task = asyncio.create_task(self._monitor_alert(alert_id))
-        self._tasks[alert_id] = task
+        alert = self.repo.get_alert(alert_id)
+        if alert and alert.status == AlertStatus.ACTIVE:
+            self._watch(alert)
     
     def stop_monitoring(self, alert_id: uuid.UUID):
         """Stop monitoring an alert"""
-        if alert_id in self._monitoring:
-            self._monitoring.remove(alert_id)
+        self._monitoring.discard(alert_id)
+        self._expiry.cancel(alert_id)
         
-        if alert_id in self._tasks:
-            self._tasks[alert_id].cancel()
-            del self._tasks[alert_id]
+        watched = self._watched.pop(alert_id, None)
+        if watched is None:
+            return
+        
+        book = self.books.get(watched.symbol)
+        if book is not None:
+            book.remove(watched.alert_type, watched.entry)
+            if not book:
+                self._drop_book(watched.symbol)
     
-    async def _monitor_alert(self, alert_id: uuid.UUID):
-        """Monitor alert and check for triggers"""
-        while alert_id in self._monitoring:
-            try:
-                alert = self.repo.get_alert(alert_id)
-                
-                if not alert or alert.status != AlertStatus.ACTIVE:
-                    self.stop_monitoring(alert_id)
-                    break
-                
-                # Check if expired
-                if alert.expires_at and datetime.utcnow() > alert.expires_at:
-                    self.repo.update_alert(alert_id, {"status": AlertStatus.EXPIRED})
-                    self.stop_monitoring(alert_id)
-                    break
-                
-                # Get current price (mock for now)
-                current_price = await self._get_current_price(alert.symbol)
-                
-                # Check if alert should trigger
-                should_trigger = self._check_trigger_condition(alert, current_price)
-                
-                if should_trigger:
-                    await self._trigger_alert(alert, current_price)
-                    self.stop_monitoring(alert_id)
-                    break
-                
-                # Check every 5 seconds
-                await asyncio.sleep(5)
+    async def on_price(self, symbol: str, price: Decimal) -> List[Alert]:
+        """
+        Process a price tick for a symbol
+        
+        Returns:
+            Alerts triggered by the tick
+        """
+        self._expire_due()
+        
+        book = self.books.get(symbol)
+        if book is None:
+            return []
+        
+        crossed = book.pop_crossed(price)
+        if not book:
+            self._drop_book(symbol)
+        
+        now = datetime.utcnow()
+        triggered = []
+        for alert_id in crossed:
+            self._watched.pop(alert_id, None)
+            self._monitoring.discard(alert_id)
+            self._expiry.cancel(alert_id)
+            
+            alert = self.repo.get_alert(alert_id)
+            if not alert or alert.status != AlertStatus.ACTIVE:
+                continue
             
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                print(f"Error monitoring alert {alert_id}: {e}")
-                await asyncio.sleep(5)
+            # Expired since the last wheel tick
+            if alert.expires_at and utc_timestamp(now) > utc_timestamp(alert.expires_at):
+                self.repo.update_alert(alert_id, {"status": AlertStatus.EXPIRED})
+                continue
+            
+            await self._trigger_alert(alert, price)
+            triggered.append(alert)
+        
+        return triggered
     
-    def _check_trigger_condition(self, alert: Alert, current_price: Decimal) -> bool:
-        """Check if alert condition is met"""
-        if alert.alert_type == AlertType.PRICE_ABOVE:
-            return current_price >= alert.threshold_value
+    def stop(self):
+        """Cancel the price streams and expiry timer"""
+        for task in self._streams.values():
+            task.cancel()
+        self._streams.clear()
+        if self._expiry_task is not None:
+            self._expiry_task.cancel()
+            self._expiry_task = None
+    
+    def _on_change(self, change: str, alert: Alert):
+        """Keep the index in step with repository changes"""
+        watched = self._watched.get(alert.id)
+        active = change != "deleted" and alert.status == AlertStatus.ACTIVE
         
-        elif alert.alert_type == AlertType.PRICE_BELOW:
-            return current_price <= alert.threshold_value
+        if alert.id in self._monitoring:
+            if not active:
+                self.stop_monitoring(alert.id)
+            elif watched is None or watched[:2] != (alert.symbol, alert.alert_type) or \
+                    watched.entry[0] != alert.threshold_value or watched.expires_at != alert.expires_at:
+                # Re-index with the changed fields
+                self.stop_monitoring(alert.id)
+                self._watch(alert)
+        elif active:
+            self._watch(alert)
+    
+    def _watch(self, alert: Alert):
+        """Add an active alert to the index"""
+        self._monitoring.add(alert.id)
         
-        elif alert.alert_type == AlertType.PERCENT_CHANGE:
-            # Would need previous price to calculate
-            return False
+        if alert.alert_type in THRESHOLD_ALERT_TYPES:
+            entry = (alert.threshold_value, next(self._sequence), alert.id)
+            book = self.books.get(alert.symbol)
+            if book is None:
+                book = self.books[alert.symbol] = ThresholdBook()
+            book.add(alert.alert_type, entry)
+        else:
+            # Percent change and volume alerts need data not streamed yet
+            entry = (Decimal(0), -1, alert.id)
+        self._watched[alert.id] = WatchedAlert(
+            alert.symbol, alert.alert_type, entry, alert.expires_at
+        )
         
-        elif alert.alert_type == AlertType.VOLUME_SPIKE:
-            # Would need volume data
-            return False
+        if alert.expires_at:
+            self._expiry.schedule(alert.id, utc_timestamp(alert.expires_at))
         
-        return False
+        self._start_tasks(alert.symbol if alert.alert_type in THRESHOLD_ALERT_TYPES else None)
+    
+    def _drop_book(self, symbol: str):
+        """Forget a symbol with no alerts left and stop its price stream"""
+        del self.books[symbol]
+        task = self._streams.get(symbol)
+        # A stream emptying its own book is still triggering the crossed
+        # alerts; it stops by itself once the book is gone
+        if task is not None and task is not asyncio.current_task():
+            del self._streams[symbol]
+            task.cancel()
+    
+    def _expire_due(self):
+        """Expire alerts whose deadline has passed"""
+        for alert_id in self._expiry.advance(utc_timestamp(datetime.utcnow())):
+            alert = self.repo.get_alert(alert_id)
+            if alert and alert.status == AlertStatus.ACTIVE:
+                self.repo.update_alert(alert_id, {"status": AlertStatus.EXPIRED})
+            self.stop_monitoring(alert_id)
+    
+    def _start_tasks(self, symbol: Optional[str]):
+        """Start the symbol's price stream and the expiry timer if needed"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Started by the next change made inside the event loop
+        
+        if symbol is not None and symbol not in self._streams:
+            self._streams[symbol] = asyncio.create_task(self._stream_prices(symbol))
+        
+        if len(self._expiry) and (self._expiry_task is None or self._expiry_task.done()):
+            self._expiry_task = asyncio.create_task(self._run_expiry())
+    
+    async def _stream_prices(self, symbol: str):
+        """Fetch one price per symbol for all of its alerts"""
+        try:
+            while symbol in self.books:
+                try:
+                    current_price = await self._get_current_price(symbol)
+                    await self.on_price(symbol, current_price)
+                except Exception as e:
+                    print(f"Error monitoring {symbol} alerts: {e}")
+                
+                await asyncio.sleep(self.poll_interval)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            if self._streams.get(symbol) is asyncio.current_task():
+                del self._streams[symbol]
+    
+    async def _run_expiry(self):
+        """Advance the expiry wheel while timers are scheduled"""
+        try:
+            while len(self._expiry):
+                await asyncio.sleep(self._expiry.tick_seconds)
+                self._expire_due()
+        except asyncio.CancelledError:
+            pass
     
     async def _trigger_alert(self, alert: Alert, current_price: Decimal):
         """Trigger alert and send notification"""
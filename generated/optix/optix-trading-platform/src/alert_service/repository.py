@@ -2,7 +2,7 @@
 Alert Repository
 Data access layer for alerts
 """
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any
 import uuid
 from datetime import datetime
 from .models import Alert, AlertStatus
@@ -14,6 +14,21 @@ class AlertRepository:
     def __init__(self):
         self._alerts: Dict[uuid.UUID, Alert] = {}
         self._user_index: Dict[uuid.UUID, List[uuid.UUID]] = {}
+        self._listeners: List[Callable[[str, Alert], None]] = []
+    
+    def add_listener(self, listener: Callable[[str, Alert], None]):
+        """
+        Register for change notifications
+        
+        The listener is called with ("created" | "updated" | "deleted", alert)
+        after each change.
+        """
+        self._listeners.append(listener)
+    
+    def _notify(self, change: str, alert: Alert):
+        """Notify listeners of a change"""
+        for listener in self._listeners:
+            listener(change, alert)
     
     def create_alert(self, alert: Alert) -> Alert:
         """Create new alert"""
@@ -23,6 +38,7 @@ class AlertRepository:
             self._user_index[alert.user_id] = []
         self._user_index[alert.user_id].append(alert.id)
         
+        self._notify("created", alert)
         return alert
     
     def get_alert(self, alert_id: uuid.UUID) -> Optional[Alert]:
@@ -66,6 +82,7 @@ class AlertRepository:
                 setattr(alert, key, value)
         
         alert.updated_at = datetime.utcnow()
+        self._notify("updated", alert)
         return alert
     
     def delete_alert(self, alert_id: uuid.UUID) -> bool:
@@ -79,4 +96,5 @@ class AlertRepository:
         if alert.user_id in self._user_index:
             self._user_index[alert.user_id].remove(alert_id)
         
+        self._notify("deleted", alert)
         return True
@@ -6,7 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from typing import List, Dict
 import uuid
 from .models import (
-    BrokerageConnection, Portfolio, Position, Transaction,
+    BrokerageConnection, Portfolio, PortfolioAggregate, Position, Transaction,
     BrokerageProvider, ConnectBrokerageRequest, OAuthCallback,
     ConnectionStatus
 )
@@ -17,14 +17,19 @@ from .sync_service import PortfolioSyncService
 router = APIRouter(prefix="/api/v1", tags=["brokerage"])
 
 
+# Shared so concurrent syncs draw on the same brokerage request budgets
+brokerage_repository = BrokerageRepository()
+portfolio_sync_service = PortfolioSyncService(brokerage_repository)
+
+
 def get_brokerage_repository() -> BrokerageRepository:
     """Get brokerage repository instance"""
-    return BrokerageRepository()
+    return brokerage_repository
 
 
 def get_sync_service() -> PortfolioSyncService:
     """Get portfolio sync service instance"""
-    return PortfolioSyncService()
+    return portfolio_sync_service
 
 
 def get_current_user_id() -> uuid.UUID:
@@ -226,6 +231,22 @@ async def get_unified_portfolio(
     return portfolio
 
 
+@router.get("/portfolio/summary", response_model=PortfolioAggregate)
+async def get_portfolio_summary(
+    user_id: uuid.UUID = Depends(get_current_user_id),
+    sync_service: PortfolioSyncService = Depends(get_sync_service)
+):
+    """
+    Get running portfolio totals without positions
+    
+    - Values by asset type and P&L
+    - Greek exposure in total and per underlying
+    
+    **Performance**: Constant time, maintained as positions change
+    """
+    return sync_service.get_portfolio_summary(user_id)
+
+
 @router.get("/portfolio/positions", response_model=List[Position])
 async def get_all_positions(
     user_id: uuid.UUID = Depends(get_current_user_id),
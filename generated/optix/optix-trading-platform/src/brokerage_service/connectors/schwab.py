@@ -181,6 +181,7 @@ class SchwabConnector(BrokerageConnector):
             
             transactions = []
             for txn_data in data.get("transactions", []):
+                broker_id = txn_data.get("transactionId")
                 transaction = Transaction(
                     connection_id=self.connection.id,
                     user_id=self.connection.user_id,
@@ -190,6 +191,7 @@ class SchwabConnector(BrokerageConnector):
                     price=Decimal(str(txn_data.get("price", 0))),
                     amount=Decimal(str(txn_data.get("netAmount", 0))),
                     fees=Decimal(str(txn_data.get("fees", 0))),
+                    broker_transaction_id=str(broker_id) if broker_id is not None else None,
                     transaction_date=datetime.fromisoformat(txn_data["transactionDate"])
                 )
                 transactions.append(transaction)
@@ -140,6 +140,9 @@ class Transaction(BaseModel):
     amount: Decimal
     fees: Decimal = Decimal("0")
     
+    # Broker's own transaction/execution id, used to deduplicate syncs
+    broker_transaction_id: Optional[str] = None
+    
     # Options details
     option_symbol: Optional[str] = None
     strike: Optional[Decimal] = None
@@ -201,6 +204,58 @@ class Portfolio(BaseModel):
         }
 
 
+class GreekExposure(BaseModel):
+    """Quantity-weighted Greeks of a set of options positions"""
+    position_count: int = 0
+    delta: Decimal = Decimal("0")
+    gamma: Decimal = Decimal("0")
+    theta: Decimal = Decimal("0")
+    vega: Decimal = Decimal("0")
+    
+    class Config:
+        json_encoders = {
+            Decimal: lambda v: float(v)
+        }
+
+
+class PortfolioAggregate(BaseModel):
+    """
+    Running portfolio totals for a user
+    Updated from position and transaction changes as they are stored
+    """
+    user_id: uuid.UUID
+    position_count: int = 0
+    
+    # Values
+    total_value: Decimal = Decimal("0")
+    value_by_type: Dict[str, Decimal] = {}
+    
+    # P&L
+    total_unrealized_pl: Decimal = Decimal("0")
+    total_realized_pl: Decimal = Decimal("0")
+    
+    # Change in value from price ticks since the start of day_pl_date
+    day_pl: Decimal = Decimal("0")
+    day_pl_date: date = Field(default_factory=lambda: datetime.utcnow().date())
+    
+    # Greeks, in total and per underlying
+    greeks: GreekExposure = Field(default_factory=GreekExposure)
+    greeks_by_underlying: Dict[str, GreekExposure] = {}
+    
+    # Closed trades
+    closed_trades: int = 0
+    winning_trades: int = 0
+    
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    class Config:
+        json_encoders = {
+            Decimal: lambda v: float(v),
+            datetime: lambda v: v.isoformat(),
+            uuid.UUID: lambda v: str(v)
+        }
+
+
 class ConnectBrokerageRequest(BaseModel):
     """Request to connect a brokerage"""
     provider: BrokerageProvider
@@ -2,10 +2,52 @@
 Brokerage Repository
 Data access layer for brokerage connections and portfolio data
 """
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, Iterable, List, Optional, Any, Set, Tuple
 import uuid
+from collections import Counter
+from decimal import Decimal
 from datetime import datetime
-from .models import BrokerageConnection, Position, Transaction
+from .models import (
+    BrokerageConnection, GreekExposure, PortfolioAggregate, Position,
+    PositionType, Transaction
+)
+
+
+GREEKS = ("delta", "gamma", "theta", "vega")
+
+# Transaction types counted as closed trades
+CLOSING_TRANSACTION_TYPES = ("sell", "buy_to_close")
+
+
+def price_key(position: Position) -> str:
+    """Symbol whose price ticks reprice a position"""
+    return position.option_symbol or position.symbol
+
+
+def transaction_keys(transactions: Iterable[Transaction]) -> List[Tuple]:
+    """
+    Deduplication keys for a connection's transactions
+    
+    Transactions are keyed on the broker's transaction id. Without one,
+    the key is the date, symbol, type, quantity, price and amount plus the
+    occurrence number among identical rows, so genuine identical fills
+    stay distinct while a re-delivered window still matches.
+    """
+    occurrences: Counter = Counter()
+    keys = []
+    for transaction in transactions:
+        if transaction.broker_transaction_id:
+            keys.append(("id", transaction.broker_transaction_id))
+            continue
+        
+        natural = (
+            transaction.transaction_date, transaction.symbol,
+            transaction.option_symbol, transaction.transaction_type,
+            transaction.quantity, transaction.price, transaction.amount
+        )
+        keys.append((*natural, occurrences[natural]))
+        occurrences[natural] += 1
+    return keys
 
 
 class BrokerageRepository:
@@ -20,6 +62,25 @@ class BrokerageRepository:
         self._positions: Dict[uuid.UUID, Position] = {}
         self._transactions: Dict[uuid.UUID, Transaction] = {}
         self._user_connection_index: Dict[uuid.UUID, List[uuid.UUID]] = {}
+        
+        # Natural keys of synced rows, per connection, for bulk upserts
+        self._position_keys: Dict[uuid.UUID, Dict[Tuple, uuid.UUID]] = {}
+        self._transaction_keys: Dict[uuid.UUID, Set[Tuple]] = {}
+        
+        # Position indexes and running per-user portfolio totals
+        self._user_positions: Dict[uuid.UUID, Dict[uuid.UUID, None]] = {}
+        self._price_index: Dict[str, Dict[uuid.UUID, None]] = {}
+        self._aggregates: Dict[uuid.UUID, PortfolioAggregate] = {}
+        self._listeners: List[Callable[[uuid.UUID, PortfolioAggregate], None]] = []
+    
+    def add_listener(self, listener: Callable[[uuid.UUID, PortfolioAggregate], None]):
+        """
+        Register for portfolio changes
+        
+        The listener is called with (user_id, aggregate) after each batch of
+        changes to a user's positions or transactions.
+        """
+        self._listeners.append(listener)
     
     def create_connection(self, connection: BrokerageConnection) -> BrokerageConnection:
         """Create new brokerage connection"""
@@ -36,6 +97,10 @@ class BrokerageRepository:
         """Get connection by ID"""
         return self._connections.get(connection_id)
     
+    def get_all_connections(self) -> List[BrokerageConnection]:
+        """Get every connection"""
+        return list(self._connections.values())
+    
     def get_user_connections(self, user_id: uuid.UUID) -> List[BrokerageConnection]:
         """Get all connections for a user"""
         connection_ids = self._user_connection_index.get(user_id, [])
@@ -75,7 +140,7 @@ class BrokerageRepository:
             if pos.connection_id == connection_id
         ]
         for pid in position_ids:
-            del self._positions[pid]
+            self._drop_position(pid)
         
         # Delete associated transactions
         txn_ids = [
@@ -83,7 +148,10 @@ class BrokerageRepository:
             if txn.connection_id == connection_id
         ]
         for tid in txn_ids:
-            del self._transactions[tid]
+            self._apply_transaction(self._transactions.pop(tid), -1)
+        
+        self._position_keys.pop(connection_id, None)
+        self._transaction_keys.pop(connection_id, None)
         
         # Delete connection
         del self._connections[connection_id]
@@ -92,12 +160,91 @@ class BrokerageRepository:
         if connection.user_id in self._user_connection_index:
             self._user_connection_index[connection.user_id].remove(connection_id)
         
+        self._notify([connection.user_id])
         return True
     
     def save_positions(self, positions: List[Position]):
         """Save/update positions"""
         for position in positions:
-            self._positions[position.id] = position
+            self._put_position(position)
+        
+        self._notify(position.user_id for position in positions)
+    
+    def upsert_positions(
+        self,
+        connection_id: uuid.UUID,
+        positions: List[Position]
+    ) -> int:
+        """
+        Replace a connection's positions with a synced snapshot
+        
+        Positions are matched on symbol and option symbol, keeping their
+        IDs. Only new or changed positions are written, and positions
+        missing from the snapshot are removed.
+        
+        Returns:
+            Number of positions written or removed
+        """
+        existing = self._position_keys.get(connection_id, {})
+        keys: Dict[Tuple, uuid.UUID] = {}
+        changes = 0
+        
+        for position in positions:
+            key = (position.symbol, position.option_symbol)
+            position_id = existing.get(key)
+            current = self._positions.get(position_id) if position_id else None
+            
+            if current is not None:
+                position = position.model_copy(update={"id": current.id})
+                if position.model_dump(exclude={"updated_at"}) == current.model_dump(exclude={"updated_at"}):
+                    keys[key] = current.id
+                    continue
+            
+            self._put_position(position)
+            keys[key] = position.id
+            changes += 1
+        
+        # Closed positions
+        user_ids = {position.user_id for position in positions}
+        for key, position_id in existing.items():
+            if key not in keys:
+                closed = self._drop_position(position_id)
+                if closed is not None:
+                    user_ids.add(closed.user_id)
+                    changes += 1
+        
+        self._position_keys[connection_id] = keys
+        if changes:
+            self._notify(user_ids)
+        return changes
+    
+    def update_prices(self, symbol: str, price: Decimal) -> int:
+        """
+        Reprice the positions traded as a symbol
+        
+        Returns:
+            Number of positions repriced
+        """
+        position_ids = list(self._price_index.get(symbol, {}))
+        
+        for position_id in position_ids:
+            position = self._positions[position_id]
+            market_value = position.quantity * price
+            self._apply_price_change(position, market_value - position.market_value)
+            unrealized_pl = market_value - position.cost_basis
+            self._put_position(position.model_copy(update={
+                "current_price": price,
+                "market_value": market_value,
+                "unrealized_pl": unrealized_pl,
+                "unrealized_pl_percent": (
+                    unrealized_pl / position.cost_basis * 100
+                    if position.cost_basis != 0 else Decimal("0")
+                ),
+                "updated_at": datetime.utcnow()
+            }))
+        
+        self._notify(self._positions[position_id].user_id for position_id in position_ids)
+        return len(position_ids)
     
     def get_connection_positions(
         self,
@@ -112,14 +259,70 @@ class BrokerageRepository:
     def get_user_positions(self, user_id: uuid.UUID) -> List[Position]:
         """Get all positions for a user"""
         return [
-            pos for pos in self._positions.values()
-            if pos.user_id == user_id
+            self._positions[pid]
+            for pid in self._user_positions.get(user_id, {})
         ]
     
+    def get_portfolio_aggregate(self, user_id: uuid.UUID) -> PortfolioAggregate:
+        """Get running portfolio totals for a user"""
+        aggregate = self._aggregates.get(user_id)
+        if aggregate is None:
+            return PortfolioAggregate(user_id=user_id)
+        self._roll_day(aggregate)
+        return aggregate
+    
     def save_transactions(self, transactions: List[Transaction]):
         """Save transactions"""
         for transaction in transactions:
+            previous = self._transactions.get(transaction.id)
+            if previous is not None:
+                self._apply_transaction(previous, -1)
             self._transactions[transaction.id] = transaction
+            self._apply_transaction(transaction, 1)
+            # Reloaded from storage on the next sync
+            self._transaction_keys.pop(transaction.connection_id, None)
+        
+        self._notify(transaction.user_id for transaction in transactions)
+    
+    def add_transactions(
+        self,
+        connection_id: uuid.UUID,
+        transactions: List[Transaction]
+    ) -> int:
+        """
+        Insert synced transactions not already stored
+        
+        Sync windows overlap at the cursor, so transactions whose key (see
+        transaction_keys) is already stored are skipped.
+        
+        Returns:
+            Number of transactions inserted
+        """
+        keys = self._get_transaction_keys(connection_id)
+        inserted = 0
+        
+        for transaction, key in zip(transactions, transaction_keys(transactions)):
+            if key in keys:
+                continue
+            
+            keys.add(key)
+            self._transactions[transaction.id] = transaction
+            self._apply_transaction(transaction, 1)
+            inserted += 1
+        
+        if inserted:
+            self._notify(transaction.user_id for transaction in transactions)
+        return inserted
+    
+    def _get_transaction_keys(self, connection_id: uuid.UUID) -> Set[Tuple]:
+        """Keys of a connection's stored transactions, loaded when not cached"""
+        keys = self._transaction_keys.get(connection_id)
+        if keys is None:
+            stored = (
+                txn for txn in self._transactions.values() if txn.connection_id == connection_id
+            )
+            keys = self._transaction_keys[connection_id] = set(transaction_keys(stored))
+        return keys
     
     def get_user_transactions(
         self,
@@ -134,3 +337,99 @@ class BrokerageRepository:
         # Sort by date descending
         txns.sort(key=lambda t: t.transaction_date, reverse=True)
         return txns[:limit]
+    
+    def _put_position(self, position: Position):
+        """Store a position, keeping indexes and aggregates in step"""
+        previous = self._positions.get(position.id)
+        if previous is not None:
+            self._apply_position(previous, -1)
+            if previous.user_id != position.user_id:
+                del self._user_positions[previous.user_id][previous.id]
+            if price_key(previous) != price_key(position):
+                del self._price_index[price_key(previous)][previous.id]
+        
+        self._positions[position.id] = position
+        self._user_positions.setdefault(position.user_id, {})[position.id] = None
+        self._price_index.setdefault(price_key(position), {})[position.id] = None
+        self._apply_position(position, 1)
+    
+    def _drop_position(self, position_id: uuid.UUID) -> Optional[Position]:
+        """Remove a position, keeping indexes and aggregates in step"""
+        position = self._positions.pop(position_id, None)
+        if position is not None:
+            self._apply_position(position, -1)
+            del self._user_positions[position.user_id][position_id]
+            del self._price_index[price_key(position)][position_id]
+        return position
+    
+    def _aggregate(self, user_id: uuid.UUID) -> PortfolioAggregate:
+        aggregate = self._aggregates.get(user_id)
+        if aggregate is None:
+            aggregate = self._aggregates[user_id] = PortfolioAggregate(user_id=user_id)
+        return aggregate
+    
+    def _apply_position(self, position: Position, sign: int):
+        """Add (sign 1) or remove (sign -1) a position's contribution"""
+        aggregate = self._aggregate(position.user_id)
+        aggregate.position_count += sign
+        aggregate.total_value += sign * position.market_value
+        aggregate.total_unrealized_pl += sign * position.unrealized_pl
+        aggregate.total_realized_pl += sign * position.realized_pl
+        
+        position_type = position.position_type.value
+        aggregate.value_by_type[position_type] = (
+            aggregate.value_by_type.get(position_type, Decimal("0"))
+            + sign * position.market_value
+        )
+        
+        if position.position_type != PositionType.OPTION:
+            return
+        
+        # Greeks are weighted by quantity
+        exposure = aggregate.greeks_by_underlying.get(position.symbol)
+        if exposure is None:
+            exposure = aggregate.greeks_by_underlying[position.symbol] = GreekExposure()
+        exposure.position_count += sign
+        aggregate.greeks.position_count += sign
+        
+        for greek in GREEKS:
+            value = getattr(position, greek)
+            if value:
+                weighted = sign * value * position.quantity
+                setattr(exposure, greek, getattr(exposure, greek) + weighted)
+                setattr(aggregate.greeks, greek, getattr(aggregate.greeks, greek) + weighted)
+        
+        if exposure.position_count == 0:
+            del aggregate.greeks_by_underlying[position.symbol]
+    
+    def _apply_price_change(self, position: Position, change: Decimal):
+        """Add a price tick's change in market value to the day's P&L"""
+        aggregate = self._aggregate(position.user_id)
+        self._roll_day(aggregate)
+        aggregate.day_pl += change
+    
+    @staticmethod
+    def _roll_day(aggregate: PortfolioAggregate):
+        """Start a new day's P&L on the first use after midnight UTC"""
+        today = datetime.utcnow().date()
+        if aggregate.day_pl_date != today:
+            aggregate.day_pl = Decimal("0")
+            aggregate.day_pl_date = today
+    
+    def _apply_transaction(self, transaction: Transaction, sign: int):
+        """Add (sign 1) or remove (sign -1) a transaction's contribution"""
+        if transaction.transaction_type not in CLOSING_TRANSACTION_TYPES:
+            return
+        
+        aggregate = self._aggregate(transaction.user_id)
+        aggregate.closed_trades += sign
+        if transaction.amount > 0:
+            aggregate.winning_trades += sign
+    
+    def _notify(self, user_ids: Iterable[uuid.UUID]):
+        """Notify listeners of changed portfolios"""
+        for user_id in set(user_ids):
+            aggregate = self._aggregate(user_id)
+            aggregate.updated_at = datetime.utcnow()
+            for listener in self._listeners:
+                listener(user_id, aggregate)
@@ -2,29 +2,84 @@
 Portfolio Sync Service
 Background service for syncing brokerage data
 """
-from typing import List, Dict, Any
+import asyncio
+import time
+from typing import List, Dict, Any, Optional, Tuple
 import uuid
 from decimal import Decimal
-from datetime import datetime
-from .models import BrokerageConnection, Portfolio, Position
+from datetime import datetime, timedelta
+from .models import (
+    BrokerageConnection, BrokerageProvider, Portfolio, PortfolioAggregate, Position
+)
 from .repository import BrokerageRepository
 from .connectors.base import BrokerageConnector
 from .connectors.schwab import SchwabConnector
 
 
+# Request budgets per brokerage: (requests per second, burst)
+PROVIDER_RATE_LIMITS: Dict[BrokerageProvider, Tuple[float, int]] = {
+    BrokerageProvider.SCHWAB: (10.0, 20),
+    BrokerageProvider.TD_AMERITRADE: (10.0, 20),
+}
+DEFAULT_RATE_LIMIT: Tuple[float, int] = (5.0, 10)
+
+# Tokens expiring within this window are refreshed before syncing
+TOKEN_REFRESH_MARGIN = timedelta(minutes=1)
+
+
+class RateBudget:
+    """
+    Token bucket shared by every sync against one brokerage
+    
+    Accounts sync concurrently, so the brokerage's request rate limit is
+    enforced here rather than per account.
+    """
+    
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """Wait for a request slot"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
 class PortfolioSyncService:
     """
     Service for syncing portfolio data from brokerages
     Runs background sync tasks
+    
+    Accounts sync concurrently, bounded by max_concurrent_syncs and by a
+    shared request budget per brokerage.
     """
     
-    def __init__(self):
-        self.repo = BrokerageRepository()
+    def __init__(
+        self,
+        repo: Optional[BrokerageRepository] = None,
+        max_concurrent_syncs: int = 50,
+        rate_limits: Optional[Dict[BrokerageProvider, Tuple[float, int]]] = None
+    ):
+        self.repo = repo or BrokerageRepository()
+        self.rate_limits = {**PROVIDER_RATE_LIMITS, **(rate_limits or {})}
+        self._sync_slots = asyncio.Semaphore(max_concurrent_syncs)
+        self._budgets: Dict[BrokerageProvider, RateBudget] = {}
+        self._refreshes: Dict[uuid.UUID, asyncio.Task] = {}
     
     def get_connector(self, connection: BrokerageConnection) -> BrokerageConnector:
         """Get appropriate connector for brokerage"""
-        from .models import BrokerageProvider
-        
         # In production, load credentials from secure config
         if connection.provider == BrokerageProvider.SCHWAB:
             return SchwabConnector(
@@ -41,11 +96,18 @@ class PortfolioSyncService:
         else:
             raise ValueError(f"Unsupported provider: {connection.provider}")
     
-    async def sync_account(self, connection_id: uuid.UUID):
+    async def sync_account(self, connection_id: uuid.UUID) -> Dict[str, int]:
         """
         Sync single brokerage account
         
+        Positions and transactions are fetched concurrently. Positions are
+        bulk upserted, and transactions are fetched from the connection's
+        last sync onwards.
+        
         **Performance**: Completes within 30 seconds (AC)
+        
+        Returns:
+            Numbers of positions changed and transactions added
         """
         connection = self.repo.get_connection(connection_id)
         if not connection:
@@ -53,30 +115,30 @@ class PortfolioSyncService:
         
         try:
             connector = self.get_connector(connection)
+            await self._ensure_token(connection, connector)
             
-            # Test connection
-            if not await connector.test_connection():
-                # Try to refresh token
-                token_data = await connector.refresh_token()
-                self.repo.update_connection(connection_id, {
-                    "access_token": token_data["access_token"],
-                    "token_expires_at": token_data["expires_at"]
-                })
+            # Cursor for the next sync, taken before fetching so nothing is missed
+            sync_started_at = datetime.utcnow()
             
-            # Fetch positions
-            positions = await connector.get_positions()
-            self.repo.save_positions(positions)
+            # Fetch positions and recent transactions
+            positions, transactions = await asyncio.gather(
+                self._request(connection, connector.get_positions),
+                self._request(connection, connector.get_transactions, connection.last_sync_at)
+            )
             
-            # Fetch recent transactions
-            transactions = await connector.get_transactions()
-            self.repo.save_transactions(transactions)
+            result = {
+                "positions_changed": self.repo.upsert_positions(connection_id, positions),
+                "transactions_added": self.repo.add_transactions(connection_id, transactions)
+            }
             
             # Update last sync time
             self.repo.update_connection(connection_id, {
-                "last_sync_at": datetime.utcnow(),
+                "last_sync_at": sync_started_at,
                 "sync_error": None
             })
             
+            return result
+            
         except Exception as e:
             # Log error
             self.repo.update_connection(connection_id, {
@@ -87,13 +149,69 @@ class PortfolioSyncService:
     async def sync_all_accounts(self, user_id: uuid.UUID):
         """Sync all connected accounts for a user"""
         connections = self.repo.get_user_connections(user_id)
+        await self._sync_connections(connections)
+    
+    async def sync_all_users(self) -> Dict[str, int]:
+        """
+        Sync every connection, e.g. from a nightly job
         
-        for connection in connections:
-            try:
-                await self.sync_account(connection.id)
-            except Exception as e:
-                print(f"Sync failed for connection {connection.id}: {e}")
-                # Continue with other accounts
+        Returns:
+            Numbers of connections synced and failed
+        """
+        return await self._sync_connections(self.repo.get_all_connections())
+    
+    async def _sync_connections(self, connections: List[BrokerageConnection]) -> Dict[str, int]:
+        """Sync connections concurrently, continuing past failures"""
+        async def sync(connection: BrokerageConnection) -> bool:
+            async with self._sync_slots:
+                try:
+                    await self.sync_account(connection.id)
+                    return True
+                except Exception as e:
+                    print(f"Sync failed for connection {connection.id}: {e}")
+                    # Continue with other accounts
+                    return False
+        
+        results = await asyncio.gather(*(sync(connection) for connection in connections))
+        synced = sum(results)
+        return {"synced": synced, "failed": len(results) - synced}
+    
+    async def _ensure_token(self, connection: BrokerageConnection, connector: BrokerageConnector):
+        """Refresh the access token if it has expired"""
+        expires_at = connection.token_expires_at
+        if expires_at is not None:
+            if expires_at > datetime.utcnow() + TOKEN_REFRESH_MARGIN:
+                return
+        elif await self._request(connection, connector.test_connection):
+            return
+        
+        await self._refresh_token(connection, connector)
+    
+    async def _refresh_token(self, connection: BrokerageConnection, connector: BrokerageConnector):
+        """Refresh a connection's token, sharing one refresh between concurrent syncs"""
+        async def refresh():
+            token_data = await self._request(connection, connector.refresh_token)
+            self.repo.update_connection(connection.id, {
+                "access_token": token_data["access_token"],
+                "token_expires_at": token_data["expires_at"]
+            })
+        
+        task = self._refreshes.get(connection.id)
+        if task is None:
+            task = self._refreshes[connection.id] = asyncio.ensure_future(refresh())
+            task.add_done_callback(lambda _: self._refreshes.pop(connection.id, None))
+        
+        await task
+    
+    async def _request(self, connection: BrokerageConnection, call, *args):
+        """Call the brokerage within its request budget"""
+        budget = self._budgets.get(connection.provider)
+        if budget is None:
+            rate, burst = self.rate_limits.get(connection.provider, DEFAULT_RATE_LIMIT)
+            budget = self._budgets[connection.provider] = RateBudget(rate, burst)
+        
+        await budget.acquire()
+        return await call(*args)
     
     async def get_unified_portfolio(self, user_id: uuid.UUID) -> Portfolio:
         """
@@ -102,92 +220,86 @@ class PortfolioSyncService:
         - Aggregates positions from all accounts
         - Calculates total values and P&L
         - Sums Greeks across options positions
+        
+        Totals come from the user's running aggregate rather than a pass
+        over the positions.
         """
         # Get all connections and positions
         connections = self.repo.get_user_connections(user_id)
         positions = self.repo.get_user_positions(user_id)
-        
-        # Calculate totals
-        total_value = Decimal("0")
-        total_stocks_value = Decimal("0")
-        total_options_value = Decimal("0")
-        total_unrealized_pl = Decimal("0")
-        
-        # Portfolio Greeks
-        total_delta = Decimal("0")
-        total_gamma = Decimal("0")
-        total_theta = Decimal("0")
-        total_vega = Decimal("0")
-        
-        for position in positions:
-            total_value += position.market_value
-            total_unrealized_pl += position.unrealized_pl
-            
-            if position.position_type.value == "stock":
-                total_stocks_value += position.market_value
-            elif position.position_type.value == "option":
-                total_options_value += position.market_value
-                
-                # Sum Greeks
-                if position.delta:
-                    total_delta += position.delta * position.quantity
-                if position.gamma:
-                    total_gamma += position.gamma * position.quantity
-                if position.theta:
-                    total_theta += position.theta * position.quantity
-                if position.vega:
-                    total_vega += position.vega * position.quantity
-        
-        # Calculate percentages
-        total_unrealized_pl_percent = (
-            (total_unrealized_pl / (total_value - total_unrealized_pl) * 100)
-            if total_value > total_unrealized_pl else Decimal("0")
-        )
+        aggregate = self.repo.get_portfolio_aggregate(user_id)
         
         portfolio = Portfolio(
             user_id=user_id,
-            total_value=total_value,
+            total_value=aggregate.total_value,
             total_cash=Decimal("0"),  # TODO: Calculate from account balances
-            total_stocks_value=total_stocks_value,
-            total_options_value=total_options_value,
-            total_unrealized_pl=total_unrealized_pl,
-            total_unrealized_pl_percent=total_unrealized_pl_percent,
-            total_realized_pl=Decimal("0"),  # TODO: Calculate from transactions
-            day_pl=Decimal("0"),  # TODO: Calculate day change
-            day_pl_percent=Decimal("0"),
-            total_delta=total_delta,
-            total_gamma=total_gamma,
-            total_theta=total_theta,
-            total_vega=total_vega,
+            total_stocks_value=aggregate.value_by_type.get("stock", Decimal("0")),
+            total_options_value=aggregate.value_by_type.get("option", Decimal("0")),
+            total_unrealized_pl=aggregate.total_unrealized_pl,
+            total_unrealized_pl_percent=self._unrealized_pl_percent(aggregate),
+            total_realized_pl=aggregate.total_realized_pl,
+            day_pl=aggregate.day_pl,
+            day_pl_percent=self._day_pl_percent(aggregate),
+            total_delta=aggregate.greeks.delta,
+            total_gamma=aggregate.greeks.gamma,
+            total_theta=aggregate.greeks.theta,
+            total_vega=aggregate.greeks.vega,
             positions=positions,
             connections=connections
         )
         
         return portfolio
     
+    def get_portfolio_summary(self, user_id: uuid.UUID) -> PortfolioAggregate:
+        """Get running portfolio totals and Greek exposure without positions"""
+        return self.repo.get_portfolio_aggregate(user_id)
+    
+    def on_price(self, symbol: str, price: Decimal) -> int:
+        """
+        Apply a price tick to the positions traded as symbol
+        
+        Affected portfolio aggregates are updated and pushed to repository
+        listeners.
+        
+        Returns:
+            Number of positions repriced
+        """
+        return self.repo.update_prices(symbol, price)
+    
     async def calculate_performance(self, user_id: uuid.UUID) -> Dict[str, Any]:
         """Calculate portfolio performance metrics"""
-        portfolio = await self.get_unified_portfolio(user_id)
-        transactions = self.repo.get_user_transactions(user_id, limit=500)
+        aggregate = self.repo.get_portfolio_aggregate(user_id)
         
         # Calculate win rate
-        closed_trades = [t for t in transactions if t.transaction_type in ["sell", "buy_to_close"]]
-        winning_trades = [t for t in closed_trades if t.amount > 0]
-        win_rate = (len(winning_trades) / len(closed_trades) * 100) if closed_trades else 0
+        closed_trades = aggregate.closed_trades
+        winning_trades = aggregate.winning_trades
+        win_rate = (winning_trades / closed_trades * 100) if closed_trades else 0
         
         return {
-            "total_value": float(portfolio.total_value),
-            "unrealized_pl": float(portfolio.total_unrealized_pl),
-            "unrealized_pl_percent": float(portfolio.total_unrealized_pl_percent),
-            "day_pl": float(portfolio.day_pl),
-            "day_pl_percent": float(portfolio.day_pl_percent),
+            "total_value": float(aggregate.total_value),
+            "unrealized_pl": float(aggregate.total_unrealized_pl),
+            "unrealized_pl_percent": float(self._unrealized_pl_percent(aggregate)),
+            "day_pl": float(aggregate.day_pl),
+            "day_pl_percent": float(self._day_pl_percent(aggregate)),
             "win_rate": win_rate,
-            "total_trades": len(closed_trades),
-            "winning_trades": len(winning_trades),
+            "total_trades": closed_trades,
+            "winning_trades": winning_trades,
             "portfolio_greeks": {
-                "delta": float(portfolio.total_delta),
-                "gamma": float(portfolio.total_gamma),
-                "theta": float(portfolio.total_theta),
-                "vega": float(portfolio.total_vega)
+                "delta": float(aggregate.greeks.delta),
+                "gamma": float(aggregate.greeks.gamma),
+                "theta": float(aggregate.greeks.theta),
+                "vega": float(aggregate.greeks.vega)
             }
         }
+    
+    @staticmethod
+    def _unrealized_pl_percent(aggregate: PortfolioAggregate) -> Decimal:
+        """Unrealized P&L as a percentage of cost"""
+        cost = aggregate.total_value - aggregate.total_unrealized_pl
+        return (aggregate.total_unrealized_pl / cost * 100) if cost > 0 else Decimal("0")
+    
+    @staticmethod
+    def _day_pl_percent(aggregate: PortfolioAggregate) -> Decimal:
+        """Day P&L as a percentage of the value before today's price moves"""
+        start_value = aggregate.total_value - aggregate.day_pl
+        return (aggregate.day_pl / start_value * 100) if start_value > 0 else Decimal("0")
@@ -0,0 +1,272 @@
+"""
+Unit tests for the alert monitor
+Tests the symbol-keyed trigger index, expiry wheel and change notifications
+"""
+import pytest
+import asyncio
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from src.alert_service.models import Alert, AlertStatus, AlertType
+from src.alert_service.repository import AlertRepository
+from src.alert_service.monitor import AlertMonitor, ThresholdBook, TimerWheel
+
+
+class RecordingMonitor(AlertMonitor):
+    """Monitor with scripted prices that records notifications"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prices = {}
+        self.notifications = []
+    
+    async def _send_notification(self, user_id, notification):
+        self.notifications.append(notification)
+    
+    async def _get_current_price(self, symbol):
+        return self.prices.get(symbol, Decimal("100"))
+
+
+def make_alert(symbol="AAPL", alert_type=AlertType.PRICE_ABOVE, threshold="150", **kwargs):
+    """Create an alert"""
+    return Alert(
+        user_id=uuid.uuid4(),
+        symbol=symbol,
+        alert_type=alert_type,
+        threshold_value=Decimal(threshold),
+        **kwargs
+    )
+
+
+@pytest.fixture
+def repo():
+    return AlertRepository()
+
+
+@pytest.fixture
+def monitor(repo):
+    return RecordingMonitor(repo)
+
+
+class TestThresholdBook:
+    """Test per-symbol threshold books"""
+    
+    def test_pop_crossed(self):
+        """Test a price pops exactly the crossed alerts"""
+        book = ThresholdBook()
+        ids = {}
+        for seq, (alert_type, threshold) in enumerate([
+            (AlertType.PRICE_ABOVE, "100"), (AlertType.PRICE_ABOVE, "105"),
+            (AlertType.PRICE_ABOVE, "110"), (AlertType.PRICE_BELOW, "95"),
+            (AlertType.PRICE_BELOW, "105"), (AlertType.PRICE_BELOW, "90"),
+        ]):
+            ids[(alert_type, threshold)] = alert_id = uuid.uuid4()
+            book.add(alert_type, (Decimal(threshold), seq, alert_id))
+        
+        crossed = book.pop_crossed(Decimal("105"))
+        
+        assert set(crossed) == {
+            ids[(AlertType.PRICE_ABOVE, "100")],
+            ids[(AlertType.PRICE_ABOVE, "105")],
+            ids[(AlertType.PRICE_BELOW, "105")],
+        }
+        assert len(book) == 3
+        assert book.pop_crossed(Decimal("105")) == []
+    
+    def test_remove(self):
+        """Test removing an entry leaves the others"""
+        book = ThresholdBook()
+        entries = [(Decimal("100"), seq, uuid.uuid4()) for seq in range(3)]
+        for entry in entries:
+            book.add(AlertType.PRICE_BELOW, entry)
+        
+        book.remove(AlertType.PRICE_BELOW, entries[1])
+        book.remove(AlertType.PRICE_BELOW, entries[1])
+        
+        assert book.below == [entries[0], entries[2]]
+
+
+class TestTimerWheel:
+    """Test expiry timer wheel"""
+    
+    def test_advance_expires_due_timers(self):
+        """Test timers fire once their deadline has passed"""
+        wheel = TimerWheel(tick_seconds=1.0, slots=8, start=1000.0)
+        wheel.schedule("a", 1002.5)
+        wheel.schedule("b", 1005.0)
+        wheel.schedule("c", 1020.0)  # Wraps the wheel
+        
+        assert wheel.advance(1002.4) == []
+        assert wheel.advance(1002.5) == ["a"]
+        assert wheel.advance(1010.0) == ["b"]
+        assert len(wheel) == 1
+        assert wheel.advance(1021.0) == ["c"]
+        assert len(wheel) == 0
+    
+    def test_cancel_and_past_deadline(self):
+        """Test cancelled timers never fire and past deadlines fire next"""
+        wheel = TimerWheel(tick_seconds=1.0, slots=8, start=1000.0)
+        wheel.advance(1005.0)
+        wheel.schedule("late", 990.0)
+        wheel.schedule("cancelled", 1007.0)
+        wheel.cancel("cancelled")
+        
+        assert wheel.advance(1006.0) == ["late"]
+        assert wheel.advance(1100.0) == []
+
+
+class TestAlertMonitor:
+    """Test alert monitor"""
+    
+    def test_price_triggers_crossed_alerts(self, repo, monitor):
+        """Test a tick triggers only the crossed alerts for its symbol"""
+        above = repo.create_alert(make_alert(threshold="150"))
+        below = repo.create_alert(make_alert(alert_type=AlertType.PRICE_BELOW, threshold="140"))
+        other = repo.create_alert(make_alert(symbol="MSFT", threshold="150"))
+        
+        triggered = asyncio.run(monitor.on_price("AAPL", Decimal("151")))
+        
+        assert [alert.id for alert in triggered] == [above.id]
+        assert repo.get_alert(above.id).status == AlertStatus.TRIGGERED
+        assert repo.get_alert(above.id).triggered_price == Decimal("151")
+        assert repo.get_alert(below.id).status == AlertStatus.ACTIVE
+        assert repo.get_alert(other.id).status == AlertStatus.ACTIVE
+        assert [n.alert_id for n in monitor.notifications] == [above.id]
+    
+    def test_change_notifications_update_index(self, repo, monitor):
+        """Test repository changes re-index without polling"""
+        moved = repo.create_alert(make_alert(threshold="150"))
+        disabled = repo.create_alert(make_alert(threshold="120"))
+        deleted = repo.create_alert(make_alert(threshold="110"))
+        
+        repo.update_alert(moved.id, {"threshold_value": Decimal("200")})
+        repo.update_alert(disabled.id, {"status": AlertStatus.DISABLED})
+        repo.delete_alert(deleted.id)
+        
+        assert asyncio.run(monitor.on_price("AAPL", Decimal("160"))) == []
+        
+        repo.update_alert(disabled.id, {"status": AlertStatus.ACTIVE})
+        triggered = asyncio.run(monitor.on_price("AAPL", Decimal("160")))
+        
+        assert [alert.id for alert in triggered] == [disabled.id]
+        assert list(monitor.books) == ["AAPL"]
+    
+    def test_empty_symbol_book_is_dropped(self, repo, monitor):
+        """Test a symbol without alerts leaves the index"""
+        alert = repo.create_alert(make_alert())
+        monitor.stop_monitoring(alert.id)
+        
+        assert monitor.books == {}
+    
+    def test_expired_alerts_do_not_trigger(self, repo, monitor):
+        """Test expired alerts are marked expired instead of triggered"""
+        alert = repo.create_alert(make_alert(expires_at=datetime.utcnow() - timedelta(seconds=5)))
+        
+        triggered = asyncio.run(monitor.on_price("AAPL", Decimal("200")))
+        
+        assert triggered == []
+        assert repo.get_alert(alert.id).status == AlertStatus.EXPIRED
+        assert monitor.notifications == []
+    
+    def test_untriggerable_types_only_expire(self, repo, monitor):
+        """Test percent change alerts are tracked for expiry only"""
+        alert = repo.create_alert(make_alert(
+            alert_type=AlertType.PERCENT_CHANGE,
+            expires_at=datetime.utcnow() - timedelta(seconds=5)
+        ))
+        
+        assert monitor.books == {}
+        asyncio.run(monitor.on_price("AAPL", Decimal("200")))
+        
+        assert repo.get_alert(alert.id).status == AlertStatus.EXPIRED
+    
+    @pytest.mark.asyncio
+    async def test_one_price_stream_per_symbol(self, repo):
+        """Test symbols share one stream that stops once alerts are gone"""
+        monitor = RecordingMonitor(repo, poll_interval=0.01)
+        monitor.prices["AAPL"] = Decimal("151")
+        alerts = [repo.create_alert(make_alert(threshold=str(140 + i))) for i in range(5)]
+        await monitor.start_monitoring(alerts[0].id)
+        
+        assert list(monitor._streams) == ["AAPL"]
+        
+        for _ in range(20):
+            await asyncio.sleep(0.01)
+            if not monitor._streams:
+                break
+        
+        assert monitor._streams == {}
+        assert all(repo.get_alert(a.id).status == AlertStatus.TRIGGERED for a in alerts)
+        monitor.stop()
+    
+    @pytest.mark.asyncio
+    async def test_stream_finishes_notifying_after_emptying_its_book(self, repo):
+        """Test a stream whose tick empties the book still notifies every crossed alert"""
+        class SlowNotificationMonitor(RecordingMonitor):
+            async def _send_notification(self, user_id, notification):
+                await asyncio.sleep(0.001)
+                self.notifications.append(notification)
+        
+        monitor = SlowNotificationMonitor(repo, poll_interval=0.01)
+        monitor.prices["AAPL"] = Decimal("151")
+        alerts = [repo.create_alert(make_alert(threshold=str(140 + i))) for i in range(5)]
+        await monitor.start_monitoring(alerts[0].id)
+        stream = monitor._streams["AAPL"]
+        
+        await asyncio.wait_for(stream, timeout=1)
+        
+        assert not stream.cancelled()
+        assert len(monitor.notifications) == 5
+        assert all(repo.get_alert(a.id).status == AlertStatus.TRIGGERED for a in alerts)
+        assert monitor._streams == {}
+        assert monitor.books == {}
+
+
+@pytest.mark.benchmark
+def test_benchmark_100k_alerts(repo, monitor, record_property):
+    """Benchmark indexing and triggering 100k alerts across 500 symbols"""
+    rng = random.Random(7)
+    symbols = [f"SYM{i}" for i in range(500)]
+    alerts = []
+    for _ in range(100_000):
+        if rng.random() < 0.5:
+            alert_type, threshold = AlertType.PRICE_ABOVE, rng.randint(9900, 15000)
+        else:
+            alert_type, threshold = AlertType.PRICE_BELOW, rng.randint(5000, 10100)
+        alerts.append(make_alert(
+            symbol=rng.choice(symbols), alert_type=alert_type, threshold=str(threshold / 100)
+        ))
+    
+    start = time.perf_counter()
+    for alert in alerts:
+        repo.create_alert(alert)
+    index_seconds = time.perf_counter() - start
+    
+    # Ticks near 100 cross a few percent of each symbol's alerts
+    ticks = [(symbol, Decimal(str(rng.uniform(99.5, 100.5))).quantize(Decimal("0.01")))
+             for symbol in symbols]
+    prices = dict(ticks)
+    expected = {
+        alert.id for alert in alerts
+        if (prices[alert.symbol] >= alert.threshold_value
+            if alert.alert_type == AlertType.PRICE_ABOVE
+            else prices[alert.symbol] <= alert.threshold_value)
+    }
+    
+    async def run_ticks():
+        triggered = []
+        for symbol, price in ticks:
+            triggered.extend(await monitor.on_price(symbol, price))
+        return triggered
+    
+    start = time.perf_counter()
+    triggered = asyncio.run(run_ticks())
+    tick_seconds = time.perf_counter() - start
+    
+    record_property("index_seconds", index_seconds)
+    record_property("tick_seconds", tick_seconds)
+    assert {alert.id for alert in triggered} == expected
+    assert sum(len(book) for book in monitor.books.values()) == 100_000 - len(expected)
@@ -3,7 +3,9 @@ Unit Tests for Brokerage Service
 Tests brokerage connections and portfolio sync
 """
 import pytest
-from datetime import datetime
+import asyncio
+import time
+from datetime import datetime, timedelta
 from decimal import Decimal
 import uuid
 from src.brokerage_service.models import (
@@ -11,7 +13,8 @@ from src.brokerage_service.models import (
     BrokerageProvider, PositionType, ConnectionStatus, AccountType
 )
 from src.brokerage_service.repository import BrokerageRepository
-from src.brokerage_service.sync_service import PortfolioSyncService
+from src.brokerage_service.sync_service import PortfolioSyncService, RateBudget
+from src.brokerage_service.connectors.base import BrokerageConnector
 
 
 class TestBrokerageRepository:
@@ -158,6 +161,402 @@ class TestPortfolioSyncService:
         assert portfolio.total_vega == Decimal("1.50")  # 0.15 * 10
 
 
+class FakeConnector(BrokerageConnector):
+    """Connector returning canned data after a simulated delay"""
+    
+    def __init__(self, connection, positions=None, transactions=None, delay=0.05):
+        super().__init__(connection)
+        self.positions = positions or []
+        self.transactions = transactions or []
+        self.delay = delay
+        self.calls = []
+        self.refreshes = 0
+    
+    async def authenticate(self, authorization_code):
+        return {}
+    
+    async def refresh_token(self):
+        self.refreshes += 1
+        await asyncio.sleep(self.delay)
+        return {"access_token": "refreshed", "expires_at": datetime.utcnow() + timedelta(hours=1)}
+    
+    async def get_account_info(self):
+        return {}
+    
+    async def get_positions(self):
+        self.calls.append("positions")
+        await asyncio.sleep(self.delay)
+        return [position.model_copy(update={"id": uuid.uuid4()}) for position in self.positions]
+    
+    async def get_account_balance(self):
+        return {}
+    
+    async def get_transactions(self, start_date=None, end_date=None):
+        self.calls.append(("transactions", start_date))
+        await asyncio.sleep(self.delay)
+        return [transaction.model_copy(update={"id": uuid.uuid4()}) for transaction in self.transactions]
+
+
+class TestConcurrentSync:
+    """Test concurrent account sync and bulk persistence"""
+    
+    @pytest.fixture
+    def user_id(self):
+        return uuid.uuid4()
+    
+    @pytest.fixture
+    def sync_service(self):
+        return PortfolioSyncService(rate_limits={BrokerageProvider.SCHWAB: (1000.0, 1000)})
+    
+    def add_connection(self, sync_service, user_id, **kwargs):
+        connection = BrokerageConnection(
+            user_id=user_id,
+            provider=BrokerageProvider.SCHWAB,
+            access_token="token",
+            token_expires_at=datetime.utcnow() + timedelta(hours=1),
+            account_id=str(uuid.uuid4()),
+            **kwargs
+        )
+        return sync_service.repo.create_connection(connection)
+    
+    def make_position(self, connection, symbol, price):
+        return Position(
+            connection_id=connection.id,
+            user_id=connection.user_id,
+            symbol=symbol,
+            position_type=PositionType.STOCK,
+            quantity=Decimal("10"),
+            average_price=Decimal("100"),
+            cost_basis=Decimal("1000"),
+            current_price=Decimal(price),
+            market_value=Decimal(price) * 10,
+            unrealized_pl=Decimal(price) * 10 - 1000,
+            unrealized_pl_percent=Decimal("0")
+        )
+    
+    @pytest.mark.asyncio
+    async def test_accounts_sync_concurrently(self, sync_service, user_id):
+        """Test five accounts sync in about the time of one"""
+        connectors = {}
+        for _ in range(5):
+            connection = self.add_connection(sync_service, user_id)
+            connectors[connection.id] = FakeConnector(
+                connection, [self.make_position(connection, "AAPL", "150")], delay=0.1
+            )
+        sync_service.get_connector = lambda connection: connectors[connection.id]
+        
+        start = time.perf_counter()
+        await sync_service.sync_all_accounts(user_id)
+        elapsed = time.perf_counter() - start
+        
+        # Positions and transactions are also fetched concurrently
+        assert elapsed < 0.4
+        assert len(sync_service.repo.get_user_positions(user_id)) == 5
+        for connection in sync_service.repo.get_user_connections(user_id):
+            assert connection.last_sync_at is not None
+            assert connection.sync_error is None
+    
+    @pytest.mark.asyncio
+    async def test_positions_upsert_only_changes(self, sync_service, user_id):
+        """Test resyncs keep position IDs and write only changed rows"""
+        connection = self.add_connection(sync_service, user_id)
+        connector = FakeConnector(connection, [
+            self.make_position(connection, "AAPL", "150"),
+            self.make_position(connection, "MSFT", "300"),
+        ], delay=0)
+        sync_service.get_connector = lambda connection: connector
+        
+        first = await sync_service.sync_account(connection.id)
+        ids = {p.symbol: p.id for p in sync_service.repo.get_user_positions(user_id)}
+        unchanged = await sync_service.sync_account(connection.id)
+        
+        connector.positions = [self.make_position(connection, "AAPL", "155")]
+        changed = await sync_service.sync_account(connection.id)
+        positions = sync_service.repo.get_user_positions(user_id)
+        
+        assert first["positions_changed"] == 2
+        assert unchanged["positions_changed"] == 0
+        assert changed["positions_changed"] == 2  # AAPL updated, MSFT closed
+        assert [(p.symbol, p.id, p.current_price) for p in positions] == [
+            ("AAPL", ids["AAPL"], Decimal("155"))
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_transactions_use_sync_cursor(self, sync_service, user_id):
+        """Test transactions are fetched from the last sync and deduplicated"""
+        connection = self.add_connection(sync_service, user_id)
+        connector = FakeConnector(connection, transactions=[Transaction(
+            connection_id=connection.id,
+            user_id=user_id,
+            symbol="AAPL",
+            transaction_type="buy",
+            quantity=Decimal("10"),
+            price=Decimal("150"),
+            amount=Decimal("-1500"),
+            transaction_date=datetime(2024, 1, 15, 10, 30)
+        )], delay=0)
+        sync_service.get_connector = lambda connection: connector
+        
+        first = await sync_service.sync_account(connection.id)
+        cursor = sync_service.repo.get_connection(connection.id).last_sync_at
+        second = await sync_service.sync_account(connection.id)
+        
+        assert connector.calls[1] == ("transactions", None)
+        assert connector.calls[3] == ("transactions", cursor)
+        assert first["transactions_added"] == 1
+        assert second["transactions_added"] == 0
+        assert len(sync_service.repo.get_user_transactions(user_id)) == 1
+    
+    def make_fill(self, connection_id, user_id, broker_transaction_id=None):
+        """A 10 share AAPL buy at a fixed time"""
+        return Transaction(
+            connection_id=connection_id,
+            user_id=user_id,
+            symbol="AAPL",
+            transaction_type="buy",
+            quantity=Decimal("10"),
+            price=Decimal("150"),
+            amount=Decimal("-1500"),
+            broker_transaction_id=broker_transaction_id,
+            transaction_date=datetime(2024, 1, 15, 10, 30)
+        )
+    
+    def test_identical_fills_are_kept(self, user_id):
+        """Test identical fills with their own broker ids are all inserted once"""
+        repo = BrokerageRepository()
+        connection_id = uuid.uuid4()
+        fills = [self.make_fill(connection_id, user_id, broker_id) for broker_id in ("E1", "E2")]
+        
+        assert repo.add_transactions(connection_id, fills) == 2
+        assert repo.add_transactions(connection_id, [
+            fill.model_copy(update={"id": uuid.uuid4()}) for fill in fills
+        ]) == 0
+        
+        # Without broker ids, identical rows in one window are distinct fills
+        anonymous = uuid.uuid4()
+        assert repo.add_transactions(anonymous, [self.make_fill(anonymous, user_id)] * 2) == 2
+        assert repo.add_transactions(anonymous, [self.make_fill(anonymous, user_id)] * 3) == 1
+    
+    def test_transaction_keys_load_from_storage(self, user_id):
+        """Test deduplication covers transactions stored before the keys were cached"""
+        repo = BrokerageRepository()
+        connection_id = uuid.uuid4()
+        repo.save_transactions([
+            self.make_fill(connection_id, user_id, "E1"),
+            self.make_fill(connection_id, user_id)
+        ])
+        
+        assert repo.add_transactions(connection_id, [
+            self.make_fill(connection_id, user_id, "E1"),
+            self.make_fill(connection_id, user_id),
+            self.make_fill(connection_id, user_id, "E2")
+        ]) == 1
+        assert len(repo.get_user_transactions(user_id)) == 3
+    
+    @pytest.mark.asyncio
+    async def test_token_refresh_is_single_flight(self, sync_service, user_id):
+        """Test concurrent syncs share one token refresh"""
+        connection = self.add_connection(sync_service, user_id)
+        sync_service.repo.update_connection(connection.id, {"token_expires_at": datetime.utcnow()})
+        connector = FakeConnector(connection, delay=0.05)
+        sync_service.get_connector = lambda connection: connector
+        
+        await asyncio.gather(*(sync_service.sync_account(connection.id) for _ in range(3)))
+        
+        assert connector.refreshes == 1
+        assert sync_service.repo.get_connection(connection.id).access_token == "refreshed"
+    
+    @pytest.mark.asyncio
+    async def test_sync_all_users_continues_past_failures(self, sync_service):
+        """Test one failing account does not stop the others"""
+        good = self.add_connection(sync_service, uuid.uuid4())
+        bad = self.add_connection(sync_service, uuid.uuid4())
+        connectors = {good.id: FakeConnector(good, delay=0)}
+        
+        def get_connector(connection):
+            if connection.id not in connectors:
+                raise ValueError("Unsupported provider")
+            return connectors[connection.id]
+        sync_service.get_connector = get_connector
+        
+        result = await sync_service.sync_all_users()
+        
+        assert result == {"synced": 1, "failed": 1}
+        assert sync_service.repo.get_connection(bad.id).sync_error == "Unsupported provider"
+    
+    @pytest.mark.asyncio
+    async def test_rate_budget_limits_requests(self):
+        """Test the budget spaces requests beyond the burst"""
+        budget = RateBudget(rate=50.0, burst=2)
+        
+        start = time.perf_counter()
+        for _ in range(5):
+            await budget.acquire()
+        
+        assert time.perf_counter() - start >= 0.05
+
+
+class TestPortfolioAggregate:
+    """Test incrementally maintained portfolio aggregates"""
+    
+    @pytest.fixture
+    def repo(self):
+        return BrokerageRepository()
+    
+    @pytest.fixture
+    def user_id(self):
+        return uuid.uuid4()
+    
+    def make_option(self, user_id, connection_id, underlying, option_symbol, quantity, price):
+        quantity, price = Decimal(quantity), Decimal(price)
+        return Position(
+            connection_id=connection_id,
+            user_id=user_id,
+            symbol=underlying,
+            position_type=PositionType.OPTION,
+            quantity=quantity,
+            average_price=Decimal("5"),
+            cost_basis=quantity * 5,
+            current_price=price,
+            market_value=quantity * price,
+            unrealized_pl=quantity * price - quantity * 5,
+            unrealized_pl_percent=Decimal("0"),
+            realized_pl=Decimal("12.50"),
+            option_symbol=option_symbol,
+            delta=Decimal("0.5"),
+            gamma=Decimal("0.05"),
+            theta=Decimal("-0.1"),
+            vega=Decimal("0.2")
+        )
+    
+    def recompute(self, repo, user_id):
+        """Totals recomputed from scratch"""
+        positions = repo.get_user_positions(user_id)
+        options = [p for p in positions if p.position_type == PositionType.OPTION]
+        return {
+            "total_value": sum((p.market_value for p in positions), Decimal("0")),
+            "unrealized_pl": sum((p.unrealized_pl for p in positions), Decimal("0")),
+            "realized_pl": sum((p.realized_pl for p in positions), Decimal("0")),
+            "delta": sum((p.delta * p.quantity for p in options), Decimal("0")),
+            "underlyings": sorted({p.symbol for p in options}),
+        }
+    
+    def aggregated(self, repo, user_id):
+        aggregate = repo.get_portfolio_aggregate(user_id)
+        return {
+            "total_value": aggregate.total_value,
+            "unrealized_pl": aggregate.total_unrealized_pl,
+            "realized_pl": aggregate.total_realized_pl,
+            "delta": aggregate.greeks.delta,
+            "underlyings": sorted(aggregate.greeks_by_underlying),
+        }
+    
+    def test_aggregate_tracks_changes(self, repo, user_id):
+        """Test the aggregate equals a full recomputation after every change"""
+        connection = repo.create_connection(BrokerageConnection(
+            user_id=user_id,
+            provider=BrokerageProvider.SCHWAB,
+            access_token="token",
+            account_id="12345678"
+        ))
+        spy = self.make_option(user_id, connection.id, "SPY", "SPY_C450", "10", "5.5")
+        qqq = self.make_option(user_id, connection.id, "QQQ", "QQQ_P380", "-4", "3")
+        
+        repo.upsert_positions(connection.id, [spy, qqq])
+        assert self.aggregated(repo, user_id) == self.recompute(repo, user_id)
+        
+        repo.upsert_positions(connection.id, [spy.model_copy(update={"quantity": Decimal("20")})])
+        assert self.aggregated(repo, user_id) == self.recompute(repo, user_id)
+        
+        repo.update_prices("SPY_C450", Decimal("7"))
+        assert self.aggregated(repo, user_id) == self.recompute(repo, user_id)
+        assert repo.get_portfolio_aggregate(user_id).total_value == Decimal("140")
+        
+        repo.delete_connection(connection.id)
+        aggregate = repo.get_portfolio_aggregate(user_id)
+        assert aggregate.position_count == 0
+        assert aggregate.total_value == 0
+        assert aggregate.greeks_by_underlying == {}
+    
+    def test_greeks_by_underlying(self, repo, user_id):
+        """Test Greek exposure is kept per underlying"""
+        connection_id = uuid.uuid4()
+        repo.save_positions([
+            self.make_option(user_id, connection_id, "SPY", "SPY_C450", "10", "5"),
+            self.make_option(user_id, connection_id, "SPY", "SPY_C460", "-4", "3"),
+            self.make_option(user_id, connection_id, "QQQ", "QQQ_P380", "2", "4"),
+        ])
+        
+        aggregate = repo.get_portfolio_aggregate(user_id)
+        
+        assert aggregate.greeks_by_underlying["SPY"].delta == Decimal("3.0")
+        assert aggregate.greeks_by_underlying["SPY"].position_count == 2
+        assert aggregate.greeks_by_underlying["QQQ"].vega == Decimal("0.4")
+        assert aggregate.greeks.delta == Decimal("4.0")
+    
+    def test_price_ticks_are_pushed(self, repo, user_id):
+        """Test listeners receive the updated aggregate on a price tick"""
+        updates = []
+        repo.add_listener(lambda changed_user, aggregate: updates.append(
+            (changed_user, aggregate.total_value)
+        ))
+        repo.save_positions([self.make_option(user_id, uuid.uuid4(), "SPY", "SPY_C450", "10", "5")])
+        
+        assert repo.update_prices("SPY_C450", Decimal("6")) == 1
+        assert repo.update_prices("AAPL", Decimal("150")) == 0
+        assert updates == [(user_id, Decimal("50")), (user_id, Decimal("60"))]
+    
+    @pytest.mark.asyncio
+    async def test_day_pl_follows_price_ticks(self, user_id):
+        """Test day P&L counts price moves but not position changes, resetting daily"""
+        sync_service = PortfolioSyncService()
+        repo = sync_service.repo
+        connection_id = uuid.uuid4()
+        repo.save_positions([self.make_option(user_id, connection_id, "SPY", "SPY_C450", "10", "5")])
+        
+        repo.update_prices("SPY_C450", Decimal("6"))
+        repo.save_positions([self.make_option(user_id, connection_id, "QQQ", "QQQ_P380", "2", "4")])
+        
+        performance = await sync_service.calculate_performance(user_id)
+        assert performance["day_pl"] == 10.0
+        assert performance["day_pl_percent"] == pytest.approx(10 / 58 * 100)
+        
+        repo.get_portfolio_aggregate(user_id).day_pl_date -= timedelta(days=1)
+        repo.update_prices("SPY_C450", Decimal("5.5"))
+        assert repo.get_portfolio_aggregate(user_id).day_pl == Decimal("-5.0")
+        
+        repo.get_portfolio_aggregate(user_id).day_pl_date -= timedelta(days=1)
+        portfolio = await sync_service.get_unified_portfolio(user_id)
+        assert portfolio.day_pl == 0
+    
+    @pytest.mark.asyncio
+    async def test_performance_uses_trade_counts(self, user_id):
+        """Test win rate comes from the running closed trade counts"""
+        sync_service = PortfolioSyncService()
+        connection_id = uuid.uuid4()
+        sync_service.repo.save_transactions([
+            Transaction(
+                connection_id=connection_id,
+                user_id=user_id,
+                symbol="AAPL",
+                transaction_type=transaction_type,
+                quantity=Decimal("10"),
+                price=Decimal("150"),
+                amount=Decimal(amount),
+                transaction_date=datetime(2024, 1, 15)
+            )
+            for transaction_type, amount in [
+                ("buy", "-1500"), ("sell", "1600"), ("sell", "-20"), ("buy_to_close", "300")
+            ]
+        ])
+        
+        performance = await sync_service.calculate_performance(user_id)
+        
+        assert performance["total_trades"] == 3
+        assert performance["winning_trades"] == 2
+        assert performance["win_rate"] == pytest.approx(200 / 3)
+
+
 class TestBrokerageModels:
     """Test brokerage models"""
     
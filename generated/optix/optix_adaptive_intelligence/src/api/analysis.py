@@ -1,6 +1,7 @@
 """
 API endpoints for AI analysis
 """
+from functools import lru_cache
 from fastapi import APIRouter, HTTPException, Query, Depends
 from typing import List, Optional
 from datetime import datetime
@@ -15,7 +16,9 @@ from ..api.patterns import _create_sample_price_data  # Reuse helper
 router = APIRouter(prefix="/api/v1/analysis", tags=["analysis"])
 
 
+@lru_cache(maxsize=1)
 def get_analysis_service() -> AIAnalysisService:
+    # Shared so fitted models stay cached across requests
     return AIAnalysisService()
 
 
@@ -1,8 +1,9 @@
 """
 API endpoints for pattern recognition
 """
+from functools import lru_cache
 from fastapi import APIRouter, HTTPException, Query, Depends
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 import pandas as pd
 
@@ -15,7 +16,9 @@ router = APIRouter(prefix="/api/v1/patterns", tags=["patterns"])
 
 
 # Dependency injection for service
+@lru_cache(maxsize=1)
 def get_pattern_service() -> PatternRecognitionService:
+    # Shared so the scan process pool is reused across requests
     return PatternRecognitionService()
 
 
@@ -55,6 +58,40 @@ async def detect_chart_patterns(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/detect/chart/scan", response_model=Dict[str, List[ChartPattern]])
+async def scan_chart_patterns(
+    symbols: List[str],
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    service: PatternRecognitionService = Depends(get_pattern_service)
+):
+    """
+    Detect chart patterns across many symbols in parallel
+    
+    Args:
+        symbols: Trading symbols to scan
+        start_date: Start date for analysis
+        end_date: End date for analysis
+        
+    Returns:
+        Detected chart patterns keyed by symbol
+    """
+    try:
+        price_data = {
+            symbol: _create_sample_price_data(symbol, start_date, end_date)
+            for symbol in symbols
+        }
+        volume_data = {
+            symbol: _create_sample_volume_data(symbol, start_date, end_date)
+            for symbol in symbols
+        }
+        
+        return await service.scan_chart_patterns(price_data, volume_data)
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/detect/support-resistance", response_model=List[SupportResistanceLevel])
 async def detect_support_resistance(
     symbol: str,
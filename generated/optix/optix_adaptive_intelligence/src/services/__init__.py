@@ -3,12 +3,16 @@ Core services for the Adaptive Intelligence Engine
 """
 from .pattern_recognition_service import PatternRecognitionService
 from .ai_analysis_service import AIAnalysisService
+from .feature_store import FeatureStore
+from .model_registry import ModelRegistry
 from .personalization_service import PersonalizationService
 from .alert_service import AlertService
 
 __all__ = [
     'PatternRecognitionService',
     'AIAnalysisService',
+    'FeatureStore',
+    'ModelRegistry',
     'PersonalizationService',
     'AlertService',
 ]
@@ -8,10 +8,9 @@ from typing import List, Dict, Optional, Any, Tuple
 import numpy as np
 import pandas as pd
 from scipy import stats
-from sklearn.ensemble import RandomForestRegressor, GradientBoostingClassifier
-from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
 
+from .feature_store import FeatureStore, PRICE_COLUMNS
+from .model_registry import FittedPriceModel, ModelKey, ModelRegistry, feature_set_hash
 from ..models.analysis_models import (
     PredictionSignal, SignalType, SignalStrength,
     VolatilityForecast, VolatilityRegime,
@@ -26,13 +25,32 @@ class AIAnalysisService:
     volatility forecasting, and sentiment analysis
     """
     
-    def __init__(self, config: Optional[Dict[str, Any]] = None):
+    def __init__(
+        self,
+        config: Optional[Dict[str, Any]] = None,
+        model_registry: Optional[ModelRegistry] = None,
+        feature_store: Optional[FeatureStore] = None
+    ):
         self.config = config or {}
-        self.price_model = None
         self.volatility_model = None
-        self.scaler = StandardScaler()
         self.feature_names = []
         
+        # Price models are fitted per (symbol, horizon, feature set)
+        prediction_config = self.config.get('price_prediction', {})
+        self.model_registry = model_registry or ModelRegistry(
+            capacity=prediction_config.get('model_cache_size', 32),
+            model_dir=prediction_config.get('model_dir'),
+            max_workers=prediction_config.get('training_workers', 2),
+            n_estimators=prediction_config.get('n_estimators', 100),
+            max_depth=prediction_config.get('max_depth', 10),
+            min_samples=prediction_config.get('min_samples', 50)
+        )
+        
+        # Indicators are kept per symbol and updated as new bars arrive
+        self.feature_store = feature_store or FeatureStore(
+            max_symbols=self.config.get('feature_store', {}).get('max_symbols', 256)
+        )
+        
     async def generate_prediction_signals(
         self,
         symbol: str,
@@ -55,22 +73,24 @@ class AIAnalysisService:
         signals = []
         
         # Prepare features
-        features = await self._prepare_features(price_data, feature_data)
+        features = await self._prepare_features(price_data, feature_data, symbol)
         
         if len(features) < 50:
             # Not enough data for reliable prediction
             return signals
         
-        # Train or update model
-        if self.price_model is None:
-            await self._train_price_model(features, price_data)
+        # Get the symbol's model, training it off the event loop if needed
+        model_key = ModelKey(symbol, time_horizon, feature_set_hash(list(features.columns)))
+        price_model = await self.model_registry.get_or_train(model_key, features, price_data)
         
         # Generate prediction
         current_features = features.iloc[-1:].values
         current_price = price_data['close'].iloc[-1]
         
         # Predict future price
-        predicted_price = await self._predict_price(current_features, current_price, time_horizon)
+        predicted_price = await self._predict_price(
+            price_model, current_features, current_price, time_horizon
+        )
         
         # Calculate prediction range
         prediction_std = self._calculate_prediction_uncertainty(features, price_data)
@@ -95,7 +115,7 @@ class AIAnalysisService:
             risk_reward_ratio = 0.0
         
         # Get feature importance
-        feature_importance = await self._get_feature_importance()
+        feature_importance = await self._get_feature_importance(price_model)
         
         # Identify contributing factors
         contributing_factors = self._identify_contributing_factors(
@@ -143,7 +163,7 @@ class AIAnalysisService:
         Returns:
             Volatility forecast
         """
-        returns = price_data['close'].pct_change().dropna()
+        returns = self.feature_store.column(symbol, price_data, 'returns').dropna()
         
         # Calculate current realized volatility
         current_volatility = returns.std() * np.sqrt(252)  # Annualized
@@ -175,14 +195,14 @@ class AIAnalysisService:
         )
         
         # Calculate confidence interval
-        vol_std = returns.rolling(window=20).std().std() * np.sqrt(252)
+        rolling_vol = self.feature_store.column(symbol, price_data, 'volatility_20') * np.sqrt(252)
+        vol_std = rolling_vol.std()
         confidence_interval = {
             'lower': max(0, forecasted_volatility - 1.96 * vol_std),
             'upper': forecasted_volatility + 1.96 * vol_std
         }
         
         # Calculate historical percentile
-        rolling_vol = returns.rolling(window=20).std() * np.sqrt(252)
         historical_percentile = stats.percentileofscore(rolling_vol.dropna(), current_volatility)
         
         # Mean reversion signal
@@ -316,10 +336,12 @@ class AIAnalysisService:
         Returns:
             Market context analysis
         """
-        returns = price_data['close'].pct_change().dropna()
+        returns = self.feature_store.column(symbol, price_data, 'returns').dropna()
         
         # Identify market regime
-        market_regime, regime_confidence = self._identify_market_regime(price_data, returns)
+        market_regime, regime_confidence = self._identify_market_regime(
+            price_data, returns, self.feature_store.latest(symbol, price_data)
+        )
         
         # Calculate trend strength
         trend_strength = self._calculate_trend_strength(price_data)
@@ -367,105 +389,36 @@ class AIAnalysisService:
     async def _prepare_features(
         self,
         price_data: pd.DataFrame,
-        feature_data: Optional[pd.DataFrame]
+        feature_data: Optional[pd.DataFrame],
+        symbol: Optional[str] = None
     ) -> pd.DataFrame:
-        """Prepare features for ML models"""
-        df = price_data.copy()
-        
-        # Technical indicators
-        df['returns'] = df['close'].pct_change()
-        df['log_returns'] = np.log(df['close'] / df['close'].shift(1))
-        
-        # Moving averages
-        df['sma_5'] = df['close'].rolling(window=5).mean()
-        df['sma_20'] = df['close'].rolling(window=20).mean()
-        df['sma_50'] = df['close'].rolling(window=50).mean()
-        
-        # Volatility
-        df['volatility_20'] = df['returns'].rolling(window=20).std()
-        
-        # RSI
-        delta = df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        df['rsi'] = 100 - (100 / (1 + rs))
-        
-        # MACD
-        exp1 = df['close'].ewm(span=12, adjust=False).mean()
-        exp2 = df['close'].ewm(span=26, adjust=False).mean()
-        df['macd'] = exp1 - exp2
-        df['macd_signal'] = df['macd'].ewm(span=9, adjust=False).mean()
-        
-        # Volume indicators
-        if 'volume' in df.columns:
-            df['volume_sma'] = df['volume'].rolling(window=20).mean()
-            df['volume_ratio'] = df['volume'] / df['volume_sma']
-        
-        # Lag features
-        for lag in [1, 2, 3, 5]:
-            df[f'returns_lag_{lag}'] = df['returns'].shift(lag)
-        
-        # Drop NaN values
-        df = df.dropna()
-        
-        # Select feature columns
-        feature_cols = [col for col in df.columns if col not in ['open', 'high', 'low', 'close', 'volume']]
-        self.feature_names = feature_cols
-        
-        return df[feature_cols]
-    
-    async def _train_price_model(
-        self,
-        features: pd.DataFrame,
-        price_data: pd.DataFrame
-    ):
-        """Train price prediction model"""
-        # Prepare target (future returns)
-        target = price_data['close'].pct_change().shift(-1)
-        target = target.iloc[:len(features)]
-        
-        # Remove NaN
-        valid_idx = ~target.isna()
-        X = features[valid_idx]
-        y = target[valid_idx]
-        
-        if len(X) < 50:
-            return
-        
-        # Split data
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, shuffle=False
-        )
+        """Prepare features for ML models from the symbol's feature store arrays"""
+        # Extra price data columns are passed through as features
+        extra_cols = [col for col in price_data.columns if col not in PRICE_COLUMNS]
+        if extra_cols:
+            indicators = self.feature_store.features(symbol, price_data, dropna=False)
+            df = price_data[extra_cols].join(indicators).dropna()
+        else:
+            df = self.feature_store.features(symbol, price_data)
         
-        # Scale features
-        X_train_scaled = self.scaler.fit_transform(X_train)
+        self.feature_names = list(df.columns)
         
-        # Train model
-        self.price_model = RandomForestRegressor(
-            n_estimators=100,
-            max_depth=10,
-            random_state=42,
-            n_jobs=-1
-        )
-        self.price_model.fit(X_train_scaled, y_train)
+        return df
     
     async def _predict_price(
         self,
+        price_model: Optional[FittedPriceModel],
         features: np.ndarray,
         current_price: float,
         time_horizon: str
     ) -> float:
         """Predict future price"""
-        if self.price_model is None:
+        if price_model is None:
             # Fallback to simple prediction
             return current_price * 1.01
         
-        # Scale features
-        features_scaled = self.scaler.transform(features)
-        
         # Predict return
-        predicted_return = self.price_model.predict(features_scaled)[0]
+        predicted_return = price_model.predict_return(features)
         
         # Adjust for time horizon
         horizon_multiplier = self._get_horizon_multiplier(time_horizon)
@@ -517,15 +470,15 @@ class AIAnalysisService:
         
         return signal_type, signal_strength, confidence
     
-    async def _get_feature_importance(self) -> Dict[str, float]:
+    async def _get_feature_importance(
+        self,
+        price_model: Optional[FittedPriceModel]
+    ) -> Dict[str, float]:
         """Get feature importance from model"""
-        if self.price_model is None or not hasattr(self.price_model, 'feature_importances_'):
+        if price_model is None:
             return {}
         
-        importance = dict(zip(
-            self.feature_names,
-            self.price_model.feature_importances_
-        ))
+        importance = price_model.feature_importance()
         
         # Sort and return top features
         sorted_importance = dict(sorted(
@@ -752,16 +705,14 @@ class AIAnalysisService:
     def _identify_market_regime(
         self,
         price_data: pd.DataFrame,
-        returns: pd.Series
+        returns: pd.Series,
+        indicators: Dict[str, float]
     ) -> Tuple[MarketRegime, float]:
         """Identify market regime"""
         # Calculate trend
-        sma_20 = price_data['close'].rolling(window=20).mean()
-        sma_50 = price_data['close'].rolling(window=50).mean()
-        
         current_price = price_data['close'].iloc[-1]
-        current_sma_20 = sma_20.iloc[-1]
-        current_sma_50 = sma_50.iloc[-1]
+        current_sma_20 = indicators['sma_20']
+        current_sma_50 = indicators['sma_50']
         
         # Calculate volatility
         volatility = returns.std()
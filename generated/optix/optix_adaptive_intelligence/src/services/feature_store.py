@@ -0,0 +1,352 @@
+"""
+Feature Store - per-symbol technical indicators maintained incrementally as bars arrive
+"""
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+PRICE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+RETURN_LAGS = (1, 2, 3, 5)
+
+# Indicator columns in the order _prepare_features has always produced them
+PRICE_FEATURES = [
+    'returns', 'log_returns',
+    'sma_5', 'sma_20', 'sma_50',
+    'volatility_20',
+    'rsi',
+    'macd', 'macd_signal',
+]
+VOLUME_FEATURES = ['volume_sma', 'volume_ratio']
+LAG_FEATURES = [f'returns_lag_{lag}' for lag in RETURN_LAGS]
+
+# Working state stored next to the features
+STATE_COLUMNS = ['close', 'volume', 'gain', 'loss', 'ema_12', 'ema_26']
+COLUMNS = STATE_COLUMNS + PRICE_FEATURES + VOLUME_FEATURES + LAG_FEATURES
+_COL = {name: i for i, name in enumerate(COLUMNS)}
+
+
+def _ewm(values: np.ndarray, span: int, previous: Optional[float]) -> np.ndarray:
+    """Continue an adjust=False exponential moving average from its previous value"""
+    alpha = 2.0 / (span + 1)
+    if previous is None:
+        # pandas seeds the average with the first observation
+        previous = values[0]
+        head = np.array([previous])
+        values = values[1:]
+    else:
+        head = np.empty(0)
+    if len(values) == 0:
+        return head
+    rest, _ = lfilter([alpha], [1.0, alpha - 1.0], values, zi=[(1.0 - alpha) * previous])
+    return np.concatenate([head, rest])
+
+
+class SymbolFeatures:
+    """
+    Indicator arrays for one symbol
+    
+    All columns live in one growable matrix. Appending bars computes only the
+    new rows: rolling windows look back at most 50 bars and the
+    exponential averages continue from their last value, so the work per new
+    bar does not depend on how much history is stored.
+    """
+    
+    def __init__(self, initial_capacity: int = 256):
+        self.n = 0
+        self.has_volume = False
+        self._data = np.empty((initial_capacity, len(COLUMNS)))
+        self._complete = np.empty(initial_capacity, dtype=bool)
+        self._index_values: Optional[np.ndarray] = None
+        self._index_dtype = None
+        self._index: Optional[pd.Index] = None
+        self._frame_cache: Dict[Tuple[int, int, bool], pd.DataFrame] = {}
+    
+    @property
+    def feature_columns(self) -> List[str]:
+        """Feature columns served for this symbol"""
+        if self.has_volume:
+            return PRICE_FEATURES + VOLUME_FEATURES + LAG_FEATURES
+        return PRICE_FEATURES + LAG_FEATURES
+    
+    @property
+    def index(self) -> pd.Index:
+        """Index of the stored bars"""
+        if self._index is None:
+            self._index = pd.Index(self._index_values[:self.n], dtype=self._index_dtype)
+        return self._index
+    
+    def sync(self, price_data: pd.DataFrame) -> Tuple[int, int]:
+        """
+        Bring the arrays up to date with price data and locate it in them
+        
+        Bars already stored are assumed not to change. Price data that extends
+        the stored history only appends its new bars; anything that does not
+        line up with it (earlier start, gaps, different closes at the overlap)
+        rebuilds the symbol from scratch.
+        
+        Returns:
+            Row range [start, stop) covering the price data
+        """
+        located = self._locate(price_data)
+        if located is None:
+            self.reset()
+            self.has_volume = 'volume' in price_data.columns
+            self._index_dtype = price_data.index.dtype
+            start, overlap = 0, 0
+        else:
+            start, overlap = located
+        
+        if overlap < len(price_data):
+            self.extend(price_data.iloc[overlap:])
+        return start, start + len(price_data)
+    
+    def reset(self):
+        """Forget all stored bars"""
+        self.n = 0
+        self._index_values = None
+        self._index = None
+        self._frame_cache.clear()
+    
+    def extend(self, bars: pd.DataFrame):
+        """Append bars and compute their indicator rows"""
+        k = len(bars)
+        if k == 0:
+            return
+        n = self.n
+        self._reserve(n + k)
+        data = self._data
+        rows = slice(n, n + k)
+        
+        close = bars['close'].to_numpy(dtype=float)
+        data[rows, _COL['close']] = close
+        data[rows, _COL['volume']] = (
+            bars['volume'].to_numpy(dtype=float) if self.has_volume else np.nan
+        )
+        
+        prev = np.concatenate([data[n - 1:n, _COL['close']] if n else [np.nan], close[:-1]])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            data[rows, _COL['returns']] = close / prev - 1
+            data[rows, _COL['log_returns']] = np.log(close / prev)
+        delta = close - prev
+        data[rows, _COL['gain']] = np.where(delta > 0, delta, 0.0)
+        data[rows, _COL['loss']] = np.where(delta < 0, -delta, 0.0)
+        
+        self.n = n + k
+        
+        # Moving averages and volatility
+        for window in (5, 20, 50):
+            data[rows, _COL[f'sma_{window}']] = self._rolling(n, 'close', window, np.mean)
+        data[rows, _COL['volatility_20']] = self._rolling(
+            n, 'returns', 20, lambda windows, axis: np.std(windows, axis=axis, ddof=1)
+        )
+        
+        # RSI
+        gain = self._rolling(n, 'gain', 14, np.mean)
+        loss = self._rolling(n, 'loss', 14, np.mean)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            data[rows, _COL['rsi']] = 100 - (100 / (1 + gain / loss))
+        
+        # MACD
+        previous = data[n - 1] if n else None
+        ema_12 = _ewm(close, 12, None if previous is None else previous[_COL['ema_12']])
+        ema_26 = _ewm(close, 26, None if previous is None else previous[_COL['ema_26']])
+        macd = ema_12 - ema_26
+        data[rows, _COL['ema_12']] = ema_12
+        data[rows, _COL['ema_26']] = ema_26
+        data[rows, _COL['macd']] = macd
+        data[rows, _COL['macd_signal']] = _ewm(
+            macd, 9, None if previous is None else previous[_COL['macd_signal']]
+        )
+        
+        # Volume
+        if self.has_volume:
+            volume_sma = self._rolling(n, 'volume', 20, np.mean)
+            data[rows, _COL['volume_sma']] = volume_sma
+            with np.errstate(divide='ignore', invalid='ignore'):
+                data[rows, _COL['volume_ratio']] = data[rows, _COL['volume']] / volume_sma
+        else:
+            data[rows, _COL['volume_sma']] = np.nan
+            data[rows, _COL['volume_ratio']] = np.nan
+        
+        # Lagged returns
+        returns = data[:n + k, _COL['returns']]
+        for lag in RETURN_LAGS:
+            lagged = np.full(k, np.nan)
+            first = max(n, lag)
+            if first < n + k:
+                lagged[first - n:] = returns[first - lag:n + k - lag]
+            data[rows, _COL[f'returns_lag_{lag}']] = lagged
+        
+        feature_idx = [_COL[name] for name in self.feature_columns]
+        self._complete[rows] = ~np.isnan(data[rows][:, feature_idx]).any(axis=1)
+        
+        index_values = bars.index.to_numpy()
+        if self._index_values is None:
+            self._index_values = np.empty(self._data.shape[0], dtype=index_values.dtype)
+        elif len(self._index_values) < self._data.shape[0]:
+            grown = np.empty(self._data.shape[0], dtype=self._index_values.dtype)
+            grown[:n] = self._index_values[:n]
+            self._index_values = grown
+        self._index_values[rows] = index_values
+        self._index = None
+        self._frame_cache.clear()
+    
+    def frame(self, start: int, stop: int, dropna: bool = True) -> pd.DataFrame:
+        """
+        Feature matrix for rows [start, stop)
+        
+        Frames are cached until new bars are appended, so repeated requests
+        over unchanged history do not rebuild them.
+        """
+        key = (start, stop, dropna)
+        cached = self._frame_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        columns = self.feature_columns
+        values = self._data[start:stop][:, [_COL[name] for name in columns]]
+        index = self.index[start:stop]
+        if dropna:
+            complete = self._complete[start:stop]
+            values, index = values[complete], index[complete]
+        frame = pd.DataFrame(values, index=index, columns=columns)
+        self._frame_cache[key] = frame
+        return frame
+    
+    def column(self, start: int, stop: int, name: str) -> pd.Series:
+        """A single feature or state column for rows [start, stop)"""
+        return pd.Series(self._data[start:stop, _COL[name]], index=self.index[start:stop], name=name)
+    
+    def row(self, position: int) -> Dict[str, float]:
+        """All indicator values at one row"""
+        return dict(zip(COLUMNS, self._data[position].tolist()))
+    
+    def _rolling(self, n: int, name: str, window: int, reduce) -> np.ndarray:
+        """Reduce the windows ending at each row appended after row n"""
+        k = self.n - n
+        out = np.full(k, np.nan)
+        lo = max(0, n - window + 1)
+        values = np.ascontiguousarray(self._data[lo:self.n, _COL[name]])
+        if len(values) >= window:
+            windows = sliding_window_view(values, window)[-k:]
+            out[k - len(windows):] = reduce(windows, axis=1)
+        return out
+    
+    def _locate(self, price_data: pd.DataFrame) -> Optional[Tuple[int, int]]:
+        """
+        Row of the first price bar and how many leading bars are already stored
+        
+        Returns None if the price data does not line up with the stored bars.
+        """
+        index = price_data.index
+        if (self.n == 0 or len(index) == 0 or
+                ('volume' in price_data.columns) != self.has_volume or
+                not index.is_monotonic_increasing):
+            return None
+        
+        stored = self.index
+        start = stored.searchsorted(index[0])
+        if start >= self.n or stored[start] != index[0]:
+            return None
+        
+        overlap = min(len(index), self.n - start)
+        last = start + overlap - 1
+        closes = self._data[:, _COL['close']]
+        if (stored[last] != index[overlap - 1] or
+                closes[start] != price_data['close'].iat[0] or
+                closes[last] != price_data['close'].iat[overlap - 1]):
+            return None
+        return start, overlap
+    
+    def _reserve(self, size: int):
+        """Grow the matrix to hold at least size rows"""
+        capacity = self._data.shape[0]
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        data = np.empty((capacity, len(COLUMNS)))
+        data[:self.n] = self._data[:self.n]
+        complete = np.empty(capacity, dtype=bool)
+        complete[:self.n] = self._complete[:self.n]
+        self._data, self._complete = data, complete
+
+
+class FeatureStore:
+    """
+    Per-symbol indicator arrays shared by the analysis services
+    
+    Each request passes the price data it has; the store appends whatever
+    bars it has not seen and serves features for the requested range from
+    the same arrays. Least recently used symbols are evicted beyond
+    max_symbols.
+    
+    Rows near the start of a request can differ from a recomputation over
+    only that request's bars: the store's rolling windows and moving
+    averages warm up on the full stored history.
+    """
+    
+    def __init__(self, max_symbols: int = 256):
+        self.max_symbols = max_symbols
+        self._symbols: "OrderedDict[str, SymbolFeatures]" = OrderedDict()
+    
+    def features(
+        self,
+        symbol: Optional[str],
+        price_data: pd.DataFrame,
+        dropna: bool = True
+    ) -> pd.DataFrame:
+        """
+        Feature matrix covering the price data's bars
+        
+        Args:
+            symbol: Trading symbol, or None to compute without caching
+            price_data: OHLC(V) data indexed by bar time
+            dropna: Drop rows whose indicators are still warming up
+        """
+        entry, start, stop = self._sync(symbol, price_data)
+        return entry.frame(start, stop, dropna)
+    
+    def column(self, symbol: Optional[str], price_data: pd.DataFrame, name: str) -> pd.Series:
+        """One indicator column covering the price data's bars"""
+        entry, start, stop = self._sync(symbol, price_data)
+        return entry.column(start, stop, name)
+    
+    def latest(self, symbol: Optional[str], price_data: pd.DataFrame) -> Dict[str, float]:
+        """Indicator values at the price data's last bar"""
+        entry, start, stop = self._sync(symbol, price_data)
+        return entry.row(stop - 1)
+    
+    def invalidate(self, symbol: Optional[str] = None):
+        """Drop one symbol's arrays, or every symbol's"""
+        if symbol is None:
+            self._symbols.clear()
+        else:
+            self._symbols.pop(symbol, None)
+    
+    def _sync(
+        self,
+        symbol: Optional[str],
+        price_data: pd.DataFrame
+    ) -> Tuple[SymbolFeatures, int, int]:
+        """Get a symbol's arrays updated with the price data"""
+        if len(price_data) == 0:
+            raise ValueError("Price data is empty")
+        
+        if symbol is None:
+            entry = SymbolFeatures(initial_capacity=len(price_data))
+        else:
+            entry = self._symbols.get(symbol)
+            if entry is None:
+                entry = SymbolFeatures()
+                self._symbols[symbol] = entry
+            self._symbols.move_to_end(symbol)
+            while len(self._symbols) > self.max_symbols:
+                self._symbols.popitem(last=False)
+        
+        start, stop = entry.sync(price_data)
+        return entry, start, stop
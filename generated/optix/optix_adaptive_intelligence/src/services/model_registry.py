@@ -0,0 +1,292 @@
+"""
+Model Registry - per-symbol cache of fitted price models with background training
+"""
+import asyncio
+import copy
+import hashlib
+import logging
+import os
+import re
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
+
+logger = logging.getLogger(__name__)
+
+
+class ModelKey(NamedTuple):
+    """Identifies a fitted model"""
+    symbol: str
+    horizon: str
+    feature_hash: str
+
+
+def feature_set_hash(feature_names: List[str]) -> str:
+    """Stable short hash of an ordered feature set"""
+    return hashlib.sha1("|".join(feature_names).encode()).hexdigest()[:12]
+
+
+@dataclass
+class FittedPriceModel:
+    """A fitted price model together with the scaler and features it was trained on"""
+    model: RandomForestRegressor
+    scaler: StandardScaler
+    feature_names: List[str]
+    last_bar: Any
+    n_samples: int
+    trained_at: datetime = field(default_factory=datetime.utcnow)
+    refreshes: int = 0
+    
+    def predict_return(self, features: np.ndarray) -> float:
+        """Predict the next-bar return for one row of features"""
+        return float(self.model.predict(self.scaler.transform(features))[0])
+    
+    def feature_importance(self) -> Dict[str, float]:
+        """Feature importances keyed by feature name"""
+        return dict(zip(self.feature_names, self.model.feature_importances_))
+
+
+def training_frame(features: pd.DataFrame, price_data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Align features with their next-bar return target
+    
+    Rows whose next bar is not known yet are dropped.
+    """
+    target = price_data['close'].pct_change().shift(-1).reindex(features.index)
+    frame = features.assign(_target=target)
+    return frame[frame['_target'].notna()]
+
+
+def train_price_model(
+    frame: pd.DataFrame,
+    last_bar: Any,
+    params: Dict[str, Any],
+    previous: Optional[FittedPriceModel] = None
+) -> FittedPriceModel:
+    """
+    Fit a price model, or grow a previous one with trees fit on new bars
+    
+    Runs in a worker process, so it only takes and returns picklable values.
+    Refreshes keep the previous scaler so existing and new trees share one
+    feature scale.
+    
+    Args:
+        frame: Features with their '_target' column, from training_frame
+        last_bar: Index of the latest bar seen, including untargeted ones
+        params: Registry training parameters
+        previous: Model to refresh instead of fitting from scratch
+    """
+    X = frame.drop(columns='_target')
+    y = frame['_target'].values
+    
+    if previous is None:
+        # Hold out the most recent 20% of bars
+        train_size = len(X) - int(np.ceil(len(X) * 0.2))
+        X, y = X.iloc[:train_size], y[:train_size]
+        scaler = StandardScaler()
+        model = RandomForestRegressor(
+            n_estimators=params['n_estimators'],
+            max_depth=params['max_depth'],
+            random_state=42,
+            n_jobs=1,
+            warm_start=True
+        )
+        model.fit(scaler.fit_transform(X.values), y)
+        return FittedPriceModel(
+            model=model,
+            scaler=scaler,
+            feature_names=list(X.columns),
+            last_bar=last_bar,
+            n_samples=len(X)
+        )
+    
+    # The previous last bar had no target yet, so it is new training data too
+    new_rows = frame[frame.index >= previous.last_bar]
+    window = frame.iloc[-max(params['refresh_window'], len(new_rows)):]
+    model = copy.deepcopy(previous.model)
+    model.n_estimators += params['refresh_estimators']
+    model.fit(
+        previous.scaler.transform(window.drop(columns='_target').values),
+        window['_target'].values
+    )
+    return FittedPriceModel(
+        model=model,
+        scaler=previous.scaler,
+        feature_names=previous.feature_names,
+        last_bar=last_bar,
+        n_samples=previous.n_samples + len(new_rows),
+        refreshes=previous.refreshes + 1
+    )
+
+
+class ModelRegistry:
+    """
+    LRU cache of fitted price models keyed by (symbol, horizon, feature-set hash)
+    
+    Models are persisted to disk when a model directory is configured, so
+    evicted or previously trained models are reloaded instead of retrained.
+    Training runs in a process pool off the event loop, and concurrent
+    requests for the same key share one training job.
+    """
+    
+    def __init__(
+        self,
+        capacity: int = 32,
+        model_dir: Optional[str] = None,
+        executor: Optional[Executor] = None,
+        max_workers: int = 2,
+        n_estimators: int = 100,
+        max_depth: int = 10,
+        min_samples: int = 50,
+        refresh_estimators: int = 10,
+        refresh_window: int = 250,
+        max_estimators: int = 200
+    ):
+        self.capacity = capacity
+        self.model_dir = model_dir
+        self.max_workers = max_workers
+        self.min_samples = min_samples
+        self.max_estimators = max_estimators
+        self.params = {
+            'n_estimators': n_estimators,
+            'max_depth': max_depth,
+            'refresh_estimators': refresh_estimators,
+            'refresh_window': refresh_window,
+        }
+        self._executor = executor
+        self._models: "OrderedDict[ModelKey, FittedPriceModel]" = OrderedDict()
+        self._jobs: Dict[ModelKey, asyncio.Future] = {}
+        
+        if model_dir:
+            os.makedirs(model_dir, exist_ok=True)
+    
+    @property
+    def executor(self) -> Executor:
+        """Process pool used for training, created on first use"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+    
+    def shutdown(self):
+        """Shut down the training pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+    
+    def get(self, key: ModelKey) -> Optional[FittedPriceModel]:
+        """Get a fitted model from memory or disk"""
+        fitted = self._models.get(key)
+        if fitted is not None:
+            self._models.move_to_end(key)
+            return fitted
+        
+        path = self._path(key)
+        if path and os.path.exists(path):
+            try:
+                fitted = joblib.load(path)
+            except Exception as e:
+                logger.warning("Discarding unreadable model %s: %s", path, e)
+                return None
+            self._remember(key, fitted)
+        return fitted
+    
+    def put(self, key: ModelKey, fitted: FittedPriceModel):
+        """Cache a fitted model and persist it"""
+        self._remember(key, fitted)
+        path = self._path(key)
+        if path:
+            tmp_path = f"{path}.tmp"
+            joblib.dump(fitted, tmp_path)
+            os.replace(tmp_path, path)
+    
+    async def get_or_train(
+        self,
+        key: ModelKey,
+        features: pd.DataFrame,
+        price_data: pd.DataFrame
+    ) -> Optional[FittedPriceModel]:
+        """
+        Get the model for a key, training it if needed
+        
+        A cached model is returned immediately; if newer bars have arrived
+        a refresh is started in the background and used by later requests.
+        
+        Returns:
+            Fitted model, or None if there is not enough data to train one
+        """
+        fitted = self.get(key)
+        if fitted is None:
+            return await self._submit(key, features, price_data, None)
+        
+        if features.index[-1] > fitted.last_bar:
+            self._submit(key, features, price_data, fitted)
+        return fitted
+    
+    def _submit(
+        self,
+        key: ModelKey,
+        features: pd.DataFrame,
+        price_data: pd.DataFrame,
+        previous: Optional[FittedPriceModel]
+    ) -> asyncio.Future:
+        """Start a training job for a key unless one is already running"""
+        job = self._jobs.get(key)
+        if job is None:
+            job = asyncio.ensure_future(self._train(key, features, price_data, previous))
+            self._jobs[key] = job
+            job.add_done_callback(lambda _: self._jobs.pop(key, None))
+        return job
+    
+    async def _train(
+        self,
+        key: ModelKey,
+        features: pd.DataFrame,
+        price_data: pd.DataFrame,
+        previous: Optional[FittedPriceModel]
+    ) -> Optional[FittedPriceModel]:
+        """Run a training job in the pool and store the result"""
+        frame = training_frame(features, price_data)
+        if len(frame) < self.min_samples:
+            return previous
+        
+        if (previous is not None and
+                previous.model.n_estimators + self.params['refresh_estimators'] > self.max_estimators):
+            # Too many refresh trees; start over from the full history
+            previous = None
+        
+        loop = asyncio.get_running_loop()
+        try:
+            fitted = await loop.run_in_executor(
+                self.executor, train_price_model,
+                frame, features.index[-1], self.params, previous
+            )
+        except Exception as e:
+            if previous is None:
+                raise
+            logger.warning("Refreshing model %s failed: %s", key, e)
+            return previous
+        
+        self.put(key, fitted)
+        return fitted
+    
+    def _remember(self, key: ModelKey, fitted: FittedPriceModel):
+        """Insert into the LRU, evicting the least recently used model"""
+        self._models[key] = fitted
+        self._models.move_to_end(key)
+        while len(self._models) > self.capacity:
+            self._models.popitem(last=False)
+    
+    def _path(self, key: ModelKey) -> Optional[str]:
+        """File a model is persisted to"""
+        if not self.model_dir:
+            return None
+        symbol = re.sub(r'[^A-Za-z0-9_.-]', '_', key.symbol)
+        return os.path.join(self.model_dir, f"{symbol}_{key.horizon}_{key.feature_hash}.joblib")
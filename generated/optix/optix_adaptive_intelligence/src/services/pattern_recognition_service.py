@@ -3,6 +3,8 @@ Pattern Recognition Service - Detects chart patterns, unusual options activity,
 """
 import asyncio
 import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Any, Tuple
 import numpy as np
@@ -18,6 +20,67 @@ from ..models.pattern_models import (
 )
 
 
+@dataclass
+class PriceExtrema:
+    """Peaks, troughs and the price extremes between them, shared by all detectors"""
+    highs: np.ndarray
+    lows: np.ndarray
+    closes: np.ndarray
+    peaks: Dict[int, np.ndarray]
+    troughs: Dict[int, np.ndarray]
+    # Lowest low from each peak up to the next one, and highest high between troughs
+    lows_between_peaks: Dict[int, np.ndarray]
+    highs_between_troughs: Dict[int, np.ndarray]
+    
+    @classmethod
+    def from_prices(cls, price_data: pd.DataFrame, distances=(5, 10)) -> "PriceExtrema":
+        """Find peaks and troughs once for every detector spacing"""
+        highs = price_data['high'].values
+        lows = price_data['low'].values
+        high_prominence = highs.std() * 0.5
+        low_prominence = lows.std() * 0.5
+        
+        peaks, troughs, lows_between, highs_between = {}, {}, {}, {}
+        for distance in distances:
+            peaks[distance], _ = find_peaks(highs, distance=distance, prominence=high_prominence)
+            troughs[distance], _ = find_peaks(-lows, distance=distance, prominence=low_prominence)
+            lows_between[distance] = _segment_extreme(np.minimum, lows, peaks[distance])
+            highs_between[distance] = _segment_extreme(np.maximum, highs, troughs[distance])
+        
+        return cls(
+            highs=highs,
+            lows=lows,
+            closes=price_data['close'].values,
+            peaks=peaks,
+            troughs=troughs,
+            lows_between_peaks=lows_between,
+            highs_between_troughs=highs_between
+        )
+
+
+def _segment_extreme(ufunc: np.ufunc, values: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    """
+    Reduce values over [indices[k], indices[k + 1]) for each consecutive pair
+    
+    Returns an array of len(indices) - 1 (empty for fewer than two indices).
+    """
+    if len(indices) < 2:
+        return np.empty(0, dtype=values.dtype)
+    return ufunc.reduceat(values, indices)[:-1]
+
+
+def _scan_chart_patterns(
+    config: Dict[str, Any],
+    batch: List[Tuple[str, pd.DataFrame, Optional[pd.DataFrame]]]
+) -> List[Tuple[str, List[ChartPattern]]]:
+    """Detect chart patterns for a batch of symbols (runs in a worker process)"""
+    service = PatternRecognitionService(config)
+    return [
+        (symbol, service.find_chart_patterns(symbol, price_data, volume_data))
+        for symbol, price_data, volume_data in batch
+    ]
+
+
 class PatternRecognitionService:
     """
     Service for detecting chart patterns, unusual options activity,
@@ -28,6 +91,9 @@ class PatternRecognitionService:
         self.config = config or {}
         self.min_pattern_confidence = self.config.get('min_pattern_confidence', 0.6)
         self.lookback_periods = self.config.get('lookback_periods', 100)
+        self.scan_workers = self.config.get('scan_workers')
+        self.scan_batch_size = self.config.get('scan_batch_size', 50)
+        self._executor: Optional[Executor] = None
         
     async def detect_chart_patterns(
         self,
@@ -46,6 +112,19 @@ class PatternRecognitionService:
         Returns:
             List of detected chart patterns
         """
+        return self.find_chart_patterns(symbol, price_data, volume_data)
+    
+    def find_chart_patterns(
+        self,
+        symbol: str,
+        price_data: pd.DataFrame,
+        volume_data: Optional[pd.DataFrame] = None
+    ) -> List[ChartPattern]:
+        """
+        Detect chart patterns synchronously
+        
+        Peaks and troughs are extracted once and shared by every detector.
+        """
         patterns = []
         
         # Ensure we have required columns
@@ -53,214 +132,268 @@ class PatternRecognitionService:
         if not all(col in price_data.columns for col in required_cols):
             raise ValueError(f"Price data must contain columns: {required_cols}")
         
-        # Detect various pattern types concurrently
-        pattern_tasks = [
-            self._detect_head_shoulders(symbol, price_data, volume_data),
-            self._detect_double_tops_bottoms(symbol, price_data, volume_data),
-            self._detect_triangles(symbol, price_data),
-            self._detect_flags_wedges(symbol, price_data),
-            self._detect_breakouts(symbol, price_data, volume_data),
-        ]
+        extrema = PriceExtrema.from_prices(price_data)
         
-        pattern_results = await asyncio.gather(*pattern_tasks, return_exceptions=True)
+        detectors = [
+            lambda: self._detect_head_shoulders(symbol, price_data, volume_data, extrema),
+            lambda: self._detect_double_tops_bottoms(symbol, price_data, volume_data, extrema),
+            lambda: self._detect_triangles(symbol, price_data),
+            lambda: self._detect_flags_wedges(symbol, price_data),
+            lambda: self._detect_breakouts(symbol, price_data, volume_data),
+        ]
         
-        for result in pattern_results:
-            if isinstance(result, list):
-                patterns.extend(result)
+        for detect in detectors:
+            try:
+                patterns.extend(detect())
+            except Exception:
+                # One failing detector should not hide the others' patterns
+                continue
         
         # Filter by confidence threshold
         patterns = [p for p in patterns if p.confidence >= self.min_pattern_confidence]
         
         return patterns
     
-    async def _detect_head_shoulders(
+    async def scan_chart_patterns(
         self,
-        symbol: str,
-        price_data: pd.DataFrame,
-        volume_data: Optional[pd.DataFrame]
-    ) -> List[ChartPattern]:
-        """Detect head and shoulders patterns"""
-        patterns = []
-        highs = price_data['high'].values
-        lows = price_data['low'].values
-        closes = price_data['close'].values
-        
-        # Find local maxima for head & shoulders
-        peaks, _ = find_peaks(highs, distance=5, prominence=highs.std() * 0.5)
+        price_data_by_symbol: Dict[str, pd.DataFrame],
+        volume_data_by_symbol: Optional[Dict[str, pd.DataFrame]] = None,
+        executor: Optional[Executor] = None
+    ) -> Dict[str, List[ChartPattern]]:
+        """
+        Detect chart patterns across many symbols in a process pool
         
-        if len(peaks) >= 3:
-            # Check for head & shoulders formation
-            for i in range(len(peaks) - 2):
-                left_shoulder = highs[peaks[i]]
-                head = highs[peaks[i + 1]]
-                right_shoulder = highs[peaks[i + 2]]
-                
-                # Head should be higher than both shoulders
-                if head > left_shoulder and head > right_shoulder:
-                    # Shoulders should be roughly equal
-                    shoulder_diff = abs(left_shoulder - right_shoulder) / head
-                    
-                    if shoulder_diff < 0.05:  # Within 5%
-                        # Calculate neckline and price target
-                        neckline = min(lows[peaks[i]:peaks[i + 2]])
-                        head_height = head - neckline
-                        price_target = neckline - head_height
-                        
-                        # Calculate confidence based on pattern quality
-                        confidence = self._calculate_pattern_confidence(
-                            shoulder_symmetry=1 - shoulder_diff,
-                            volume_confirmation=self._check_volume_confirmation(
-                                volume_data, peaks[i], peaks[i + 2]
-                            ) if volume_data is not None else 0.5
-                        )
-                        
-                        pattern = ChartPattern(
-                            pattern_id=f"pat_{uuid.uuid4().hex[:8]}",
-                            symbol=symbol,
-                            pattern_type=PatternType.HEAD_SHOULDERS,
-                            confidence=confidence,
-                            start_time=price_data.index[peaks[i]],
-                            end_time=price_data.index[peaks[i + 2]],
-                            trend_direction=TrendDirection.BEARISH,
-                            price_target=price_target,
-                            stop_loss=head * 1.02,
-                            support_level=neckline,
-                            resistance_level=head,
-                            volume_confirmation=volume_data is not None,
-                            key_levels=[
-                                {"level": "neckline", "price": neckline},
-                                {"level": "head", "price": head},
-                                {"level": "left_shoulder", "price": left_shoulder},
-                                {"level": "right_shoulder", "price": right_shoulder}
-                            ]
-                        )
-                        patterns.append(pattern)
+        Args:
+            price_data_by_symbol: OHLC data keyed by symbol
+            volume_data_by_symbol: Optional volume data keyed by symbol
+            executor: Executor to use instead of the service's process pool
+            
+        Returns:
+            Detected patterns keyed by symbol
+        """
+        volume_data_by_symbol = volume_data_by_symbol or {}
+        items = [
+            (symbol, price_data, volume_data_by_symbol.get(symbol))
+            for symbol, price_data in price_data_by_symbol.items()
+        ]
+        batches = [
+            items[i:i + self.scan_batch_size]
+            for i in range(0, len(items), self.scan_batch_size)
+        ]
         
-        # Detect inverse head & shoulders (on lows)
-        troughs, _ = find_peaks(-lows, distance=5, prominence=lows.std() * 0.5)
+        loop = asyncio.get_running_loop()
+        executor = executor or self._get_executor()
+        results = await asyncio.gather(*[
+            loop.run_in_executor(executor, _scan_chart_patterns, self.config, batch)
+            for batch in batches
+        ])
         
-        if len(troughs) >= 3:
-            for i in range(len(troughs) - 2):
-                left_shoulder = lows[troughs[i]]
-                head = lows[troughs[i + 1]]
-                right_shoulder = lows[troughs[i + 2]]
-                
-                if head < left_shoulder and head < right_shoulder:
-                    shoulder_diff = abs(left_shoulder - right_shoulder) / head
-                    
-                    if shoulder_diff < 0.05:
-                        neckline = max(highs[troughs[i]:troughs[i + 2]])
-                        head_depth = neckline - head
-                        price_target = neckline + head_depth
-                        
-                        confidence = self._calculate_pattern_confidence(
-                            shoulder_symmetry=1 - shoulder_diff,
-                            volume_confirmation=self._check_volume_confirmation(
-                                volume_data, troughs[i], troughs[i + 2]
-                            ) if volume_data is not None else 0.5
-                        )
-                        
-                        pattern = ChartPattern(
-                            pattern_id=f"pat_{uuid.uuid4().hex[:8]}",
-                            symbol=symbol,
-                            pattern_type=PatternType.INVERSE_HEAD_SHOULDERS,
-                            confidence=confidence,
-                            start_time=price_data.index[troughs[i]],
-                            end_time=price_data.index[troughs[i + 2]],
-                            trend_direction=TrendDirection.BULLISH,
-                            price_target=price_target,
-                            stop_loss=head * 0.98,
-                            support_level=head,
-                            resistance_level=neckline,
-                            volume_confirmation=volume_data is not None,
-                            key_levels=[
-                                {"level": "neckline", "price": neckline},
-                                {"level": "head", "price": head},
-                                {"level": "left_shoulder", "price": left_shoulder},
-                                {"level": "right_shoulder", "price": right_shoulder}
-                            ]
-                        )
-                        patterns.append(pattern)
-        
-        return patterns
+        return {symbol: patterns for batch in results for symbol, patterns in batch}
     
-    async def _detect_double_tops_bottoms(
+    def _get_executor(self) -> Executor:
+        """Process pool for symbol scans, created on first use"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.scan_workers)
+        return self._executor
+    
+    def shutdown(self):
+        """Shut down the scan process pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+    
+    def _detect_head_shoulders(
         self,
         symbol: str,
         price_data: pd.DataFrame,
-        volume_data: Optional[pd.DataFrame]
+        volume_data: Optional[pd.DataFrame],
+        extrema: PriceExtrema
     ) -> List[ChartPattern]:
-        """Detect double top and double bottom patterns"""
+        """Detect head and shoulders patterns"""
         patterns = []
-        highs = price_data['high'].values
-        lows = price_data['low'].values
+        highs = extrema.highs
+        lows = extrema.lows
         
-        # Double tops
-        peaks, _ = find_peaks(highs, distance=10, prominence=highs.std() * 0.5)
-        
-        for i in range(len(peaks) - 1):
-            peak1 = highs[peaks[i]]
-            peak2 = highs[peaks[i + 1]]
+        # Slide a three-peak window over the peaks: shoulders, head, shoulder
+        peaks = extrema.peaks[5]
+        if len(peaks) >= 3:
+            lefts, heads, rights = highs[peaks[:-2]], highs[peaks[1:-1]], highs[peaks[2:]]
+            shoulder_diffs = np.abs(lefts - rights) / heads
+            # Head above both shoulders, shoulders within 5% of each other
+            matches = (heads > lefts) & (heads > rights) & (shoulder_diffs < 0.05)
+            between = extrema.lows_between_peaks[5]
+            necklines = np.minimum(between[:-1], between[1:])
             
-            # Peaks should be roughly equal (within 2%)
-            if abs(peak1 - peak2) / peak1 < 0.02:
-                trough_between = min(lows[peaks[i]:peaks[i + 1]])
-                price_target = trough_between - (peak1 - trough_between)
+            for i in np.flatnonzero(matches):
+                left_shoulder = highs[peaks[i]]
+                head = highs[peaks[i + 1]]
+                right_shoulder = highs[peaks[i + 2]]
+                shoulder_diff = shoulder_diffs[i]
                 
+                # Calculate neckline and price target
+                neckline = necklines[i]
+                head_height = head - neckline
+                price_target = neckline - head_height
+                
+                # Calculate confidence based on pattern quality
                 confidence = self._calculate_pattern_confidence(
-                    peak_similarity=1 - abs(peak1 - peak2) / peak1,
-                    volume_confirmation=0.7
+                    shoulder_symmetry=1 - shoulder_diff,
+                    volume_confirmation=self._check_volume_confirmation(
+                        volume_data, peaks[i], peaks[i + 2]
+                    ) if volume_data is not None else 0.5
                 )
                 
                 pattern = ChartPattern(
                     pattern_id=f"pat_{uuid.uuid4().hex[:8]}",
                     symbol=symbol,
-                    pattern_type=PatternType.DOUBLE_TOP,
+                    pattern_type=PatternType.HEAD_SHOULDERS,
                     confidence=confidence,
                     start_time=price_data.index[peaks[i]],
-                    end_time=price_data.index[peaks[i + 1]],
+                    end_time=price_data.index[peaks[i + 2]],
                     trend_direction=TrendDirection.BEARISH,
                     price_target=price_target,
-                    stop_loss=max(peak1, peak2) * 1.02,
-                    resistance_level=max(peak1, peak2),
-                    support_level=trough_between
+                    stop_loss=head * 1.02,
+                    support_level=neckline,
+                    resistance_level=head,
+                    volume_confirmation=volume_data is not None,
+                    key_levels=[
+                        {"level": "neckline", "price": neckline},
+                        {"level": "head", "price": head},
+                        {"level": "left_shoulder", "price": left_shoulder},
+                        {"level": "right_shoulder", "price": right_shoulder}
+                    ]
                 )
                 patterns.append(pattern)
         
-        # Double bottoms
-        troughs, _ = find_peaks(-lows, distance=10, prominence=lows.std() * 0.5)
-        
-        for i in range(len(troughs) - 1):
-            bottom1 = lows[troughs[i]]
-            bottom2 = lows[troughs[i + 1]]
+        # Detect inverse head & shoulders (on lows)
+        troughs = extrema.troughs[5]
+        if len(troughs) >= 3:
+            lefts, heads, rights = lows[troughs[:-2]], lows[troughs[1:-1]], lows[troughs[2:]]
+            shoulder_diffs = np.abs(lefts - rights) / heads
+            matches = (heads < lefts) & (heads < rights) & (shoulder_diffs < 0.05)
+            between = extrema.highs_between_troughs[5]
+            necklines = np.maximum(between[:-1], between[1:])
             
-            if abs(bottom1 - bottom2) / bottom1 < 0.02:
-                peak_between = max(highs[troughs[i]:troughs[i + 1]])
-                price_target = peak_between + (peak_between - bottom1)
+            for i in np.flatnonzero(matches):
+                left_shoulder = lows[troughs[i]]
+                head = lows[troughs[i + 1]]
+                right_shoulder = lows[troughs[i + 2]]
+                shoulder_diff = shoulder_diffs[i]
+                
+                neckline = necklines[i]
+                head_depth = neckline - head
+                price_target = neckline + head_depth
                 
                 confidence = self._calculate_pattern_confidence(
-                    peak_similarity=1 - abs(bottom1 - bottom2) / bottom1,
-                    volume_confirmation=0.7
+                    shoulder_symmetry=1 - shoulder_diff,
+                    volume_confirmation=self._check_volume_confirmation(
+                        volume_data, troughs[i], troughs[i + 2]
+                    ) if volume_data is not None else 0.5
                 )
                 
                 pattern = ChartPattern(
                     pattern_id=f"pat_{uuid.uuid4().hex[:8]}",
                     symbol=symbol,
-                    pattern_type=PatternType.DOUBLE_BOTTOM,
+                    pattern_type=PatternType.INVERSE_HEAD_SHOULDERS,
                     confidence=confidence,
                     start_time=price_data.index[troughs[i]],
-                    end_time=price_data.index[troughs[i + 1]],
+                    end_time=price_data.index[troughs[i + 2]],
                     trend_direction=TrendDirection.BULLISH,
                     price_target=price_target,
-                    stop_loss=min(bottom1, bottom2) * 0.98,
-                    support_level=min(bottom1, bottom2),
-                    resistance_level=peak_between
+                    stop_loss=head * 0.98,
+                    support_level=head,
+                    resistance_level=neckline,
+                    volume_confirmation=volume_data is not None,
+                    key_levels=[
+                        {"level": "neckline", "price": neckline},
+                        {"level": "head", "price": head},
+                        {"level": "left_shoulder", "price": left_shoulder},
+                        {"level": "right_shoulder", "price": right_shoulder}
+                    ]
                 )
                 patterns.append(pattern)
         
         return patterns
     
-    async def _detect_triangles(
+    def _detect_double_tops_bottoms(
+        self,
+        symbol: str,
+        price_data: pd.DataFrame,
+        volume_data: Optional[pd.DataFrame],
+        extrema: PriceExtrema
+    ) -> List[ChartPattern]:
+        """Detect double top and double bottom patterns"""
+        patterns = []
+        highs = extrema.highs
+        lows = extrema.lows
+        
+        # Double tops: consecutive peaks within 2% of each other
+        peaks = extrema.peaks[10]
+        firsts, seconds = highs[peaks[:-1]], highs[peaks[1:]]
+        similarity = np.abs(firsts - seconds) / firsts
+        troughs_between = extrema.lows_between_peaks[10]
+        
+        for i in np.flatnonzero(similarity < 0.02):
+            peak1 = highs[peaks[i]]
+            peak2 = highs[peaks[i + 1]]
+            trough_between = troughs_between[i]
+            price_target = trough_between - (peak1 - trough_between)
+            
+            confidence = self._calculate_pattern_confidence(
+                peak_similarity=1 - similarity[i],
+                volume_confirmation=0.7
+            )
+            
+            pattern = ChartPattern(
+                pattern_id=f"pat_{uuid.uuid4().hex[:8]}",
+                symbol=symbol,
+                pattern_type=PatternType.DOUBLE_TOP,
+                confidence=confidence,
+                start_time=price_data.index[peaks[i]],
+                end_time=price_data.index[peaks[i + 1]],
+                trend_direction=TrendDirection.BEARISH,
+                price_target=price_target,
+                stop_loss=max(peak1, peak2) * 1.02,
+                resistance_level=max(peak1, peak2),
+                support_level=trough_between
+            )
+            patterns.append(pattern)
+        
+        # Double bottoms
+        troughs = extrema.troughs[10]
+        firsts, seconds = lows[troughs[:-1]], lows[troughs[1:]]
+        similarity = np.abs(firsts - seconds) / firsts
+        peaks_between = extrema.highs_between_troughs[10]
+        
+        for i in np.flatnonzero(similarity < 0.02):
+            bottom1 = lows[troughs[i]]
+            bottom2 = lows[troughs[i + 1]]
+            peak_between = peaks_between[i]
+            price_target = peak_between + (peak_between - bottom1)
+            
+            confidence = self._calculate_pattern_confidence(
+                peak_similarity=1 - similarity[i],
+                volume_confirmation=0.7
+            )
+            
+            pattern = ChartPattern(
+                pattern_id=f"pat_{uuid.uuid4().hex[:8]}",
+                symbol=symbol,
+                pattern_type=PatternType.DOUBLE_BOTTOM,
+                confidence=confidence,
+                start_time=price_data.index[troughs[i]],
+                end_time=price_data.index[troughs[i + 1]],
+                trend_direction=TrendDirection.BULLISH,
+                price_target=price_target,
+                stop_loss=min(bottom1, bottom2) * 0.98,
+                support_level=min(bottom1, bottom2),
+                resistance_level=peak_between
+            )
+            patterns.append(pattern)
+        
+        return patterns
+    
+    def _detect_triangles(
         self,
         symbol: str,
         price_data: pd.DataFrame
@@ -336,7 +469,7 @@ class PatternRecognitionService:
         
         return patterns
     
-    async def _detect_flags_wedges(
+    def _detect_flags_wedges(
         self,
         symbol: str,
         price_data: pd.DataFrame
@@ -373,7 +506,7 @@ class PatternRecognitionService:
         
         return patterns
     
-    async def _detect_breakouts(
+    def _detect_breakouts(
         self,
         symbol: str,
         price_data: pd.DataFrame,
@@ -545,55 +678,69 @@ class PatternRecognitionService:
             List of unusual options activities
         """
         activities = []
-        
-        for _, option in options_data.iterrows():
-            volume = option.get('volume', 0)
-            open_interest = option.get('open_interest', 1)
-            avg_volume = option.get('avg_volume', volume * 0.5)
-            
-            if avg_volume == 0:
-                avg_volume = 1
+        if options_data.empty:
+            return activities
+        
+        def column(name: str, default) -> pd.Series:
+            if name in options_data.columns:
+                return options_data[name]
+            return pd.Series(default, index=options_data.index)
+        
+        volume = column('volume', 0)
+        open_interest = column('open_interest', 1)
+        avg_volume = column('avg_volume', np.nan).fillna(volume * 0.5)
+        avg_volume = avg_volume.mask(avg_volume == 0, 1)
+        
+        volume_multiple = volume / avg_volume
+        volume_oi_ratio = volume / open_interest.clip(lower=1)
+        
+        # Unusual volume, escalating to sweeps (aggressive buying) and
+        # golden sweeps (very large and aggressive)
+        unusual = (volume_multiple > 3.0).values
+        if not unusual.any():
+            return activities
+        
+        golden = (volume_multiple > 10.0).values
+        sweep = ((volume_multiple > 5.0) & (volume_oi_ratio > 0.5)).values
+        base_confidence = np.minimum(0.95, 0.5 + volume_multiple.values / 20)
+        confidence = np.where(
+            golden, 0.95,
+            np.where(sweep, np.minimum(0.95, base_confidence + 0.1), base_confidence)
+        )
+        
+        rows = np.flatnonzero(unusual)
+        records = options_data.iloc[rows].to_dict('records')
+        
+        for row, option in zip(rows, records):
+            if golden[row]:
+                activity_type = OptionsActivityType.GOLDEN_SWEEP
+            elif sweep[row]:
+                activity_type = OptionsActivityType.SWEEP
+            else:
+                activity_type = OptionsActivityType.UNUSUAL_VOLUME
             
-            volume_multiple = volume / avg_volume
-            volume_oi_ratio = volume / max(open_interest, 1)
+            # Determine sentiment
+            sentiment = TrendDirection.BULLISH if option['option_type'] == 'call' else TrendDirection.BEARISH
             
-            # Detect unusual volume
-            if volume_multiple > 3.0:
-                activity_type = OptionsActivityType.UNUSUAL_VOLUME
-                confidence = min(0.95, 0.5 + (volume_multiple / 20))
-                
-                # Detect sweeps (aggressive buying)
-                if volume_multiple > 5.0 and volume_oi_ratio > 0.5:
-                    activity_type = OptionsActivityType.SWEEP
-                    confidence = min(0.95, confidence + 0.1)
-                
-                # Golden sweep (very large and aggressive)
-                if volume_multiple > 10.0:
-                    activity_type = OptionsActivityType.GOLDEN_SWEEP
-                    confidence = 0.95
-                
-                # Determine sentiment
-                sentiment = TrendDirection.BULLISH if option['option_type'] == 'call' else TrendDirection.BEARISH
-                
-                activity = OptionsActivity(
-                    activity_id=f"act_{uuid.uuid4().hex[:8]}",
-                    symbol=symbol,
-                    activity_type=activity_type,
-                    strike=option['strike'],
-                    expiration=option['expiration'],
-                    option_type=option['option_type'],
-                    volume=int(volume),
-                    open_interest=int(open_interest),
-                    volume_oi_ratio=volume_oi_ratio,
-                    avg_volume=avg_volume,
-                    volume_multiple=volume_multiple,
-                    premium=option.get('premium', 0.0),
-                    implied_volatility=option.get('implied_volatility', 0.0),
-                    delta=option.get('delta'),
-                    sentiment=sentiment,
-                    confidence=confidence
-                )
-                activities.append(activity)
+            activity = OptionsActivity(
+                activity_id=f"act_{uuid.uuid4().hex[:8]}",
+                symbol=symbol,
+                activity_type=activity_type,
+                strike=option['strike'],
+                expiration=option['expiration'],
+                option_type=option['option_type'],
+                volume=int(volume.iat[row]),
+                open_interest=int(open_interest.iat[row]),
+                volume_oi_ratio=volume_oi_ratio.iat[row],
+                avg_volume=avg_volume.iat[row],
+                volume_multiple=volume_multiple.iat[row],
+                premium=option.get('premium', 0.0),
+                implied_volatility=option.get('implied_volatility', 0.0),
+                delta=option.get('delta'),
+                sentiment=sentiment,
+                confidence=confidence[row]
+            )
+            activities.append(activity)
         
         return activities
     
@@ -0,0 +1,130 @@
+"""
+Unit tests for Feature Store
+"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.services.ai_analysis_service import AIAnalysisService
+from src.services.feature_store import FeatureStore
+
+
+def _price_data(periods=400, seed=0):
+    """Create sample price data"""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(end=datetime(2024, 6, 28), periods=periods, freq='D')
+    prices = 100.0 * (1 + rng.normal(0.0005, 0.02, periods)).cumprod()
+    return pd.DataFrame({
+        'open': prices,
+        'high': prices * 1.01,
+        'low': prices * 0.99,
+        'close': prices,
+        'volume': rng.integers(1000000, 3000000, size=periods)
+    }, index=dates)
+
+
+def _pandas_features(price_data):
+    """Reference features computed with full pandas rolling passes"""
+    df = price_data.copy()
+    df['returns'] = df['close'].pct_change()
+    df['log_returns'] = np.log(df['close'] / df['close'].shift(1))
+    df['sma_5'] = df['close'].rolling(window=5).mean()
+    df['sma_20'] = df['close'].rolling(window=20).mean()
+    df['sma_50'] = df['close'].rolling(window=50).mean()
+    df['volatility_20'] = df['returns'].rolling(window=20).std()
+    delta = df['close'].diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+    df['rsi'] = 100 - (100 / (1 + gain / loss))
+    df['macd'] = (
+        df['close'].ewm(span=12, adjust=False).mean() -
+        df['close'].ewm(span=26, adjust=False).mean()
+    )
+    df['macd_signal'] = df['macd'].ewm(span=9, adjust=False).mean()
+    if 'volume' in df.columns:
+        df['volume_sma'] = df['volume'].rolling(window=20).mean()
+        df['volume_ratio'] = df['volume'] / df['volume_sma']
+    for lag in [1, 2, 3, 5]:
+        df[f'returns_lag_{lag}'] = df['returns'].shift(lag)
+    df = df.dropna()
+    return df[[col for col in df.columns if col not in ['open', 'high', 'low', 'close', 'volume']]]
+
+
+@pytest.mark.parametrize("with_volume", [True, False])
+def test_features_match_pandas(with_volume):
+    """Test stored features equal a full pandas recomputation"""
+    price_data = _price_data()
+    if not with_volume:
+        price_data = price_data.drop(columns='volume')
+    
+    features = FeatureStore().features("AAPL", price_data)
+    expected = _pandas_features(price_data)
+    
+    assert list(features.columns) == list(expected.columns)
+    assert features.index.equals(expected.index)
+    np.testing.assert_allclose(features.values, expected.values, rtol=1e-9)
+
+
+def test_incremental_bars_match_full_history():
+    """Test appending bars one request at a time gives the same features"""
+    price_data = _price_data()
+    store = FeatureStore()
+    
+    for end in list(range(1, 60)) + list(range(60, len(price_data) + 1, 17)):
+        store.features("AAPL", price_data.iloc[:end])
+    features = store.features("AAPL", price_data)
+    
+    np.testing.assert_allclose(features.values, _pandas_features(price_data).values, rtol=1e-9)
+    assert store._symbols["AAPL"].n == len(price_data)
+
+
+def test_unchanged_history_is_served_from_cache():
+    """Test repeated requests reuse the cached feature matrix"""
+    price_data = _price_data()
+    store = FeatureStore()
+    
+    first = store.features("AAPL", price_data)
+    assert store.features("AAPL", price_data) is first
+    
+    # A sliding window is served from the stored history
+    window = store.features("AAPL", price_data.iloc[100:])
+    pd.testing.assert_frame_equal(window, first.loc[price_data.index[100]:])
+
+
+def test_revised_history_rebuilds_symbol():
+    """Test price data that no longer lines up replaces the stored bars"""
+    price_data = _price_data()
+    store = FeatureStore()
+    store.features("AAPL", price_data)
+    
+    revised = price_data.copy()
+    revised.iloc[-1, revised.columns.get_loc('close')] *= 1.1
+    features = store.features("AAPL", revised)
+    
+    np.testing.assert_allclose(features.values, _pandas_features(revised).values, rtol=1e-9)
+
+
+def test_lru_eviction():
+    """Test least recently used symbols are evicted"""
+    store = FeatureStore(max_symbols=2)
+    for symbol in ["AAPL", "MSFT", "AAPL", "NVDA"]:
+        store.features(symbol, _price_data(periods=60))
+    
+    assert list(store._symbols) == ["AAPL", "NVDA"]
+
+
+@pytest.mark.asyncio
+async def test_services_share_feature_store():
+    """Test analysis methods read indicators from the shared store"""
+    store = FeatureStore()
+    service = AIAnalysisService(feature_store=store)
+    price_data = _price_data()
+    
+    await service.forecast_volatility("AAPL", price_data)
+    features = await service._prepare_features(price_data, None, "AAPL")
+    
+    assert list(store._symbols) == ["AAPL"]
+    assert store._symbols["AAPL"].n == len(price_data)
+    assert features is store.features("AAPL", price_data)
@@ -0,0 +1,145 @@
+"""
+Unit tests for Model Registry
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.services.ai_analysis_service import AIAnalysisService
+from src.services.model_registry import ModelKey, ModelRegistry, feature_set_hash
+
+
+def _price_data(periods=150, seed=0, drift=0.001):
+    """Create sample price data"""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(end=datetime(2024, 6, 28), periods=periods, freq='D')
+    prices = 100.0 * (1 + rng.normal(drift, 0.02, periods)).cumprod()
+    return pd.DataFrame({
+        'open': prices,
+        'high': prices * 1.01,
+        'low': prices * 0.99,
+        'close': prices,
+        'volume': rng.integers(1000000, 3000000, size=periods)
+    }, index=dates)
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    """Thread pool that counts submitted training jobs"""
+    
+    def __init__(self):
+        super().__init__(max_workers=2)
+        self.jobs = 0
+    
+    def submit(self, fn, *args, **kwargs):
+        self.jobs += 1
+        return super().submit(fn, *args, **kwargs)
+
+
+@pytest.fixture
+def executor():
+    pool = CountingExecutor()
+    yield pool
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_models_are_per_symbol(executor):
+    """Test each symbol gets its own model"""
+    service = AIAnalysisService(model_registry=ModelRegistry(executor=executor, n_estimators=10))
+    
+    await service.generate_prediction_signals("AAPL", _price_data(seed=1))
+    await service.generate_prediction_signals("MSFT", _price_data(seed=2))
+    await service.generate_prediction_signals("AAPL", _price_data(seed=1))
+    
+    registry = service.model_registry
+    keys = list(registry._models)
+    assert {key.symbol for key in keys} == {"AAPL", "MSFT"}
+    assert registry._models[keys[0]] is not registry._models[keys[1]]
+    assert executor.jobs == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_training(executor):
+    """Test concurrent requests for one symbol coalesce onto a single job"""
+    service = AIAnalysisService(model_registry=ModelRegistry(executor=executor, n_estimators=10))
+    price_data = _price_data()
+    
+    results = await asyncio.gather(*[
+        service.generate_prediction_signals("AAPL", price_data) for _ in range(5)
+    ])
+    
+    assert executor.jobs == 1
+    assert len({signals[0].predicted_price for signals in results}) == 1
+
+
+@pytest.mark.asyncio
+async def test_new_bars_refresh_in_background(executor):
+    """Test new bars return the cached model and warm start a refresh"""
+    registry = ModelRegistry(executor=executor, n_estimators=10, refresh_estimators=5)
+    service = AIAnalysisService(model_registry=registry)
+    price_data = _price_data(periods=200)
+    
+    await service.generate_prediction_signals("AAPL", price_data.iloc[:150])
+    key = next(iter(registry._models))
+    first = registry.get(key)
+    
+    await service.generate_prediction_signals("AAPL", price_data)
+    # The request is served by the existing model while the refresh runs
+    assert key in registry._jobs
+    assert registry.get(key) is first
+    await asyncio.gather(*registry._jobs.values())
+    
+    refreshed = registry.get(key)
+    assert refreshed.refreshes == 1
+    assert refreshed.model.n_estimators == 15
+    assert refreshed.last_bar == price_data.index[-1]
+    assert first.model.n_estimators == 10
+    
+    # No new bars, no further training
+    jobs = executor.jobs
+    await service.generate_prediction_signals("AAPL", price_data)
+    assert executor.jobs == jobs
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_and_persistence(executor, tmp_path):
+    """Test evicted models are reloaded from disk instead of retrained"""
+    registry = ModelRegistry(capacity=1, model_dir=str(tmp_path), executor=executor, n_estimators=10)
+    service = AIAnalysisService(model_registry=registry)
+    
+    aapl = await service.generate_prediction_signals("AAPL", _price_data(seed=1))
+    await service.generate_prediction_signals("BRK/B", _price_data(seed=2))
+    assert len(registry._models) == 1
+    assert len(list(tmp_path.glob("*.joblib"))) == 2
+    
+    reloaded = ModelRegistry(model_dir=str(tmp_path), executor=executor)
+    service = AIAnalysisService(model_registry=reloaded)
+    again = await service.generate_prediction_signals("AAPL", _price_data(seed=1))
+    
+    assert executor.jobs == 2
+    assert again[0].predicted_price == pytest.approx(aapl[0].predicted_price)
+
+
+@pytest.mark.asyncio
+async def test_training_in_process_pool():
+    """Test training runs in the default process pool"""
+    registry = ModelRegistry(n_estimators=5, max_workers=1)
+    service = AIAnalysisService(model_registry=registry)
+    try:
+        signals = await service.generate_prediction_signals("AAPL", _price_data())
+    finally:
+        registry.shutdown()
+    
+    assert signals[0].model_name == "RandomForestRegressor"
+    assert signals[0].feature_importance
+
+
+def test_feature_set_hash():
+    """Test feature hashes depend on names and order"""
+    assert feature_set_hash(['a', 'b']) == feature_set_hash(['a', 'b'])
+    assert feature_set_hash(['a', 'b']) != feature_set_hash(['b', 'a'])
+    assert ModelKey("AAPL", "1D", "x") != ModelKey("AAPL", "1W", "x")
@@ -7,7 +7,7 @@ import pandas as pd
 from datetime import datetime, timedelta
 
 from src.services.pattern_recognition_service import PatternRecognitionService
-from src.models.pattern_models import PatternType, TrendDirection
+from src.models.pattern_models import PatternType, TrendDirection, OptionsActivityType
 
 
 @pytest.fixture
@@ -178,3 +178,65 @@ async def test_pattern_filtering_by_confidence(pattern_service, sample_price_dat
     
     for pattern in patterns:
         assert pattern.confidence >= 0.9
+
+
+@pytest.mark.asyncio
+async def test_scan_chart_patterns_matches_single_symbol(pattern_service):
+    """Test multi-symbol scans in a process pool match per-symbol detection"""
+    price_data_by_symbol = {}
+    volume_data_by_symbol = {}
+    for seed in range(12):
+        rng = np.random.default_rng(seed)
+        dates = pd.date_range(end=datetime(2024, 6, 28), periods=200, freq='D')
+        prices = 100.0 * (1 + rng.normal(0, 0.02, 200)).cumprod()
+        price_data_by_symbol[f"SYM{seed}"] = pd.DataFrame({
+            'open': prices,
+            'high': prices * (1 + np.abs(rng.normal(0, 0.01, 200))),
+            'low': prices * (1 - np.abs(rng.normal(0, 0.01, 200))),
+            'close': prices
+        }, index=dates)
+        volume_data_by_symbol[f"SYM{seed}"] = pd.DataFrame({
+            'volume': rng.integers(1000000, 3000000, size=200)
+        }, index=dates)
+    
+    pattern_service.scan_batch_size = 5
+    pattern_service.scan_workers = 2
+    try:
+        results = await pattern_service.scan_chart_patterns(
+            price_data_by_symbol, volume_data_by_symbol
+        )
+    finally:
+        pattern_service.shutdown()
+    
+    assert set(results) == set(price_data_by_symbol)
+    for symbol, patterns in results.items():
+        expected = pattern_service.find_chart_patterns(
+            symbol, price_data_by_symbol[symbol], volume_data_by_symbol[symbol]
+        )
+        assert [(p.pattern_type, p.start_time, p.confidence) for p in patterns] == \
+            [(p.pattern_type, p.start_time, p.confidence) for p in expected]
+
+
+@pytest.mark.asyncio
+async def test_detect_unusual_options_classification(pattern_service):
+    """Test vectorised options classification"""
+    options_data = pd.DataFrame({
+        'strike': [95, 100, 105, 110, 115],
+        'expiration': [datetime(2024, 7, 19)] * 5,
+        'option_type': ['call', 'call', 'put', 'put', 'call'],
+        'volume': [4000, 6000, 6000, 12000, 100],
+        'open_interest': [2000, 3000, 20000, 4000, 0],
+        'avg_volume': [1000, 1000, 1000, 1000, 50]
+    })
+    
+    activities = await pattern_service.detect_unusual_options_activity("AAPL", options_data)
+    
+    assert [(a.strike, a.activity_type) for a in activities] == [
+        (95, OptionsActivityType.UNUSUAL_VOLUME),
+        (100, OptionsActivityType.SWEEP),
+        (105, OptionsActivityType.UNUSUAL_VOLUME),
+        (110, OptionsActivityType.GOLDEN_SWEEP),
+    ]
+    assert activities[1].confidence == pytest.approx(0.9)
+    assert activities[2].sentiment == TrendDirection.BEARISH
+    assert activities[0].premium == 0.0
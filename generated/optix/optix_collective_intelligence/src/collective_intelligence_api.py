@@ -166,10 +166,13 @@ class CollectiveIntelligenceAPI:
         asset: Optional[str] = None,
         tags: Optional[List[str]] = None,
         sentiment: Optional[SentimentType] = None,
-        limit: int = 50
+        limit: int = 50,
+        offset: int = 0
     ) -> List[TradeIdea]:
         """Search for trade ideas."""
-        return self.trade_idea_service.search_ideas(query, asset, tags, sentiment, limit)
+        return self.trade_idea_service.search_ideas(
+            query, asset, tags, sentiment, limit, offset
+        )
 
     def get_trending_ideas(self, limit: int = 10) -> List[TradeIdea]:
         """Get trending trade ideas."""
@@ -4,26 +4,271 @@ Copy Trading Service for managing copy trading functionality.
 This service handles automatic trade replication from followed traders.
 """
 
+import asyncio
+import inspect
+import time
 from datetime import datetime
-from typing import List, Dict, Optional, Callable, Any
-from .models import Trade, TradeType, TradeStatus, FollowRelationship, FollowType
+from typing import List, Dict, Optional, Callable, Any, Tuple
+import numpy as np
+from .models import (
+    Trade, TradeType, TradeStatus, FollowRelationship, FollowType,
+    CopyExecutionResult, CopyExecutionStatus
+)
 from .trader_service import TraderService
-from .exceptions import ValidationError, NotFoundError, PermissionError
+from .exceptions import ValidationError, NotFoundError, PermissionError, CopyTradingError
+
+
+BatchExecutionCallback = Callable[[List[Trade]], List[Trade]]
+
+
+class CopyBook:
+    """
+    Active copy relationships of one leader, compiled into columns.
+
+    Settings are compiled once when a relationship changes; each leader
+    trade is then filtered and sized for every copier with array operations.
+    """
+
+    def __init__(self):
+        """Initialize an empty copy book."""
+        self._settings: Dict[str, Dict[str, Any]] = {}  # follower_id -> settings
+        self._dirty = True
+        self.follower_ids: List[str] = []
+        self.settings: List[Dict[str, Any]] = []
+        self._fraction = np.empty(0)
+        self._max_size = np.empty(0)
+        self._min_size = np.empty(0)
+        self._reverse = np.empty(0, dtype=bool)
+        self._restricted = np.empty(0, dtype=bool)
+        self._whitelist: Dict[str, np.ndarray] = {}  # asset -> rows allowing it
+        self._blacklist: Dict[str, np.ndarray] = {}  # asset -> rows excluding it
+
+    def __len__(self) -> int:
+        return len(self._settings)
+
+    def __contains__(self, follower_id: str) -> bool:
+        return follower_id in self._settings
+
+    def upsert(self, follower_id: str, settings: Dict[str, Any]) -> None:
+        """Add a copier or replace their settings."""
+        self._settings[follower_id] = settings
+        self._dirty = True
+
+    def remove(self, follower_id: str) -> None:
+        """Remove a copier if present."""
+        if self._settings.pop(follower_id, None) is not None:
+            self._dirty = True
+
+    def _compile(self) -> None:
+        """Rebuild the settings columns."""
+        self.follower_ids = list(self._settings)
+        self.settings = list(self._settings.values())
+
+        # Unset (falsy) limits never filter
+        self._fraction = np.array(
+            [s.get("copy_percentage", 100.0) / 100.0 for s in self.settings], dtype=float
+        )
+        self._max_size = np.array(
+            [s.get("max_position_size") or np.inf for s in self.settings], dtype=float
+        )
+        self._min_size = np.array(
+            [s.get("min_position_size") or -np.inf for s in self.settings], dtype=float
+        )
+        self._reverse = np.array(
+            [bool(s.get("reverse_trades", False)) for s in self.settings], dtype=bool
+        )
+        self._restricted = np.array(
+            [bool(s.get("asset_whitelist")) for s in self.settings], dtype=bool
+        )
+
+        whitelist: Dict[str, List[int]] = {}
+        blacklist: Dict[str, List[int]] = {}
+        for row, s in enumerate(self.settings):
+            for asset in s.get("asset_whitelist") or ():
+                whitelist.setdefault(asset, []).append(row)
+            for asset in s.get("asset_blacklist") or ():
+                blacklist.setdefault(asset, []).append(row)
+        self._whitelist = {asset: np.array(rows) for asset, rows in whitelist.items()}
+        self._blacklist = {asset: np.array(rows) for asset, rows in blacklist.items()}
+
+        self._dirty = False
+
+    def plan(self, trade: Trade) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Select the copiers of a trade and size their positions.
+
+        Args:
+            trade: Leader trade
+
+        Returns:
+            Tuple of (rows, quantities, reverse flags) for copiers that take it
+        """
+        if self._dirty:
+            self._compile()
+
+        quantity = trade.quantity
+        mask = (quantity <= self._max_size) & (quantity >= self._min_size)
+
+        if self._restricted.any():
+            allowed = ~self._restricted
+            rows = self._whitelist.get(trade.asset)
+            if rows is not None:
+                allowed[rows] = True
+            mask &= allowed
+
+        rows = self._blacklist.get(trade.asset)
+        if rows is not None:
+            mask[rows] = False
+
+        quantities = np.minimum(quantity * self._fraction, self._max_size)
+        mask &= quantities >= self._min_size
+
+        rows = np.flatnonzero(mask)
+        return rows, quantities[rows], self._reverse[rows]
+
+
+class CopyExecutionPool:
+    """
+    Asynchronous worker pool executing copy trades in batches.
+
+    Submissions wait for queue space, which applies back-pressure to the
+    producer, and every batch must complete within ``batch_timeout`` so a
+    leader trade reaches all copiers within a bounded time.
+    """
+
+    def __init__(
+        self,
+        execute: Callable[[List[Trade]], Any],
+        workers: int = 4,
+        batch_size: int = 100,
+        queue_size: int = 10000,
+        batch_timeout: float = 5.0
+    ):
+        """
+        Initialize the execution pool.
+
+        Args:
+            execute: Executes a batch of trades and returns the executed
+                trades in the same order; may be a coroutine function.
+                Blocking callables run in a worker thread.
+            workers: Number of concurrent batch workers
+            batch_size: Maximum trades per batch
+            queue_size: Maximum queued trades before submit waits
+            batch_timeout: Seconds a batch may take before it times out
+        """
+        self.execute = execute
+        self.workers = workers
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.batch_timeout = batch_timeout
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        """Whether the workers have been started."""
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        """Start the workers."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [
+            asyncio.create_task(self._worker()) for _ in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Wait for queued trades to finish and stop the workers."""
+        if not self.running:
+            return
+        await self._queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, trade: Trade) -> "asyncio.Future[Trade]":
+        """
+        Queue a trade for execution, waiting while the queue is full.
+
+        Args:
+            trade: Copy trade to execute
+
+        Returns:
+            Future resolved with the executed trade
+        """
+        if not self.running:
+            raise CopyTradingError("Execution pool is not running")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((trade, future))
+        return future
+
+    async def _worker(self) -> None:
+        """Execute queued trades in batches."""
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            try:
+                await self._run_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _run_batch(self, batch: List[Tuple[Trade, asyncio.Future]]) -> None:
+        """Execute one batch and resolve its futures."""
+        trades = [trade for trade, _ in batch]
+        try:
+            if inspect.iscoroutinefunction(self.execute):
+                call = self.execute(trades)
+            else:
+                call = asyncio.to_thread(self.execute, trades)
+            executed = await asyncio.wait_for(call, timeout=self.batch_timeout)
+            if len(executed) != len(trades):
+                raise CopyTradingError(
+                    f"Executor returned {len(executed)} trades for a batch of {len(trades)}"
+                )
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for (_, future), trade in zip(batch, executed):
+            if not future.done():
+                future.set_result(trade)
 
 
 class CopyTradingService:
     """Service for managing copy trading."""
 
-    def __init__(self, trader_service: TraderService):
+    def __init__(
+        self,
+        trader_service: TraderService,
+        execution_pool: Optional[CopyExecutionPool] = None,
+        batch_size: int = 100
+    ):
         """
         Initialize the copy trading service.
 
         Args:
             trader_service: TraderService instance
+            execution_pool: Optional pool used by process_trade_async
+            batch_size: Trades per call to a batch execution callback
         """
         self.trader_service = trader_service
+        self.execution_pool = execution_pool
+        self.batch_size = batch_size
         self._copy_trades: Dict[str, List[str]] = {}  # source_trade_id -> [copy_trade_ids]
         self._execution_callback: Optional[Callable] = None
+        self._batch_execution_callback: Optional[BatchExecutionCallback] = None
+        self._copy_books: Dict[str, CopyBook] = {}  # leader_id -> active copiers
+        # (follower_id, leader_id) -> execution results
+        self._results: Dict[Tuple[str, str], List[CopyExecutionResult]] = {}
+
+        self.trader_service.add_relationship_listener(self._refresh_relationship)
 
     def set_execution_callback(self, callback: Callable[[Trade], Trade]):
         """
@@ -34,6 +279,18 @@ class CopyTradingService:
         """
         self._execution_callback = callback
 
+    def set_batch_execution_callback(self, callback: BatchExecutionCallback):
+        """
+        Set callback function for executing trades in batches.
+
+        Takes precedence over the single-trade callback in process_trade.
+
+        Args:
+            callback: Function that executes a list of trades and returns the
+                executed trades in the same order
+        """
+        self._batch_execution_callback = callback
+
     def enable_copy_trading(
         self,
         follower_id: str,
@@ -90,6 +347,7 @@ class CopyTradingService:
 
         self._validate_copy_settings(default_settings)
         relationship.copy_settings = default_settings
+        self._refresh_relationship(relationship)
 
         return relationship
 
@@ -123,6 +381,7 @@ class CopyTradingService:
 
         if relationship.copy_settings:
             relationship.copy_settings["enabled"] = False
+        self._refresh_relationship(relationship)
 
         # TODO: Implement position closing if close_positions is True
 
@@ -136,51 +395,172 @@ class CopyTradingService:
             source_trade: Original trade from the leader
 
         Returns:
-            List of created copy Trade objects
+            List of executed copy Trade objects
         """
-        if not self._execution_callback:
+        if not self._execution_callback and not self._batch_execution_callback:
             raise ValidationError("Execution callback not set")
 
-        # Get followers who are copying this trader
-        followers = self.trader_service.get_followers(source_trade.trader_id)
+        copy_trades = self._generate_copy_trades(source_trade)
+        executed_trades = []
+
+        for start in range(0, len(copy_trades), self.batch_size):
+            batch = copy_trades[start:start + self.batch_size]
+            started = time.perf_counter()
+
+            if self._batch_execution_callback:
+                try:
+                    executed = self._batch_execution_callback(batch)
+                except Exception as exc:
+                    self._record_failures(source_trade, batch, exc, started)
+                    continue
+            else:
+                executed = []
+                for copy_trade in batch:
+                    try:
+                        executed.append(self._execution_callback(copy_trade))
+                    except Exception as exc:
+                        self._record_failures(source_trade, [copy_trade], exc, started)
+
+            for executed_trade in executed:
+                self._record_execution(source_trade, executed_trade, started)
+            executed_trades.extend(executed)
+
+        return executed_trades
+
+    async def process_trade_async(self, source_trade: Trade) -> List[CopyExecutionResult]:
+        """
+        Fan a trade out to all copiers through the execution pool.
 
-        copy_trades = []
+        Args:
+            source_trade: Original trade from the leader
 
-        for follower in followers:
-            relationship = self.trader_service.get_follow_relationship(
-                follower.trader_id,
-                source_trade.trader_id
-            )
+        Returns:
+            One CopyExecutionResult per copier, in submission order
 
-            if not relationship or relationship.follow_type != FollowType.COPY:
-                continue
+        Raises:
+            ValidationError: If no running execution pool is configured
+        """
+        if not self.execution_pool or not self.execution_pool.running:
+            raise ValidationError("Execution pool not running")
+
+        started = time.perf_counter()
+        copy_trades = self._generate_copy_trades(source_trade)
+        futures = [await self.execution_pool.submit(trade) for trade in copy_trades]
+        outcomes = await asyncio.gather(*futures, return_exceptions=True)
+
+        results = []
+        for copy_trade, outcome in zip(copy_trades, outcomes):
+            if isinstance(outcome, BaseException):
+                results.extend(self._record_failures(source_trade, [copy_trade], outcome, started))
+            else:
+                results.append(self._record_execution(source_trade, outcome, started))
+        return results
+
+    def _generate_copy_trades(self, source_trade: Trade) -> List[Trade]:
+        """Build the copy trades of every active copier of the trade's leader."""
+        book = self._copy_books.get(source_trade.trader_id)
+        if not book:
+            return []
+
+        rows, quantities, reverse = book.plan(source_trade)
+        reversed_type = self._reverse_trade_type(source_trade.trade_type)
+        notes = f"Copy of trade {source_trade.trade_id}"
 
-            settings = relationship.copy_settings
-            if not settings or not settings.get("enabled", False):
-                continue
+        copy_trades = []
+        for row, quantity, is_reversed in zip(rows.tolist(), quantities.tolist(), reverse.tolist()):
+            copy_trade = Trade(
+                trader_id=book.follower_ids[row],
+                idea_id=source_trade.idea_id,
+                asset=source_trade.asset,
+                trade_type=reversed_type if is_reversed else source_trade.trade_type,
+                entry_price=source_trade.entry_price,
+                quantity=quantity,
+                status=TradeStatus.PENDING,
+                notes=notes
+            )
+            copy_trade.metadata = {
+                "copy_trade": True,
+                "source_trade_id": source_trade.trade_id,
+                "source_trader_id": source_trade.trader_id,
+                "copy_settings": book.settings[row]
+            }
+            copy_trades.append(copy_trade)
 
-            # Check if trade should be copied based on settings
-            if not self._should_copy_trade(source_trade, settings):
-                continue
+        return copy_trades
 
-            # Create copy trade
-            copy_trade = self._create_copy_trade(
-                source_trade,
-                follower.trader_id,
-                settings
+    def _record_execution(
+        self,
+        source_trade: Trade,
+        executed_trade: Trade,
+        started: float
+    ) -> CopyExecutionResult:
+        """Track an executed copy trade."""
+        self._copy_trades.setdefault(source_trade.trade_id, []).append(
+            executed_trade.trade_id
+        )
+        return self._add_result(CopyExecutionResult(
+            follower_id=executed_trade.trader_id,
+            source_trader_id=source_trade.trader_id,
+            source_trade_id=source_trade.trade_id,
+            status=CopyExecutionStatus.EXECUTED,
+            trade=executed_trade,
+            latency_ms=(time.perf_counter() - started) * 1000,
+            slippage_percentage=(
+                abs(executed_trade.entry_price - source_trade.entry_price)
+                / source_trade.entry_price * 100
+                if source_trade.entry_price else 0.0
             )
+        ))
 
-            if copy_trade:
-                # Execute the copy trade
-                executed_trade = self._execution_callback(copy_trade)
-                copy_trades.append(executed_trade)
+    def _record_failures(
+        self,
+        source_trade: Trade,
+        copy_trades: List[Trade],
+        error: BaseException,
+        started: float
+    ) -> List[CopyExecutionResult]:
+        """Track copy trades that could not be executed."""
+        status = (
+            CopyExecutionStatus.TIMED_OUT
+            if isinstance(error, asyncio.TimeoutError)
+            else CopyExecutionStatus.FAILED
+        )
+        latency_ms = (time.perf_counter() - started) * 1000
+        return [
+            self._add_result(CopyExecutionResult(
+                follower_id=copy_trade.trader_id,
+                source_trader_id=source_trade.trader_id,
+                source_trade_id=source_trade.trade_id,
+                status=status,
+                trade=copy_trade,
+                error=str(error) or type(error).__name__,
+                latency_ms=latency_ms
+            ))
+            for copy_trade in copy_trades
+        ]
+
+    def _add_result(self, result: CopyExecutionResult) -> CopyExecutionResult:
+        """Store a result under its follow relationship."""
+        key = (result.follower_id, result.source_trader_id)
+        self._results.setdefault(key, []).append(result)
+        return result
+
+    def get_execution_results(
+        self,
+        follower_id: str,
+        following_id: str
+    ) -> List[CopyExecutionResult]:
+        """
+        Get copy execution results for a relationship.
 
-                # Track the copy relationship
-                if source_trade.trade_id not in self._copy_trades:
-                    self._copy_trades[source_trade.trade_id] = []
-                self._copy_trades[source_trade.trade_id].append(executed_trade.trade_id)
+        Args:
+            follower_id: ID of the follower
+            following_id: ID of the trader being copied
 
-        return copy_trades
+        Returns:
+            List of CopyExecutionResult objects, oldest first
+        """
+        return list(self._results.get((follower_id, following_id), []))
 
     def get_copy_trades(self, source_trade_id: str) -> List[str]:
         """
@@ -237,107 +617,38 @@ class CopyTradingService:
         Returns:
             Dictionary with statistics
         """
-        # TODO: Implement statistics calculation
+        results = self._results.get((follower_id, following_id), [])
+        executed = [
+            result for result in results if result.status == CopyExecutionStatus.EXECUTED
+        ]
+
         return {
-            "total_copied_trades": 0,
-            "successful_copies": 0,
-            "failed_copies": 0,
-            "total_profit_loss": 0.0,
-            "average_slippage": 0.0
+            "total_copied_trades": len(results),
+            "successful_copies": len(executed),
+            "failed_copies": len(results) - len(executed),
+            "total_profit_loss": sum(result.trade.profit_loss for result in executed),
+            "average_slippage": (
+                sum(result.slippage_percentage for result in executed) / len(executed)
+                if executed else 0.0
+            )
         }
 
-    def _should_copy_trade(
-        self,
-        trade: Trade,
-        settings: Dict[str, Any]
-    ) -> bool:
+    def _refresh_relationship(self, relationship: FollowRelationship) -> None:
         """
-        Determine if a trade should be copied based on settings.
+        Keep a leader's copy book in step with a relationship.
 
         Args:
-            trade: Trade to evaluate
-            settings: Copy trading settings
-
-        Returns:
-            True if trade should be copied
+            relationship: Created, updated or removed relationship
         """
-        # Check whitelist
-        if settings.get("asset_whitelist"):
-            if trade.asset not in settings["asset_whitelist"]:
-                return False
-
-        # Check blacklist
-        if settings.get("asset_blacklist"):
-            if trade.asset in settings["asset_blacklist"]:
-                return False
-
-        # Check position size limits
-        if settings.get("max_position_size"):
-            if trade.quantity > settings["max_position_size"]:
-                return False
-
-        if settings.get("min_position_size"):
-            if trade.quantity < settings["min_position_size"]:
-                return False
-
-        # TODO: Check max concurrent positions
+        book = self._copy_books.setdefault(relationship.following_id, CopyBook())
+        settings = relationship.copy_settings
 
-        return True
-
-    def _create_copy_trade(
-        self,
-        source_trade: Trade,
-        follower_id: str,
-        settings: Dict[str, Any]
-    ) -> Optional[Trade]:
-        """
-        Create a copy trade based on source trade and settings.
-
-        Args:
-            source_trade: Original trade
-            follower_id: ID of the follower
-            settings: Copy trading settings
-
-        Returns:
-            Copy Trade object or None
-        """
-        # Calculate position size based on copy percentage
-        copy_percentage = settings.get("copy_percentage", 100.0) / 100.0
-        quantity = source_trade.quantity * copy_percentage
-
-        # Apply position size limits
-        if settings.get("max_position_size"):
-            quantity = min(quantity, settings["max_position_size"])
-
-        if settings.get("min_position_size"):
-            if quantity < settings["min_position_size"]:
-                return None  # Don't copy if below minimum
-
-        # Determine trade type (reverse if enabled)
-        trade_type = source_trade.trade_type
-        if settings.get("reverse_trades", False):
-            trade_type = self._reverse_trade_type(trade_type)
-
-        # Create copy trade
-        copy_trade = Trade(
-            trader_id=follower_id,
-            idea_id=source_trade.idea_id,
-            asset=source_trade.asset,
-            trade_type=trade_type,
-            entry_price=source_trade.entry_price,
-            quantity=quantity,
-            status=TradeStatus.PENDING,
-            notes=f"Copy of trade {source_trade.trade_id}"
-        )
-
-        copy_trade.metadata = {
-            "copy_trade": True,
-            "source_trade_id": source_trade.trade_id,
-            "source_trader_id": source_trade.trader_id,
-            "copy_settings": settings
-        }
-
-        return copy_trade
+        if (relationship.active and
+                relationship.follow_type == FollowType.COPY and
+                settings and settings.get("enabled", False)):
+            book.upsert(relationship.follower_id, settings)
+        else:
+            book.remove(relationship.follower_id)
 
     def _reverse_trade_type(self, trade_type: TradeType) -> TradeType:
         """Reverse a trade type."""
@@ -5,10 +5,95 @@ This service handles leaderboard generation and ranking algorithms.
 """
 
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Callable
-from .models import LeaderboardEntry, Trader, PerformanceMetrics
+from typing import List, Dict, Optional, Callable, Tuple
+from sortedcontainers import SortedList
+from .models import LeaderboardEntry, Trader, PerformanceMetrics, Trade
 from .trader_service import TraderService
 from .performance_service import PerformanceService
+from .exceptions import NotFoundError
+
+
+class RankingIndex:
+    """
+    Ranking of eligible traders for one (metric, period, min_trades).
+
+    Traders are kept in a sorted list keyed by descending metric value, so
+    top-k slices and rank lookups cost O(log n + k) and a trader whose
+    metrics change is repositioned in O(log n).
+    """
+
+    def __init__(self, metric: str, period: str, min_trades: int):
+        """
+        Initialize an empty ranking index.
+
+        Args:
+            metric: Metric to rank by
+            period: Time period for metrics
+            min_trades: Minimum number of trades required
+        """
+        self.metric = metric
+        self.period = period
+        self.min_trades = min_trades
+        self.built_at = datetime.utcnow()
+        self._ranking = SortedList()  # (-metric_value, seq, trader_id)
+        self._keys: Dict[str, Tuple[float, int, str]] = {}
+        self._metrics: Dict[str, PerformanceMetrics] = {}
+        self.previous_ranks: Dict[str, int] = {}
+        self.snapshot_at: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self._ranking)
+
+    def update(self, trader_id: str, seq: int, metrics: Optional[PerformanceMetrics]) -> None:
+        """
+        Insert, move or remove a trader after their metrics change.
+
+        Args:
+            trader_id: ID of the trader
+            seq: Stable tiebreaker (trader registration order)
+            metrics: Current metrics for the index period
+        """
+        self.remove(trader_id)
+
+        if metrics and metrics.total_trades >= self.min_trades:
+            key = (-getattr(metrics, self.metric, 0.0), seq, trader_id)
+            self._ranking.add(key)
+            self._keys[trader_id] = key
+            self._metrics[trader_id] = metrics
+
+    def remove(self, trader_id: str) -> None:
+        """Remove a trader from the ranking if present."""
+        key = self._keys.pop(trader_id, None)
+        if key is not None:
+            self._ranking.remove(key)
+            del self._metrics[trader_id]
+
+    def top(self, limit: int) -> List[Tuple[str, PerformanceMetrics]]:
+        """Return the top traders with their metrics, best first."""
+        return [
+            (trader_id, self._metrics[trader_id])
+            for _, _, trader_id in self._ranking.islice(0, limit)
+        ]
+
+    def rank(self, trader_id: str) -> Optional[int]:
+        """Return the 1-indexed rank of a trader, or None if unranked."""
+        key = self._keys.get(trader_id)
+        if key is None:
+            return None
+        return self._ranking.index(key) + 1
+
+    def snapshot(self) -> None:
+        """Record current ranks as the baseline for rank changes."""
+        self.previous_ranks = {
+            trader_id: rank
+            for rank, (_, _, trader_id) in enumerate(self._ranking, 1)
+        }
+        self.snapshot_at = datetime.utcnow()
+
+    def change_from_previous(self, trader_id: str, rank: int) -> int:
+        """Places gained since the last snapshot (negative if dropped)."""
+        previous = self.previous_ranks.get(trader_id)
+        return previous - rank if previous is not None else 0
 
 
 class LeaderboardService:
@@ -28,7 +113,17 @@ class LeaderboardService:
         """
         self.trader_service = trader_service
         self.performance_service = performance_service
-        self._leaderboard_cache: Dict[str, tuple] = {}  # key -> (entries, timestamp)
+        # (metric, period, min_trades) -> RankingIndex
+        self._leaderboard_cache: Dict[Tuple[str, str, int], RankingIndex] = {}
+        self._trader_seq: Dict[str, int] = {}
+        # Rolling-window periods drift as trades age out, so their indexes
+        # are rebuilt after this many seconds; all_time indexes never expire
+        self.window_index_ttl = 300
+        # change_from_previous reports movement since the ranks this many
+        # seconds ago; each index snapshots itself when the interval elapses
+        self.rank_snapshot_interval = 86400
+
+        self.performance_service.add_trade_listener(self._on_trade_recorded)
 
     def get_leaderboard(
         self,
@@ -49,51 +144,94 @@ class LeaderboardService:
         Returns:
             List of LeaderboardEntry objects
         """
-        cache_key = f"{metric}:{period}:{limit}:{min_trades}"
+        index = self._get_index(metric, period, min_trades)
 
-        # Check cache (5 minute TTL)
-        if cache_key in self._leaderboard_cache:
-            entries, timestamp = self._leaderboard_cache[cache_key]
-            if (datetime.utcnow() - timestamp).seconds < 300:
-                return entries
-
-        # Get all traders
-        traders = self.trader_service.get_all_traders()
-
-        # Calculate metrics and filter
         entries = []
-        for trader in traders:
-            metrics = self.performance_service.get_metrics(trader.trader_id, period)
-
-            if metrics and metrics.total_trades >= min_trades:
-                # Get metric value
-                metric_value = getattr(metrics, metric, 0.0)
-
-                entry = LeaderboardEntry(
-                    trader_id=trader.trader_id,
-                    username=trader.username,
-                    display_name=trader.display_name,
-                    avatar_url=trader.avatar_url,
-                    score=self._calculate_score(metrics),
-                    metric_value=metric_value,
-                    verified=trader.verified
-                )
-                entries.append(entry)
+        for trader_id, metrics in index.top(limit):
+            trader = self.trader_service.get_trader(trader_id)
+            rank = len(entries) + 1
+
+            entries.append(LeaderboardEntry(
+                rank=rank,
+                trader_id=trader.trader_id,
+                username=trader.username,
+                display_name=trader.display_name,
+                avatar_url=trader.avatar_url,
+                score=self._calculate_score(metrics),
+                metric_value=getattr(metrics, metric, 0.0),
+                change_from_previous=index.change_from_previous(trader_id, rank),
+                verified=trader.verified
+            ))
 
-        # Sort by metric value
-        entries = sorted(entries, key=lambda x: x.metric_value, reverse=True)
+        return entries
 
-        # Assign ranks and calculate changes
-        for i, entry in enumerate(entries[:limit], 1):
-            entry.rank = i
-            # TODO: Calculate change from previous ranking
+    def _get_index(self, metric: str, period: str, min_trades: int) -> RankingIndex:
+        """
+        Get the ranking index for a leaderboard, building it on first use.
 
-        entries = entries[:limit]
+        Args:
+            metric: Metric to rank by
+            period: Time period for metrics
+            min_trades: Minimum number of trades required
 
-        # Cache the result
-        self._leaderboard_cache[cache_key] = (entries, datetime.utcnow())
+        Returns:
+            RankingIndex kept current by recorded trades
+        """
+        cache_key = (metric, period, min_trades)
+        index = self._leaderboard_cache.get(cache_key)
+
+        if index is not None and period != "all_time":
+            if (datetime.utcnow() - index.built_at).total_seconds() >= self.window_index_ttl:
+                index = None
+
+        if index is None:
+            previous = self._leaderboard_cache.get(cache_key)
+            index = RankingIndex(metric, period, min_trades)
+            if previous is not None:
+                index.previous_ranks = previous.previous_ranks
+                index.snapshot_at = previous.snapshot_at
+
+            for trader in self.trader_service.get_all_traders():
+                metrics = self.performance_service.get_metrics(trader.trader_id, period)
+                index.update(trader.trader_id, self._seq(trader.trader_id), metrics)
+
+            self._leaderboard_cache[cache_key] = index
+
+        if index.snapshot_at is None or (
+            (datetime.utcnow() - index.snapshot_at).total_seconds() >= self.rank_snapshot_interval
+        ):
+            index.snapshot()
+
+        return index
+
+    def _on_trade_recorded(self, trade: Trade) -> None:
+        """Reposition the trader in every built ranking index."""
+        trader_id = trade.trader_id
+        try:
+            self.trader_service.get_trader(trader_id)
+        except NotFoundError:
+            return
+
+        for index in self._leaderboard_cache.values():
+            metrics = self.performance_service.get_metrics(trader_id, index.period)
+            index.update(trader_id, self._seq(trader_id), metrics)
+
+    def _seq(self, trader_id: str) -> int:
+        """Stable tiebreaker preserving the order traders were first seen."""
+        seq = self._trader_seq.get(trader_id)
+        if seq is None:
+            seq = self._trader_seq[trader_id] = len(self._trader_seq)
+        return seq
+
+    def snapshot_rankings(self) -> None:
+        """
+        Record current ranks as the baseline for change_from_previous.
 
-        return entries
+        Indexes snapshot themselves every rank_snapshot_interval seconds;
+        call this to start a new interval now (e.g. at the daily close).
+        """
+        for index in self._leaderboard_cache.values():
+            index.snapshot()
 
     def get_top_performers(
         self,
@@ -210,7 +348,8 @@ class LeaderboardService:
         self,
         trader_id: str,
         metric: str = "total_return",
-        period: str = "all_time"
+        period: str = "all_time",
+        min_trades: int = 10
     ) -> Optional[int]:
         """
         Get a trader's rank for a specific metric.
@@ -219,17 +358,12 @@ class LeaderboardService:
             trader_id: ID of the trader
             metric: Metric to rank by
             period: Time period
+            min_trades: Minimum number of trades required
 
         Returns:
             Rank (1-indexed) or None if not ranked
         """
-        leaderboard = self.get_leaderboard(metric=metric, period=period, limit=1000)
-
-        for entry in leaderboard:
-            if entry.trader_id == trader_id:
-                return entry.rank
-
-        return None
+        return self._get_index(metric, period, min_trades).rank(trader_id)
 
     def get_category_leaderboards(
         self,
@@ -271,5 +405,5 @@ class LeaderboardService:
         )
 
     def clear_cache(self):
-        """Clear the leaderboard cache."""
+        """Clear the ranking indexes; they are rebuilt on next use."""
         self._leaderboard_cache.clear()
@@ -47,6 +47,13 @@ class FollowType(Enum):
     COPY = "copy"
 
 
+class CopyExecutionStatus(Enum):
+    """Outcome of executing a copy trade."""
+    EXECUTED = "executed"
+    FAILED = "failed"
+    TIMED_OUT = "timed_out"
+
+
 @dataclass
 class Trader:
     """Represents a trader in the network."""
@@ -351,3 +358,31 @@ class LeaderboardEntry:
             'verified': self.verified,
             'metadata': self.metadata
         }
+
+
+@dataclass
+class CopyExecutionResult:
+    """Result of executing one copy trade for a follower."""
+    follower_id: str = ""
+    source_trader_id: str = ""
+    source_trade_id: str = ""
+    status: CopyExecutionStatus = CopyExecutionStatus.EXECUTED
+    trade: Optional[Trade] = None
+    error: Optional[str] = None
+    latency_ms: float = 0.0
+    slippage_percentage: float = 0.0  # Fill price vs the leader's entry price
+    completed_at: datetime = field(default_factory=datetime.utcnow)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        return {
+            'follower_id': self.follower_id,
+            'source_trader_id': self.source_trader_id,
+            'source_trade_id': self.source_trade_id,
+            'status': self.status.value,
+            'trade_id': self.trade.trade_id if self.trade else None,
+            'error': self.error,
+            'latency_ms': self.latency_ms,
+            'slippage_percentage': self.slippage_percentage,
+            'completed_at': self.completed_at.isoformat()
+        }
@@ -5,7 +5,7 @@ This service handles performance calculations, analytics, and metrics.
 """
 
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Callable
 import math
 from .models import Trade, PerformanceMetrics, TradeStatus
 from .exceptions import NotFoundError, ValidationError
@@ -19,6 +19,16 @@ class PerformanceService:
         self._metrics_cache: Dict[str, Dict[str, PerformanceMetrics]] = {}
         self._trades: Dict[str, Trade] = {}
         self._trader_trades_index: Dict[str, List[str]] = {}
+        self._trade_listeners: List[Callable[[Trade], None]] = []
+
+    def add_trade_listener(self, listener: Callable[[Trade], None]) -> None:
+        """
+        Register a callback invoked after each trade is added.
+
+        Args:
+            listener: Callable receiving the added Trade
+        """
+        self._trade_listeners.append(listener)
 
     def add_trade(self, trade: Trade) -> Trade:
         """
@@ -40,6 +50,9 @@ class PerformanceService:
         if trade.trader_id in self._metrics_cache:
             del self._metrics_cache[trade.trader_id]
 
+        for listener in self._trade_listeners:
+            listener(trade)
+
         return trade
 
     def get_trader_trades(
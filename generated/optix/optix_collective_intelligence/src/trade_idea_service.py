@@ -4,22 +4,164 @@ Trade Idea Service for managing trade ideas and discussions.
 This service handles creation, sharing, and interaction with trade ideas.
 """
 
+import heapq
+import math
+import re
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from itertools import islice
+from typing import List, Optional, Dict, Any, Hashable, Iterator, Tuple
+from sortedcontainers import SortedList
 from .models import TradeIdea, Comment, IdeaStatus, SentimentType
 from .exceptions import ValidationError, NotFoundError, PermissionError
 
 
+# (created_at, -insertion_seq, idea_id): ascending order is oldest first and
+# equal timestamps keep insertion order when read newest first
+PostingEntry = Tuple[datetime, int, str]
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Engagement weights used for trending scores
+TRENDING_WEIGHTS = {
+    "publish": 1.0,
+    "like": 2.0,
+    "comment": 3.0,
+    "share": 5.0,
+    "view": 0.1,
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens for the full-text index."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def matches_query(idea: TradeIdea, query_tokens: List[str]) -> bool:
+    """Check every query token starts a word of the idea's title or description."""
+    words = set(tokenize(idea.title)) | set(tokenize(idea.description))
+    return all(
+        any(word.startswith(token) for word in words)
+        for token in query_tokens
+    )
+
+
+class PostingIndex:
+    """
+    Inverted index from a key to the ideas carrying it, kept in time order.
+
+    Each posting list is a sorted list of entries, so inserts and removals
+    are O(log n) and reading the newest ideas for a key is lazy.
+    """
+
+    def __init__(self, prefix_search: bool = False):
+        """
+        Initialize an empty posting index.
+
+        Args:
+            prefix_search: Keep string keys sorted so with_prefix can be used
+        """
+        self._postings: Dict[Hashable, SortedList] = {}
+        self._keys: Optional[SortedList] = SortedList() if prefix_search else None
+
+    def add(self, key: Hashable, entry: PostingEntry) -> None:
+        """Add an idea entry under a key."""
+        postings = self._postings.get(key)
+        if postings is None:
+            postings = self._postings[key] = SortedList()
+            if self._keys is not None:
+                self._keys.add(key)
+        postings.add(entry)
+
+    def discard(self, key: Hashable, entry: PostingEntry) -> None:
+        """Remove an idea entry from a key if present."""
+        postings = self._postings.get(key)
+        if postings is None:
+            return
+        postings.discard(entry)
+        if not postings:
+            del self._postings[key]
+            if self._keys is not None:
+                self._keys.remove(key)
+
+    def get(self, key: Hashable) -> List[SortedList]:
+        """Get the posting list for a key (empty if the key is unknown)."""
+        postings = self._postings.get(key)
+        return [postings] if postings is not None else []
+
+    def with_prefix(self, prefix: str) -> List[SortedList]:
+        """Get the posting lists of every string key starting with prefix."""
+        matches = []
+        for key in self._keys.irange(minimum=prefix):
+            if not key.startswith(prefix):
+                break
+            matches.append(self._postings[key])
+        return matches
+
+
+def newest_first(postings: List[SortedList]) -> Iterator[PostingEntry]:
+    """Lazily merge posting lists newest first, dropping duplicates."""
+    if len(postings) == 1:
+        yield from reversed(postings[0])
+        return
+
+    previous = None
+    for entry in heapq.merge(*(reversed(p) for p in postings), reverse=True):
+        if entry != previous:
+            yield entry
+            previous = entry
+
+
 class TradeIdeaService:
     """Service for managing trade ideas."""
 
-    def __init__(self):
-        """Initialize the trade idea service."""
+    def __init__(
+        self,
+        trending_half_life_hours: float = 6.0,
+        trending_capacity: int = 100
+    ):
+        """
+        Initialize the trade idea service.
+
+        Args:
+            trending_half_life_hours: Hours for an engagement's weight in the
+                trending score to halve
+            trending_capacity: Number of ideas kept in the trending heap
+        """
         self._ideas: Dict[str, TradeIdea] = {}
         self._comments: Dict[str, Comment] = {}
         self._likes: Dict[str, set] = {}  # idea_id -> set of trader_ids
         self._comment_likes: Dict[str, set] = {}  # comment_id -> set of trader_ids
 
+        # Time-ordered postings. Trader postings hold every idea; the others
+        # only hold published ideas, which is all that discovery returns.
+        self._seq = 0
+        self._entries: Dict[str, PostingEntry] = {}
+        self._indexed_keys: Dict[str, List[Tuple[PostingIndex, Hashable]]] = {}
+        self._by_trader = PostingIndex()
+        self._published = PostingIndex()
+        self._by_asset = PostingIndex()
+        self._by_sentiment = PostingIndex()
+        self._by_tag = PostingIndex()
+        self._by_token = PostingIndex(prefix_search=True)
+
+        # idea_id -> parent_comment_id -> comments in creation order
+        self._comment_index: Dict[str, Dict[Optional[str], List[Comment]]] = {}
+
+        # Trending scores use forward decay: an engagement at time t adds
+        # weight * e^((t - epoch) / tau), so relative order between ideas
+        # never changes unless one of them is engaged with. The top ideas
+        # live in a bounded min-heap with lazily discarded stale entries.
+        self._trending_tau = trending_half_life_hours * 3600 / math.log(2)
+        self._trending_epoch = self._now()
+        self.trending_capacity = trending_capacity
+        self._trending_scores: Dict[str, float] = {}
+        self._trending_members: Dict[str, float] = {}
+        self._trending_heap: List[Tuple[float, str]] = []
+        # Upper bound on the score of any scored idea outside the members;
+        # members are only rebuilt when one may have fallen below it
+        self._trending_outside_bound = -1.0
+        self._trending_stale = False
+
     def create_idea(
         self,
         trader_id: str,
@@ -63,6 +205,8 @@ class TradeIdeaService:
 
         self._ideas[idea.idea_id] = idea
         self._likes[idea.idea_id] = set()
+        self._comment_index[idea.idea_id] = {}
+        self._index_idea(idea)
         return idea
 
     def publish_idea(self, idea_id: str, trader_id: str) -> TradeIdea:
@@ -93,6 +237,7 @@ class TradeIdeaService:
         idea.published_at = datetime.utcnow()
         idea.updated_at = datetime.utcnow()
 
+        self._reindex_idea(idea)
         return idea
 
     def update_idea(
@@ -126,6 +271,7 @@ class TradeIdeaService:
                 setattr(idea, key, value)
 
         idea.updated_at = datetime.utcnow()
+        self._reindex_idea(idea)
         return idea
 
     def get_idea(self, idea_id: str) -> TradeIdea:
@@ -160,34 +306,36 @@ class TradeIdeaService:
         Returns:
             List of TradeIdea objects
         """
-        ideas = [
-            idea for idea in self._ideas.values()
-            if idea.trader_id == trader_id
-        ]
+        ideas = (
+            self._ideas[idea_id]
+            for _, _, idea_id in newest_first(self._by_trader.get(trader_id))
+        )
 
         if not include_drafts:
-            ideas = [
-                idea for idea in ideas
-                if idea.status != IdeaStatus.DRAFT
-            ]
+            ideas = (idea for idea in ideas if idea.status != IdeaStatus.DRAFT)
 
-        return sorted(ideas, key=lambda x: x.created_at, reverse=True)
+        return list(ideas)
 
-    def get_ideas_by_asset(self, asset: str) -> List[TradeIdea]:
+    def get_ideas_by_asset(
+        self,
+        asset: str,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[TradeIdea]:
         """
-        Get all published ideas for a specific asset.
+        Get published ideas for a specific asset, newest first.
 
         Args:
             asset: Asset symbol
+            limit: Maximum number of results (all if None)
+            offset: Number of results to skip
 
         Returns:
             List of TradeIdea objects
         """
-        ideas = [
-            idea for idea in self._ideas.values()
-            if idea.asset == asset and idea.status == IdeaStatus.PUBLISHED
-        ]
-        return sorted(ideas, key=lambda x: x.created_at, reverse=True)
+        entries = newest_first(self._by_asset.get(asset))
+        stop = offset + limit if limit is not None else None
+        return [self._ideas[idea_id] for _, _, idea_id in islice(entries, offset, stop)]
 
     def search_ideas(
         self,
@@ -195,48 +343,63 @@ class TradeIdeaService:
         asset: Optional[str] = None,
         tags: Optional[List[str]] = None,
         sentiment: Optional[SentimentType] = None,
-        limit: int = 50
+        limit: int = 50,
+        offset: int = 0
     ) -> List[TradeIdea]:
         """
-        Search for trade ideas.
+        Search for published trade ideas, newest first.
+
+        The most selective filter's postings drive the search and the other
+        filters are checked per candidate, so a page costs roughly
+        offset + limit candidate checks rather than a scan of every idea.
+        Each word of the query must start a word of the title or
+        description, in any order: "break" matches "breakout" but "eakou"
+        does not.
 
         Args:
             query: Text search query
             asset: Filter by asset
-            tags: Filter by tags
+            tags: Filter by tags (any of)
             sentiment: Filter by sentiment
             limit: Maximum number of results
+            offset: Number of results to skip
 
         Returns:
             List of matching TradeIdea objects
         """
-        results = [
-            idea for idea in self._ideas.values()
-            if idea.status == IdeaStatus.PUBLISHED
-        ]
-
+        sources = []
         if asset:
-            results = [idea for idea in results if idea.asset == asset]
-
+            sources.append(self._by_asset.get(asset))
         if sentiment:
-            results = [idea for idea in results if idea.sentiment == sentiment]
-
+            sources.append(self._by_sentiment.get(sentiment))
         if tags:
-            results = [
-                idea for idea in results
-                if any(tag in idea.tags for tag in tags)
-            ]
-
-        if query:
-            query_lower = query.lower()
-            results = [
-                idea for idea in results
-                if query_lower in idea.title.lower()
-                or query_lower in idea.description.lower()
-            ]
-
-        results = sorted(results, key=lambda x: x.created_at, reverse=True)
-        return results[:limit]
+            sources.append([p for tag in set(tags) for p in self._by_tag.get(tag)])
+
+        query_tokens = sorted(set(tokenize(query))) if query else []
+        for token in query_tokens:
+            sources.append(self._by_token.with_prefix(token))
+
+        if not sources:
+            sources.append(self._published.get(None))
+
+        driver = min(sources, key=lambda postings: sum(len(p) for p in postings))
+
+        def matches(idea: TradeIdea) -> bool:
+            if asset and idea.asset != asset:
+                return False
+            if sentiment and idea.sentiment != sentiment:
+                return False
+            if tags and not any(tag in idea.tags for tag in tags):
+                return False
+            if query_tokens and not matches_query(idea, query_tokens):
+                return False
+            return True
+
+        results = (
+            idea for idea in (self._ideas[idea_id] for _, _, idea_id in newest_first(driver))
+            if matches(idea)
+        )
+        return list(islice(results, offset, offset + limit))
 
     def like_idea(self, idea_id: str, trader_id: str) -> TradeIdea:
         """
@@ -257,6 +420,7 @@ class TradeIdeaService:
         if trader_id not in self._likes[idea_id]:
             self._likes[idea_id].add(trader_id)
             idea.likes_count += 1
+            self._bump_trending(idea, TRENDING_WEIGHTS["like"])
 
         return idea
 
@@ -279,6 +443,7 @@ class TradeIdeaService:
         if trader_id in self._likes[idea_id]:
             self._likes[idea_id].remove(trader_id)
             idea.likes_count = max(0, idea.likes_count - 1)
+            self._bump_trending(idea, -TRENDING_WEIGHTS["like"])
 
         return idea
 
@@ -325,7 +490,9 @@ class TradeIdeaService:
 
         self._comments[comment.comment_id] = comment
         self._comment_likes[comment.comment_id] = set()
+        self._comment_index[idea_id].setdefault(parent_comment_id, []).append(comment)
         idea.comments_count += 1
+        self._bump_trending(idea, TRENDING_WEIGHTS["comment"])
 
         return comment
 
@@ -344,16 +511,12 @@ class TradeIdeaService:
         Returns:
             List of Comment objects
         """
-        comments = [
-            comment for comment in self._comments.values()
-            if comment.idea_id == idea_id
-            and comment.parent_comment_id == parent_comment_id
-        ]
-        return sorted(comments, key=lambda x: x.created_at)
+        threads = self._comment_index.get(idea_id, {})
+        return list(threads.get(parent_comment_id, []))
 
     def get_trending_ideas(self, limit: int = 10) -> List[TradeIdea]:
         """
-        Get trending trade ideas based on engagement.
+        Get trending trade ideas based on time-decayed engagement.
 
         Args:
             limit: Maximum number of results
@@ -361,28 +524,20 @@ class TradeIdeaService:
         Returns:
             List of trending TradeIdea objects
         """
-        published_ideas = [
-            idea for idea in self._ideas.values()
-            if idea.status == IdeaStatus.PUBLISHED
-        ]
-
-        # Calculate engagement score
-        def engagement_score(idea: TradeIdea) -> float:
-            age_hours = (datetime.utcnow() - idea.published_at).total_seconds() / 3600
-            age_factor = 1 / (age_hours + 2)  # Decay factor
-            return (
-                idea.likes_count * 2 +
-                idea.comments_count * 3 +
-                idea.shares_count * 5 +
-                idea.views_count * 0.1
-            ) * age_factor
-
-        trending = sorted(
-            published_ideas,
-            key=engagement_score,
-            reverse=True
-        )
-        return trending[:limit]
+        self._maybe_rebase_trending()
+        if self._trending_stale:
+            self._rebuild_trending_heap()
+
+        if limit > self.trending_capacity:
+            ranked = heapq.nlargest(
+                limit, self._trending_scores.items(), key=lambda item: item[1]
+            )
+        else:
+            ranked = sorted(
+                self._trending_members.items(), key=lambda item: item[1], reverse=True
+            )[:limit]
+
+        return [self._ideas[idea_id] for idea_id, _ in ranked]
 
     def increment_views(self, idea_id: str) -> TradeIdea:
         """
@@ -396,6 +551,7 @@ class TradeIdeaService:
         """
         idea = self.get_idea(idea_id)
         idea.views_count += 1
+        self._bump_trending(idea, TRENDING_WEIGHTS["view"])
         return idea
 
     def share_idea(self, idea_id: str) -> TradeIdea:
@@ -410,4 +566,131 @@ class TradeIdeaService:
         """
         idea = self.get_idea(idea_id)
         idea.shares_count += 1
+        self._bump_trending(idea, TRENDING_WEIGHTS["share"])
         return idea
+
+    # ==================== Indexing ====================
+
+    def _now(self) -> datetime:
+        """Current time used for trending decay."""
+        return datetime.utcnow()
+
+    def _index_idea(self, idea: TradeIdea) -> None:
+        """Add an idea to the postings matching its current fields."""
+        entry = self._entries.get(idea.idea_id)
+        if entry is None or entry[0] != idea.created_at:
+            self._seq += 1
+            entry = (idea.created_at, -self._seq, idea.idea_id)
+            self._entries[idea.idea_id] = entry
+
+        keys: List[Tuple[PostingIndex, Hashable]] = [(self._by_trader, idea.trader_id)]
+        if idea.status == IdeaStatus.PUBLISHED:
+            keys.append((self._published, None))
+            keys.append((self._by_asset, idea.asset))
+            keys.append((self._by_sentiment, idea.sentiment))
+            keys.extend((self._by_tag, tag) for tag in set(idea.tags))
+            tokens = set(tokenize(idea.title)) | set(tokenize(idea.description))
+            keys.extend((self._by_token, token) for token in tokens)
+
+        for index, key in keys:
+            index.add(key, entry)
+        self._indexed_keys[idea.idea_id] = keys
+
+        if idea.status == IdeaStatus.PUBLISHED:
+            if idea.idea_id not in self._trending_scores:
+                self._bump_trending(idea, TRENDING_WEIGHTS["publish"] + self._engagement(idea))
+        else:
+            self._remove_trending(idea.idea_id)
+
+    def _reindex_idea(self, idea: TradeIdea) -> None:
+        """Refresh an idea's postings after its fields change."""
+        entry = self._entries[idea.idea_id]
+        for index, key in self._indexed_keys.pop(idea.idea_id, []):
+            index.discard(key, entry)
+        self._index_idea(idea)
+
+    # ==================== Trending ====================
+
+    @staticmethod
+    def _engagement(idea: TradeIdea) -> float:
+        """Weighted engagement accumulated by an idea so far."""
+        return (
+            idea.likes_count * TRENDING_WEIGHTS["like"] +
+            idea.comments_count * TRENDING_WEIGHTS["comment"] +
+            idea.shares_count * TRENDING_WEIGHTS["share"] +
+            idea.views_count * TRENDING_WEIGHTS["view"]
+        )
+
+    def _bump_trending(self, idea: TradeIdea, weight: float) -> None:
+        """Add a weighted engagement at the current time to an idea's score."""
+        if idea.status != IdeaStatus.PUBLISHED:
+            return
+
+        self._maybe_rebase_trending()
+        elapsed = (self._now() - self._trending_epoch).total_seconds()
+        previous = self._trending_scores.get(idea.idea_id, 0.0)
+        score = max(0.0, previous + weight * math.exp(elapsed / self._trending_tau))
+        self._trending_scores[idea.idea_id] = score
+
+        if idea.idea_id in self._trending_members and score < self._trending_outside_bound:
+            # A member losing score may no longer belong in the top ideas
+            self._trending_stale = True
+        self._offer_trending(idea.idea_id, score)
+
+    def _offer_trending(self, idea_id: str, score: float) -> None:
+        """Place an idea in the trending heap if it ranks among the top."""
+        members = self._trending_members
+        if idea_id not in members and len(members) >= self.trending_capacity:
+            self._prune_trending_heap()
+            lowest_score, lowest_id = self._trending_heap[0]
+            if score <= lowest_score:
+                self._trending_outside_bound = max(self._trending_outside_bound, score)
+                return
+            heapq.heappop(self._trending_heap)
+            del members[lowest_id]
+            self._trending_outside_bound = max(self._trending_outside_bound, lowest_score)
+
+        members[idea_id] = score
+        heapq.heappush(self._trending_heap, (score, idea_id))
+
+        if len(self._trending_heap) > 2 * self.trending_capacity:
+            self._trending_heap = [(s, i) for i, s in members.items()]
+            heapq.heapify(self._trending_heap)
+
+    def _prune_trending_heap(self) -> None:
+        """Drop stale entries from the top of the trending heap."""
+        heap = self._trending_heap
+        while heap and self._trending_members.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+
+    def _remove_trending(self, idea_id: str) -> None:
+        """Stop tracking an idea that is no longer published."""
+        self._trending_scores.pop(idea_id, None)
+        if self._trending_members.pop(idea_id, None) is not None:
+            # Its heap entry is now stale; an outside idea may take its place
+            if self._trending_outside_bound >= 0:
+                self._trending_stale = True
+
+    def _rebuild_trending_heap(self) -> None:
+        """Rebuild the trending heap from all scores."""
+        top = heapq.nlargest(
+            self.trending_capacity + 1, self._trending_scores.items(), key=lambda item: item[1]
+        )
+        self._trending_outside_bound = top.pop()[1] if len(top) > self.trending_capacity else -1.0
+        self._trending_members = dict(top)
+        self._trending_heap = [(score, idea_id) for idea_id, score in top]
+        heapq.heapify(self._trending_heap)
+        self._trending_stale = False
+
+    def _maybe_rebase_trending(self) -> None:
+        """Move the decay epoch forward before scores grow too large."""
+        elapsed = (self._now() - self._trending_epoch).total_seconds()
+        if elapsed / self._trending_tau < 100:
+            return
+
+        factor = math.exp(-elapsed / self._trending_tau)
+        self._trending_epoch = self._now()
+        self._trending_scores = {
+            idea_id: score * factor for idea_id, score in self._trending_scores.items()
+        }
+        self._rebuild_trending_heap()
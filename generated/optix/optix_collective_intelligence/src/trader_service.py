@@ -5,7 +5,7 @@ This service handles trader management, following, and social connections.
 """
 
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Callable, Tuple
 from .models import Trader, FollowRelationship, FollowType
 from .exceptions import ValidationError, NotFoundError, DuplicateError
 
@@ -20,6 +20,27 @@ class TraderService:
         self._relationships: Dict[str, FollowRelationship] = {}
         self._following_index: Dict[str, set] = {}  # follower_id -> set of following_ids
         self._followers_index: Dict[str, set] = {}  # following_id -> set of follower_ids
+        # (follower_id, following_id) -> active relationship
+        self._active_relationships: Dict[Tuple[str, str], FollowRelationship] = {}
+        self._relationship_listeners: List[Callable[[FollowRelationship], None]] = []
+
+    def add_relationship_listener(
+        self,
+        listener: Callable[[FollowRelationship], None]
+    ) -> None:
+        """
+        Register a callback invoked after a relationship is created, removed or
+        has its copy settings updated.
+
+        Args:
+            listener: Callable receiving the changed FollowRelationship
+        """
+        self._relationship_listeners.append(listener)
+
+    def _notify_relationship_changed(self, relationship: FollowRelationship) -> None:
+        """Call relationship listeners."""
+        for listener in self._relationship_listeners:
+            listener(relationship)
 
     def create_trader(
         self,
@@ -175,6 +196,7 @@ class TraderService:
         )
 
         self._relationships[relationship.relationship_id] = relationship
+        self._active_relationships[(follower_id, following_id)] = relationship
         self._following_index[follower_id].add(following_id)
         self._followers_index[following_id].add(follower_id)
 
@@ -184,6 +206,7 @@ class TraderService:
         follower.following_count += 1
         following.followers_count += 1
 
+        self._notify_relationship_changed(relationship)
         return relationship
 
     def unfollow_trader(
@@ -211,12 +234,9 @@ class TraderService:
             return False
 
         # Find and deactivate relationship
-        for rel in self._relationships.values():
-            if (rel.follower_id == follower_id and
-                rel.following_id == following_id and
-                rel.active):
-                rel.active = False
-                break
+        relationship = self._active_relationships.pop((follower_id, following_id), None)
+        if relationship:
+            relationship.active = False
 
         self._following_index[follower_id].discard(following_id)
         self._followers_index[following_id].discard(follower_id)
@@ -227,6 +247,8 @@ class TraderService:
         follower.following_count = max(0, follower.following_count - 1)
         following.followers_count = max(0, following.followers_count - 1)
 
+        if relationship:
+            self._notify_relationship_changed(relationship)
         return True
 
     def get_following(self, trader_id: str) -> List[Trader]:
@@ -285,12 +307,7 @@ class TraderService:
         Returns:
             FollowRelationship object or None
         """
-        for rel in self._relationships.values():
-            if (rel.follower_id == follower_id and
-                rel.following_id == following_id and
-                rel.active):
-                return rel
-        return None
+        return self._active_relationships.get((follower_id, following_id))
 
     def update_copy_settings(
         self,
@@ -317,6 +334,7 @@ class TraderService:
             raise NotFoundError("Follow relationship not found")
 
         relationship.copy_settings = copy_settings
+        self._notify_relationship_changed(relationship)
         return relationship
 
     def search_traders(
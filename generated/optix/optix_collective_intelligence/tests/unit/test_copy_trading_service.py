@@ -2,11 +2,13 @@
 Unit tests for CopyTradingService.
 """
 
+import asyncio
+import random
 import pytest
 
-from src.copy_trading_service import CopyTradingService
+from src.copy_trading_service import CopyTradingService, CopyExecutionPool
 from src.trader_service import TraderService
-from src.models import Trade, TradeType, TradeStatus, FollowType
+from src.models import Trade, TradeType, TradeStatus, FollowType, CopyExecutionStatus
 from src.exceptions import ValidationError, NotFoundError
 
 
@@ -99,174 +101,87 @@ class TestCopyTradingService:
         )
         assert relationship.copy_settings["enabled"] is False
 
-    def test_should_copy_trade_whitelist(self, service, traders):
-        """Test trade copying with asset whitelist."""
-        settings = {
-            "asset_whitelist": ["BTC/USD", "ETH/USD"]
-        }
-
-        trade_btc = Trade(
-            trader_id=traders["leader"].trader_id,
-            asset="BTC/USD",
-            trade_type=TradeType.BUY,
-            quantity=1.0
+    def copy_of(self, service, traders, settings, **trade):
+        """Copy the follower makes of a leader trade, or None if skipped."""
+        service.enable_copy_trading(
+            traders["follower"].trader_id,
+            traders["leader"].trader_id,
+            settings
         )
-
-        trade_xrp = Trade(
+        service.set_execution_callback(lambda t: t)
+        source_trade = Trade(
             trader_id=traders["leader"].trader_id,
-            asset="XRP/USD",
             trade_type=TradeType.BUY,
-            quantity=1.0
+            **trade
         )
+        copies = service.process_trade(source_trade)
+        return copies[0] if copies else None
 
-        assert service._should_copy_trade(trade_btc, settings) is True
-        assert service._should_copy_trade(trade_xrp, settings) is False
+    def test_copy_trade_whitelist(self, service, traders):
+        """Test trade copying with asset whitelist."""
+        settings = {
+            "asset_whitelist": ["BTC/USD", "ETH/USD"]
+        }
+
+        assert self.copy_of(service, traders, settings, asset="BTC/USD", quantity=1.0)
+        assert self.copy_of(service, traders, settings, asset="XRP/USD", quantity=1.0) is None
 
-    def test_should_copy_trade_blacklist(self, service, traders):
+    def test_copy_trade_blacklist(self, service, traders):
         """Test trade copying with asset blacklist."""
         settings = {
             "asset_blacklist": ["DOGE/USD"]
         }
 
-        trade_btc = Trade(
-            trader_id=traders["leader"].trader_id,
-            asset="BTC/USD",
-            trade_type=TradeType.BUY,
-            quantity=1.0
-        )
-
-        trade_doge = Trade(
-            trader_id=traders["leader"].trader_id,
-            asset="DOGE/USD",
-            trade_type=TradeType.BUY,
-            quantity=1.0
-        )
-
-        assert service._should_copy_trade(trade_btc, settings) is True
-        assert service._should_copy_trade(trade_doge, settings) is False
+        assert self.copy_of(service, traders, settings, asset="BTC/USD", quantity=1.0)
+        assert self.copy_of(service, traders, settings, asset="DOGE/USD", quantity=1.0) is None
 
-    def test_should_copy_trade_position_limits(self, service, traders):
+    def test_copy_trade_position_limits(self, service, traders):
         """Test trade copying with position size limits."""
         settings = {
             "max_position_size": 10.0,
             "min_position_size": 1.0
         }
 
-        trade_valid = Trade(
-            trader_id=traders["leader"].trader_id,
-            asset="BTC/USD",
-            trade_type=TradeType.BUY,
-            quantity=5.0
-        )
+        assert self.copy_of(service, traders, settings, asset="BTC/USD", quantity=5.0)
+        assert self.copy_of(service, traders, settings, asset="BTC/USD", quantity=15.0) is None
+        assert self.copy_of(service, traders, settings, asset="BTC/USD", quantity=0.5) is None
 
-        trade_too_large = Trade(
-            trader_id=traders["leader"].trader_id,
-            asset="BTC/USD",
-            trade_type=TradeType.BUY,
-            quantity=15.0
-        )
-
-        trade_too_small = Trade(
-            trader_id=traders["leader"].trader_id,
-            asset="BTC/USD",
-            trade_type=TradeType.BUY,
-            quantity=0.5
-        )
-
-        assert service._should_copy_trade(trade_valid, settings) is True
-        assert service._should_copy_trade(trade_too_large, settings) is False
-        assert service._should_copy_trade(trade_too_small, settings) is False
-
-    def test_create_copy_trade(self, service, traders):
+    def test_copy_trade(self, service, traders):
         """Test creating a copy trade."""
-        source_trade = Trade(
-            trader_id=traders["leader"].trader_id,
-            asset="BTC/USD",
-            trade_type=TradeType.BUY,
-            entry_price=50000.0,
-            quantity=2.0
-        )
-
         settings = {
             "copy_percentage": 50.0
         }
 
-        copy_trade = service._create_copy_trade(
-            source_trade,
-            traders["follower"].trader_id,
-            settings
+        copy_trade = self.copy_of(
+            service, traders, settings, asset="BTC/USD", entry_price=50000.0, quantity=2.0
         )
 
         assert copy_trade is not None
         assert copy_trade.trader_id == traders["follower"].trader_id
-        assert copy_trade.asset == source_trade.asset
-        assert copy_trade.trade_type == source_trade.trade_type
+        assert copy_trade.asset == "BTC/USD"
+        assert copy_trade.trade_type == TradeType.BUY
         assert copy_trade.quantity == 1.0  # 50% of 2.0
         assert copy_trade.metadata["copy_trade"] is True
-        assert copy_trade.metadata["source_trade_id"] == source_trade.trade_id
-
-    def test_create_copy_trade_with_limits(self, service, traders):
-        """Test creating copy trade with position limits."""
-        source_trade = Trade(
-            trader_id=traders["leader"].trader_id,
-            asset="BTC/USD",
-            trade_type=TradeType.BUY,
-            quantity=10.0
-        )
-
-        settings = {
-            "copy_percentage": 100.0,
-            "max_position_size": 5.0
-        }
+        assert copy_trade.metadata["source_trade_id"] in service._copy_trades
 
-        copy_trade = service._create_copy_trade(
-            source_trade,
-            traders["follower"].trader_id,
-            settings
-        )
-
-        assert copy_trade.quantity == 5.0  # Capped at max
-
-    def test_create_copy_trade_below_minimum(self, service, traders):
+    def test_copy_trade_below_minimum(self, service, traders):
         """Test that trades below minimum are not copied."""
-        source_trade = Trade(
-            trader_id=traders["leader"].trader_id,
-            asset="BTC/USD",
-            trade_type=TradeType.BUY,
-            quantity=1.0
-        )
-
         settings = {
             "copy_percentage": 10.0,  # Results in 0.1
             "min_position_size": 0.5
         }
 
-        copy_trade = service._create_copy_trade(
-            source_trade,
-            traders["follower"].trader_id,
-            settings
-        )
+        copy_trade = self.copy_of(service, traders, settings, asset="BTC/USD", quantity=1.0)
 
         assert copy_trade is None  # Below minimum
 
-    def test_create_copy_trade_reverse(self, service, traders):
+    def test_copy_trade_reverse(self, service, traders):
         """Test creating reversed copy trade."""
-        source_trade = Trade(
-            trader_id=traders["leader"].trader_id,
-            asset="BTC/USD",
-            trade_type=TradeType.BUY,
-            quantity=1.0
-        )
-
         settings = {
             "reverse_trades": True
         }
 
-        copy_trade = service._create_copy_trade(
-            source_trade,
-            traders["follower"].trader_id,
-            settings
-        )
+        copy_trade = self.copy_of(service, traders, settings, asset="BTC/USD", quantity=1.0)
 
         assert copy_trade.trade_type == TradeType.SELL  # Reversed
 
@@ -418,3 +333,190 @@ class TestCopyTradingService:
                 "max_position_size": 10.0,
                 "min_position_size": 20.0
             })
+
+    def _copiers(self, trader_service, service, leader, count, rng):
+        """Create copiers of a leader with randomised settings."""
+        assets = ["BTC/USD", "ETH/USD", "SOL/USD"]
+        for i in range(count):
+            follower = trader_service.create_trader(
+                username=f"copier{i}",
+                display_name=f"Copier {i}"
+            )
+            settings = {
+                "copy_percentage": rng.choice([10.0, 50.0, 100.0]),
+                "max_position_size": rng.choice([None, 0.5, 2.0]),
+                "min_position_size": rng.choice([None, 0.1, 0.4]),
+                "asset_whitelist": rng.choice([None, assets[:1], assets[1:]]),
+                "asset_blacklist": rng.choice([None, assets[2:]]),
+                "reverse_trades": rng.random() < 0.3,
+            }
+            if settings["max_position_size"] and settings["min_position_size"]:
+                settings["min_position_size"] = min(
+                    settings["min_position_size"], settings["max_position_size"]
+                )
+            service.enable_copy_trading(follower.trader_id, leader.trader_id, settings)
+
+    def _expected_copy(self, trade, settings):
+        """Quantity and type of a follower's copy, applying each rule in turn."""
+        if settings.get("asset_whitelist") and trade.asset not in settings["asset_whitelist"]:
+            return None
+        if settings.get("asset_blacklist") and trade.asset in settings["asset_blacklist"]:
+            return None
+        if settings.get("max_position_size") and trade.quantity > settings["max_position_size"]:
+            return None
+        if settings.get("min_position_size") and trade.quantity < settings["min_position_size"]:
+            return None
+
+        quantity = trade.quantity * (settings.get("copy_percentage", 100.0) / 100.0)
+        if settings.get("max_position_size"):
+            quantity = min(quantity, settings["max_position_size"])
+        if settings.get("min_position_size") and quantity < settings["min_position_size"]:
+            return None
+
+        trade_type = trade.trade_type
+        if settings.get("reverse_trades", False):
+            trade_type = TradeType.SELL
+        return quantity, trade_type
+
+    def test_process_trade_matches_per_follower_rules(self, service, trader_service, traders):
+        """Test vectorised copy generation matches the per-follower rules."""
+        rng = random.Random(11)
+        leader = traders["leader"]
+        self._copiers(trader_service, service, leader, 60, rng)
+        # Relationships changed after enabling are picked up too
+        followers = trader_service.get_followers(leader.trader_id)
+        trader_service.unfollow_trader(followers[0].trader_id, leader.trader_id)
+        service.disable_copy_trading(followers[1].trader_id, leader.trader_id)
+        service.update_copy_settings(
+            followers[2].trader_id, leader.trader_id, {"enabled": True, "copy_percentage": 25.0}
+        )
+
+        service.set_execution_callback(lambda t: t)
+
+        for asset in ["BTC/USD", "ETH/USD", "SOL/USD"]:
+            for quantity in [0.05, 0.3, 1.0, 3.0]:
+                source_trade = Trade(
+                    trader_id=leader.trader_id,
+                    asset=asset,
+                    trade_type=TradeType.BUY,
+                    quantity=quantity
+                )
+                expected = {}
+                for follower in trader_service.get_followers(leader.trader_id):
+                    relationship = trader_service.get_follow_relationship(
+                        follower.trader_id, leader.trader_id
+                    )
+                    settings = relationship.copy_settings
+                    if not settings or not settings.get("enabled", False):
+                        continue
+                    copy = self._expected_copy(source_trade, settings)
+                    if copy:
+                        expected[follower.trader_id] = copy
+
+                copies = service.process_trade(source_trade)
+                actual = {t.trader_id: (t.quantity, t.trade_type) for t in copies}
+                assert actual == pytest.approx(expected)
+
+    def test_batch_execution_and_failures(self, service, trader_service, traders):
+        """Test batched execution tracks results per follower."""
+        leader = traders["leader"]
+        followers = []
+        for i in range(5):
+            follower = trader_service.create_trader(username=f"batch{i}", display_name="Batch")
+            service.enable_copy_trading(follower.trader_id, leader.trader_id)
+            followers.append(follower)
+
+        batches = []
+        def execute_batch(trades):
+            batches.append(len(trades))
+            if any(t.trader_id == followers[4].trader_id for t in trades):
+                raise RuntimeError("broker rejected batch")
+            return trades
+
+        service.batch_size = 2
+        service.set_batch_execution_callback(execute_batch)
+        source_trade = Trade(trader_id=leader.trader_id, asset="BTC/USD", quantity=1.0)
+        executed = service.process_trade(source_trade)
+
+        assert batches == [2, 2, 1]
+        assert len(executed) == 4
+        assert len(service.get_copy_trades(source_trade.trade_id)) == 4
+
+        failed = service.get_execution_results(followers[4].trader_id, leader.trader_id)
+        assert [r.status for r in failed] == [CopyExecutionStatus.FAILED]
+        assert failed[0].error == "broker rejected batch"
+
+        stats = service.get_copy_statistics(followers[0].trader_id, leader.trader_id)
+        assert stats["total_copied_trades"] == 1
+        assert stats["successful_copies"] == 1
+
+    def test_copy_statistics(self, service, traders):
+        """Test profit/loss and slippage are summarised per relationship."""
+        follower_id = traders["follower"].trader_id
+        leader_id = traders["leader"].trader_id
+        service.enable_copy_trading(follower_id, leader_id)
+        fills = iter([(101.0, 25.0), (99.0, -5.0)])
+
+        def execute(trade):
+            price, profit_loss = next(fills, (None, None))
+            if price is None:
+                raise RuntimeError("rejected")
+            trade.entry_price = price
+            trade.profit_loss = profit_loss
+            return trade
+
+        service.set_execution_callback(execute)
+        for _ in range(3):
+            service.process_trade(Trade(trader_id=leader_id, asset="BTC/USD",
+                                        entry_price=100.0, quantity=1.0))
+
+        stats = service.get_copy_statistics(follower_id, leader_id)
+
+        assert stats["total_copied_trades"] == 3
+        assert stats["successful_copies"] == 2
+        assert stats["failed_copies"] == 1
+        assert stats["total_profit_loss"] == pytest.approx(20.0)
+        assert stats["average_slippage"] == pytest.approx(1.0)
+        assert service.get_copy_statistics("nobody", leader_id)["average_slippage"] == 0.0
+
+    def test_process_trade_async(self, trader_service, traders):
+        """Test fan-out through the async pool with back-pressure and timeouts."""
+        leader = traders["leader"]
+        batches = []
+
+        async def execute(trades):
+            batches.append(len(trades))
+            if any(t.metadata["copy_settings"].get("slow") for t in trades):
+                await asyncio.sleep(1)
+            return trades
+
+        pool = CopyExecutionPool(execute, workers=2, batch_size=10, queue_size=5, batch_timeout=0.2)
+        service = CopyTradingService(trader_service, execution_pool=pool)
+        for i in range(30):
+            follower = trader_service.create_trader(username=f"async{i}", display_name="Async")
+            service.enable_copy_trading(
+                follower.trader_id, leader.trader_id, {"slow": i == 29}
+            )
+
+        async def scenario():
+            await pool.start()
+            source_trade = Trade(trader_id=leader.trader_id, asset="BTC/USD", quantity=2.0)
+            results = await service.process_trade_async(source_trade)
+            await pool.stop()
+            return results
+
+        results = asyncio.run(scenario())
+
+        assert len(results) == 30
+        # The queue never holds more than queue_size trades
+        assert max(batches) <= 5
+        statuses = [r.status for r in results]
+        assert statuses.count(CopyExecutionStatus.TIMED_OUT) >= 1
+        assert statuses[-1] == CopyExecutionStatus.TIMED_OUT
+        assert all(r.latency_ms < 1000 for r in results)
+
+    def test_process_trade_async_requires_pool(self, service, traders):
+        """Test async fan-out fails fast without a running pool."""
+        source_trade = Trade(trader_id=traders["leader"].trader_id, asset="BTC/USD")
+        with pytest.raises(ValidationError):
+            asyncio.run(service.process_trade_async(source_trade))
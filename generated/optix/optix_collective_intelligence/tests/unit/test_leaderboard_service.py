@@ -220,6 +220,90 @@ class TestLeaderboardService:
         # Should return same results within cache TTL
         assert len(lb1) == len(lb2)
 
+    def test_leaderboard_limits_share_ranking(self, service, setup_traders):
+        """Test different page sizes are served from one ranking index."""
+        full = service.get_leaderboard(limit=100, min_trades=5)
+        page = service.get_leaderboard(limit=2, min_trades=5)
+
+        assert len(service._leaderboard_cache) == 1
+        assert [e.trader_id for e in page] == [e.trader_id for e in full[:2]]
+
+    def test_recorded_trade_updates_ranking(self, service, setup_traders, performance_service):
+        """Test a new trade repositions only that trader without a rebuild."""
+        leaderboard = service.get_leaderboard(limit=10, min_trades=5)
+        index = service._leaderboard_cache[("total_return", "all_time", 5)]
+        last = leaderboard[-1]
+
+        performance_service.add_trade(Trade(
+            trader_id=last.trader_id,
+            asset="BTC/USD",
+            trade_type=TradeType.BUY,
+            status=TradeStatus.CLOSED,
+            opened_at=datetime.utcnow(),
+            closed_at=datetime.utcnow(),
+            profit_loss=100000.0,
+            profit_loss_percentage=1000.0
+        ))
+
+        assert service._leaderboard_cache[("total_return", "all_time", 5)] is index
+        assert service.get_trader_rank(last.trader_id, min_trades=5) == 1
+        updated = service.get_leaderboard(limit=10, min_trades=5)
+        assert updated[0].trader_id == last.trader_id
+        assert updated[0].metric_value == last.metric_value + 1000.0
+
+    def test_rank_changes_from_snapshot(self, service, setup_traders, performance_service):
+        """Test change_from_previous reports movement since the last snapshot."""
+        before = service.get_leaderboard(limit=10, min_trades=5)
+        assert all(entry.change_from_previous == 0 for entry in before)
+        service.snapshot_rankings()
+
+        climber = before[-1]
+        performance_service.add_trade(Trade(
+            trader_id=climber.trader_id,
+            asset="BTC/USD",
+            trade_type=TradeType.BUY,
+            status=TradeStatus.CLOSED,
+            opened_at=datetime.utcnow(),
+            closed_at=datetime.utcnow(),
+            profit_loss=100000.0,
+            profit_loss_percentage=1000.0
+        ))
+
+        after = {e.trader_id: e for e in service.get_leaderboard(limit=10, min_trades=5)}
+        assert after[climber.trader_id].change_from_previous == len(before) - 1
+        assert after[before[0].trader_id].change_from_previous == -1
+
+    def test_rank_changes_without_explicit_snapshot(self, service, setup_traders, performance_service):
+        """Test indexes take their own baseline and roll it forward each interval."""
+        before = service.get_leaderboard(limit=10, min_trades=5)
+        climber = before[-1]
+        performance_service.add_trade(Trade(
+            trader_id=climber.trader_id,
+            asset="BTC/USD",
+            trade_type=TradeType.BUY,
+            status=TradeStatus.CLOSED,
+            opened_at=datetime.utcnow(),
+            closed_at=datetime.utcnow(),
+            profit_loss=100000.0,
+            profit_loss_percentage=1000.0
+        ))
+
+        after = {e.trader_id: e for e in service.get_leaderboard(limit=10, min_trades=5)}
+        assert after[climber.trader_id].change_from_previous == len(before) - 1
+
+        service.rank_snapshot_interval = 0
+        rolled = service.get_leaderboard(limit=10, min_trades=5)
+        assert all(entry.change_from_previous == 0 for entry in rolled)
+
+    def test_trader_rank_matches_leaderboard(self, service, setup_traders):
+        """Test index rank lookups agree with the materialised leaderboard."""
+        leaderboard = service.get_leaderboard(metric="win_rate", limit=100, min_trades=5)
+
+        for entry in leaderboard:
+            assert service.get_trader_rank(
+                entry.trader_id, metric="win_rate", min_trades=5
+            ) == entry.rank
+
     def test_clear_cache(self, service, setup_traders):
         """Test clearing leaderboard cache."""
         service.get_leaderboard()
@@ -2,8 +2,9 @@
 Unit tests for TradeIdeaService.
 """
 
+import random
 import pytest
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from src.trade_idea_service import TradeIdeaService
 from src.models import TradeIdea, TradeType, IdeaStatus, SentimentType
@@ -338,3 +339,163 @@ class TestTradeIdeaService:
         initial_shares = sample_idea.shares_count
         service.share_idea(sample_idea.idea_id)
         assert sample_idea.shares_count == initial_shares + 1
+
+    def test_search_matches_full_scan(self, service):
+        """Test indexed search returns the same pages as filtering every idea."""
+        rng = random.Random(3)
+        assets = ["BTC/USD", "ETH/USD", "SOL/USD"]
+        tags = ["long", "short", "swing", "scalp"]
+        words = ["breakout", "support", "resistance", "momentum", "divergence"]
+        base = datetime(2024, 1, 1)
+
+        for i in range(200):
+            idea = service.create_idea(
+                trader_id=f"trader{i % 7}",
+                title=f"{rng.choice(words).title()} idea {i}",
+                description=" ".join(rng.choice(words) for _ in range(6)),
+                asset=rng.choice(assets),
+                tags=rng.sample(tags, 2),
+                sentiment=rng.choice(list(SentimentType)),
+                created_at=base + timedelta(minutes=rng.randint(0, 50))
+            )
+            if i % 4:
+                service.publish_idea(idea.idea_id, idea.trader_id)
+        # Editing a published idea moves it between postings
+        some_idea = next(iter(service._ideas.values()))
+        service.update_idea(some_idea.idea_id, some_idea.trader_id, asset="SOL/USD", tags=["swing"])
+
+        def full_scan(query=None, asset=None, tags=None, sentiment=None):
+            ideas = [i for i in service._ideas.values() if i.status == IdeaStatus.PUBLISHED]
+            ideas = [i for i in ideas if not asset or i.asset == asset]
+            ideas = [i for i in ideas if not sentiment or i.sentiment == sentiment]
+            ideas = [i for i in ideas if not tags or any(t in i.tags for t in tags)]
+            ideas = [
+                i for i in ideas
+                if not query or all(
+                    any(word.startswith(token) for word in f"{i.title} {i.description}".lower().split())
+                    for token in query.split()
+                )
+            ]
+            return sorted(ideas, key=lambda x: x.created_at, reverse=True)
+
+        for filters in [
+            {},
+            {"asset": "SOL/USD"},
+            {"tags": ["swing", "scalp"]},
+            {"query": "momentum", "sentiment": SentimentType.BULLISH},
+            {"query": "break", "asset": "BTC/USD", "tags": ["long"]},
+            {"query": "mom sup"},
+        ]:
+            expected = full_scan(**filters)
+            for offset in (0, 10):
+                page = service.search_ideas(limit=10, offset=offset, **filters)
+                assert [i.idea_id for i in page] == [i.idea_id for i in expected[offset:offset + 10]]
+
+        assert service.get_ideas_by_asset("SOL/USD") == full_scan(asset="SOL/USD")
+
+    def test_search_query_matches_word_prefixes(self, service, sample_idea):
+        """Test every query word must start a word, whichever filter drives the search."""
+        service.publish_idea(sample_idea.idea_id, "trader123")
+
+        for query, found in [
+            ("bull", True),
+            ("Chart BITCOIN", True),
+            ("4h long", True),
+            ("ullish", False),
+            ("bitcoin bear", False),
+            ("", True),
+        ]:
+            expected = [sample_idea] if found else []
+            assert service.search_ideas(query=query) == expected
+            # Asset postings drive the search; the query is checked per idea
+            assert service.search_ideas(query=query, asset="BTC/USD") == expected
+
+    def test_unpublished_idea_leaves_indexes(self, service, sample_idea):
+        """Test closing an idea removes it from discovery and trending."""
+        service.publish_idea(sample_idea.idea_id, "trader123")
+        assert service.search_ideas(query="bitcoin") == [sample_idea]
+        assert service.get_trending_ideas() == [sample_idea]
+
+        service.update_idea(sample_idea.idea_id, "trader123", status=IdeaStatus.CLOSED)
+
+        assert service.search_ideas(query="bitcoin") == []
+        assert service.get_ideas_by_asset("BTC/USD") == []
+        assert service.get_trending_ideas() == []
+        assert service.get_ideas_by_trader("trader123") == [sample_idea]
+
+    def test_get_comments_by_thread(self, service, sample_idea):
+        """Test comments are returned per thread in creation order."""
+        first = service.add_comment(sample_idea.idea_id, "trader456", "First")
+        reply = service.add_comment(
+            sample_idea.idea_id, "trader789", "Reply", parent_comment_id=first.comment_id
+        )
+        second = service.add_comment(sample_idea.idea_id, "trader789", "Second")
+
+        assert service.get_comments(sample_idea.idea_id) == [first, second]
+        assert service.get_comments(sample_idea.idea_id, first.comment_id) == [reply]
+        assert service.get_comments("other_idea") == []
+
+    def test_trending_scores_decay(self, service, monkeypatch):
+        """Test older engagement counts less than recent engagement."""
+        now = [service._now()]
+        monkeypatch.setattr(service, "_now", lambda: now[0])
+
+        old = service.create_idea("trader1", "Old favourite", "Was popular yesterday", "BTC")
+        service.publish_idea(old.idea_id, "trader1")
+        for i in range(5):
+            service.like_idea(old.idea_id, f"fan{i}")
+
+        now[0] += timedelta(hours=24)
+        new = service.create_idea("trader2", "Fresh setup", "Gaining attention now", "ETH")
+        service.publish_idea(new.idea_id, "trader2")
+        service.share_idea(new.idea_id)
+
+        assert service.get_trending_ideas(limit=2) == [new, old]
+
+    def test_trending_heap_is_bounded(self):
+        """Test only the top ideas are kept and unlikes can demote a member."""
+        service = TradeIdeaService(trending_capacity=3)
+        ideas = []
+        for i in range(6):
+            idea = service.create_idea(f"trader{i}", f"Idea number {i}", "Some description", "BTC")
+            service.publish_idea(idea.idea_id, idea.trader_id)
+            for j in range(i):
+                service.like_idea(idea.idea_id, f"fan{j}")
+            ideas.append(idea)
+
+        assert len(service._trending_members) == 3
+        assert service.get_trending_ideas(limit=3) == [ideas[5], ideas[4], ideas[3]]
+
+        for j in range(5):
+            service.unlike_idea(ideas[5].idea_id, f"fan{j}")
+        assert service.get_trending_ideas(limit=3) == [ideas[4], ideas[3], ideas[2]]
+        assert len(service.get_trending_ideas(limit=10)) == 6
+
+    def test_unlike_updates_trending_member_in_place(self, monkeypatch):
+        """Test a member that stays in the top ideas is not rebuilt from every score."""
+        service = TradeIdeaService(trending_capacity=2)
+        ideas = []
+        for likes in (5, 3, 0):
+            idea = service.create_idea("trader1", "Idea with likes", "Some description", "BTC")
+            service.publish_idea(idea.idea_id, "trader1")
+            for j in range(likes):
+                service.like_idea(idea.idea_id, f"fan{j}")
+            ideas.append(idea)
+
+        rebuilds = []
+        rebuild = service._rebuild_trending_heap
+        monkeypatch.setattr(
+            service, "_rebuild_trending_heap", lambda: rebuilds.append(1) or rebuild()
+        )
+
+        service.unlike_idea(ideas[0].idea_id, "fan0")
+        assert service.get_trending_ideas(limit=2) == [ideas[0], ideas[1]]
+        assert rebuilds == []
+
+        # Dropping below the best idea outside the heap rebuilds once, on read
+        for j in range(1, 5):
+            service.unlike_idea(ideas[0].idea_id, f"fan{j}")
+        service.like_idea(ideas[2].idea_id, "fan0")
+        assert rebuilds == []
+        assert service.get_trending_ideas(limit=2) == [ideas[1], ideas[2]]
+        assert rebuilds == [1]
@@ -0,0 +1,312 @@
+"""
+Batch volatility engine for analysing whole watchlists at once.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .models import VolatilityMetrics, VolatilityCondition
+from .calculators import IVConditionClassifier
+
+# Trading days of IV history used for rank, percentile and 52-week extremes
+IV_LOOKBACK_DAYS = 252
+
+# Historical volatility windows reported in VolatilityMetrics
+HV_WINDOWS = (30, 60, 90)
+
+
+def pack_series(series: Sequence[Sequence[float]], length: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pack the most recent values of each series into a NaN-padded matrix.
+    
+    Args:
+        series: One list of values per symbol (most recent first)
+        length: Number of most recent values to keep
+    
+    Returns:
+        Tuple of (symbols x length matrix, number of values kept per row)
+    """
+    matrix = np.full((len(series), length), np.nan)
+    lengths = np.zeros(len(series), dtype=int)
+    for row, values in enumerate(series):
+        values = values[:length]
+        matrix[row, :len(values)] = values
+        lengths[row] = len(values)
+    return matrix, lengths
+
+
+class BatchVolatilityCalculator:
+    """
+    Vectorised counterparts of the per-symbol calculators.
+    
+    Each method takes packed matrices with one row per symbol and returns
+    one value per row, equal to what the scalar calculator returns for
+    that symbol (before rounding).
+    """
+    
+    @staticmethod
+    def calculate_extremes(iv_history: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Minimum and maximum of each row, ignoring padding.
+        
+        Returns:
+            Tuple of (min, max) per symbol; (inf, -inf) for empty rows
+        """
+        min_iv = np.where(np.isnan(iv_history), np.inf, iv_history).min(axis=1, initial=np.inf)
+        max_iv = np.where(np.isnan(iv_history), -np.inf, iv_history).max(axis=1, initial=-np.inf)
+        return min_iv, max_iv
+    
+    @staticmethod
+    def calculate_iv_rank(current_iv: np.ndarray, min_iv: np.ndarray,
+                          max_iv: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+        """
+        Calculate IV Rank for each row.
+        
+        Args:
+            current_iv: Current IV per symbol
+            min_iv: Minimum IV per symbol, from calculate_extremes
+            max_iv: Maximum IV per symbol, from calculate_extremes
+            lengths: Number of history values per row
+        
+        Returns:
+            IV Rank per symbol between 0 and 100
+        """
+        valid = (lengths >= 2) & (max_iv != min_iv)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            iv_rank = ((current_iv - min_iv) / (max_iv - min_iv)) * 100
+        return np.where(valid, np.clip(iv_rank, 0.0, 100.0), 50.0)
+    
+    @staticmethod
+    def calculate_iv_percentile(current_iv: np.ndarray, iv_history: np.ndarray,
+                                lengths: np.ndarray) -> np.ndarray:
+        """
+        Calculate IV Percentile for each row.
+        
+        Args:
+            current_iv: Current IV per symbol
+            iv_history: Packed IV history (most recent first)
+            lengths: Number of history values per row
+        
+        Returns:
+            IV Percentile per symbol between 0 and 100 (unrounded)
+        """
+        days_below = (iv_history < current_iv[:, None]).sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            percentile = (days_below / lengths) * 100
+        return np.where(lengths >= 2, percentile, 50.0)
+    
+    @staticmethod
+    def calculate_average_iv(iv_history: np.ndarray, lengths: np.ndarray,
+                             window_days: int) -> np.ndarray:
+        """
+        Average of the most recent IV values for each row.
+        
+        Returns:
+            Average IV per symbol, NaN where fewer than window_days values exist
+        """
+        averages = np.full(len(lengths), np.nan)
+        rows = lengths >= window_days
+        if rows.any():
+            averages[rows] = iv_history[rows, :window_days].mean(axis=1)
+        return averages
+    
+    @staticmethod
+    def calculate_hv(prices: np.ndarray, lengths: np.ndarray,
+                     window_days: int) -> np.ndarray:
+        """
+        Close-to-close historical volatility for each row.
+        
+        Args:
+            prices: Packed prices (most recent first)
+            lengths: Number of prices per row
+            window_days: Number of days for HV calculation
+        
+        Returns:
+            Annualized HV per symbol as a percentage (unrounded), 0.0
+            where there are not enough prices
+        """
+        hv = np.zeros(len(lengths))
+        rows = lengths >= window_days + 1
+        if rows.any():
+            window = prices[rows, :window_days + 1]
+            log_returns = np.log(window[:, :-1] / window[:, 1:])
+            hv[rows] = log_returns.std(axis=1, ddof=1) * np.sqrt(252) * 100
+        return hv
+    
+    @staticmethod
+    def calculate_parkinson_hv(highs: np.ndarray, lows: np.ndarray,
+                               lengths: np.ndarray, window_days: int = 30) -> np.ndarray:
+        """
+        Parkinson historical volatility for each row.
+        
+        Args:
+            highs: Packed daily highs (most recent first)
+            lows: Packed daily lows (most recent first)
+            lengths: Number of days per row
+            window_days: Number of days for calculation
+        
+        Returns:
+            Annualized Parkinson HV per symbol as a percentage (unrounded),
+            0.0 where there are not enough days
+        """
+        hv = np.zeros(len(lengths))
+        rows = lengths >= window_days
+        if rows.any():
+            high = highs[rows, :window_days]
+            low = lows[rows, :window_days]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                squared = np.where(low > 0, np.log(high / low) ** 2, 0.0)
+            variance = (1 / (4 * np.log(2))) * (squared.sum(axis=1) / window_days)
+            hv[rows] = np.sqrt(variance * 252) * 100
+        return hv
+
+
+def _calculate_metric_arrays(
+    current_iv: List[float],
+    iv_histories: List[List[float]],
+    price_histories: List[List[float]]
+) -> Dict[str, np.ndarray]:
+    """Calculate every per-symbol metric array in one vectorised pass."""
+    calc = BatchVolatilityCalculator
+    current = np.asarray(current_iv, dtype=float)
+    iv_history, iv_lengths = pack_series(iv_histories, IV_LOOKBACK_DAYS)
+    prices, price_lengths = pack_series(price_histories, max(HV_WINDOWS) + 1)
+    
+    min_iv, max_iv = calc.calculate_extremes(iv_history)
+    arrays = {
+        'min_iv_52w': np.where(iv_lengths > 0, min_iv, 0.0),
+        'max_iv_52w': np.where(iv_lengths > 0, max_iv, 0.0),
+        'iv_rank': calc.calculate_iv_rank(current, min_iv, max_iv, iv_lengths),
+        'iv_percentile': calc.calculate_iv_percentile(current, iv_history, iv_lengths),
+        'average_iv_30d': calc.calculate_average_iv(iv_history, iv_lengths, 30),
+        'average_iv_60d': calc.calculate_average_iv(iv_history, iv_lengths, 60),
+    }
+    for window in HV_WINDOWS:
+        arrays[f'hv_{window}d'] = calc.calculate_hv(prices, price_lengths, window)
+    return arrays
+
+
+class BatchVolatilityEngine:
+    """
+    Calculates VolatilityMetrics for many symbols at once.
+    
+    Histories are packed into symbol x day matrices so each metric is a
+    single vectorised pass over the watchlist. Large watchlists can be
+    split into chunks computed in a process pool.
+    """
+    
+    def __init__(self, max_workers: Optional[int] = None, chunk_size: int = 500):
+        """
+        Initialize the batch engine.
+        
+        Args:
+            max_workers: Process pool size; None computes in-process
+            chunk_size: Symbols per pool task
+        """
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.condition_classifier = IVConditionClassifier()
+        self._executor: Optional[ProcessPoolExecutor] = None
+    
+    def shutdown(self):
+        """Shut down the process pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+    
+    def calculate_metrics(
+        self,
+        symbols_data: Dict[str, Dict],
+        timestamp: datetime
+    ) -> Dict[str, VolatilityMetrics]:
+        """
+        Calculate core volatility metrics for every symbol.
+        
+        Args:
+            symbols_data: Dictionary mapping symbols to their data
+            timestamp: Timestamp stamped on every result
+        
+        Returns:
+            Dictionary mapping symbols to VolatilityMetrics, in input order
+        """
+        symbols = list(symbols_data.keys())
+        current_iv = [symbols_data[s]['current_iv'] for s in symbols]
+        iv_histories = [symbols_data[s]['iv_history'] for s in symbols]
+        price_histories = [symbols_data[s]['price_history'] for s in symbols]
+        
+        arrays = self._calculate_arrays(current_iv, iv_histories, price_histories)
+        columns = {name: values.tolist() for name, values in arrays.items()}
+        
+        symbol_metrics = {}
+        for row, symbol in enumerate(symbols):
+            values = {name: column[row] for name, column in columns.items()}
+            symbol_metrics[symbol] = self._build_metrics(
+                symbol, timestamp, current_iv[row], values
+            )
+        return symbol_metrics
+    
+    def _calculate_arrays(
+        self,
+        current_iv: List[float],
+        iv_histories: List[List[float]],
+        price_histories: List[List[float]]
+    ) -> Dict[str, np.ndarray]:
+        """Calculate metric arrays, in chunks across the pool if configured."""
+        if not self.max_workers or len(current_iv) <= self.chunk_size:
+            return _calculate_metric_arrays(current_iv, iv_histories, price_histories)
+        
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        
+        starts = range(0, len(current_iv), self.chunk_size)
+        chunks = list(self._executor.map(
+            _calculate_metric_arrays,
+            [current_iv[i:i + self.chunk_size] for i in starts],
+            [iv_histories[i:i + self.chunk_size] for i in starts],
+            [price_histories[i:i + self.chunk_size] for i in starts],
+        ))
+        return {
+            name: np.concatenate([chunk[name] for chunk in chunks])
+            for name in chunks[0]
+        }
+    
+    def _build_metrics(
+        self,
+        symbol: str,
+        timestamp: datetime,
+        current_iv: float,
+        values: Dict[str, float]
+    ) -> VolatilityMetrics:
+        """Build one symbol's metrics from its row of the metric arrays."""
+        iv_rank = values['iv_rank']
+        iv_percentile = round(values['iv_percentile'], 2)
+        hv_30d, hv_60d, hv_90d = (
+            round(values[f'hv_{window}d'], 2) for window in HV_WINDOWS
+        )
+        
+        condition = VolatilityCondition(
+            self.condition_classifier.classify_condition(iv_rank, iv_percentile)
+        )
+        
+        # Averages are NaN without enough history
+        average_iv_30d = values['average_iv_30d']
+        average_iv_60d = values['average_iv_60d']
+        
+        return VolatilityMetrics(
+            symbol=symbol,
+            timestamp=timestamp,
+            current_iv=current_iv,
+            iv_rank=iv_rank,
+            iv_percentile=iv_percentile,
+            historical_volatility_30d=hv_30d,
+            historical_volatility_60d=hv_60d,
+            historical_volatility_90d=hv_90d,
+            iv_hv_ratio=self.condition_classifier.calculate_iv_hv_ratio(current_iv, hv_30d),
+            condition=condition,
+            average_iv_30d=current_iv if np.isnan(average_iv_30d) else average_iv_30d,
+            average_iv_60d=current_iv if np.isnan(average_iv_60d) else average_iv_60d,
+            min_iv_52w=values['min_iv_52w'],
+            max_iv_52w=values['max_iv_52w']
+        )
@@ -2,10 +2,13 @@
 Core calculation engines for volatility metrics.
 """
 import numpy as np
+from bisect import bisect_left, insort
+from collections import OrderedDict, deque
 from typing import List, Tuple, Optional
 from datetime import datetime, timedelta
 from scipy import stats
-from scipy.interpolate import griddata
+from scipy.interpolate import CloughTocher2DInterpolator, UnivariateSpline
+from scipy.spatial import Delaunay
 
 
 class IVRankCalculator:
@@ -74,6 +77,108 @@ class IVRankCalculator:
         return min(history_52w), max(history_52w)
 
 
+class IVHistoryWindow:
+    """
+    Rolling window of daily IVs kept in sorted order.
+    
+    Answers IV rank, IV percentile and window extremes with binary searches
+    instead of scanning the lookback, and slides by one day in O(log n)
+    searches plus a list shift. Results equal IVRankCalculator's for the
+    same window.
+    """
+    
+    def __init__(self, iv_history: Optional[List[float]] = None,
+                 lookback_days: int = 252):
+        """
+        Initialize the window.
+        
+        Args:
+            iv_history: Historical IV values (most recent first)
+            lookback_days: Number of days kept in the window
+        """
+        self.lookback_days = lookback_days
+        history = list(iv_history or [])[:lookback_days]
+        # Chronological order, oldest first, so eviction pops from the left
+        self._values = deque(reversed(history))
+        self._sorted = sorted(history)
+    
+    def __len__(self) -> int:
+        return len(self._sorted)
+    
+    def push(self, iv: float) -> None:
+        """Add the newest daily IV, evicting the oldest beyond the lookback."""
+        self._values.append(iv)
+        insort(self._sorted, iv)
+        if len(self._values) > self.lookback_days:
+            self._remove(self._values.popleft())
+    
+    def iv_rank(self, current_iv: float) -> float:
+        """IV Rank of current_iv against the window (see IVRankCalculator)."""
+        if len(self._sorted) < 2:
+            return 50.0
+        
+        min_iv, max_iv = self._sorted[0], self._sorted[-1]
+        if max_iv == min_iv:
+            return 50.0
+        
+        iv_rank = ((current_iv - min_iv) / (max_iv - min_iv)) * 100
+        return max(0.0, min(100.0, iv_rank))
+    
+    def iv_percentile(self, current_iv: float) -> float:
+        """IV Percentile of current_iv against the window (see IVRankCalculator)."""
+        if len(self._sorted) < 2:
+            return 50.0
+        
+        days_below = bisect_left(self._sorted, current_iv)
+        return round((days_below / len(self._sorted)) * 100, 2)
+    
+    def extremes(self) -> Tuple[float, float]:
+        """Minimum and maximum IV in the window."""
+        if not self._sorted:
+            return 0.0, 0.0
+        return self._sorted[0], self._sorted[-1]
+    
+    @classmethod
+    def rolling_history(cls, iv_history: List[float], days: int = 30,
+                        lookback_days: int = 252) -> List[Tuple[int, float, float]]:
+        """
+        IV rank and percentile of each recent day against its own lookback.
+        
+        Day i (0 = most recent) is measured against iv_history[i:i + lookback_days],
+        like calling IVRankCalculator on iv_history[i:] for each day, but the
+        window slides one day at a time instead of being rebuilt.
+        
+        Args:
+            iv_history: Historical IV values (most recent first)
+            days: Number of recent days to measure
+            lookback_days: Number of days in each lookback
+        
+        Returns:
+            List of (days_ago, iv_rank, iv_percentile), oldest first;
+            days with fewer than two lookback values are skipped
+        """
+        days = min(days, len(iv_history))
+        if days == 0:
+            return []
+        
+        # Start from the oldest measured day and slide towards the present
+        oldest = days - 1
+        window = cls(iv_history[oldest:], lookback_days)
+        history = []
+        for i in range(oldest, -1, -1):
+            if i < oldest:
+                window.push(iv_history[i])
+            if len(window) >= 2:
+                current = iv_history[i]
+                history.append((i, window.iv_rank(current), window.iv_percentile(current)))
+        
+        return history
+    
+    def _remove(self, iv: float) -> None:
+        """Remove one occurrence of a value from the sorted list."""
+        del self._sorted[bisect_left(self._sorted, iv)]
+
+
 class HistoricalVolatilityCalculator:
     """Calculator for historical volatility (realized volatility)."""
     
@@ -318,7 +423,9 @@ class VolatilitySurfaceCalculator:
     @staticmethod
     def interpolate_surface(known_points: List[Tuple[float, int, float]],
                            grid_strikes: np.ndarray,
-                           grid_dtes: np.ndarray) -> np.ndarray:
+                           grid_dtes: np.ndarray,
+                           method: str = 'cubic',
+                           symbol: Optional[str] = None) -> np.ndarray:
         """
         Interpolate volatility surface for visualization.
         
@@ -326,31 +433,143 @@ class VolatilitySurfaceCalculator:
             known_points: List of (strike, dte, iv) tuples
             grid_strikes: Strike grid for interpolation
             grid_dtes: DTE grid for interpolation
+            method: "cubic" (scattered data) or "structured" (regular chains)
+            symbol: Symbol the surface belongs to, used to key cached work
             
         Returns:
             2D array of interpolated IV values
         """
+        return surface_interpolator.interpolate(
+            known_points, grid_strikes, grid_dtes, method=method, symbol=symbol
+        )
+
+
+class SurfaceInterpolator:
+    """
+    Volatility surface interpolation that reuses work across requests.
+    
+    The "cubic" method gives the same result as griddata(method='cubic'),
+    but caches the Delaunay triangulation of each symbol's strike/DTE
+    lattice so refreshes where only the IVs changed skip Qhull. The
+    "structured" method is for regular chains: a smoothing spline across
+    strikes for each expiration, then linear interpolation across DTE.
+    """
+    
+    METHODS = ('cubic', 'structured')
+    
+    # Fewest strikes an expiration needs for a smoothing spline
+    MIN_SPLINE_STRIKES = 5
+    
+    def __init__(self, max_entries: int = 128, smoothing: float = 0.25):
+        """
+        Initialize the interpolator.
+        
+        Args:
+            max_entries: Triangulations kept in the LRU cache
+            smoothing: RMS distance in IV points the structured splines may
+                keep from each expiration's quotes
+        """
+        self.max_entries = max_entries
+        self.smoothing = smoothing
+        self._triangulations: "OrderedDict[Tuple, Delaunay]" = OrderedDict()
+    
+    def interpolate(self, known_points: List[Tuple[float, int, float]],
+                    grid_strikes: np.ndarray,
+                    grid_dtes: np.ndarray,
+                    method: str = 'cubic',
+                    symbol: Optional[str] = None) -> np.ndarray:
+        """
+        Interpolate IVs onto a strike x DTE grid.
+        
+        Args:
+            known_points: List of (strike, dte, iv) tuples
+            grid_strikes: Strike grid for interpolation
+            grid_dtes: DTE grid for interpolation
+            method: "cubic" or "structured"
+            symbol: Symbol the surface belongs to, used to key cached work
+            
+        Returns:
+            2D array of interpolated IV values, NaN outside the known points
+        """
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown surface interpolation method: {method}")
+        
         if len(known_points) < 3:
             return np.zeros((len(grid_dtes), len(grid_strikes)))
         
-        # Prepare data for interpolation
-        strikes = np.array([s for s, _, _ in known_points])
-        dtes = np.array([d for _, d, _ in known_points])
-        ivs = np.array([iv for _, _, iv in known_points])
+        points = np.asarray(known_points, dtype=float)
         
-        # Create meshgrid
-        strike_grid, dte_grid = np.meshgrid(grid_strikes, grid_dtes)
+        if method == 'structured':
+            return self._interpolate_structured(
+                points,
+                np.asarray(grid_strikes, dtype=float),
+                np.asarray(grid_dtes, dtype=float)
+            )
         
-        # Interpolate using cubic method
-        iv_surface = griddata(
-            (strikes, dtes), 
-            ivs, 
-            (strike_grid, dte_grid),
-            method='cubic',
+        strike_grid, dte_grid = np.meshgrid(grid_strikes, grid_dtes)
+        interpolator = CloughTocher2DInterpolator(
+            self._triangulation(symbol, points[:, :2]),
+            points[:, 2],
             fill_value=np.nan
         )
-        
-        return iv_surface
+        return interpolator(strike_grid, dte_grid)
+    
+    def clear(self, symbol: Optional[str] = None):
+        """Drop cached triangulations, for one symbol or all."""
+        if symbol is None:
+            self._triangulations.clear()
+            return
+        for key in [key for key in self._triangulations if key[0] == symbol]:
+            del self._triangulations[key]
+    
+    def _triangulation(self, symbol: Optional[str], lattice: np.ndarray) -> Delaunay:
+        """Get the triangulation of a strike/DTE lattice from the LRU cache."""
+        lattice = np.ascontiguousarray(lattice)
+        key = (symbol, lattice.shape, lattice.tobytes())
+        tri = self._triangulations.get(key)
+        if tri is not None:
+            self._triangulations.move_to_end(key)
+            return tri
+        
+        tri = Delaunay(lattice)
+        self._triangulations[key] = tri
+        while len(self._triangulations) > self.max_entries:
+            self._triangulations.popitem(last=False)
+        return tri
+    
+    def _interpolate_structured(self, points: np.ndarray,
+                                grid_strikes: np.ndarray,
+                                grid_dtes: np.ndarray) -> np.ndarray:
+        """Per-expiration smoothing splines, linear across DTE."""
+        dtes = np.unique(points[:, 1])
+        slices = np.full((len(dtes), len(grid_strikes)), np.nan)
+        
+        for row, dte in enumerate(dtes):
+            expiration = points[points[:, 1] == dte]
+            strikes, inverse = np.unique(expiration[:, 0], return_inverse=True)
+            # Calls and puts at the same strike are averaged
+            ivs = np.bincount(inverse, weights=expiration[:, 2]) / np.bincount(inverse)
+            
+            inside = (grid_strikes >= strikes[0]) & (grid_strikes <= strikes[-1])
+            if len(strikes) >= self.MIN_SPLINE_STRIKES:
+                spline = UnivariateSpline(
+                    strikes, ivs, s=len(strikes) * self.smoothing ** 2
+                )
+                slices[row, inside] = spline(grid_strikes[inside])
+            else:
+                slices[row, inside] = np.interp(grid_strikes[inside], strikes, ivs)
+        
+        if len(dtes) == 1:
+            surface = np.tile(slices[0], (len(grid_dtes), 1))
+            surface[grid_dtes != dtes[0]] = np.nan
+            return surface
+        
+        upper = np.clip(np.searchsorted(dtes, grid_dtes), 1, len(dtes) - 1)
+        lower = upper - 1
+        weight = ((grid_dtes - dtes[lower]) / (dtes[upper] - dtes[lower]))[:, None]
+        surface = slices[lower] * (1 - weight) + slices[upper] * weight
+        surface[(grid_dtes < dtes[0]) | (grid_dtes > dtes[-1])] = np.nan
+        return surface
 
 
 class IVConditionClassifier:
@@ -398,3 +617,7 @@ class IVConditionClassifier:
             return 1.0
             
         return round(current_iv / historical_vol, 2)
+
+
+# Shared interpolator so cached triangulations outlive individual requests
+surface_interpolator = SurfaceInterpolator()
@@ -12,10 +12,12 @@ from .models import (
 )
 from .calculators import (
     IVRankCalculator, HistoricalVolatilityCalculator, SkewCalculator,
-    TermStructureCalculator, VolatilitySurfaceCalculator, IVConditionClassifier
+    TermStructureCalculator, VolatilitySurfaceCalculator, IVConditionClassifier,
+    IVHistoryWindow
 )
 from .strategy_engine import VolatilityStrategyEngine
 from .alert_engine import VolatilityAlertEngine
+from .batch_engine import BatchVolatilityEngine
 
 
 class VolatilityCompass:
@@ -24,8 +26,14 @@ class VolatilityCompass:
     Coordinates all volatility calculations, analysis, and reporting.
     """
     
-    def __init__(self):
-        """Initialize Volatility Compass with calculation engines."""
+    def __init__(self, batch_workers: Optional[int] = None):
+        """
+        Initialize Volatility Compass with calculation engines.
+        
+        Args:
+            batch_workers: Process pool size for large watchlists; None
+                computes watchlists in-process
+        """
         self.iv_rank_calc = IVRankCalculator()
         self.hv_calc = HistoricalVolatilityCalculator()
         self.skew_calc = SkewCalculator()
@@ -34,6 +42,7 @@ class VolatilityCompass:
         self.condition_classifier = IVConditionClassifier()
         self.strategy_engine = VolatilityStrategyEngine()
         self.alert_engine = VolatilityAlertEngine()
+        self.batch_engine = BatchVolatilityEngine(max_workers=batch_workers)
     
     def analyze_symbol(
         self,
@@ -365,7 +374,9 @@ class VolatilityCompass:
         """
         timestamp = datetime.now()
         symbols = list(symbols_data.keys())
-        symbol_metrics = {}
+        
+        # Calculate metrics for the whole watchlist in one vectorised pass
+        symbol_metrics = self.batch_engine.calculate_metrics(symbols_data, timestamp)
         
         high_iv_symbols = []
         low_iv_symbols = []
@@ -373,17 +384,9 @@ class VolatilityCompass:
         premium_buying = []
         all_alerts = []
         
-        # Analyze each symbol
+        # Categorize each symbol
         for symbol, data in symbols_data.items():
-            metrics = self._calculate_metrics(
-                symbol,
-                data['current_iv'],
-                data['iv_history'],
-                data['price_history'],
-                timestamp
-            )
-            
-            symbol_metrics[symbol] = metrics
+            metrics = symbol_metrics[symbol]
             
             # Categorize by IV rank
             if metrics.iv_rank >= 70:
@@ -435,37 +438,21 @@ class VolatilityCompass:
         iv_history: List[float], 
         days: int = 30
     ) -> List[Tuple[datetime, float]]:
-        """Build historical IV rank data for charting."""
-        history = []
+        """Build historical IV rank data for charting, oldest first."""
         current_date = datetime.now()
-        
-        for i in range(min(days, len(iv_history))):
-            date = current_date - timedelta(days=i)
-            # Calculate rolling IV rank
-            lookback = iv_history[i:]
-            if len(lookback) >= 2:
-                current = iv_history[i]
-                rank = self.iv_rank_calc.calculate_iv_rank(current, lookback)
-                history.append((date, rank))
-        
-        return list(reversed(history))
+        return [
+            (current_date - timedelta(days=i), rank)
+            for i, rank, _ in IVHistoryWindow.rolling_history(iv_history, days)
+        ]
     
     def _build_percentile_history(
         self,
         iv_history: List[float],
         days: int = 30
     ) -> List[Tuple[datetime, float]]:
-        """Build historical IV percentile data for charting."""
-        history = []
+        """Build historical IV percentile data for charting, oldest first."""
         current_date = datetime.now()
-        
-        for i in range(min(days, len(iv_history))):
-            date = current_date - timedelta(days=i)
-            # Calculate rolling IV percentile
-            lookback = iv_history[i:]
-            if len(lookback) >= 2:
-                current = iv_history[i]
-                percentile = self.iv_rank_calc.calculate_iv_percentile(current, lookback)
-                history.append((date, percentile))
-        
-        return list(reversed(history))
+        return [
+            (current_date - timedelta(days=i), percentile)
+            for i, _, percentile in IVHistoryWindow.rolling_history(iv_history, days)
+        ]
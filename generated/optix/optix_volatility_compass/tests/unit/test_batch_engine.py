@@ -0,0 +1,112 @@
+"""
+Unit tests for the batch volatility engine.
+"""
+import pytest
+import numpy as np
+from datetime import datetime
+
+from src.batch_engine import BatchVolatilityCalculator, BatchVolatilityEngine, pack_series
+from src.calculators import HistoricalVolatilityCalculator
+from src.volatility_compass import VolatilityCompass
+
+
+def create_symbols_data(count=40, seed=7):
+    """Create watchlist data with a mix of history lengths."""
+    rng = np.random.default_rng(seed)
+    history_lengths = [0, 1, 2, 29, 30, 59, 60, 100, 252, 300]
+    price_lengths = [0, 30, 31, 60, 61, 90, 91, 100, 300]
+    
+    symbols_data = {}
+    for i in range(count):
+        iv_days = history_lengths[i % len(history_lengths)]
+        price_days = price_lengths[i % len(price_lengths)]
+        iv_history = list(rng.uniform(15, 45, iv_days))
+        if i % 7 == 0:
+            iv_history = [30.0] * iv_days  # No variation
+        prices = list(100.0 * np.cumprod(1 + rng.normal(0, 0.02, price_days)))
+        symbols_data[f'SYM{i}'] = {
+            'current_iv': float(rng.uniform(15, 45)),
+            'iv_history': iv_history,
+            'price_history': prices,
+        }
+    return symbols_data
+
+
+class TestBatchVolatilityEngine:
+    """Tests for batch watchlist metrics."""
+    
+    def setup_method(self):
+        self.compass = VolatilityCompass()
+        self.engine = BatchVolatilityEngine()
+    
+    def test_metrics_match_per_symbol_calculation(self):
+        """Test batch metrics equal the per-symbol metrics exactly."""
+        symbols_data = create_symbols_data()
+        timestamp = datetime.now()
+        
+        batch = self.engine.calculate_metrics(symbols_data, timestamp)
+        
+        assert list(batch) == list(symbols_data)
+        for symbol, data in symbols_data.items():
+            expected = self.compass._calculate_metrics(
+                symbol, data['current_iv'], data['iv_history'],
+                data['price_history'], timestamp
+            )
+            assert batch[symbol] == expected
+    
+    def test_process_pool_matches_in_process(self):
+        """Test chunked pool computation gives the same metrics."""
+        symbols_data = create_symbols_data(count=25)
+        timestamp = datetime.now()
+        engine = BatchVolatilityEngine(max_workers=2, chunk_size=10)
+        
+        try:
+            pooled = engine.calculate_metrics(symbols_data, timestamp)
+        finally:
+            engine.shutdown()
+        
+        assert pooled == self.engine.calculate_metrics(symbols_data, timestamp)
+    
+    def test_empty_watchlist(self):
+        """Test an empty watchlist yields no metrics."""
+        assert self.engine.calculate_metrics({}, datetime.now()) == {}
+    
+    def test_analyze_watchlist_uses_batch_metrics(self):
+        """Test watchlist analysis categorizes batch-computed metrics."""
+        symbols_data = create_symbols_data(count=12)
+        
+        analysis = self.compass.analyze_watchlist("Batch", symbols_data)
+        
+        assert list(analysis.symbol_metrics) == list(symbols_data)
+        for symbol in analysis.high_iv_symbols:
+            assert analysis.symbol_metrics[symbol].iv_rank >= 70
+
+
+class TestBatchVolatilityCalculator:
+    """Tests for vectorised calculators."""
+    
+    def test_pack_series(self):
+        """Test series are truncated and NaN padded."""
+        matrix, lengths = pack_series([[1.0, 2.0, 3.0], [4.0], []], 2)
+        
+        assert matrix.shape == (3, 2)
+        assert list(lengths) == [2, 1, 0]
+        assert matrix[0].tolist() == [1.0, 2.0]
+        assert np.isnan(matrix[1, 1]) and np.isnan(matrix[2]).all()
+    
+    def test_parkinson_hv_matches_scalar(self):
+        """Test batch Parkinson HV equals the scalar calculator."""
+        rng = np.random.default_rng(3)
+        days = [10, 30, 45]
+        high_low = [
+            [(h * 1.02, h * 0.98) for h in rng.uniform(90, 110, n)]
+            for n in days
+        ]
+        highs, lengths = pack_series([[h for h, _ in rows] for rows in high_low], 30)
+        lows, _ = pack_series([[l for _, l in rows] for rows in high_low], 30)
+        
+        batch = BatchVolatilityCalculator.calculate_parkinson_hv(highs, lows, lengths, 30)
+        
+        for row, rows in enumerate(high_low):
+            expected = HistoricalVolatilityCalculator.calculate_parkinson_hv(rows, 30)
+            assert round(batch[row], 2) == pytest.approx(expected)
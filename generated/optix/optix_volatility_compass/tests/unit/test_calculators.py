@@ -4,11 +4,13 @@ Unit tests for volatility calculators.
 import pytest
 import numpy as np
 from datetime import datetime, timedelta
+from scipy.interpolate import griddata
 
 from src.calculators import (
     IVRankCalculator, HistoricalVolatilityCalculator,
     SkewCalculator, TermStructureCalculator,
-    VolatilitySurfaceCalculator, IVConditionClassifier
+    VolatilitySurfaceCalculator, IVConditionClassifier,
+    IVHistoryWindow, SurfaceInterpolator
 )
 
 
@@ -102,6 +104,59 @@ class TestIVRankCalculator:
         assert max_iv == 0.0
 
 
+class TestIVHistoryWindow:
+    """Tests for the sorted rolling IV window."""
+    
+    def test_queries_match_calculator(self):
+        """Test rank, percentile and extremes equal IVRankCalculator."""
+        rng = np.random.default_rng(5)
+        iv_history = list(rng.uniform(15, 45, 300))
+        window = IVHistoryWindow(iv_history)
+        
+        for current_iv in [10.0, 22.5, iv_history[0], 30.0, 50.0]:
+            assert window.iv_rank(current_iv) == IVRankCalculator.calculate_iv_rank(current_iv, iv_history)
+            assert window.iv_percentile(current_iv) == IVRankCalculator.calculate_iv_percentile(current_iv, iv_history)
+        assert window.extremes() == IVRankCalculator.get_52_week_extremes(iv_history)
+    
+    def test_push_slides_lookback(self):
+        """Test new days evict the oldest beyond the lookback."""
+        window = IVHistoryWindow([30.0, 20.0, 10.0], lookback_days=3)
+        
+        window.push(40.0)
+        
+        assert len(window) == 3
+        assert window.extremes() == (20.0, 40.0)
+        assert window.iv_percentile(30.0) == pytest.approx(33.33)
+    
+    def test_insufficient_history(self):
+        """Test defaults with fewer than two values."""
+        window = IVHistoryWindow([30.0])
+        
+        assert window.iv_rank(35.0) == 50.0
+        assert window.iv_percentile(35.0) == 50.0
+        assert IVHistoryWindow([]).extremes() == (0.0, 0.0)
+    
+    def test_rolling_history_matches_rescan(self):
+        """Test chart history equals rescanning each day's lookback."""
+        rng = np.random.default_rng(9)
+        iv_history = list(rng.integers(15, 45, 400).astype(float))
+        
+        history = IVHistoryWindow.rolling_history(iv_history, days=200)
+        
+        expected = [
+            (i,
+             IVRankCalculator.calculate_iv_rank(iv_history[i], iv_history[i:]),
+             IVRankCalculator.calculate_iv_percentile(iv_history[i], iv_history[i:]))
+            for i in reversed(range(200))
+        ]
+        assert history == expected
+    
+    def test_rolling_history_short(self):
+        """Test days without two lookback values are skipped."""
+        assert IVHistoryWindow.rolling_history([], days=30) == []
+        assert [i for i, _, _ in IVHistoryWindow.rolling_history([30.0, 25.0, 20.0])] == [1, 0]
+
+
 class TestHistoricalVolatilityCalculator:
     """Tests for Historical Volatility calculator."""
     
@@ -377,6 +432,72 @@ class TestVolatilitySurfaceCalculator:
         assert surface.shape == (len(grid_dtes), len(grid_strikes))
 
 
+class TestSurfaceInterpolator:
+    """Tests for cached and structured surface interpolation."""
+    
+    def setup_method(self):
+        self.interpolator = SurfaceInterpolator()
+        self.grid_strikes = np.linspace(90, 110, 9)
+        self.grid_dtes = np.array([20, 30, 45, 60, 90])
+    
+    def create_chain_points(self, shift=0.0):
+        """Create (strike, dte, iv) points for a regular chain."""
+        return [
+            (float(strike), dte, 25.0 + 0.02 * (strike - 100) ** 2 + dte / 30 + side + shift)
+            for dte in [30, 60]
+            for strike in range(90, 111, 2)
+            for side in (0.0, 0.5)
+        ]
+    
+    def test_cubic_matches_griddata(self):
+        """Test cached cubic interpolation equals griddata."""
+        points = self.create_chain_points()
+        strikes, dtes, ivs = (np.array(values) for values in zip(*points))
+        
+        surface = self.interpolator.interpolate(
+            points, self.grid_strikes, self.grid_dtes, symbol='AAPL'
+        )
+        
+        strike_grid, dte_grid = np.meshgrid(self.grid_strikes, self.grid_dtes)
+        expected = griddata(
+            (strikes, dtes), ivs, (strike_grid, dte_grid),
+            method='cubic', fill_value=np.nan
+        )
+        np.testing.assert_array_equal(surface, expected)
+    
+    def test_triangulation_reused_when_ivs_change(self):
+        """Test new IVs on the same lattice reuse the triangulation."""
+        self.interpolator.interpolate(
+            self.create_chain_points(), self.grid_strikes, self.grid_dtes, symbol='AAPL'
+        )
+        self.interpolator.interpolate(
+            self.create_chain_points(shift=1.0), self.grid_strikes, self.grid_dtes, symbol='AAPL'
+        )
+        assert len(self.interpolator._triangulations) == 1
+        
+        self.interpolator.clear('AAPL')
+        assert len(self.interpolator._triangulations) == 0
+    
+    def test_structured_interpolation(self):
+        """Test structured interpolation is linear across DTE and NaN outside."""
+        surface = self.interpolator.interpolate(
+            self.create_chain_points(), self.grid_strikes, self.grid_dtes,
+            method='structured'
+        )
+        
+        assert surface.shape == (len(self.grid_dtes), len(self.grid_strikes))
+        assert np.isnan(surface[0]).all() and np.isnan(surface[-1]).all()
+        np.testing.assert_allclose(surface[2], (surface[1] + surface[3]) / 2)
+        assert surface[1, 4] == pytest.approx(26.25, abs=0.3)
+    
+    def test_unknown_method(self):
+        """Test unknown methods are rejected."""
+        with pytest.raises(ValueError):
+            self.interpolator.interpolate(
+                self.create_chain_points(), self.grid_strikes, self.grid_dtes, method='linear'
+            )
+
+
 class TestIVConditionClassifier:
     """Tests for IV Condition classifier."""
     
@@ -297,6 +297,23 @@ class TestVolatilityCompass:
             assert isinstance(date, datetime)
             assert 0 <= percentile <= 100
     
+    def test_chart_history_is_chronological(self):
+        """Test rank and percentile history run from oldest to newest."""
+        iv_history = self.create_sample_iv_history(30.0, 60)
+        
+        rank_history = self.compass._build_rank_history(iv_history, days=30)
+        percentile_history = self.compass._build_percentile_history(iv_history, days=30)
+        
+        for history in (rank_history, percentile_history):
+            dates = [date for date, _ in history]
+            assert len(dates) == 30
+            assert dates == sorted(dates)
+        
+        # The last point is today's value against the full history
+        assert rank_history[-1][1] == self.compass.iv_rank_calc.calculate_iv_rank(
+            iv_history[0], iv_history
+        )
+    
     def test_analyze_symbol_with_alerts(self):
         """Test that analysis includes alerts when IV changes."""
         symbol = "AAPL"
@@ -6,10 +6,11 @@ by symbol, strategy, time period, and advanced metrics.
 """
 
 import logging
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Tuple
-from collections import defaultdict
-from statistics import mean, median, stdev
+
+import numpy as np
 from sqlalchemy.orm import Session
 from sqlalchemy import func, extract
 
@@ -20,6 +21,60 @@ from .models import (
 
 logger = logging.getLogger(__name__)
 
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+MONTH_NAMES = [
+    'January', 'February', 'March', 'April', 'May', 'June',
+    'July', 'August', 'September', 'October', 'November', 'December'
+]
+
+
+@dataclass
+class TradeColumns:
+    """
+    Columnar view of closed trades, ordered by exit date (entry date if open).
+
+    Loaded with a single query so several analyses can share one fetch
+    instead of each hydrating every Trade ORM object.
+    """
+    net_pnl: np.ndarray
+    gross_pnl: np.ndarray
+    commissions: np.ndarray
+    symbols: np.ndarray
+    setup_types: np.ndarray
+    entry_dates: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.net_pnl)
+
+    def take(self, index: np.ndarray) -> 'TradeColumns':
+        """Select rows by boolean mask or position, preserving order."""
+        return TradeColumns(
+            net_pnl=self.net_pnl[index],
+            gross_pnl=self.gross_pnl[index],
+            commissions=self.commissions[index],
+            symbols=self.symbols[index],
+            setup_types=self.setup_types[index],
+            entry_dates=self.entry_dates[index]
+        )
+
+    @property
+    def entry_hours(self) -> np.ndarray:
+        """Hour of day of each entry."""
+        days = self.entry_dates.astype('datetime64[D]')
+        return ((self.entry_dates - days) // np.timedelta64(1, 'h')).astype(np.int64)
+
+    @property
+    def entry_weekdays(self) -> np.ndarray:
+        """Weekday of each entry, Monday == 0."""
+        days = self.entry_dates.astype('datetime64[D]').astype(np.int64)
+        # 1970-01-01 was a Thursday
+        return (days + 3) % 7
+
+    @property
+    def entry_months(self) -> np.ndarray:
+        """Calendar month (1-12) of each entry."""
+        return self.entry_dates.astype('datetime64[M]').astype(np.int64) % 12 + 1
+
 
 class AnalyticsEngine:
     """
@@ -54,8 +109,46 @@ class AnalyticsEngine:
         Returns:
             Dictionary of performance metrics
         """
-        # Build query
-        query = self.db.query(Trade).filter(
+        trades = self.load_trade_columns(user_id, start_date, end_date, filters)
+        
+        if not len(trades):
+            return self._empty_metrics()
+        
+        # Calculate metrics
+        return self._calculate_metrics_from_columns(trades, start_date, end_date)
+    
+    def load_trade_columns(
+        self,
+        user_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> TradeColumns:
+        """
+        Fetch the columns needed for analytics in a single query.
+        
+        Only scalar columns are selected, so no Trade objects are loaded
+        into the session. Pass the result to the analysis methods to share
+        one fetch across a dashboard load.
+        
+        Args:
+            user_id: User identifier
+            start_date: Start date for analysis
+            end_date: End date for analysis
+            filters: Optional filters (symbol, setup_type, etc.)
+            
+        Returns:
+            TradeColumns ordered by exit date
+        """
+        query = self.db.query(
+            Trade.net_pnl,
+            Trade.gross_pnl,
+            Trade.entry_commission,
+            Trade.exit_commission,
+            Trade.symbol,
+            Trade.setup_type,
+            Trade.entry_date
+        ).filter(
             Trade.user_id == user_id,
             Trade.entry_date >= start_date,
             Trade.entry_date <= end_date,
@@ -74,13 +167,37 @@ class AnalyticsEngine:
             if 'market_condition' in filters:
                 query = query.filter(Trade.market_condition == filters['market_condition'])
         
-        trades = query.all()
-        
-        if not trades:
-            return self._empty_metrics()
+        # Drawdown and streaks need trades in close order
+        rows = query.order_by(
+            func.coalesce(Trade.exit_date, Trade.entry_date),
+            Trade.id
+        ).all()
         
-        # Calculate metrics
-        return self._calculate_metrics_from_trades(trades, start_date, end_date)
+        if not rows:
+            return TradeColumns(
+                net_pnl=np.empty(0, dtype=np.float64),
+                gross_pnl=np.empty(0, dtype=np.float64),
+                commissions=np.empty(0, dtype=np.float64),
+                symbols=np.empty(0, dtype=object),
+                setup_types=np.empty(0, dtype=object),
+                entry_dates=np.empty(0, dtype='datetime64[us]')
+            )
+        
+        net_pnl, gross_pnl, entry_comm, exit_comm, symbols, setup_types, entry_dates = zip(*rows)
+        return TradeColumns(
+            net_pnl=np.array(net_pnl, dtype=np.float64),
+            gross_pnl=np.array([g or 0.0 for g in gross_pnl], dtype=np.float64),
+            commissions=np.array(
+                [(e or 0) + (x or 0) for e, x in zip(entry_comm, exit_comm)],
+                dtype=np.float64
+            ),
+            symbols=np.array(symbols, dtype=object),
+            setup_types=np.array(
+                [st.value if st is not None else None for st in setup_types],
+                dtype=object
+            ),
+            entry_dates=np.array(entry_dates, dtype='datetime64[us]')
+        )
     
     def _empty_metrics(self) -> Dict[str, Any]:
         """Return empty metrics structure."""
@@ -106,59 +223,55 @@ class AnalyticsEngine:
             'total_commissions': 0.0
         }
     
-    def _calculate_metrics_from_trades(
+    def _calculate_metrics_from_columns(
         self,
-        trades: List[Trade],
+        trades: TradeColumns,
         start_date: datetime,
         end_date: datetime
     ) -> Dict[str, Any]:
-        """Calculate all metrics from trade list."""
-        winning_trades = [t for t in trades if t.net_pnl > 0]
-        losing_trades = [t for t in trades if t.net_pnl <= 0]
+        """Calculate all metrics from columnar trades."""
+        pnl = trades.net_pnl
+        wins = pnl > 0
         
         # Basic metrics
-        total_trades = len(trades)
-        winning_count = len(winning_trades)
-        losing_count = len(losing_trades)
+        total_trades = len(pnl)
+        winning_count = int(wins.sum())
+        losing_count = total_trades - winning_count
         win_rate = (winning_count / total_trades * 100) if total_trades > 0 else 0.0
         
         # P&L metrics
-        gross_pnl = sum(t.gross_pnl for t in trades if t.gross_pnl)
-        net_pnl = sum(t.net_pnl for t in trades if t.net_pnl)
+        gross_pnl = float(trades.gross_pnl.sum())
+        net_pnl = float(pnl.sum())
         average_pnl = net_pnl / total_trades if total_trades > 0 else 0.0
         
-        total_wins = sum(t.net_pnl for t in winning_trades) if winning_trades else 0.0
-        total_losses = abs(sum(t.net_pnl for t in losing_trades)) if losing_trades else 0.0
+        total_wins = float(pnl[wins].sum())
+        total_losses = abs(float(pnl[~wins].sum()))
         
         average_win = total_wins / winning_count if winning_count > 0 else 0.0
         average_loss = -total_losses / losing_count if losing_count > 0 else 0.0
         
-        all_pnls = [t.net_pnl for t in trades if t.net_pnl is not None]
-        largest_win = max(all_pnls) if all_pnls else 0.0
-        largest_loss = min(all_pnls) if all_pnls else 0.0
+        largest_win = float(pnl.max()) if total_trades else 0.0
+        largest_loss = float(pnl.min()) if total_trades else 0.0
         
         # Advanced metrics
         profit_factor = total_wins / total_losses if total_losses > 0 else 0.0
         expectancy = (win_rate / 100 * average_win) - ((1 - win_rate / 100) * abs(average_loss))
         
         # Sharpe ratio (simplified)
-        if len(all_pnls) > 1:
-            returns_std = stdev(all_pnls)
+        if total_trades > 1:
+            returns_std = float(pnl.std(ddof=1))
             sharpe_ratio = (average_pnl / returns_std) if returns_std > 0 else 0.0
         else:
             sharpe_ratio = 0.0
         
         # Max drawdown
-        max_drawdown = self._calculate_max_drawdown(trades)
+        max_drawdown = self._calculate_max_drawdown(pnl)
         
         # Streaks
-        win_streak, loss_streak = self._calculate_streaks(trades)
+        win_streak, loss_streak = self._calculate_streaks(wins)
         
         # Commissions
-        total_commissions = sum(
-            (t.entry_commission or 0) + (t.exit_commission or 0) 
-            for t in trades
-        )
+        total_commissions = float(trades.commissions.sum())
         
         return {
             'period_start': start_date.isoformat(),
@@ -183,73 +296,68 @@ class AnalyticsEngine:
             'total_commissions': round(total_commissions, 2)
         }
     
-    def _calculate_max_drawdown(self, trades: List[Trade]) -> float:
-        """Calculate maximum drawdown."""
-        if not trades:
+    def _calculate_max_drawdown(self, pnl: np.ndarray) -> float:
+        """Calculate maximum drawdown from P&L in close order."""
+        if not len(pnl):
             return 0.0
         
-        # Sort by exit date
-        sorted_trades = sorted(trades, key=lambda t: t.exit_date or t.entry_date)
-        
-        cumulative_pnl = 0.0
-        peak = 0.0
-        max_drawdown = 0.0
+        cumulative_pnl = np.cumsum(pnl)
+        # Peak equity starts at zero before the first trade
+        peak = np.maximum.accumulate(np.maximum(cumulative_pnl, 0.0))
         
-        for trade in sorted_trades:
-            cumulative_pnl += trade.net_pnl or 0
-            
-            if cumulative_pnl > peak:
-                peak = cumulative_pnl
-            
-            drawdown = peak - cumulative_pnl
-            if drawdown > max_drawdown:
-                max_drawdown = drawdown
-        
-        return max_drawdown
+        return max(0.0, float((peak - cumulative_pnl).max()))
     
-    def _calculate_streaks(self, trades: List[Trade]) -> Tuple[int, int]:
-        """Calculate max winning and losing streaks."""
-        if not trades:
+    def _calculate_streaks(self, wins: np.ndarray) -> Tuple[int, int]:
+        """Calculate max winning and losing streaks from win flags in close order."""
+        if not len(wins):
             return 0, 0
         
-        sorted_trades = sorted(trades, key=lambda t: t.exit_date or t.entry_date)
+        # Run boundaries wherever the outcome flips
+        boundaries = np.concatenate((
+            [0],
+            np.flatnonzero(wins[1:] != wins[:-1]) + 1,
+            [len(wins)]
+        ))
+        lengths = np.diff(boundaries)
+        run_is_win = wins[boundaries[:-1]]
         
-        current_streak = 0
-        current_type = None
-        max_win_streak = 0
-        max_loss_streak = 0
+        max_win_streak = int(lengths[run_is_win].max()) if run_is_win.any() else 0
+        max_loss_streak = int(lengths[~run_is_win].max()) if not run_is_win.all() else 0
         
-        for trade in sorted_trades:
-            is_win = trade.net_pnl > 0
-            
-            if current_type is None:
-                current_type = 'win' if is_win else 'loss'
-                current_streak = 1
-            elif (current_type == 'win' and is_win) or (current_type == 'loss' and not is_win):
-                current_streak += 1
-            else:
-                if current_type == 'win':
-                    max_win_streak = max(max_win_streak, current_streak)
-                else:
-                    max_loss_streak = max(max_loss_streak, current_streak)
-                
-                current_type = 'win' if is_win else 'loss'
-                current_streak = 1
+        return max_win_streak, max_loss_streak
+    
+    def _group_metrics(
+        self,
+        trades: TradeColumns,
+        keys: np.ndarray,
+        start_date: datetime,
+        end_date: datetime
+    ) -> Dict[Any, Dict[str, Any]]:
+        """
+        Calculate metrics per group key.
         
-        # Check final streak
-        if current_type == 'win':
-            max_win_streak = max(max_win_streak, current_streak)
-        else:
-            max_loss_streak = max(max_loss_streak, current_streak)
+        Groups are formed with a stable sort so each group keeps close order.
+        """
+        if not len(trades):
+            return {}
         
-        return max_win_streak, max_loss_streak
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        order = np.argsort(inverse, kind='stable')
+        splits = np.cumsum(np.bincount(inverse, minlength=len(unique_keys)))[:-1]
+        
+        return {
+            key.item() if isinstance(key, np.generic) else key:
+                self._calculate_metrics_from_columns(trades.take(rows), start_date, end_date)
+            for key, rows in zip(unique_keys, np.split(order, splits))
+        }
     
     def analyze_by_symbol(
         self,
         user_id: str,
         start_date: datetime,
         end_date: datetime,
-        min_trades: int = 3
+        min_trades: int = 3,
+        trades: Optional[TradeColumns] = None
     ) -> Dict[str, Any]:
         """
         Analyze performance by symbol.
@@ -259,31 +367,20 @@ class AnalyticsEngine:
             start_date: Start date
             end_date: End date
             min_trades: Minimum trades per symbol
+            trades: Optional pre-loaded columns from load_trade_columns
             
         Returns:
             Symbol performance analysis
         """
-        trades = self.db.query(Trade).filter(
-            Trade.user_id == user_id,
-            Trade.entry_date >= start_date,
-            Trade.entry_date <= end_date,
-            Trade.status == TradeStatus.CLOSED,
-            Trade.net_pnl.isnot(None)
-        ).all()
+        if trades is None:
+            trades = self.load_trade_columns(user_id, start_date, end_date)
         
-        # Group by symbol
-        symbol_trades = defaultdict(list)
-        for trade in trades:
-            symbol_trades[trade.symbol].append(trade)
+        # Drop symbols below the minimum before computing their metrics
+        symbols, counts = np.unique(trades.symbols, return_counts=True)
+        trades = trades.take(np.isin(trades.symbols, symbols[counts >= min_trades]))
         
         # Calculate metrics per symbol
-        results = {}
-        for symbol, sym_trades in symbol_trades.items():
-            if len(sym_trades) < min_trades:
-                continue
-            
-            metrics = self._calculate_metrics_from_trades(sym_trades, start_date, end_date)
-            results[symbol] = metrics
+        results = self._group_metrics(trades, trades.symbols, start_date, end_date)
         
         # Sort by profitability
         sorted_results = dict(sorted(
@@ -303,7 +400,8 @@ class AnalyticsEngine:
         self,
         user_id: str,
         start_date: datetime,
-        end_date: datetime
+        end_date: datetime,
+        trades: Optional[TradeColumns] = None
     ) -> Dict[str, Any]:
         """
         Analyze performance by setup type.
@@ -312,29 +410,18 @@ class AnalyticsEngine:
             user_id: User identifier
             start_date: Start date
             end_date: End date
+            trades: Optional pre-loaded columns from load_trade_columns
             
         Returns:
             Setup type performance analysis
         """
-        trades = self.db.query(Trade).filter(
-            Trade.user_id == user_id,
-            Trade.entry_date >= start_date,
-            Trade.entry_date <= end_date,
-            Trade.status == TradeStatus.CLOSED,
-            Trade.setup_type.isnot(None),
-            Trade.net_pnl.isnot(None)
-        ).all()
+        if trades is None:
+            trades = self.load_trade_columns(user_id, start_date, end_date)
         
-        # Group by setup type
-        setup_trades = defaultdict(list)
-        for trade in trades:
-            setup_trades[trade.setup_type.value].append(trade)
+        trades = trades.take(trades.setup_types != None)  # noqa: E711
         
         # Calculate metrics per setup
-        results = {}
-        for setup, setup_list in setup_trades.items():
-            metrics = self._calculate_metrics_from_trades(setup_list, start_date, end_date)
-            results[setup] = metrics
+        results = self._group_metrics(trades, trades.setup_types, start_date, end_date)
         
         return {
             'by_setup': results,
@@ -345,7 +432,8 @@ class AnalyticsEngine:
         self,
         user_id: str,
         start_date: datetime,
-        end_date: datetime
+        end_date: datetime,
+        trades: Optional[TradeColumns] = None
     ) -> Dict[str, Any]:
         """
         Analyze performance by time of day.
@@ -354,29 +442,17 @@ class AnalyticsEngine:
             user_id: User identifier
             start_date: Start date
             end_date: End date
+            trades: Optional pre-loaded columns from load_trade_columns
             
         Returns:
             Time of day performance analysis
         """
-        trades = self.db.query(Trade).filter(
-            Trade.user_id == user_id,
-            Trade.entry_date >= start_date,
-            Trade.entry_date <= end_date,
-            Trade.status == TradeStatus.CLOSED,
-            Trade.net_pnl.isnot(None)
-        ).all()
-        
-        # Group by hour
-        hourly_trades = defaultdict(list)
-        for trade in trades:
-            hour = trade.entry_date.hour
-            hourly_trades[hour].append(trade)
+        if trades is None:
+            trades = self.load_trade_columns(user_id, start_date, end_date)
         
         # Calculate metrics per hour
-        results = {}
-        for hour, hour_trades in hourly_trades.items():
-            metrics = self._calculate_metrics_from_trades(hour_trades, start_date, end_date)
-            results[f"{hour:02d}:00"] = metrics
+        hourly = self._group_metrics(trades, trades.entry_hours, start_date, end_date)
+        results = {f"{hour:02d}:00": metrics for hour, metrics in hourly.items()}
         
         # Find best hours
         sorted_hours = sorted(
@@ -395,7 +471,8 @@ class AnalyticsEngine:
         self,
         user_id: str,
         start_date: datetime,
-        end_date: datetime
+        end_date: datetime,
+        trades: Optional[TradeColumns] = None
     ) -> Dict[str, Any]:
         """
         Analyze performance by day of week.
@@ -404,31 +481,17 @@ class AnalyticsEngine:
             user_id: User identifier
             start_date: Start date
             end_date: End date
+            trades: Optional pre-loaded columns from load_trade_columns
             
         Returns:
             Day of week performance analysis
         """
-        trades = self.db.query(Trade).filter(
-            Trade.user_id == user_id,
-            Trade.entry_date >= start_date,
-            Trade.entry_date <= end_date,
-            Trade.status == TradeStatus.CLOSED,
-            Trade.net_pnl.isnot(None)
-        ).all()
-        
-        # Group by day of week
-        day_trades = defaultdict(list)
-        day_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        
-        for trade in trades:
-            day = day_names[trade.entry_date.weekday()]
-            day_trades[day].append(trade)
+        if trades is None:
+            trades = self.load_trade_columns(user_id, start_date, end_date)
         
         # Calculate metrics per day
-        results = {}
-        for day, day_list in day_trades.items():
-            metrics = self._calculate_metrics_from_trades(day_list, start_date, end_date)
-            results[day] = metrics
+        daily = self._group_metrics(trades, trades.entry_weekdays, start_date, end_date)
+        results = {DAY_NAMES[day]: metrics for day, metrics in daily.items()}
         
         return {
             'by_day': results,
@@ -436,6 +499,42 @@ class AnalyticsEngine:
             'worst_day': min(results.items(), key=lambda x: x[1]['net_pnl'])[0] if results else None
         }
     
+    def get_dashboard_analytics(
+        self,
+        user_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        min_trades: int = 3
+    ) -> Dict[str, Any]:
+        """
+        Calculate every dashboard breakdown from a single trade fetch.
+        
+        Args:
+            user_id: User identifier
+            start_date: Start date
+            end_date: End date
+            min_trades: Minimum trades per symbol
+            
+        Returns:
+            Performance metrics with symbol, setup, hour and weekday breakdowns
+        """
+        trades = self.load_trade_columns(user_id, start_date, end_date)
+        
+        performance = (
+            self._calculate_metrics_from_columns(trades, start_date, end_date)
+            if len(trades) else self._empty_metrics()
+        )
+        
+        return {
+            'performance': performance,
+            'by_symbol': self.analyze_by_symbol(
+                user_id, start_date, end_date, min_trades=min_trades, trades=trades
+            ),
+            'by_setup': self.analyze_by_setup_type(user_id, start_date, end_date, trades=trades),
+            'by_time_of_day': self.analyze_by_time_of_day(user_id, start_date, end_date, trades=trades),
+            'by_day_of_week': self.analyze_by_day_of_week(user_id, start_date, end_date, trades=trades)
+        }
+    
     def generate_equity_curve(
         self,
         user_id: str,
@@ -453,7 +552,11 @@ class AnalyticsEngine:
         Returns:
             List of equity curve data points
         """
-        trades = self.db.query(Trade).filter(
+        rows = self.db.query(
+            Trade.exit_date,
+            Trade.entry_date,
+            Trade.net_pnl
+        ).filter(
             Trade.user_id == user_id,
             Trade.entry_date >= start_date,
             Trade.entry_date <= end_date,
@@ -464,11 +567,11 @@ class AnalyticsEngine:
         equity_curve = []
         cumulative_pnl = 0.0
         
-        for trade in trades:
-            cumulative_pnl += trade.net_pnl or 0
+        for exit_date, entry_date, net_pnl in rows:
+            cumulative_pnl += net_pnl or 0
             equity_curve.append({
-                'date': (trade.exit_date or trade.entry_date).isoformat(),
-                'trade_pnl': round(trade.net_pnl or 0, 2),
+                'date': (exit_date or entry_date).isoformat(),
+                'trade_pnl': round(net_pnl or 0, 2),
                 'cumulative_pnl': round(cumulative_pnl, 2)
             })
         
@@ -492,37 +595,22 @@ class AnalyticsEngine:
         start_date = datetime(year, 1, 1)
         end_date = datetime(year, 12, 31, 23, 59, 59)
         
-        trades = self.db.query(Trade).filter(
-            Trade.user_id == user_id,
-            Trade.entry_date >= start_date,
-            Trade.entry_date <= end_date,
-            Trade.status == TradeStatus.CLOSED,
-            Trade.net_pnl.isnot(None)
-        ).all()
-        
-        # Group by month
-        monthly_trades = defaultdict(list)
-        month_names = [
-            'January', 'February', 'March', 'April', 'May', 'June',
-            'July', 'August', 'September', 'October', 'November', 'December'
-        ]
-        
-        for trade in trades:
-            month = month_names[trade.entry_date.month - 1]
-            monthly_trades[month].append(trade)
+        trades = self.load_trade_columns(user_id, start_date, end_date)
+        months = trades.entry_months
         
         # Calculate metrics per month
         results = {}
-        for month in month_names:
-            if month in monthly_trades:
-                month_start = datetime(year, month_names.index(month) + 1, 1)
-                if month_names.index(month) == 11:
+        for index, month in enumerate(MONTH_NAMES):
+            in_month = months == index + 1
+            if in_month.any():
+                month_start = datetime(year, index + 1, 1)
+                if index == 11:
                     month_end = datetime(year, 12, 31, 23, 59, 59)
                 else:
-                    month_end = datetime(year, month_names.index(month) + 2, 1) - timedelta(seconds=1)
+                    month_end = datetime(year, index + 2, 1) - timedelta(seconds=1)
                 
-                metrics = self._calculate_metrics_from_trades(
-                    monthly_trades[month],
+                metrics = self._calculate_metrics_from_columns(
+                    trades.take(in_month),
                     month_start,
                     month_end
                 )
@@ -531,8 +619,7 @@ class AnalyticsEngine:
                 results[month] = self._empty_metrics()
         
         # Calculate year totals
-        all_trades = [t for trades_list in monthly_trades.values() for t in trades_list]
-        year_metrics = self._calculate_metrics_from_trades(all_trades, start_date, end_date) if all_trades else self._empty_metrics()
+        year_metrics = self._calculate_metrics_from_columns(trades, start_date, end_date) if len(trades) else self._empty_metrics()
         
         return {
             'year': year,
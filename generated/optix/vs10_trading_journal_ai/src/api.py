@@ -6,10 +6,12 @@ including trade management, journal entries, analytics, and AI insights.
 """
 
 import logging
+import os
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
 from fastapi import FastAPI, HTTPException, Depends, Query, BackgroundTasks
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.orm import Session
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import create_engine
@@ -17,7 +19,7 @@ from sqlalchemy.orm import sessionmaker
 
 from .models import (
     TradeCreate, TradeUpdate, TradeResponse,
-    JournalEntryCreate, JournalEntryResponse,
+    JournalEntryCreate, JournalEntryResponse, JournalSearchResult,
     TagCreate, TagResponse,
     WeeklyReviewResponse,
     PerformanceAnalyticsRequest,
@@ -29,7 +31,8 @@ from .pattern_analyzer import PatternAnalyzer
 from .ai_reviewer import AIReviewer
 from .journal_service import JournalService
 from .analytics_engine import AnalyticsEngine
-from .export_service import ExportService
+from .rollups import RollupService
+from .export_service import ExportJob, ExportJobRegistry, ExportService
 
 logger = logging.getLogger(__name__)
 
@@ -298,6 +301,45 @@ async def search_journal_entries(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@app.get("/api/v1/journal/search/hits", response_model=List[JournalSearchResult])
+async def search_journal_hits(
+    user_id: str,
+    query: str,
+    limit: int = 50,
+    db: Session = Depends(get_db)
+):
+    """
+    Search journal entries, ranked, with highlighted snippets.
+    
+    Args:
+        user_id: User identifier
+        query: Search query
+        limit: Maximum results
+        db: Database session
+        
+    Returns:
+        Matching journal entries with scores and snippets
+    """
+    try:
+        journal_service = JournalService(db)
+        hits = journal_service.search_journal_hits(
+            user_id=user_id,
+            search_query=query,
+            limit=limit
+        )
+        return [
+            JournalSearchResult(
+                entry=JournalEntryResponse.model_validate(entry),
+                score=hit.score,
+                snippet=hit.snippet
+            )
+            for entry, hit in hits
+        ]
+    except Exception as e:
+        logger.error(f"Error searching journal entries: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 # Tag endpoints
 @app.post("/api/v1/tags", response_model=TagResponse)
 async def create_tag(
@@ -486,6 +528,40 @@ async def get_setup_analytics(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@app.get("/api/v1/analytics/dashboard")
+async def get_dashboard_analytics(
+    user_id: str,
+    start_date: datetime,
+    end_date: datetime,
+    min_trades: int = 3,
+    db: Session = Depends(get_db)
+):
+    """
+    Get all dashboard analytics from a single trade fetch.
+    
+    Args:
+        user_id: User identifier
+        start_date: Start date
+        end_date: End date
+        min_trades: Minimum trades per symbol
+        db: Database session
+        
+    Returns:
+        Performance metrics with symbol, setup, hour and weekday breakdowns
+    """
+    try:
+        analytics = AnalyticsEngine(db)
+        return analytics.get_dashboard_analytics(
+            user_id=user_id,
+            start_date=start_date,
+            end_date=end_date,
+            min_trades=min_trades
+        )
+    except Exception as e:
+        logger.error(f"Error calculating dashboard analytics: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @app.get("/api/v1/analytics/equity-curve")
 async def get_equity_curve(
     user_id: str,
@@ -518,6 +594,60 @@ async def get_equity_curve(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@app.get("/api/v1/analytics/summary")
+async def get_rollup_summary(
+    user_id: str,
+    start_date: datetime,
+    end_date: datetime,
+    db: Session = Depends(get_db)
+):
+    """
+    Get performance metrics for realized trades from daily/monthly rollups.
+    
+    Args:
+        user_id: User identifier
+        start_date: Start date (day resolution)
+        end_date: End date (day resolution)
+        db: Database session
+        
+    Returns:
+        Performance metrics with daily P&L series
+    """
+    try:
+        rollups = RollupService(db)
+        return {
+            'metrics': rollups.get_performance_metrics(user_id, start_date, end_date),
+            'daily_pnl': rollups.get_daily_pnl(user_id, start_date, end_date)
+        }
+    except Exception as e:
+        logger.error(f"Error reading performance rollups: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/v1/analytics/monthly/{year}")
+async def get_monthly_performance(
+    user_id: str,
+    year: int,
+    db: Session = Depends(get_db)
+):
+    """
+    Get monthly performance for a year from monthly rollups.
+    
+    Args:
+        user_id: User identifier
+        year: Year to analyze
+        db: Database session
+        
+    Returns:
+        Monthly performance breakdown
+    """
+    try:
+        return RollupService(db).get_monthly_performance(user_id, year)
+    except Exception as e:
+        logger.error(f"Error reading monthly rollups: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 # Pattern analysis endpoints
 @app.get("/api/v1/patterns/behavioral")
 async def detect_behavioral_patterns(
@@ -641,36 +771,39 @@ async def get_weekly_reviews(
 async def export_csv(
     user_id: str,
     start_date: datetime,
-    end_date: datetime,
-    db: Session = Depends(get_db)
+    end_date: datetime
 ):
     """
     Export trades to CSV.
     
+    The file is streamed as trades are read, with its own database session
+    held until the last row is sent.
+    
     Args:
         user_id: User identifier
         start_date: Start date
         end_date: End date
-        db: Database session
         
     Returns:
-        CSV file
+        Streamed CSV file
     """
-    try:
-        export_service = ExportService(db)
-        file_path = export_service.export_trades_csv(
-            user_id=user_id,
-            start_date=start_date,
-            end_date=end_date
-        )
-        return FileResponse(
-            file_path,
-            media_type='text/csv',
-            filename=f'trades_{user_id}_{start_date.date()}_to_{end_date.date()}.csv'
-        )
-    except Exception as e:
-        logger.error(f"Error exporting CSV: {e}")
-        raise HTTPException(status_code=400, detail=str(e))
+    def stream():
+        db = SessionLocal()
+        try:
+            yield from ExportService(db).stream_trades_csv(
+                user_id=user_id,
+                start_date=start_date,
+                end_date=end_date
+            )
+        finally:
+            db.close()
+    
+    filename = f'trades_{user_id}_{start_date.date()}_to_{end_date.date()}.csv'
+    return StreamingResponse(
+        stream(),
+        media_type='text/csv',
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
 
 
 @app.get("/api/v1/export/pdf")
@@ -709,6 +842,103 @@ async def export_pdf(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+# Background exports; finished jobs and their files expire
+export_jobs = ExportJobRegistry()
+
+
+def run_export_job(job: ExportJob):
+    """Run a background export with its own database session."""
+    db = SessionLocal()
+    try:
+        ExportService(db).run_export_job(job)
+    finally:
+        db.close()
+
+
+def export_job_status(job: ExportJob) -> Dict[str, Any]:
+    """Summarize an export job for the API."""
+    return {
+        "job_id": job.job_id,
+        "status": job.status,
+        "current_export": job.current_export,
+        "rows_written": job.rows_written,
+        "files": sorted(job.files),
+        "error": job.error
+    }
+
+
+@app.post("/api/v1/export/jobs")
+async def start_export_job(
+    user_id: str,
+    start_date: datetime,
+    end_date: datetime,
+    background_tasks: BackgroundTasks
+):
+    """
+    Start a background export of trades, journal and performance report.
+    
+    Args:
+        user_id: User identifier
+        start_date: Start date
+        end_date: End date
+        background_tasks: Background tasks handler
+        
+    Returns:
+        Export job status
+    """
+    job = ExportJob(user_id=user_id, start_date=start_date, end_date=end_date)
+    if not export_jobs.add(job):
+        raise HTTPException(
+            status_code=429,
+            detail=f"User {user_id} already has {export_jobs.max_active_per_user} exports running"
+        )
+    background_tasks.add_task(run_export_job, job)
+    return export_job_status(job)
+
+
+@app.get("/api/v1/export/jobs/{job_id}")
+async def get_export_job(job_id: str):
+    """
+    Get a background export's progress.
+    
+    Args:
+        job_id: Export job identifier
+        
+    Returns:
+        Export job status
+    """
+    job = export_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Export job {job_id} not found")
+    return export_job_status(job)
+
+
+@app.get("/api/v1/export/jobs/{job_id}/files/{export_type}")
+async def download_export_file(job_id: str, export_type: str):
+    """
+    Download a file of a completed background export.
+    
+    Each file can be downloaded once; it is deleted after it is sent.
+    
+    Args:
+        job_id: Export job identifier
+        export_type: Export type, e.g. trades_csv
+        
+    Returns:
+        Exported file
+    """
+    job = export_jobs.get(job_id)
+    if not job or export_type not in job.files:
+        raise HTTPException(status_code=404, detail=f"Export {export_type} not found")
+    file_path = job.files.pop(export_type)
+    return FileResponse(
+        file_path,
+        filename=os.path.basename(file_path),
+        background=BackgroundTask(job.remove_file, file_path)
+    )
+
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -7,13 +7,16 @@ This module handles exporting data to various formats including CSV and PDF repo
 import logging
 import csv
 import os
-from datetime import datetime
-from typing import List, Dict, Any
+import shutil
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Callable, Iterator, Optional
 from io import StringIO
 import tempfile
 from sqlalchemy.orm import Session
 
-from .models import Trade, TradeStatus
+from .models import JournalEntry, Trade, TradeStatus
 from .analytics_engine import AnalyticsEngine
 
 logger = logging.getLogger(__name__)
@@ -30,6 +33,152 @@ except ImportError:
     logger.warning("ReportLab not installed. PDF export will not be available.")
     PDF_AVAILABLE = False
 
+# Rows fetched per server-side cursor batch, and written per streamed chunk
+EXPORT_BATCH_SIZE = 1000
+
+# CSV columns and the trade columns they are read from
+TRADE_CSV_COLUMNS = {
+    'trade_id': Trade.id,
+    'symbol': Trade.symbol,
+    'direction': Trade.direction,
+    'status': Trade.status,
+    'entry_date': Trade.entry_date,
+    'entry_price': Trade.entry_price,
+    'quantity': Trade.quantity,
+    'exit_date': Trade.exit_date,
+    'exit_price': Trade.exit_price,
+    'gross_pnl': Trade.gross_pnl,
+    'net_pnl': Trade.net_pnl,
+    'pnl_percent': Trade.pnl_percent,
+    'setup_type': Trade.setup_type,
+    'market_condition': Trade.market_condition,
+    'sentiment': Trade.sentiment,
+    'stop_loss': Trade.stop_loss,
+    'take_profit': Trade.take_profit,
+    'risk_reward_ratio': Trade.risk_reward_ratio,
+    'entry_commission': Trade.entry_commission,
+    'exit_commission': Trade.exit_commission
+}
+
+# Columns written even when zero
+REQUIRED_CSV_FIELDS = ('trade_id', 'symbol', 'entry_price', 'quantity', 'entry_commission')
+
+# Called with the export being written and the rows written so far
+ProgressCallback = Callable[[str, int], None]
+
+# Finished export jobs, and their files, are kept this long
+EXPORT_JOB_TTL = timedelta(hours=1)
+
+# Pending or running export jobs allowed per user
+MAX_ACTIVE_EXPORT_JOBS = 2
+
+
+@dataclass
+class ExportJob:
+    """Progress and results of a background export."""
+    user_id: str
+    start_date: datetime
+    end_date: datetime
+    job_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = 'pending'  # pending, running, completed, failed
+    current_export: Optional[str] = None
+    rows_written: int = 0
+    files: Dict[str, str] = field(default_factory=dict)
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    completed_at: Optional[datetime] = None
+    # Temporary directory created for the job's files, if any
+    output_dir: Optional[str] = None
+    
+    @property
+    def finished(self) -> bool:
+        """Whether the job has completed or failed."""
+        return self.status in ('completed', 'failed')
+    
+    def remove_file(self, path: str) -> None:
+        """Delete a file taken from the job, and its directory once empty."""
+        if os.path.exists(path):
+            os.remove(path)
+        if self.output_dir and not self.files:
+            shutil.rmtree(self.output_dir, ignore_errors=True)
+    
+    def remove_files(self) -> None:
+        """Delete all of the job's files."""
+        for path in self.files.values():
+            if os.path.exists(path):
+                os.remove(path)
+        self.files.clear()
+        if self.output_dir:
+            shutil.rmtree(self.output_dir, ignore_errors=True)
+
+
+class ExportJobRegistry:
+    """
+    Background export jobs by ID.
+    
+    Finished jobs expire after a TTL and their files are deleted with
+    them. Each user may only have a few jobs pending or running at once.
+    """
+    
+    def __init__(
+        self,
+        ttl: timedelta = EXPORT_JOB_TTL,
+        max_active_per_user: int = MAX_ACTIVE_EXPORT_JOBS
+    ):
+        """
+        Initialize the registry.
+        
+        Args:
+            ttl: How long finished jobs are kept
+            max_active_per_user: Pending or running jobs allowed per user
+        """
+        self.ttl = ttl
+        self.max_active_per_user = max_active_per_user
+        self._jobs: Dict[str, ExportJob] = {}
+    
+    def __len__(self) -> int:
+        return len(self._jobs)
+    
+    def add(self, job: ExportJob) -> bool:
+        """
+        Register a new job.
+        
+        Returns:
+            False if the user already has the maximum of active jobs
+        """
+        self.evict_expired()
+        active = sum(
+            1 for other in self._jobs.values()
+            if other.user_id == job.user_id and not other.finished
+        )
+        if active >= self.max_active_per_user:
+            return False
+        
+        self._jobs[job.job_id] = job
+        return True
+    
+    def get(self, job_id: str) -> Optional[ExportJob]:
+        """Get a job unless it is unknown or has expired."""
+        self.evict_expired()
+        return self._jobs.get(job_id)
+    
+    def evict_expired(self, now: Optional[datetime] = None) -> int:
+        """
+        Drop finished jobs older than the TTL and delete their files.
+        
+        Returns:
+            Number of jobs evicted
+        """
+        cutoff = (now or datetime.utcnow()) - self.ttl
+        expired = [
+            job for job in self._jobs.values()
+            if job.finished and job.completed_at <= cutoff
+        ]
+        for job in expired:
+            del self._jobs[job.job_id]
+            job.remove_files()
+        return len(expired)
+
 
 class ExportService:
     """
@@ -51,73 +200,113 @@ class ExportService:
         user_id: str,
         start_date: datetime,
         end_date: datetime,
-        output_path: Optional[str] = None
+        output_path: Optional[str] = None,
+        progress: Optional[ProgressCallback] = None
     ) -> str:
         """
         Export trades to CSV file.
         
+        Trades are streamed to the file, so memory use does not grow with
+        the number of trades.
+        
         Args:
             user_id: User identifier
             start_date: Start date
             end_date: End date
             output_path: Optional output file path
+            progress: Optional callback receiving the trades written so far
             
         Returns:
             Path to created CSV file
         """
-        # Get trades
-        trades = self.db.query(Trade).filter(
-            Trade.user_id == user_id,
-            Trade.entry_date >= start_date,
-            Trade.entry_date <= end_date
-        ).order_by(Trade.entry_date).all()
-        
-        # Create CSV
         if not output_path:
             fd, output_path = tempfile.mkstemp(suffix='.csv', prefix='trades_')
             os.close(fd)
         
+        rows = 0
         with open(output_path, 'w', newline='') as csvfile:
-            fieldnames = [
-                'trade_id', 'symbol', 'direction', 'status',
-                'entry_date', 'entry_price', 'quantity',
-                'exit_date', 'exit_price',
-                'gross_pnl', 'net_pnl', 'pnl_percent',
-                'setup_type', 'market_condition', 'sentiment',
-                'stop_loss', 'take_profit', 'risk_reward_ratio',
-                'entry_commission', 'exit_commission'
-            ]
-            
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            
-            for trade in trades:
-                writer.writerow({
-                    'trade_id': trade.id,
-                    'symbol': trade.symbol,
-                    'direction': trade.direction.value,
-                    'status': trade.status.value,
-                    'entry_date': trade.entry_date.isoformat(),
-                    'entry_price': trade.entry_price,
-                    'quantity': trade.quantity,
-                    'exit_date': trade.exit_date.isoformat() if trade.exit_date else '',
-                    'exit_price': trade.exit_price or '',
-                    'gross_pnl': trade.gross_pnl or '',
-                    'net_pnl': trade.net_pnl or '',
-                    'pnl_percent': trade.pnl_percent or '',
-                    'setup_type': trade.setup_type.value if trade.setup_type else '',
-                    'market_condition': trade.market_condition.value if trade.market_condition else '',
-                    'sentiment': trade.sentiment.value if trade.sentiment else '',
-                    'stop_loss': trade.stop_loss or '',
-                    'take_profit': trade.take_profit or '',
-                    'risk_reward_ratio': trade.risk_reward_ratio or '',
-                    'entry_commission': trade.entry_commission,
-                    'exit_commission': trade.exit_commission or ''
-                })
-        
-        logger.info(f"Exported {len(trades)} trades to CSV: {output_path}")
+            for chunk, rows in self._trade_csv_chunks(user_id, start_date, end_date):
+                csvfile.write(chunk)
+                if progress:
+                    progress('trades_csv', rows)
+        
+        logger.info(f"Exported {rows} trades to CSV: {output_path}")
         return output_path
     
+    def stream_trades_csv(
+        self,
+        user_id: str,
+        start_date: datetime,
+        end_date: datetime
+    ) -> Iterator[str]:
+        """
+        Stream trades as CSV text, for a streaming HTTP response.
+        
+        The header is yielded before any trade is read, then trades follow
+        in chunks of EXPORT_BATCH_SIZE rows read through a server-side
+        cursor.
+        
+        Args:
+            user_id: User identifier
+            start_date: Start date
+            end_date: End date
+            
+        Yields:
+            CSV text chunks
+        """
+        for chunk, _ in self._trade_csv_chunks(user_id, start_date, end_date):
+            yield chunk
+    
+    def _trade_csv_chunks(
+        self,
+        user_id: str,
+        start_date: datetime,
+        end_date: datetime
+    ) -> Iterator[tuple]:
+        """Yield (CSV text, rows written so far), header first."""
+        buffer = StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(TRADE_CSV_COLUMNS)
+        yield self._drain(buffer), 0
+        
+        rows = self.db.query(*TRADE_CSV_COLUMNS.values()).filter(
+            Trade.user_id == user_id,
+            Trade.entry_date >= start_date,
+            Trade.entry_date <= end_date
+        ).order_by(Trade.entry_date, Trade.id).yield_per(EXPORT_BATCH_SIZE)
+        
+        written = 0
+        for row in rows:
+            writer.writerow(self._csv_values(row))
+            written += 1
+            if written % EXPORT_BATCH_SIZE == 0:
+                yield self._drain(buffer), written
+        
+        if buffer.tell():
+            yield self._drain(buffer), written
+    
+    @staticmethod
+    def _csv_values(row) -> List[Any]:
+        """Format a trade row for CSV, leaving missing values empty."""
+        values = []
+        for name, value in zip(TRADE_CSV_COLUMNS, row):
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            elif hasattr(value, 'value'):
+                value = value.value
+            if not value and name not in REQUIRED_CSV_FIELDS:
+                value = ''
+            values.append(value)
+        return values
+    
+    @staticmethod
+    def _drain(buffer: StringIO) -> str:
+        """Take the buffered text and reset the buffer."""
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+    
     def export_performance_pdf(
         self,
         user_id: str,
@@ -165,12 +354,14 @@ class ExportService:
         story.append(Paragraph(period_text, styles['Normal']))
         story.append(Spacer(1, 0.3*inch))
         
-        # Get performance metrics
-        metrics = self.analytics.calculate_performance_metrics(
+        # Get performance metrics and breakdowns from a single fetch
+        dashboard = self.analytics.get_dashboard_analytics(
             user_id=user_id,
             start_date=start_date,
-            end_date=end_date
+            end_date=end_date,
+            min_trades=1
         )
+        metrics = dashboard['performance']
         
         # Summary section
         story.append(Paragraph("Performance Summary", styles['Heading2']))
@@ -229,12 +420,7 @@ class ExportService:
         story.append(Spacer(1, 0.3*inch))
         
         # Performance by symbol
-        symbol_analysis = self.analytics.analyze_by_symbol(
-            user_id=user_id,
-            start_date=start_date,
-            end_date=end_date,
-            min_trades=1
-        )
+        symbol_analysis = dashboard['by_symbol']
         
         if symbol_analysis['by_symbol']:
             story.append(PageBreak())
@@ -263,11 +449,7 @@ class ExportService:
             story.append(symbol_table)
         
         # Performance by setup
-        setup_analysis = self.analytics.analyze_by_setup_type(
-            user_id=user_id,
-            start_date=start_date,
-            end_date=end_date
-        )
+        setup_analysis = dashboard['by_setup']
         
         if setup_analysis['by_setup']:
             story.append(Spacer(1, 0.3*inch))
@@ -317,34 +499,36 @@ class ExportService:
         user_id: str,
         start_date: datetime,
         end_date: datetime,
-        output_path: Optional[str] = None
+        output_path: Optional[str] = None,
+        progress: Optional[ProgressCallback] = None
     ) -> str:
         """
         Export journal entries to text file.
         
+        Entries are streamed to the file, newest first, so memory use does
+        not grow with the number of entries.
+        
         Args:
             user_id: User identifier
             start_date: Start date
             end_date: End date
             output_path: Optional output file path
+            progress: Optional callback receiving the entries written so far
             
         Returns:
             Path to created text file
         """
-        from .journal_service import JournalService
-        
-        journal_service = JournalService(self.db)
-        entries = journal_service.get_user_journal_entries(
-            user_id=user_id,
-            start_date=start_date,
-            end_date=end_date,
-            limit=1000
-        )
+        entries = self.db.query(JournalEntry).filter(
+            JournalEntry.user_id == user_id,
+            JournalEntry.entry_date >= start_date,
+            JournalEntry.entry_date <= end_date
+        ).order_by(JournalEntry.entry_date.desc(), JournalEntry.id.desc()).yield_per(EXPORT_BATCH_SIZE)
         
         if not output_path:
             fd, output_path = tempfile.mkstemp(suffix='.txt', prefix='journal_')
             os.close(fd)
         
+        count = 0
         with open(output_path, 'w') as f:
             f.write("=" * 80 + "\n")
             f.write(f"Trading Journal Entries\n")
@@ -352,45 +536,60 @@ class ExportService:
             f.write("=" * 80 + "\n\n")
             
             for entry in entries:
-                f.write(f"Date: {entry.entry_date.strftime('%Y-%m-%d %H:%M:%S')}\n")
-                if entry.title:
-                    f.write(f"Title: {entry.title}\n")
-                if entry.trade_id:
-                    f.write(f"Trade ID: {entry.trade_id}\n")
-                
-                # Mood ratings
-                if entry.mood_rating or entry.confidence_level or entry.discipline_rating:
-                    f.write("\nRatings:\n")
-                    if entry.mood_rating:
-                        f.write(f"  Mood: {entry.mood_rating}/10\n")
-                    if entry.confidence_level:
-                        f.write(f"  Confidence: {entry.confidence_level}/10\n")
-                    if entry.discipline_rating:
-                        f.write(f"  Discipline: {entry.discipline_rating}/10\n")
-                
-                # Content
-                if entry.content:
-                    f.write(f"\nEntry:\n{entry.content}\n")
-                
-                # Notes
-                if entry.notes:
-                    f.write(f"\nNotes:\n{entry.notes}\n")
-                
-                # AI insights
-                if entry.ai_suggestions:
-                    f.write(f"\nAI Suggestions:\n{entry.ai_suggestions}\n")
-                
-                f.write("\n" + "-" * 80 + "\n\n")
-        
-        logger.info(f"Exported {len(entries)} journal entries to text: {output_path}")
+                f.write(self._journal_entry_text(entry))
+                count += 1
+                if progress and count % EXPORT_BATCH_SIZE == 0:
+                    progress('journal_text', count)
+        
+        if progress:
+            progress('journal_text', count)
+        
+        logger.info(f"Exported {count} journal entries to text: {output_path}")
         return output_path
     
+    @staticmethod
+    def _journal_entry_text(entry: JournalEntry) -> str:
+        """Format a journal entry for the text export."""
+        lines = []
+        lines.append(f"Date: {entry.entry_date.strftime('%Y-%m-%d %H:%M:%S')}\n")
+        if entry.title:
+            lines.append(f"Title: {entry.title}\n")
+        if entry.trade_id:
+            lines.append(f"Trade ID: {entry.trade_id}\n")
+        
+        # Mood ratings
+        if entry.mood_rating or entry.confidence_level or entry.discipline_rating:
+            lines.append("\nRatings:\n")
+            if entry.mood_rating:
+                lines.append(f"  Mood: {entry.mood_rating}/10\n")
+            if entry.confidence_level:
+                lines.append(f"  Confidence: {entry.confidence_level}/10\n")
+            if entry.discipline_rating:
+                lines.append(f"  Discipline: {entry.discipline_rating}/10\n")
+        
+        # Content
+        if entry.content:
+            lines.append(f"\nEntry:\n{entry.content}\n")
+        
+        # Notes
+        if entry.notes:
+            lines.append(f"\nNotes:\n{entry.notes}\n")
+        
+        # AI insights
+        if entry.ai_suggestions:
+            lines.append(f"\nAI Suggestions:\n{entry.ai_suggestions}\n")
+        
+        lines.append("\n" + "-" * 80 + "\n\n")
+        
+        return "".join(lines)
+    
     def export_all_data(
         self,
         user_id: str,
         start_date: datetime,
         end_date: datetime,
-        output_dir: Optional[str] = None
+        output_dir: Optional[str] = None,
+        progress: Optional[ProgressCallback] = None
     ) -> Dict[str, str]:
         """
         Export all data (trades, journal, reports) to multiple files.
@@ -400,6 +599,7 @@ class ExportService:
             start_date: Start date
             end_date: End date
             output_dir: Optional output directory
+            progress: Optional callback receiving each export's rows written so far
             
         Returns:
             Dictionary mapping export types to file paths
@@ -417,11 +617,14 @@ class ExportService:
             user_id=user_id,
             start_date=start_date,
             end_date=end_date,
-            output_path=csv_path
+            output_path=csv_path,
+            progress=progress
         )
         
         # Export performance PDF
         if PDF_AVAILABLE:
+            if progress:
+                progress('performance_pdf', 0)
             pdf_path = os.path.join(output_dir, 'performance_report.pdf')
             exports['performance_pdf'] = self.export_performance_pdf(
                 user_id=user_id,
@@ -436,8 +639,46 @@ class ExportService:
             user_id=user_id,
             start_date=start_date,
             end_date=end_date,
-            output_path=journal_path
+            output_path=journal_path,
+            progress=progress
         )
         
         logger.info(f"Exported all data to directory: {output_dir}")
         return exports
+    
+    def run_export_job(self, job: ExportJob, output_dir: Optional[str] = None) -> ExportJob:
+        """
+        Run a full export as a background job, recording its progress.
+        
+        Args:
+            job: Job to run; updated in place as exports are written
+            output_dir: Optional output directory
+            
+        Returns:
+            The finished job
+        """
+        def progress(export: str, rows: int):
+            job.current_export = export
+            job.rows_written = rows
+        
+        if not output_dir:
+            output_dir = job.output_dir = tempfile.mkdtemp(prefix='trading_journal_export_')
+        
+        job.status = 'running'
+        try:
+            job.files = self.export_all_data(
+                user_id=job.user_id,
+                start_date=job.start_date,
+                end_date=job.end_date,
+                output_dir=output_dir,
+                progress=progress
+            )
+            job.status = 'completed'
+        except Exception as e:
+            logger.error(f"Export job {job.job_id} failed: {e}")
+            job.status = 'failed'
+            job.error = str(e)
+        finally:
+            job.completed_at = datetime.utcnow()
+        
+        return job
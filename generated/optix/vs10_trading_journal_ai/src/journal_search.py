@@ -0,0 +1,355 @@
+"""
+Journal Search Module for Trading Journal AI.
+
+This module maintains a full-text index over journal entries and the tags
+of their trades, with stemming, prefix matching, relevance ranking and
+highlighted snippets. SQLite uses an FTS5 virtual table and PostgreSQL a
+weighted tsvector with a GIN index; other databases fall back to LIKE
+matching.
+"""
+
+import logging
+import re
+import weakref
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from .models import JournalEntry
+
+logger = logging.getLogger(__name__)
+
+# Words of a search query; everything else is ignored
+TERM_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_END = '</mark>'
+
+# Entries read per batch when building an index from existing entries
+REBUILD_BATCH_SIZE = 1000
+
+# Engines whose search index is known to exist
+_indexed_binds: 'weakref.WeakSet' = weakref.WeakSet()
+
+
+def query_terms(search_query: str) -> List[str]:
+    """Lowercased words of a search query."""
+    return TERM_PATTERN.findall(search_query.lower())
+
+
+def entry_tags(entry: JournalEntry) -> str:
+    """Space separated tag names of an entry's trade."""
+    if entry.trade is None:
+        return ''
+    return ' '.join(tag.name for tag in entry.trade.tags)
+
+
+@dataclass
+class SearchHit:
+    """A matching journal entry with its relevance and snippet."""
+    entry_id: int
+    score: float
+    snippet: Optional[str] = None
+
+
+class JournalSearchBackend(ABC):
+    """
+    Full-text index over journal entries.
+    
+    Entries are indexed in the caller's transaction, so the index commits
+    or rolls back together with the entry change. The index itself is
+    created and filled in its own transaction.
+    """
+    
+    def __init__(self, db_session: Session):
+        """
+        Initialize the search backend.
+        
+        Args:
+            db_session: SQLAlchemy database session
+        """
+        self.db = db_session
+    
+    def ensure_index(self) -> None:
+        """
+        Create the index if needed, filling it from existing entries.
+        
+        This commits on a separate connection, so the index survives the
+        caller's session being closed without a commit.
+        """
+        bind = self.db.get_bind()
+        if bind in _indexed_binds:
+            return
+        
+        with bind.begin() as connection:
+            with Session(bind=connection) as index_session:
+                builder = type(self)(index_session)
+                if builder._create_index():
+                    builder.rebuild()
+        _indexed_binds.add(bind)
+    
+    def rebuild(self, user_id: Optional[str] = None) -> int:
+        """
+        Re-index existing entries.
+        
+        Args:
+            user_id: Optional user to re-index; all users when omitted
+        
+        Returns:
+            Number of entries indexed
+        """
+        query = self.db.query(JournalEntry)
+        if user_id:
+            query = query.filter(JournalEntry.user_id == user_id)
+        
+        count = 0
+        for entry in query.order_by(JournalEntry.id).yield_per(REBUILD_BATCH_SIZE):
+            self.index_entry(entry)
+            count += 1
+        
+        logger.info(f"Indexed {count} journal entries for search")
+        return count
+    
+    @abstractmethod
+    def _create_index(self) -> bool:
+        """Create the index storage; returns True if it was newly created."""
+    
+    @abstractmethod
+    def index_entry(self, entry: JournalEntry) -> None:
+        """Add or replace an entry in the index."""
+    
+    @abstractmethod
+    def remove_entry(self, entry_id: int) -> None:
+        """Remove an entry from the index."""
+    
+    @abstractmethod
+    def search(self, user_id: str, search_query: str, limit: int = 50) -> List[SearchHit]:
+        """
+        Search a user's entries.
+        
+        Args:
+            user_id: User identifier
+            search_query: Words to match; every word must match, as a prefix
+            limit: Maximum number of results
+        
+        Returns:
+            Hits, most relevant first
+        """
+
+
+class SQLiteFTSSearchBackend(JournalSearchBackend):
+    """
+    SQLite FTS5 index with Porter stemming and BM25 ranking.
+    
+    The index is its own FTS5 table keyed by entry id (rowid).
+    """
+    
+    TABLE = 'journal_entries_fts'
+    
+    # bm25() column weights: user_id (unindexed), title, content, notes, tags
+    WEIGHTS = (0.0, 5.0, 1.0, 1.0, 3.0)
+    
+    SNIPPET_TOKENS = 16
+    
+    def _create_index(self) -> bool:
+        exists = self.db.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {'name': self.TABLE}
+        ).first()
+        if exists:
+            return False
+        
+        self.db.execute(text(
+            f"CREATE VIRTUAL TABLE {self.TABLE} USING fts5("
+            "user_id UNINDEXED, title, content, notes, tags, "
+            "tokenize = 'porter unicode61')"
+        ))
+        return True
+    
+    def index_entry(self, entry: JournalEntry) -> None:
+        self.remove_entry(entry.id)
+        self.db.execute(
+            text(
+                f"INSERT INTO {self.TABLE} (rowid, user_id, title, content, notes, tags) "
+                "VALUES (:id, :user_id, :title, :content, :notes, :tags)"
+            ),
+            {
+                'id': entry.id,
+                'user_id': entry.user_id,
+                'title': entry.title or '',
+                'content': entry.content or '',
+                'notes': entry.notes or '',
+                'tags': entry_tags(entry)
+            }
+        )
+    
+    def remove_entry(self, entry_id: int) -> None:
+        self.db.execute(text(f"DELETE FROM {self.TABLE} WHERE rowid = :id"), {'id': entry_id})
+    
+    def search(self, user_id: str, search_query: str, limit: int = 50) -> List[SearchHit]:
+        terms = query_terms(search_query)
+        if not terms:
+            return []
+        
+        weights = ', '.join(str(weight) for weight in self.WEIGHTS)
+        rows = self.db.execute(
+            text(
+                f"SELECT rowid, bm25({self.TABLE}, {weights}) AS rank, "
+                f"snippet({self.TABLE}, -1, :start, :end, '...', {self.SNIPPET_TOKENS}) "
+                f"FROM {self.TABLE} "
+                f"WHERE {self.TABLE} MATCH :query AND user_id = :user_id "
+                "ORDER BY rank LIMIT :limit"
+            ),
+            {
+                'query': ' '.join(f'"{term}"*' for term in terms),
+                'user_id': user_id,
+                'start': HIGHLIGHT_START,
+                'end': HIGHLIGHT_END,
+                'limit': limit
+            }
+        )
+        # bm25() is lower for better matches
+        return [SearchHit(entry_id, -rank, snippet) for entry_id, rank, snippet in rows]
+
+
+class PostgresSearchBackend(JournalSearchBackend):
+    """
+    PostgreSQL full-text index with English stemming and cover density
+    ranking.
+    
+    A side table holds a weighted tsvector per entry (title A, tags B,
+    content and notes C) under a GIN index.
+    """
+    
+    TABLE = 'journal_entry_search'
+    
+    HEADLINE_OPTIONS = (
+        f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, MaxWords=24, MinWords=8"
+    )
+    
+    def _create_index(self) -> bool:
+        exists = self.db.execute(
+            text("SELECT to_regclass(:name)"), {'name': self.TABLE}
+        ).scalar()
+        if exists:
+            return False
+        
+        self.db.execute(text(
+            f"CREATE TABLE {self.TABLE} ("
+            "entry_id INTEGER PRIMARY KEY REFERENCES journal_entries (id) ON DELETE CASCADE, "
+            "user_id VARCHAR(50) NOT NULL, "
+            "body TEXT NOT NULL, "
+            "document TSVECTOR NOT NULL)"
+        ))
+        self.db.execute(text(
+            f"CREATE INDEX ix_{self.TABLE}_document ON {self.TABLE} USING GIN (document)"
+        ))
+        self.db.execute(text(
+            f"CREATE INDEX ix_{self.TABLE}_user_id ON {self.TABLE} (user_id)"
+        ))
+        return True
+    
+    def index_entry(self, entry: JournalEntry) -> None:
+        self.db.execute(
+            text(
+                f"INSERT INTO {self.TABLE} (entry_id, user_id, body, document) "
+                "VALUES (:id, :user_id, :body, "
+                "setweight(to_tsvector('english', :title), 'A') || "
+                "setweight(to_tsvector('english', :tags), 'B') || "
+                "setweight(to_tsvector('english', :text), 'C')) "
+                "ON CONFLICT (entry_id) DO UPDATE SET "
+                "user_id = EXCLUDED.user_id, body = EXCLUDED.body, document = EXCLUDED.document"
+            ),
+            {
+                'id': entry.id,
+                'user_id': entry.user_id,
+                'body': '\n'.join(filter(None, [entry.title, entry.content, entry.notes])),
+                'title': entry.title or '',
+                'tags': entry_tags(entry),
+                'text': f"{entry.content or ''} {entry.notes or ''}"
+            }
+        )
+    
+    def remove_entry(self, entry_id: int) -> None:
+        self.db.execute(text(f"DELETE FROM {self.TABLE} WHERE entry_id = :id"), {'id': entry_id})
+    
+    def search(self, user_id: str, search_query: str, limit: int = 50) -> List[SearchHit]:
+        terms = query_terms(search_query)
+        if not terms:
+            return []
+        
+        rows = self.db.execute(
+            text(
+                "SELECT entry_id, ts_rank_cd(document, query) AS rank, "
+                "ts_headline('english', body, query, :options) "
+                f"FROM {self.TABLE}, to_tsquery('english', :query) AS query "
+                "WHERE user_id = :user_id AND document @@ query "
+                "ORDER BY rank DESC LIMIT :limit"
+            ),
+            {
+                'query': ' & '.join(f'{term}:*' for term in terms),
+                'options': self.HEADLINE_OPTIONS,
+                'user_id': user_id,
+                'limit': limit
+            }
+        )
+        return [SearchHit(entry_id, rank, snippet) for entry_id, rank, snippet in rows]
+
+
+class LikeSearchBackend(JournalSearchBackend):
+    """
+    Unindexed fallback matching the whole query inside title, content or
+    notes, newest entries first.
+    """
+    
+    def _create_index(self) -> bool:
+        return False
+    
+    def index_entry(self, entry: JournalEntry) -> None:
+        # Matches against the entries table directly; nothing to index
+        pass
+    
+    def remove_entry(self, entry_id: int) -> None:
+        pass
+    
+    def search(self, user_id: str, search_query: str, limit: int = 50) -> List[SearchHit]:
+        entry_ids = self.db.query(JournalEntry.id).filter(
+            JournalEntry.user_id == user_id,
+            JournalEntry.title.contains(search_query) |
+            JournalEntry.content.contains(search_query) |
+            JournalEntry.notes.contains(search_query)
+        ).order_by(JournalEntry.entry_date.desc()).limit(limit)
+        return [SearchHit(entry_id, 0.0) for (entry_id,) in entry_ids]
+
+
+def create_search_backend(db_session: Session) -> JournalSearchBackend:
+    """
+    Create the search backend for a session's database, with its index
+    ready.
+    
+    Args:
+        db_session: SQLAlchemy database session
+    
+    Returns:
+        FTS5 backend on SQLite, tsvector backend on PostgreSQL, LIKE
+        fallback elsewhere or when SQLite lacks FTS5
+    """
+    dialect = db_session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        backend = SQLiteFTSSearchBackend(db_session)
+    elif dialect == 'postgresql':
+        backend = PostgresSearchBackend(db_session)
+    else:
+        return LikeSearchBackend(db_session)
+    
+    try:
+        backend.ensure_index()
+    except OperationalError as e:
+        logger.warning(f"Full-text search unavailable, using LIKE matching: {e}")
+        return LikeSearchBackend(db_session)
+    
+    return backend
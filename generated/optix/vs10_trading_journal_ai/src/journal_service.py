@@ -6,8 +6,8 @@ insights generation for individual journal entries.
 """
 
 import logging
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
@@ -15,6 +15,7 @@ from .models import (
     JournalEntry, Trade, Tag, JournalEntryCreate,
     JournalEntryResponse, TagCreate, TagResponse
 )
+from .journal_search import JournalSearchBackend, SearchHit, create_search_backend
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +33,9 @@ class JournalService:
             db_session: SQLAlchemy database session
         """
         self.db = db_session
+        
+        # Set up before any writes, as creating the index commits separately
+        self.search_backend: JournalSearchBackend = create_search_backend(db_session)
     
     def create_journal_entry(
         self,
@@ -74,6 +78,8 @@ class JournalService:
             entry.ai_suggestions = self._generate_entry_suggestions(entry)
         
         self.db.add(entry)
+        self.db.flush()
+        self.search_backend.index_entry(entry)
         self.db.commit()
         self.db.refresh(entry)
         
@@ -122,6 +128,7 @@ class JournalService:
                 entry.ai_insights = self._generate_entry_insights(entry)
                 entry.ai_suggestions = self._generate_entry_suggestions(entry)
         
+        self.search_backend.index_entry(entry)
         self.db.commit()
         self.db.refresh(entry)
         
@@ -151,6 +158,7 @@ class JournalService:
         if not entry:
             raise ValueError(f"Journal entry {entry_id} not found")
         
+        self.search_backend.remove_entry(entry.id)
         self.db.delete(entry)
         self.db.commit()
         
@@ -399,6 +407,7 @@ class JournalService:
         
         if tag not in trade.tags:
             trade.tags.append(tag)
+            self._reindex_trade_entries(trade)
             self.db.commit()
         
         logger.info(f"Added tag {tag_id} to trade {trade_id}")
@@ -439,6 +448,7 @@ class JournalService:
         
         if tag in trade.tags:
             trade.tags.remove(tag)
+            self._reindex_trade_entries(trade)
             self.db.commit()
         
         logger.info(f"Removed tag {tag_id} from trade {trade_id}")
@@ -451,7 +461,7 @@ class JournalService:
         limit: int = 50
     ) -> List[JournalEntry]:
         """
-        Search journal entries by content.
+        Search journal entries by title, content, notes and trade tags.
         
         Args:
             user_id: User identifier
@@ -459,22 +469,49 @@ class JournalService:
             limit: Maximum number of results
             
         Returns:
-            List of matching journal entries
+            List of matching journal entries, most relevant first
         """
-        query = self.db.query(JournalEntry).filter(
-            JournalEntry.user_id == user_id
-        )
+        return [entry for entry, _ in self.search_journal_hits(user_id, search_query, limit)]
+    
+    def search_journal_hits(
+        self,
+        user_id: str,
+        search_query: str,
+        limit: int = 50
+    ) -> List[Tuple[JournalEntry, SearchHit]]:
+        """
+        Search journal entries, with relevance scores and highlighted snippets.
         
-        # Search in title, content, and notes
-        search_filter = (
-            JournalEntry.title.contains(search_query) |
-            JournalEntry.content.contains(search_query) |
-            JournalEntry.notes.contains(search_query)
-        )
+        Every word of the query must match, as a word prefix, after
+        stemming (e.g. "stop los" matches "stopped losses").
         
-        query = query.filter(search_filter)
+        Args:
+            user_id: User identifier
+            search_query: Search query string
+            limit: Maximum number of results
+            
+        Returns:
+            List of (entry, hit) pairs, most relevant first
+        """
+        hits = self.search_backend.search(user_id, search_query, limit)
+        if not hits:
+            return []
+        
+        entries = {
+            entry.id: entry
+            for entry in self.db.query(JournalEntry).filter(
+                JournalEntry.id.in_([hit.entry_id for hit in hits]),
+                JournalEntry.user_id == user_id
+            )
+        }
         
-        return query.order_by(JournalEntry.entry_date.desc()).limit(limit).all()
+        # Entries removed outside this service may linger in the index
+        return [(entries[hit.entry_id], hit) for hit in hits if hit.entry_id in entries]
+    
+    def _reindex_trade_entries(self, trade: Trade):
+        """Re-index a trade's journal entries after its tags change."""
+        for entry in trade.journal_entries:
+            self.search_backend.index_entry(entry)
     
     def get_mood_trend(
         self,
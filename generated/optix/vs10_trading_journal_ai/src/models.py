@@ -12,7 +12,8 @@ from typing import Optional, List, Dict, Any
 from pydantic import BaseModel, Field, validator
 from sqlalchemy import (
     Column, Integer, String, Float, DateTime, Text, 
-    ForeignKey, Table, Boolean, JSON, Enum as SQLEnum
+    ForeignKey, Table, Boolean, JSON, Enum as SQLEnum,
+    UniqueConstraint
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
@@ -287,6 +288,81 @@ class PerformanceMetric(Base):
         return f"<PerformanceMetric {self.metric_type}:{self.metric_key}>"
 
 
+class PerformanceRollup(Base):
+    """
+    Incrementally maintained per-user P&L rollup for one day or month.
+    
+    Closed trades are bucketed by realization date (exit date). Besides
+    additive sums the row keeps the running cumulative P&L extremes and the
+    leading/trailing streaks of the bucket, so consecutive buckets can be
+    combined into drawdown and streak figures without reading trades.
+    """
+    __tablename__ = 'performance_rollups'
+    __table_args__ = (
+        UniqueConstraint('user_id', 'period_type', 'period_start', name='uq_rollup_period'),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(String(50), nullable=False, index=True)
+    
+    # Bucket
+    period_type = Column(String(10), nullable=False)  # day, month
+    period_start = Column(DateTime, nullable=False, index=True)
+    
+    # Additive aggregates
+    total_trades = Column(Integer, default=0)
+    winning_trades = Column(Integer, default=0)
+    losing_trades = Column(Integer, default=0)
+    gross_pnl = Column(Float, default=0.0)
+    net_pnl = Column(Float, default=0.0)
+    win_pnl = Column(Float, default=0.0)
+    loss_pnl = Column(Float, default=0.0)
+    pnl_sum_squares = Column(Float, default=0.0)
+    total_commissions = Column(Float, default=0.0)
+    max_pnl = Column(Float)
+    min_pnl = Column(Float)
+    
+    # Path aggregates (cumulative P&L measured from the bucket start)
+    peak_cumulative_pnl = Column(Float, default=0.0)
+    trough_cumulative_pnl = Column(Float, default=0.0)
+    max_drawdown = Column(Float, default=0.0)
+    first_streak = Column(Integer, default=0)  # signed: +wins / -losses
+    last_streak = Column(Integer, default=0)
+    max_win_streak = Column(Integer, default=0)
+    max_loss_streak = Column(Integer, default=0)
+    last_exit_date = Column(DateTime)
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<PerformanceRollup {self.user_id} {self.period_type}:{self.period_start}>"
+
+
+class TradeSyncState(Base):
+    """
+    Per-user, per-broker trade sync high-water mark.
+    
+    Trade syncs resume from last_synced_at instead of re-reading a fixed
+    lookback window. The state advances in the same transaction as the
+    imported trades.
+    """
+    __tablename__ = 'trade_sync_states'
+    __table_args__ = (
+        UniqueConstraint('user_id', 'broker_id', name='uq_trade_sync_state'),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(String(50), nullable=False, index=True)
+    broker_id = Column(String(50), nullable=False)
+    last_synced_at = Column(DateTime, nullable=False)
+    trades_imported = Column(Integer, default=0)
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<TradeSyncState {self.user_id}:{self.broker_id} {self.last_synced_at}>"
+
+
 # Pydantic schemas for API
 class TradeCreate(BaseModel):
     """Schema for creating a trade."""
@@ -401,6 +477,13 @@ class JournalEntryResponse(BaseModel):
         from_attributes = True
 
 
+class JournalSearchResult(BaseModel):
+    """Schema for a journal search hit with its highlighted snippet."""
+    entry: JournalEntryResponse
+    score: float
+    snippet: Optional[str] = None
+
+
 class TagCreate(BaseModel):
     """Schema for creating a tag."""
     user_id: str
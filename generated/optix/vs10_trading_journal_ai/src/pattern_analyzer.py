@@ -11,7 +11,7 @@ from typing import List, Dict, Any, Optional, Tuple
 from collections import defaultdict
 from statistics import mean, median, stdev
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from sqlalchemy import func, and_, or_, case, extract
 
 from .models import (
     Trade, TradeStatus, SetupType, MarketCondition, 
@@ -35,29 +35,41 @@ class PatternAnalyzer:
         """
         self.db = db_session
     
-    def analyze_setup_performance(
+    def _grouped_pnl_query(
         self,
+        group_column,
         user_id: str,
-        start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None,
-        min_trades: int = 3
-    ) -> Dict[str, Any]:
+        start_date: Optional[datetime],
+        end_date: Optional[datetime]
+    ):
         """
-        Analyze performance by setup type.
+        Build a GROUP BY query of P&L aggregates for closed trades.
+        
+        Each row is (key, trades, wins, total_pnl, win_pnl, loss_pnl,
+        max_pnl, min_pnl), so trades are never loaded as ORM objects.
         
         Args:
+            group_column: Column or expression to group by
             user_id: User identifier
             start_date: Optional start date
             end_date: Optional end date
-            min_trades: Minimum trades required for analysis
             
         Returns:
-            Dictionary with setup performance analysis
+            SQLAlchemy query
         """
-        query = self.db.query(Trade).filter(
+        is_win = Trade.net_pnl > 0
+        query = self.db.query(
+            group_column,
+            func.count(Trade.id),
+            func.sum(case((is_win, 1), else_=0)),
+            func.sum(Trade.net_pnl),
+            func.sum(case((is_win, Trade.net_pnl), else_=0.0)),
+            func.sum(case((is_win, 0.0), else_=Trade.net_pnl)),
+            func.max(Trade.net_pnl),
+            func.min(Trade.net_pnl)
+        ).filter(
             Trade.user_id == user_id,
             Trade.status == TradeStatus.CLOSED,
-            Trade.setup_type.isnot(None),
             Trade.net_pnl.isnot(None)
         )
         
@@ -66,61 +78,58 @@ class PatternAnalyzer:
         if end_date:
             query = query.filter(Trade.entry_date <= end_date)
         
-        trades = query.all()
-        
-        # Group by setup type
-        setup_stats = defaultdict(lambda: {
-            'trades': [],
-            'winning_trades': 0,
-            'losing_trades': 0,
-            'total_pnl': 0.0,
-            'pnl_list': []
-        })
+        return query.group_by(group_column)
+    
+    def analyze_setup_performance(
+        self,
+        user_id: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        min_trades: int = 3
+    ) -> Dict[str, Any]:
+        """
+        Analyze performance by setup type.
         
-        for trade in trades:
-            setup = trade.setup_type.value
-            stats = setup_stats[setup]
-            
-            stats['trades'].append(trade)
-            stats['pnl_list'].append(trade.net_pnl)
-            stats['total_pnl'] += trade.net_pnl
+        Args:
+            user_id: User identifier
+            start_date: Optional start date
+            end_date: Optional end date
+            min_trades: Minimum trades required for analysis
             
-            if trade.net_pnl > 0:
-                stats['winning_trades'] += 1
-            else:
-                stats['losing_trades'] += 1
+        Returns:
+            Dictionary with setup performance analysis
+        """
+        query = self._grouped_pnl_query(
+            Trade.setup_type, user_id, start_date, end_date
+        ).filter(Trade.setup_type.isnot(None))
         
         # Calculate metrics
         results = {}
-        for setup, stats in setup_stats.items():
-            total_trades = len(stats['trades'])
-            
+        for setup, total_trades, wins, total_pnl, win_pnl, loss_pnl, max_pnl, min_pnl in query.all():
             if total_trades < min_trades:
                 continue
             
-            win_rate = (stats['winning_trades'] / total_trades * 100) if total_trades > 0 else 0
-            avg_pnl = stats['total_pnl'] / total_trades if total_trades > 0 else 0
+            losses = total_trades - wins
+            win_rate = (wins / total_trades * 100) if total_trades > 0 else 0
+            avg_pnl = total_pnl / total_trades if total_trades > 0 else 0
             
-            winning_pnls = [t.net_pnl for t in stats['trades'] if t.net_pnl > 0]
-            losing_pnls = [t.net_pnl for t in stats['trades'] if t.net_pnl <= 0]
+            avg_win = win_pnl / wins if wins else 0
+            avg_loss = loss_pnl / losses if losses else 0
             
-            avg_win = mean(winning_pnls) if winning_pnls else 0
-            avg_loss = mean(losing_pnls) if losing_pnls else 0
+            profit_factor = abs(win_pnl / loss_pnl) if losses and loss_pnl != 0 else 0
             
-            profit_factor = abs(sum(winning_pnls) / sum(losing_pnls)) if losing_pnls and sum(losing_pnls) != 0 else 0
-            
-            results[setup] = {
+            results[setup.value] = {
                 'total_trades': total_trades,
-                'winning_trades': stats['winning_trades'],
-                'losing_trades': stats['losing_trades'],
+                'winning_trades': wins,
+                'losing_trades': losses,
                 'win_rate': round(win_rate, 2),
-                'total_pnl': round(stats['total_pnl'], 2),
+                'total_pnl': round(total_pnl, 2),
                 'average_pnl': round(avg_pnl, 2),
                 'average_win': round(avg_win, 2),
                 'average_loss': round(avg_loss, 2),
                 'profit_factor': round(profit_factor, 2),
-                'max_win': round(max(stats['pnl_list']), 2) if stats['pnl_list'] else 0,
-                'max_loss': round(min(stats['pnl_list']), 2) if stats['pnl_list'] else 0
+                'max_win': round(max_pnl, 2),
+                'max_loss': round(min_pnl, 2)
             }
         
         # Sort by profitability
@@ -154,53 +163,22 @@ class PatternAnalyzer:
         Returns:
             Dictionary with time-of-day analysis
         """
-        query = self.db.query(Trade).filter(
-            Trade.user_id == user_id,
-            Trade.status == TradeStatus.CLOSED,
-            Trade.net_pnl.isnot(None)
+        query = self._grouped_pnl_query(
+            extract('hour', Trade.entry_date), user_id, start_date, end_date
         )
         
-        if start_date:
-            query = query.filter(Trade.entry_date >= start_date)
-        if end_date:
-            query = query.filter(Trade.entry_date <= end_date)
-        
-        trades = query.all()
-        
-        # Group by hour
-        hourly_stats = defaultdict(lambda: {
-            'trades': 0,
-            'wins': 0,
-            'losses': 0,
-            'total_pnl': 0.0,
-            'pnl_list': []
-        })
-        
-        for trade in trades:
-            hour = trade.entry_date.hour
-            stats = hourly_stats[hour]
-            
-            stats['trades'] += 1
-            stats['pnl_list'].append(trade.net_pnl)
-            stats['total_pnl'] += trade.net_pnl
-            
-            if trade.net_pnl > 0:
-                stats['wins'] += 1
-            else:
-                stats['losses'] += 1
-        
         # Calculate metrics
         results = {}
-        for hour, stats in hourly_stats.items():
-            win_rate = (stats['wins'] / stats['trades'] * 100) if stats['trades'] > 0 else 0
-            avg_pnl = stats['total_pnl'] / stats['trades'] if stats['trades'] > 0 else 0
+        for hour, trades, wins, total_pnl, *_ in query.all():
+            win_rate = (wins / trades * 100) if trades > 0 else 0
+            avg_pnl = total_pnl / trades if trades > 0 else 0
             
-            results[f"{hour:02d}:00"] = {
-                'total_trades': stats['trades'],
-                'wins': stats['wins'],
-                'losses': stats['losses'],
+            results[f"{int(hour):02d}:00"] = {
+                'total_trades': trades,
+                'wins': wins,
+                'losses': trades - wins,
                 'win_rate': round(win_rate, 2),
-                'total_pnl': round(stats['total_pnl'], 2),
+                'total_pnl': round(total_pnl, 2),
                 'average_pnl': round(avg_pnl, 2)
             }
         
@@ -279,47 +257,20 @@ class PatternAnalyzer:
         Returns:
             Dictionary with market condition analysis
         """
-        query = self.db.query(Trade).filter(
-            Trade.user_id == user_id,
-            Trade.status == TradeStatus.CLOSED,
-            Trade.market_condition.isnot(None),
-            Trade.net_pnl.isnot(None)
-        )
-        
-        if start_date:
-            query = query.filter(Trade.entry_date >= start_date)
-        if end_date:
-            query = query.filter(Trade.entry_date <= end_date)
-        
-        trades = query.all()
-        
-        # Group by market condition
-        condition_stats = defaultdict(lambda: {
-            'trades': 0,
-            'wins': 0,
-            'total_pnl': 0.0
-        })
-        
-        for trade in trades:
-            condition = trade.market_condition.value
-            stats = condition_stats[condition]
-            
-            stats['trades'] += 1
-            stats['total_pnl'] += trade.net_pnl
-            
-            if trade.net_pnl > 0:
-                stats['wins'] += 1
+        query = self._grouped_pnl_query(
+            Trade.market_condition, user_id, start_date, end_date
+        ).filter(Trade.market_condition.isnot(None))
         
         # Calculate metrics
         results = {}
-        for condition, stats in condition_stats.items():
-            win_rate = (stats['wins'] / stats['trades'] * 100) if stats['trades'] > 0 else 0
+        for condition, trades, wins, total_pnl, *_ in query.all():
+            win_rate = (wins / trades * 100) if trades > 0 else 0
             
-            results[condition] = {
-                'total_trades': stats['trades'],
-                'wins': stats['wins'],
+            results[condition.value] = {
+                'total_trades': trades,
+                'wins': wins,
                 'win_rate': round(win_rate, 2),
-                'total_pnl': round(stats['total_pnl'], 2)
+                'total_pnl': round(total_pnl, 2)
             }
         
         return {
@@ -0,0 +1,651 @@
+"""
+Performance Rollups Module for Trading Journal AI.
+
+This module maintains daily and monthly per-user P&L rollups so that
+performance summaries can be answered by combining a bounded number of
+rollup rows instead of scanning the full trade history.
+"""
+
+import argparse
+import logging
+import math
+import os
+from dataclasses import dataclass, fields
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple, Iterable
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import Session, sessionmaker
+
+from .models import Base, Trade, TradeStatus, PerformanceRollup
+
+logger = logging.getLogger(__name__)
+
+PERIOD_DAY = 'day'
+PERIOD_MONTH = 'month'
+
+MONTH_NAMES = [
+    'January', 'February', 'March', 'April', 'May', 'June',
+    'July', 'August', 'September', 'October', 'November', 'December'
+]
+
+
+def realized_date(trade: Trade) -> datetime:
+    """Date a closed trade's P&L is realized on."""
+    return trade.exit_date or trade.entry_date
+
+
+def day_start(value: datetime) -> datetime:
+    """Start of the day containing value."""
+    return datetime(value.year, value.month, value.day)
+
+
+def month_start(value: datetime) -> datetime:
+    """Start of the month containing value."""
+    return datetime(value.year, value.month, 1)
+
+
+def next_month(value: datetime) -> datetime:
+    """Start of the month after value's month."""
+    if value.month == 12:
+        return datetime(value.year + 1, 1, 1)
+    return datetime(value.year, value.month + 1, 1)
+
+
+@dataclass
+class RollupSummary:
+    """
+    Combinable summary of an ordered sequence of closed trades.
+    
+    Sums combine by addition. Cumulative P&L extremes, drawdown and the
+    leading/trailing streaks combine left to right, so summaries of
+    consecutive periods can be merged into the summary of the whole range.
+    """
+    total_trades: int = 0
+    winning_trades: int = 0
+    losing_trades: int = 0
+    gross_pnl: float = 0.0
+    net_pnl: float = 0.0
+    win_pnl: float = 0.0
+    loss_pnl: float = 0.0
+    pnl_sum_squares: float = 0.0
+    total_commissions: float = 0.0
+    max_pnl: Optional[float] = None
+    min_pnl: Optional[float] = None
+    peak_cumulative_pnl: float = 0.0
+    trough_cumulative_pnl: float = 0.0
+    max_drawdown: float = 0.0
+    first_streak: int = 0
+    last_streak: int = 0
+    max_win_streak: int = 0
+    max_loss_streak: int = 0
+    last_exit_date: Optional[datetime] = None
+    
+    @classmethod
+    def from_rollup(cls, rollup: PerformanceRollup) -> 'RollupSummary':
+        """Load a summary from a rollup row."""
+        return cls(**{f.name: getattr(rollup, f.name) for f in fields(cls)})
+    
+    def to_rollup(self, rollup: PerformanceRollup) -> None:
+        """Store the summary on a rollup row."""
+        for f in fields(self):
+            setattr(rollup, f.name, getattr(self, f.name))
+    
+    def add_trade(
+        self,
+        net_pnl: float,
+        gross_pnl: Optional[float] = None,
+        commissions: float = 0.0,
+        exit_date: Optional[datetime] = None
+    ) -> None:
+        """Append a trade closed after every trade already in the summary."""
+        is_win = net_pnl > 0
+        
+        self.total_trades += 1
+        self.gross_pnl += gross_pnl or 0.0
+        self.net_pnl += net_pnl
+        self.pnl_sum_squares += net_pnl * net_pnl
+        self.total_commissions += commissions
+        self.max_pnl = net_pnl if self.max_pnl is None else max(self.max_pnl, net_pnl)
+        self.min_pnl = net_pnl if self.min_pnl is None else min(self.min_pnl, net_pnl)
+        if is_win:
+            self.winning_trades += 1
+            self.win_pnl += net_pnl
+        else:
+            self.losing_trades += 1
+            self.loss_pnl += net_pnl
+        
+        # Drawdown against the running peak
+        self.peak_cumulative_pnl = max(self.peak_cumulative_pnl, self.net_pnl)
+        self.trough_cumulative_pnl = min(self.trough_cumulative_pnl, self.net_pnl)
+        self.max_drawdown = max(self.max_drawdown, self.peak_cumulative_pnl - self.net_pnl)
+        
+        # Streaks
+        step = 1 if is_win else -1
+        single_run = abs(self.first_streak) == self.total_trades - 1
+        if self.last_streak * step > 0:
+            self.last_streak += step
+        else:
+            self.last_streak = step
+        if single_run and self.first_streak * step >= 0:
+            self.first_streak = self.last_streak
+        self._track_streak(self.last_streak)
+        
+        if exit_date is not None:
+            self.last_exit_date = exit_date
+    
+    def combine(self, later: 'RollupSummary') -> 'RollupSummary':
+        """Summary of this period followed by a later one."""
+        if not self.total_trades:
+            return RollupSummary(**later.__dict__)
+        if not later.total_trades:
+            return RollupSummary(**self.__dict__)
+        
+        merged = RollupSummary(
+            total_trades=self.total_trades + later.total_trades,
+            winning_trades=self.winning_trades + later.winning_trades,
+            losing_trades=self.losing_trades + later.losing_trades,
+            gross_pnl=self.gross_pnl + later.gross_pnl,
+            net_pnl=self.net_pnl + later.net_pnl,
+            win_pnl=self.win_pnl + later.win_pnl,
+            loss_pnl=self.loss_pnl + later.loss_pnl,
+            pnl_sum_squares=self.pnl_sum_squares + later.pnl_sum_squares,
+            total_commissions=self.total_commissions + later.total_commissions,
+            max_pnl=max(self.max_pnl, later.max_pnl),
+            min_pnl=min(self.min_pnl, later.min_pnl),
+            peak_cumulative_pnl=max(
+                self.peak_cumulative_pnl, self.net_pnl + later.peak_cumulative_pnl
+            ),
+            trough_cumulative_pnl=min(
+                self.trough_cumulative_pnl, self.net_pnl + later.trough_cumulative_pnl
+            ),
+            max_drawdown=max(
+                self.max_drawdown,
+                later.max_drawdown,
+                self.peak_cumulative_pnl - (self.net_pnl + later.trough_cumulative_pnl)
+            ),
+            first_streak=self.first_streak,
+            last_streak=later.last_streak,
+            max_win_streak=max(self.max_win_streak, later.max_win_streak),
+            max_loss_streak=max(self.max_loss_streak, later.max_loss_streak),
+            last_exit_date=later.last_exit_date or self.last_exit_date
+        )
+        
+        # A run crossing the boundary joins the trailing and leading streaks
+        if self.last_streak * later.first_streak > 0:
+            if abs(self.first_streak) == self.total_trades:
+                merged.first_streak = self.first_streak + later.first_streak
+            if abs(later.last_streak) == later.total_trades:
+                merged.last_streak = self.last_streak + later.last_streak
+            merged._track_streak(self.last_streak + later.first_streak)
+        
+        return merged
+    
+    def _track_streak(self, streak: int) -> None:
+        """Record a signed streak length in the max streak counters."""
+        if streak > 0:
+            self.max_win_streak = max(self.max_win_streak, streak)
+        elif streak < 0:
+            self.max_loss_streak = max(self.max_loss_streak, -streak)
+    
+    def to_metrics(self, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
+        """Performance metrics in the AnalyticsEngine format."""
+        total_trades = self.total_trades
+        win_rate = (self.winning_trades / total_trades * 100) if total_trades > 0 else 0.0
+        average_pnl = self.net_pnl / total_trades if total_trades > 0 else 0.0
+        
+        total_wins = self.win_pnl
+        total_losses = abs(self.loss_pnl)
+        average_win = total_wins / self.winning_trades if self.winning_trades > 0 else 0.0
+        average_loss = -total_losses / self.losing_trades if self.losing_trades > 0 else 0.0
+        
+        profit_factor = total_wins / total_losses if total_losses > 0 else 0.0
+        expectancy = (win_rate / 100 * average_win) - ((1 - win_rate / 100) * abs(average_loss))
+        
+        # Sharpe ratio (simplified) from the sum of squares
+        if total_trades > 1:
+            variance = (self.pnl_sum_squares - total_trades * average_pnl ** 2) / (total_trades - 1)
+            returns_std = math.sqrt(max(variance, 0.0))
+            sharpe_ratio = (average_pnl / returns_std) if returns_std > 0 else 0.0
+        else:
+            sharpe_ratio = 0.0
+        
+        return {
+            'period_start': start_date.isoformat(),
+            'period_end': end_date.isoformat(),
+            'total_trades': total_trades,
+            'winning_trades': self.winning_trades,
+            'losing_trades': self.losing_trades,
+            'win_rate': round(win_rate, 2),
+            'gross_pnl': round(self.gross_pnl, 2),
+            'net_pnl': round(self.net_pnl, 2),
+            'average_pnl': round(average_pnl, 2),
+            'average_win': round(average_win, 2),
+            'average_loss': round(average_loss, 2),
+            'largest_win': round(self.max_pnl or 0.0, 2),
+            'largest_loss': round(self.min_pnl or 0.0, 2),
+            'profit_factor': round(profit_factor, 2),
+            'expectancy': round(expectancy, 2),
+            'sharpe_ratio': round(sharpe_ratio, 2),
+            'max_drawdown': round(self.max_drawdown, 2),
+            'max_win_streak': self.max_win_streak,
+            'max_loss_streak': self.max_loss_streak,
+            'total_commissions': round(self.total_commissions, 2)
+        }
+
+
+class RollupService:
+    """
+    Maintains and queries daily/monthly performance rollups.
+    
+    Rollups only include closed trades with a net P&L, bucketed by exit date.
+    Changes are added to the session and committed with the caller's trade.
+    """
+    
+    def __init__(self, db_session: Session):
+        """
+        Initialize the rollup service.
+        
+        Args:
+            db_session: SQLAlchemy database session
+        """
+        self.db = db_session
+    
+    def record_trade(
+        self,
+        trade: Trade,
+        previous_exit_date: Optional[datetime] = None
+    ) -> None:
+        """
+        Fold a newly closed trade into its day and month rollups.
+        
+        Trades closing after everything already in a bucket are appended in
+        constant time. Back-dated trades, and trades that were already closed
+        (previous_exit_date set), rebuild only the affected buckets.
+        
+        Args:
+            trade: Trade that was created or updated
+            previous_exit_date: Realization date the trade was previously
+                rolled up under, if it was already closed
+        """
+        self.db.flush()
+        
+        if previous_exit_date is not None:
+            self.rebuild_period(trade.user_id, previous_exit_date)
+        
+        if trade.status != TradeStatus.CLOSED or trade.net_pnl is None:
+            return
+        
+        realized = realized_date(trade)
+        if previous_exit_date is not None:
+            if day_start(realized) != day_start(previous_exit_date):
+                self.rebuild_period(trade.user_id, realized)
+            return
+        
+        day = self._get_or_create(trade.user_id, PERIOD_DAY, day_start(realized))
+        month = self._get_or_create(trade.user_id, PERIOD_MONTH, month_start(realized))
+        
+        for rollup in (day, month):
+            if rollup.last_exit_date is not None and realized < rollup.last_exit_date:
+                self.rebuild_period(trade.user_id, realized)
+                return
+        
+        for rollup in (day, month):
+            summary = RollupSummary.from_rollup(rollup)
+            summary.add_trade(
+                net_pnl=trade.net_pnl,
+                gross_pnl=trade.gross_pnl,
+                commissions=(trade.entry_commission or 0) + (trade.exit_commission or 0),
+                exit_date=realized
+            )
+            summary.to_rollup(rollup)
+    
+    def rebuild_period(self, user_id: str, when: datetime) -> None:
+        """
+        Rebuild the day rollup containing when from trades, then its month
+        rollup from the month's day rollups.
+        
+        Args:
+            user_id: User identifier
+            when: Any time within the day to rebuild
+        """
+        self.db.flush()
+        
+        start = day_start(when)
+        rows = self._closed_trade_rows(user_id, start, start + timedelta(days=1))
+        day = self._get_or_create(user_id, PERIOD_DAY, start)
+        self._summarize_rows(rows).to_rollup(day)
+        self.db.flush()
+        
+        first = month_start(when)
+        days = self.db.query(PerformanceRollup).filter(
+            PerformanceRollup.user_id == user_id,
+            PerformanceRollup.period_type == PERIOD_DAY,
+            PerformanceRollup.period_start >= first,
+            PerformanceRollup.period_start < next_month(first)
+        ).order_by(PerformanceRollup.period_start).all()
+        
+        month = self._get_or_create(user_id, PERIOD_MONTH, first)
+        self._combine(RollupSummary.from_rollup(d) for d in days).to_rollup(month)
+    
+    def rebuild_periods(self, user_id: str, dates: Iterable[datetime]) -> None:
+        """
+        Rebuild the day rollups containing dates, then each affected month
+        once.
+        
+        Used after bulk changes, where rebuilding the touched buckets is
+        cheaper than folding in trades one at a time.
+        
+        Args:
+            user_id: User identifier
+            dates: Times within the days to rebuild
+        """
+        self.db.flush()
+        
+        days = sorted({day_start(when) for when in dates})
+        if not days:
+            return
+        
+        # One pass over the trades spanning every affected day
+        rows_by_day: Dict[datetime, List[Tuple]] = {start: [] for start in days}
+        for row in self._closed_trade_rows(user_id, days[0], days[-1] + timedelta(days=1)):
+            day_rows = rows_by_day.get(day_start(row[0]))
+            if day_rows is not None:
+                day_rows.append(row)
+        
+        for start, rows in rows_by_day.items():
+            self._summarize_rows(rows).to_rollup(
+                self._get_or_create(user_id, PERIOD_DAY, start)
+            )
+        self.db.flush()
+        
+        for first in sorted({month_start(start) for start in days}):
+            month_days = self.db.query(PerformanceRollup).filter(
+                PerformanceRollup.user_id == user_id,
+                PerformanceRollup.period_type == PERIOD_DAY,
+                PerformanceRollup.period_start >= first,
+                PerformanceRollup.period_start < next_month(first)
+            ).order_by(PerformanceRollup.period_start).all()
+            
+            month = self._get_or_create(user_id, PERIOD_MONTH, first)
+            self._combine(RollupSummary.from_rollup(d) for d in month_days).to_rollup(month)
+    
+    def backfill(self, user_id: Optional[str] = None, batch_size: int = 5000) -> int:
+        """
+        Rebuild all rollups from existing trades.
+        
+        Trades are streamed in realization order, so memory is bounded by the
+        number of buckets rather than the number of trades.
+        
+        Args:
+            user_id: Optional user to backfill; all users when omitted
+            batch_size: Rows fetched per round trip
+        
+        Returns:
+            Number of rollup rows written
+        """
+        delete = self.db.query(PerformanceRollup)
+        query = self.db.query(
+            Trade.user_id,
+            func.coalesce(Trade.exit_date, Trade.entry_date),
+            Trade.net_pnl,
+            Trade.gross_pnl,
+            Trade.entry_commission,
+            Trade.exit_commission
+        ).filter(
+            Trade.status == TradeStatus.CLOSED,
+            Trade.net_pnl.isnot(None)
+        )
+        if user_id:
+            delete = delete.filter(PerformanceRollup.user_id == user_id)
+            query = query.filter(Trade.user_id == user_id)
+        delete.delete(synchronize_session=False)
+        
+        buckets: Dict[Tuple[str, str, datetime], RollupSummary] = {}
+        query = query.order_by(
+            Trade.user_id,
+            func.coalesce(Trade.exit_date, Trade.entry_date),
+            Trade.id
+        ).yield_per(batch_size)
+        
+        for owner, realized, net_pnl, gross_pnl, entry_comm, exit_comm in query:
+            for key in (
+                (owner, PERIOD_DAY, day_start(realized)),
+                (owner, PERIOD_MONTH, month_start(realized))
+            ):
+                summary = buckets.get(key)
+                if summary is None:
+                    summary = buckets[key] = RollupSummary()
+                summary.add_trade(net_pnl, gross_pnl, (entry_comm or 0) + (exit_comm or 0), realized)
+        
+        for (owner, period_type, period_start), summary in buckets.items():
+            rollup = PerformanceRollup(
+                user_id=owner,
+                period_type=period_type,
+                period_start=period_start
+            )
+            summary.to_rollup(rollup)
+            self.db.add(rollup)
+        
+        self.db.commit()
+        logger.info(f"Backfilled {len(buckets)} performance rollups")
+        return len(buckets)
+    
+    def get_performance_metrics(
+        self,
+        user_id: str,
+        start_date: datetime,
+        end_date: datetime
+    ) -> Dict[str, Any]:
+        """
+        Performance metrics for trades realized between two dates.
+        
+        Whole months are read from month rollups and the partial months at
+        either end from day rollups, so at most ~60 day rows plus one row per
+        month are combined regardless of trade history length. Resolution is
+        one day: both endpoints are widened to whole days.
+        
+        Args:
+            user_id: User identifier
+            start_date: Start date
+            end_date: End date
+        
+        Returns:
+            Dictionary of performance metrics
+        """
+        summary = self._combine(self._range_summaries(user_id, start_date, end_date))
+        return summary.to_metrics(start_date, end_date)
+    
+    def get_monthly_performance(self, user_id: str, year: int) -> Dict[str, Any]:
+        """
+        Monthly performance for a year from month rollups.
+        
+        Args:
+            user_id: User identifier
+            year: Year to analyze
+        
+        Returns:
+            Monthly performance breakdown
+        """
+        rollups = self.db.query(PerformanceRollup).filter(
+            PerformanceRollup.user_id == user_id,
+            PerformanceRollup.period_type == PERIOD_MONTH,
+            PerformanceRollup.period_start >= datetime(year, 1, 1),
+            PerformanceRollup.period_start < datetime(year + 1, 1, 1)
+        ).all()
+        by_month = {r.period_start.month: RollupSummary.from_rollup(r) for r in rollups}
+        
+        results = {}
+        for index, month in enumerate(MONTH_NAMES):
+            first = datetime(year, index + 1, 1)
+            summary = by_month.get(index + 1, RollupSummary())
+            results[month] = summary.to_metrics(first, next_month(first) - timedelta(seconds=1))
+        
+        yearly = self._combine(by_month[m] for m in sorted(by_month))
+        
+        return {
+            'year': year,
+            'monthly': results,
+            'yearly_total': yearly.to_metrics(
+                datetime(year, 1, 1), datetime(year, 12, 31, 23, 59, 59)
+            )
+        }
+    
+    def get_daily_pnl(
+        self,
+        user_id: str,
+        start_date: datetime,
+        end_date: datetime
+    ) -> List[Dict[str, Any]]:
+        """
+        Daily realized P&L series from day rollups.
+        
+        Args:
+            user_id: User identifier
+            start_date: Start date
+            end_date: End date
+        
+        Returns:
+            List of daily P&L points with cumulative P&L
+        """
+        rollups = self.db.query(PerformanceRollup).filter(
+            PerformanceRollup.user_id == user_id,
+            PerformanceRollup.period_type == PERIOD_DAY,
+            PerformanceRollup.period_start >= day_start(start_date),
+            PerformanceRollup.period_start <= end_date,
+            PerformanceRollup.total_trades > 0
+        ).order_by(PerformanceRollup.period_start).all()
+        
+        cumulative_pnl = 0.0
+        points = []
+        for rollup in rollups:
+            cumulative_pnl += rollup.net_pnl
+            points.append({
+                'date': rollup.period_start.date().isoformat(),
+                'trades': rollup.total_trades,
+                'net_pnl': round(rollup.net_pnl, 2),
+                'cumulative_pnl': round(cumulative_pnl, 2)
+            })
+        return points
+    
+    def _range_summaries(
+        self,
+        user_id: str,
+        start_date: datetime,
+        end_date: datetime
+    ) -> List[RollupSummary]:
+        """Rollup summaries covering [start_date, end_date] in order."""
+        first_day = day_start(start_date)
+        last_day = day_start(end_date)
+        
+        # Whole months strictly inside the range
+        inner_start = first_day if first_day.day == 1 else next_month(first_day)
+        inner_end = month_start(last_day + timedelta(days=1))
+        
+        base = self.db.query(PerformanceRollup).filter(PerformanceRollup.user_id == user_id)
+        if inner_start >= inner_end:
+            rows = base.filter(
+                PerformanceRollup.period_type == PERIOD_DAY,
+                PerformanceRollup.period_start >= first_day,
+                PerformanceRollup.period_start <= last_day
+            ).all()
+        else:
+            rows = base.filter(
+                PerformanceRollup.period_type == PERIOD_DAY,
+                PerformanceRollup.period_start >= first_day,
+                PerformanceRollup.period_start < inner_start
+            ).all() + base.filter(
+                PerformanceRollup.period_type == PERIOD_MONTH,
+                PerformanceRollup.period_start >= inner_start,
+                PerformanceRollup.period_start < inner_end
+            ).all() + base.filter(
+                PerformanceRollup.period_type == PERIOD_DAY,
+                PerformanceRollup.period_start >= inner_end,
+                PerformanceRollup.period_start <= last_day
+            ).all()
+        
+        rows.sort(key=lambda r: r.period_start)
+        return [RollupSummary.from_rollup(r) for r in rows]
+    
+    def _combine(self, summaries: Iterable[RollupSummary]) -> RollupSummary:
+        """Combine consecutive summaries in order."""
+        total = RollupSummary()
+        for summary in summaries:
+            total = total.combine(summary)
+        return total
+    
+    def _closed_trade_rows(self, user_id: str, start: datetime, end: datetime) -> List[Tuple]:
+        """Closed trade P&L rows realized in [start, end), in realization order."""
+        realized = func.coalesce(Trade.exit_date, Trade.entry_date)
+        return self.db.query(
+            realized,
+            Trade.net_pnl,
+            Trade.gross_pnl,
+            Trade.entry_commission,
+            Trade.exit_commission
+        ).filter(
+            Trade.user_id == user_id,
+            Trade.status == TradeStatus.CLOSED,
+            Trade.net_pnl.isnot(None),
+            realized >= start,
+            realized < end
+        ).order_by(realized, Trade.id).all()
+    
+    def _summarize_rows(self, rows: List[Tuple]) -> RollupSummary:
+        """Summarize closed trade rows already in realization order."""
+        summary = RollupSummary()
+        for realized, net_pnl, gross_pnl, entry_comm, exit_comm in rows:
+            summary.add_trade(net_pnl, gross_pnl, (entry_comm or 0) + (exit_comm or 0), realized)
+        return summary
+    
+    def _get_or_create(
+        self,
+        user_id: str,
+        period_type: str,
+        period_start: datetime
+    ) -> PerformanceRollup:
+        """Fetch a rollup row, creating an empty one if needed."""
+        rollup = self.db.query(PerformanceRollup).filter(
+            PerformanceRollup.user_id == user_id,
+            PerformanceRollup.period_type == period_type,
+            PerformanceRollup.period_start == period_start
+        ).first()
+        
+        if rollup is None:
+            rollup = PerformanceRollup(
+                user_id=user_id,
+                period_type=period_type,
+                period_start=period_start
+            )
+            RollupSummary().to_rollup(rollup)
+            self.db.add(rollup)
+        
+        return rollup
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Backfill performance rollups from the command line."""
+    parser = argparse.ArgumentParser(description="Backfill trading journal performance rollups")
+    parser.add_argument(
+        '--database-url',
+        default=os.environ.get('DATABASE_URL', 'sqlite:///./trading_journal.db'),
+        help="SQLAlchemy database URL"
+    )
+    parser.add_argument('--user-id', help="Only backfill this user")
+    parser.add_argument('--batch-size', type=int, default=5000, help="Rows fetched per round trip")
+    args = parser.parse_args(argv)
+    
+    logging.basicConfig(level=logging.INFO)
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(engine, tables=[PerformanceRollup.__table__])
+    
+    session = sessionmaker(bind=engine)()
+    try:
+        count = RollupService(session).backfill(args.user_id, batch_size=args.batch_size)
+        print(f"Wrote {count} rollups")
+    finally:
+        session.close()
+
+
+if __name__ == '__main__':
+    main()
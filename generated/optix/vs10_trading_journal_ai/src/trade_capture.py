@@ -7,20 +7,34 @@ syncing with VS-7 (Brokerage Integration System).
 
 import logging
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from decimal import Decimal
 import asyncio
 import aiohttp
+from sqlalchemy import func, insert
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
 from .models import (
-    Trade, TradeDirection, TradeStatus, TradeCreate,
+    Trade, TradeDirection, TradeStatus, TradeCreate, TradeSyncState,
     SetupType, MarketCondition
 )
+from .rollups import RollupService, realized_date
 
 logger = logging.getLogger(__name__)
 
+# Broker trade ids per existence lookup query
+LOOKUP_BATCH_SIZE = 500
+
+# Trade attributes written by bulk imports
+IMPORT_COLUMNS = [
+    'user_id', 'broker_id', 'broker_trade_id', 'symbol', 'direction', 'status',
+    'entry_date', 'entry_price', 'quantity', 'entry_commission',
+    'exit_date', 'exit_price', 'exit_commission', 'gross_pnl', 'net_pnl',
+    'pnl_percent', 'stop_loss', 'take_profit', 'risk_reward_ratio',
+    'setup_type', 'market_condition', 'sentiment', 'metadata'
+]
+
 
 class BrokerageIntegrationClient:
     """Client for interacting with VS-7 Brokerage Integration System."""
@@ -136,7 +150,8 @@ class TradeCapture:
     def __init__(
         self,
         db_session: Session,
-        vs7_client: BrokerageIntegrationClient
+        vs7_client: BrokerageIntegrationClient,
+        rollups: Optional[RollupService] = None
     ):
         """
         Initialize the trade capture service.
@@ -144,9 +159,11 @@ class TradeCapture:
         Args:
             db_session: SQLAlchemy database session
             vs7_client: VS-7 brokerage integration client
+            rollups: Optional rollup service kept in sync with trade changes
         """
         self.db = db_session
         self.vs7_client = vs7_client
+        self.rollups = rollups or RollupService(db_session)
     
     def _normalize_broker_trade(self, broker_trade: Dict[str, Any]) -> TradeCreate:
         """
@@ -249,17 +266,17 @@ class TradeCapture:
                 reward = abs(price_diff)
                 trade.risk_reward_ratio = reward / risk
     
-    def create_trade(self, trade_data: TradeCreate) -> Trade:
+    def _build_trade(self, trade_data: TradeCreate) -> Trade:
         """
-        Create a new trade in the database.
+        Build an open trade from creation data.
         
         Args:
             trade_data: Trade creation data
             
         Returns:
-            Created trade object
+            Unsaved trade object
         """
-        trade = Trade(
+        return Trade(
             user_id=trade_data.user_id,
             broker_id=trade_data.broker_id,
             broker_trade_id=trade_data.broker_trade_id,
@@ -277,9 +294,22 @@ class TradeCapture:
             sentiment=trade_data.sentiment,
             metadata=trade_data.metadata
         )
+    
+    def create_trade(self, trade_data: TradeCreate) -> Trade:
+        """
+        Create a new trade in the database.
+        
+        Args:
+            trade_data: Trade creation data
+            
+        Returns:
+            Created trade object
+        """
+        trade = self._build_trade(trade_data)
         
         try:
             self.db.add(trade)
+            self.rollups.record_trade(trade)
             self.db.commit()
             self.db.refresh(trade)
             logger.info(f"Created trade {trade.id} for {trade.symbol}")
@@ -312,6 +342,11 @@ class TradeCapture:
         if not trade:
             raise ValueError(f"Trade {trade_id} not found")
         
+        # Already rolled up trades are re-aggregated rather than added twice
+        previous_exit_date = None
+        if trade.status == TradeStatus.CLOSED and trade.net_pnl is not None:
+            previous_exit_date = realized_date(trade)
+        
         trade.exit_price = exit_price
         trade.exit_date = exit_date
         trade.exit_commission = exit_commission
@@ -319,12 +354,107 @@ class TradeCapture:
         
         # Calculate P&L
         self._calculate_pnl(trade)
+        self.rollups.record_trade(trade, previous_exit_date=previous_exit_date)
         
         self.db.commit()
         self.db.refresh(trade)
         logger.info(f"Updated trade {trade.id} with exit price {exit_price}")
         return trade
     
+    def import_trades(
+        self,
+        broker_trades: List[Dict[str, Any]],
+        user_id: Optional[str] = None,
+        broker_id: Optional[str] = None,
+        synced_at: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Import broker trades in a single transaction.
+        
+        Existing broker trade ids are loaded in batched lookups, new trades
+        are normalized (and, if the broker reports them closed, their P&L
+        calculated) and inserted in bulk, and trades the broker has since
+        closed get their exit details. The unique broker_trade_id makes the
+        insert idempotent, so re-importing the same trades is a no-op.
+        
+        Args:
+            broker_trades: Raw trade data from broker
+            user_id: User identifier for trades that do not carry one
+            broker_id: Broker identifier for trades that do not carry one
+            synced_at: If set, advance the user's sync high-water mark to
+                this time in the same transaction
+            
+        Returns:
+            Import summary
+        """
+        stats = {
+            'total_fetched': len(broker_trades),
+            'new_trades': 0,
+            'updated_trades': 0,
+            'errors': 0
+        }
+        
+        # Later copies of a trade supersede earlier ones
+        by_broker_id: Dict[str, Dict[str, Any]] = {}
+        for broker_trade in broker_trades:
+            broker_trade_id = broker_trade.get('trade_id') or broker_trade.get('order_id')
+            if not broker_trade_id:
+                logger.error(f"Skipping broker trade without an id: {broker_trade.get('symbol')}")
+                stats['errors'] += 1
+                continue
+            
+            broker_trade = dict(broker_trade)
+            if user_id:
+                broker_trade.setdefault('user_id', user_id)
+            if broker_id:
+                broker_trade.setdefault('broker_id', broker_id)
+            by_broker_id[broker_trade_id] = broker_trade
+        
+        existing = self._existing_trades(list(by_broker_id))
+        
+        new_rows = []
+        exits: Dict[int, Dict[str, Any]] = {}
+        for broker_trade_id, broker_trade in by_broker_id.items():
+            try:
+                if broker_trade_id in existing:
+                    trade_id, status = existing[broker_trade_id]
+                    # Update if status changed or exit info available
+                    if broker_trade.get('status') == 'CLOSED' and status != TradeStatus.CLOSED:
+                        exits[trade_id] = broker_trade
+                    continue
+                
+                new_rows.append(self._import_row(broker_trade))
+            
+            except Exception as e:
+                logger.error(f"Error processing trade {broker_trade_id}: {e}")
+                stats['errors'] += 1
+        
+        try:
+            stats['new_trades'] = self._insert_trades(new_rows)
+            closed = self._apply_exits(exits)
+            stats['updated_trades'] = len(closed)
+            
+            # Rebuild the rollup buckets of every trade closed by this import
+            realized: Dict[str, List[datetime]] = {}
+            for row in new_rows:
+                if row['status'] == TradeStatus.CLOSED and row.get('net_pnl') is not None:
+                    realized.setdefault(row['user_id'], []).append(row['exit_date'] or row['entry_date'])
+            for trade in closed:
+                if trade.net_pnl is not None:
+                    realized.setdefault(trade.user_id, []).append(realized_date(trade))
+            for owner, dates in realized.items():
+                self.rollups.rebuild_periods(owner, dates)
+            
+            if synced_at is not None:
+                self._advance_sync_state(user_id, broker_id, synced_at, stats['new_trades'])
+            
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        
+        return stats
+    
     async def sync_trades(
         self,
         user_id: str,
@@ -334,15 +464,21 @@ class TradeCapture:
         """
         Synchronize trades from brokerage.
         
+        Syncs resume from the user's high-water mark (or from the oldest
+        still-open trade, so its exit is picked up). The first sync looks
+        back lookback_days.
+        
         Args:
             user_id: User identifier
             broker_id: Broker identifier
-            lookback_days: Number of days to look back
+            lookback_days: Number of days to look back on the first sync
             
         Returns:
             Synchronization summary
         """
-        start_date = datetime.utcnow() - timedelta(days=lookback_days)
+        # Next high-water mark, taken before fetching so nothing is missed
+        synced_at = datetime.utcnow()
+        start_date = self._sync_start_date(user_id, broker_id, lookback_days)
         
         try:
             # Fetch trades from broker
@@ -352,41 +488,7 @@ class TradeCapture:
                 start_date=start_date
             )
             
-            stats = {
-                'total_fetched': len(broker_trades),
-                'new_trades': 0,
-                'updated_trades': 0,
-                'errors': 0
-            }
-            
-            for broker_trade in broker_trades:
-                try:
-                    broker_trade_id = broker_trade.get('trade_id') or broker_trade.get('order_id')
-                    
-                    # Check if trade already exists
-                    existing_trade = self.db.query(Trade).filter(
-                        Trade.broker_trade_id == broker_trade_id
-                    ).first()
-                    
-                    if existing_trade:
-                        # Update if status changed or exit info available
-                        if broker_trade.get('status') == 'CLOSED' and existing_trade.status != TradeStatus.CLOSED:
-                            self.update_trade_exit(
-                                trade_id=existing_trade.id,
-                                exit_price=float(broker_trade.get('exit_price', 0)),
-                                exit_date=self._parse_datetime(broker_trade.get('exit_date')),
-                                exit_commission=float(broker_trade.get('exit_commission', 0))
-                            )
-                            stats['updated_trades'] += 1
-                    else:
-                        # Create new trade
-                        trade_data = self._normalize_broker_trade(broker_trade)
-                        self.create_trade(trade_data)
-                        stats['new_trades'] += 1
-                
-                except Exception as e:
-                    logger.error(f"Error processing trade {broker_trade.get('trade_id')}: {e}")
-                    stats['errors'] += 1
+            stats = self.import_trades(broker_trades, user_id, broker_id, synced_at=synced_at)
             
             logger.info(f"Trade sync completed for user {user_id}: {stats}")
             return stats
@@ -422,37 +524,47 @@ class TradeCapture:
                 'errors': 0
             }
             
+            # Symbols that already have an open trade, in one query
+            open_symbols = {
+                symbol for (symbol,) in self.db.query(Trade.symbol).filter(
+                    Trade.user_id == user_id,
+                    Trade.broker_id == broker_id,
+                    Trade.status == TradeStatus.OPEN
+                )
+            }
+            
+            rows = []
             for position in positions:
                 try:
-                    # Check if we have an open trade for this position
                     symbol = position.get('symbol')
-                    existing_trade = self.db.query(Trade).filter(
-                        Trade.user_id == user_id,
-                        Trade.broker_id == broker_id,
-                        Trade.symbol == symbol,
-                        Trade.status == TradeStatus.OPEN
-                    ).first()
+                    if symbol in open_symbols:
+                        continue
                     
-                    if not existing_trade:
-                        # Create trade from position
-                        trade_data = self._normalize_broker_trade({
-                            'user_id': user_id,
-                            'broker_id': broker_id,
-                            'trade_id': f"{broker_id}_{symbol}_{int(datetime.utcnow().timestamp())}",
-                            'symbol': symbol,
-                            'side': position.get('side', 'BUY'),
-                            'entry_price': position.get('average_price'),
-                            'quantity': position.get('quantity'),
-                            'entry_date': position.get('opened_at', datetime.utcnow().isoformat()),
-                            'commission': 0.0
-                        })
-                        self.create_trade(trade_data)
-                        stats['synced'] += 1
+                    # Create trade from position
+                    rows.append(self._import_row({
+                        'user_id': user_id,
+                        'broker_id': broker_id,
+                        'trade_id': f"{broker_id}_{symbol}_{int(datetime.utcnow().timestamp())}",
+                        'symbol': symbol,
+                        'side': position.get('side', 'BUY'),
+                        'entry_price': position.get('average_price'),
+                        'quantity': position.get('quantity'),
+                        'entry_date': position.get('opened_at', datetime.utcnow().isoformat()),
+                        'commission': 0.0
+                    }))
+                    open_symbols.add(symbol)
                 
                 except Exception as e:
                     logger.error(f"Error syncing position {position.get('symbol')}: {e}")
                     stats['errors'] += 1
             
+            try:
+                stats['synced'] = self._insert_trades(rows)
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
+            
             logger.info(f"Position sync completed for user {user_id}: {stats}")
             return stats
         
@@ -460,6 +572,138 @@ class TradeCapture:
             logger.error(f"Position sync failed for user {user_id}: {e}")
             raise
     
+    def _import_row(self, broker_trade: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Normalize a broker trade into a row for bulk insert.
+        
+        Trades the broker reports as closed are imported closed, with P&L.
+        
+        Args:
+            broker_trade: Raw trade data from broker
+            
+        Returns:
+            Trade column values
+        """
+        trade = self._build_trade(self._normalize_broker_trade(broker_trade))
+        trade.exit_commission = 0.0
+        
+        if broker_trade.get('status') == 'CLOSED' and broker_trade.get('exit_price'):
+            trade.exit_price = float(broker_trade['exit_price'])
+            trade.exit_date = self._parse_datetime(broker_trade.get('exit_date'))
+            trade.exit_commission = float(broker_trade.get('exit_commission', 0))
+            trade.status = TradeStatus.CLOSED
+            self._calculate_pnl(trade)
+        
+        return {column: getattr(trade, column) for column in IMPORT_COLUMNS}
+    
+    def _existing_trades(self, broker_trade_ids: List[str]) -> Dict[str, Tuple[int, TradeStatus]]:
+        """Map already imported broker trade ids to (trade id, status)."""
+        existing = {}
+        for start in range(0, len(broker_trade_ids), LOOKUP_BATCH_SIZE):
+            batch = broker_trade_ids[start:start + LOOKUP_BATCH_SIZE]
+            rows = self.db.query(Trade.broker_trade_id, Trade.id, Trade.status).filter(
+                Trade.broker_trade_id.in_(batch)
+            )
+            for broker_trade_id, trade_id, status in rows:
+                existing[broker_trade_id] = (trade_id, status)
+        return existing
+    
+    def _insert_trades(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Bulk insert trade rows, skipping broker trade ids already stored.
+        
+        Returns:
+            Number of rows inserted
+        """
+        if not rows:
+            return 0
+        
+        statement = insert(Trade.__table__)
+        dialect = self.db.get_bind().dialect.name
+        if dialect in ('postgresql', 'sqlite'):
+            if dialect == 'postgresql':
+                from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            
+            # Conflicts only occur when a concurrent import won the race
+            statement = dialect_insert(Trade.__table__).on_conflict_do_nothing(
+                index_elements=['broker_trade_id']
+            )
+        # Elsewhere rows were checked against existing ids, and the unique
+        # constraint rejects the batch if a concurrent import got there first
+        
+        return self.db.connection().execute(statement, rows).rowcount
+    
+    def _apply_exits(self, exits: Dict[int, Dict[str, Any]]) -> List[Trade]:
+        """
+        Close open trades the broker reports as closed.
+        
+        Args:
+            exits: Broker trade data keyed by trade id
+            
+        Returns:
+            Trades that were closed
+        """
+        trade_ids = list(exits)
+        closed = []
+        for start in range(0, len(trade_ids), LOOKUP_BATCH_SIZE):
+            trades = self.db.query(Trade).filter(
+                Trade.id.in_(trade_ids[start:start + LOOKUP_BATCH_SIZE])
+            ).all()
+            for trade in trades:
+                broker_trade = exits[trade.id]
+                trade.exit_price = float(broker_trade.get('exit_price', 0))
+                trade.exit_date = self._parse_datetime(broker_trade.get('exit_date'))
+                trade.exit_commission = float(broker_trade.get('exit_commission', 0))
+                trade.status = TradeStatus.CLOSED
+                self._calculate_pnl(trade)
+                closed.append(trade)
+        return closed
+    
+    def _sync_start_date(self, user_id: str, broker_id: str, lookback_days: int) -> datetime:
+        """Start of the next sync window for a user's broker account."""
+        state = self.db.query(TradeSyncState).filter(
+            TradeSyncState.user_id == user_id,
+            TradeSyncState.broker_id == broker_id
+        ).first()
+        if state is None:
+            return datetime.utcnow() - timedelta(days=lookback_days)
+        
+        # Reach back to open trades so their exits are seen
+        oldest_open = self.db.query(func.min(Trade.entry_date)).filter(
+            Trade.user_id == user_id,
+            Trade.broker_id == broker_id,
+            Trade.status == TradeStatus.OPEN
+        ).scalar()
+        if oldest_open is not None and oldest_open < state.last_synced_at:
+            return oldest_open
+        return state.last_synced_at
+    
+    def _advance_sync_state(
+        self,
+        user_id: str,
+        broker_id: str,
+        synced_at: datetime,
+        trades_imported: int
+    ) -> None:
+        """Move a user's sync high-water mark forward."""
+        state = self.db.query(TradeSyncState).filter(
+            TradeSyncState.user_id == user_id,
+            TradeSyncState.broker_id == broker_id
+        ).first()
+        if state is None:
+            state = TradeSyncState(
+                user_id=user_id,
+                broker_id=broker_id,
+                last_synced_at=synced_at,
+                trades_imported=0
+            )
+            self.db.add(state)
+        
+        state.last_synced_at = max(state.last_synced_at, synced_at)
+        state.trades_imported += trades_imported
+    
     def get_user_trades(
         self,
         user_id: str,
@@ -4,7 +4,7 @@ Unit tests for analytics engine.
 
 import pytest
 from datetime import datetime, timedelta
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
 from src.models import Base, Trade, TradeDirection, TradeStatus, SetupType
@@ -275,6 +275,8 @@ class TestAnalyticsEngine:
         )
         
         assert metrics['max_drawdown'] > 0
+        # Peak 1000 after the first trade, trough 200 after the third
+        assert metrics['max_drawdown'] == 800.0
     
     def test_streak_calculation(self, analytics_engine, db_session):
         """Test win/loss streak calculation."""
@@ -312,6 +314,45 @@ class TestAnalyticsEngine:
         assert metrics['max_win_streak'] == 3  # First 3 wins
         assert metrics['max_loss_streak'] == 2  # 2 losses in middle
     
+    def test_dashboard_analytics_single_fetch(self, analytics_engine, db_session, sample_trades):
+        """Test dashboard breakdowns share one query and match individual calls."""
+        start_date = datetime.utcnow() - timedelta(days=31)
+        end_date = datetime.utcnow()
+        
+        statements = []
+        
+        def count_selects(conn, cursor, statement, *args):
+            if statement.lstrip().upper().startswith('SELECT'):
+                statements.append(statement)
+        
+        engine = db_session.get_bind()
+        event.listen(engine, 'before_cursor_execute', count_selects)
+        try:
+            dashboard = analytics_engine.get_dashboard_analytics(
+                user_id="test_user",
+                start_date=start_date,
+                end_date=end_date,
+                min_trades=1
+            )
+        finally:
+            event.remove(engine, 'before_cursor_execute', count_selects)
+        
+        assert len(statements) == 1
+        assert dashboard['performance'] == analytics_engine.calculate_performance_metrics(
+            "test_user", start_date, end_date
+        )
+        assert dashboard['by_symbol'] == analytics_engine.analyze_by_symbol(
+            "test_user", start_date, end_date, min_trades=1
+        )
+        assert dashboard['by_time_of_day'] == analytics_engine.analyze_by_time_of_day(
+            "test_user", start_date, end_date
+        )
+        assert dashboard['by_day_of_week'] == analytics_engine.analyze_by_day_of_week(
+            "test_user", start_date, end_date
+        )
+        assert dashboard['by_symbol']['by_symbol']['AAPL']['total_trades'] == 3
+        assert dashboard['by_symbol']['by_symbol']['AAPL']['max_win_streak'] == 3
+    
     def test_performance_with_filters(self, analytics_engine, sample_trades):
         """Test performance metrics with filters."""
         start_date = datetime.utcnow() - timedelta(days=31)
@@ -0,0 +1,241 @@
+"""
+Unit tests for streaming exports.
+"""
+
+import pytest
+import csv
+import os
+import tracemalloc
+from datetime import datetime, timedelta
+from io import StringIO
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.models import Base, JournalEntry, Trade, TradeDirection, TradeStatus, SetupType
+from src.export_service import (
+    ExportJob, ExportJobRegistry, ExportService, EXPORT_BATCH_SIZE, TRADE_CSV_COLUMNS
+)
+
+
+@pytest.fixture
+def db_session():
+    """Create in-memory database session for testing."""
+    engine = create_engine('sqlite:///:memory:')
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def export_service(db_session):
+    """Create ExportService instance."""
+    return ExportService(db_session)
+
+
+START = datetime(2024, 1, 1)
+END = datetime(2024, 12, 31)
+
+
+def add_trades(db_session, count, user_id="user123"):
+    """Insert closed and open trades."""
+    db_session.add_all(
+        Trade(
+            user_id=user_id,
+            symbol=f"SYM{i % 20}",
+            direction=TradeDirection.LONG,
+            status=TradeStatus.CLOSED if i % 2 else TradeStatus.OPEN,
+            entry_date=START + timedelta(minutes=i),
+            entry_price=100.0,
+            quantity=10,
+            exit_date=START + timedelta(minutes=i + 30) if i % 2 else None,
+            exit_price=101.0 if i % 2 else None,
+            net_pnl=10.0 if i % 2 else None,
+            setup_type=SetupType.BREAKOUT if i % 3 == 0 else None,
+            entry_commission=1.0
+        )
+        for i in range(count)
+    )
+    db_session.commit()
+
+
+class TestStreamingExports:
+    """Tests for streaming exports."""
+    
+    def test_stream_yields_header_first(self, db_session, export_service):
+        """Test the header arrives before any trade is read."""
+        add_trades(db_session, 3)
+        
+        chunks = export_service.stream_trades_csv("user123", START, END)
+        
+        assert next(chunks) == ",".join(TRADE_CSV_COLUMNS) + "\r\n"
+        assert len(list(csv.reader(StringIO("".join(chunks))))) == 3
+    
+    def test_stream_chunks_by_batch(self, db_session, export_service):
+        """Test trades are streamed in batch sized chunks."""
+        add_trades(db_session, EXPORT_BATCH_SIZE * 2 + 5)
+        
+        chunks = list(export_service.stream_trades_csv("user123", START, END))
+        rows = list(csv.DictReader(StringIO("".join(chunks))))
+        
+        assert len(chunks) == 4
+        assert len(rows) == EXPORT_BATCH_SIZE * 2 + 5
+        assert [row['trade_id'] for row in rows[:3]] == ['1', '2', '3']
+    
+    def test_csv_values(self, db_session, export_service, tmp_path):
+        """Test rows match the file export format."""
+        add_trades(db_session, 2)
+        add_trades(db_session, 2, user_id="other")
+        
+        path = export_service.export_trades_csv("user123", START, END, str(tmp_path / "trades.csv"))
+        with open(path, newline='') as f:
+            open_trade, closed_trade = list(csv.DictReader(f))
+        
+        assert open_trade['direction'] == TradeDirection.LONG.value
+        assert open_trade['status'] == TradeStatus.OPEN.value
+        assert open_trade['entry_date'] == START.isoformat()
+        assert open_trade['exit_date'] == ''
+        assert open_trade['exit_price'] == ''
+        assert open_trade['setup_type'] == SetupType.BREAKOUT.value
+        assert closed_trade['status'] == TradeStatus.CLOSED.value
+        assert closed_trade['net_pnl'] == '10.0'
+        assert closed_trade['setup_type'] == ''
+    
+    def test_journal_export_is_not_truncated(self, db_session, export_service, tmp_path):
+        """Test every journal entry in range is exported, newest first."""
+        db_session.add_all(
+            JournalEntry(user_id="user123", title=f"Entry {i}", content="Notes",
+                         entry_date=START + timedelta(hours=i))
+            for i in range(1500)
+        )
+        db_session.commit()
+        
+        path = export_service.export_journal_entries_text(
+            "user123", START, END, str(tmp_path / "journal.txt")
+        )
+        with open(path) as f:
+            text = f.read()
+        
+        assert text.count("Title: Entry") == 1500
+        assert text.index("Title: Entry 1499") < text.index("Title: Entry 0\n")
+    
+    def test_export_all_data_reports_progress(self, db_session, export_service, tmp_path):
+        """Test full exports report rows written per export."""
+        add_trades(db_session, EXPORT_BATCH_SIZE + 1)
+        progress = []
+        
+        export_service.export_all_data(
+            "user123", START, END, str(tmp_path), progress=lambda *update: progress.append(update)
+        )
+        
+        assert progress[:3] == [
+            ('trades_csv', 0), ('trades_csv', EXPORT_BATCH_SIZE), ('trades_csv', EXPORT_BATCH_SIZE + 1)
+        ]
+        assert progress[-1] == ('journal_text', 0)
+    
+    def test_export_job(self, db_session, export_service, tmp_path):
+        """Test background export jobs record their files."""
+        add_trades(db_session, 3)
+        job = ExportJob(user_id="user123", start_date=START, end_date=END)
+        
+        export_service.run_export_job(job, output_dir=str(tmp_path))
+        
+        assert job.status == 'completed'
+        assert {'trades_csv', 'journal_text'} <= set(job.files)
+        assert job.completed_at is not None
+    
+    def test_export_job_temp_files_are_removed(self, db_session, export_service):
+        """Test a job's own temporary directory is deleted with its files."""
+        add_trades(db_session, 3)
+        job = ExportJob(user_id="user123", start_date=START, end_date=END)
+        export_service.run_export_job(job)
+        
+        assert os.path.isdir(job.output_dir)
+        path = job.files.pop('trades_csv')
+        job.remove_file(path)
+        assert not os.path.exists(path)
+        assert os.path.isdir(job.output_dir)
+        
+        job.remove_files()
+        assert job.files == {}
+        assert not os.path.exists(job.output_dir)
+    
+    def test_failed_export_job(self, export_service, tmp_path):
+        """Test export failures are recorded on the job."""
+        job = ExportJob(user_id="user123", start_date=START, end_date=END)
+        export_service.export_all_data = lambda **kwargs: 1 / 0
+        
+        export_service.run_export_job(job)
+        
+        assert job.status == 'failed'
+        assert 'division by zero' in job.error
+
+
+class TestExportJobRegistry:
+    """Test suite for background export job bookkeeping."""
+    
+    def finished_job(self, tmp_path, user_id="user123", completed_at=None):
+        """A completed job with one file on disk."""
+        path = tmp_path / f"{len(list(tmp_path.iterdir()))}.csv"
+        path.write_text("trade_id\n")
+        return ExportJob(
+            user_id=user_id, start_date=START, end_date=END, status='completed',
+            files={'trades_csv': str(path)}, completed_at=completed_at or datetime.utcnow()
+        )
+    
+    def test_finished_jobs_expire_with_their_files(self, tmp_path):
+        """Test jobs past the TTL are dropped and their files deleted."""
+        registry = ExportJobRegistry(ttl=timedelta(minutes=90))
+        old = self.finished_job(tmp_path, completed_at=datetime.utcnow() - timedelta(hours=1))
+        recent = self.finished_job(tmp_path)
+        running = ExportJob(user_id="user123", start_date=START, end_date=END, status='running',
+                            created_at=datetime.utcnow() - timedelta(hours=2))
+        old_file = old.files['trades_csv']
+        for job in (old, recent, running):
+            assert registry.add(job)
+        
+        assert registry.evict_expired() == 0
+        assert registry.get(old.job_id) is old
+        
+        assert registry.evict_expired(datetime.utcnow() + timedelta(minutes=31)) == 1
+        assert registry.get(old.job_id) is None
+        assert not os.path.exists(old_file)
+        assert registry.get(recent.job_id) is recent
+        assert registry.get(running.job_id) is running
+    
+    def test_active_jobs_are_capped_per_user(self):
+        """Test each user may only run a few jobs at once."""
+        registry = ExportJobRegistry(max_active_per_user=2)
+        jobs = [ExportJob(user_id="user123", start_date=START, end_date=END) for _ in range(3)]
+        
+        assert registry.add(jobs[0])
+        assert registry.add(jobs[1])
+        assert not registry.add(jobs[2])
+        assert registry.add(ExportJob(user_id="user456", start_date=START, end_date=END))
+        
+        jobs[0].status = 'completed'
+        jobs[0].completed_at = datetime.utcnow()
+        assert registry.add(jobs[2])
+        assert len(registry) == 4
+
+
+@pytest.mark.benchmark
+def test_benchmark_csv_export_memory(db_session, export_service, tmp_path):
+    """Benchmark CSV export peak memory as trade counts grow."""
+    results = []
+    count = 0
+    for size in (5000, 50000):
+        add_trades(db_session, size - count)
+        count = size
+        db_session.expunge_all()
+        
+        tracemalloc.start()
+        export_service.export_trades_csv("user123", START, END + timedelta(days=365),
+                                         str(tmp_path / "trades.csv"))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results.append(peak)
+    
+    # Peak memory stays flat while the export grows tenfold
+    assert results[1] < results[0] * 2
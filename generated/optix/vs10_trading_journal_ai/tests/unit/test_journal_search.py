@@ -0,0 +1,211 @@
+"""
+Unit tests for journal full-text search.
+"""
+
+import pytest
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.models import (
+    Base, JournalEntry, JournalEntryCreate, Trade, TradeDirection, TagCreate
+)
+from src.journal_service import JournalService
+from src.journal_search import (
+    JournalSearchBackend, LikeSearchBackend, SQLiteFTSSearchBackend, query_terms
+)
+
+
+@pytest.fixture
+def db_session():
+    """Create in-memory database session for testing."""
+    engine = create_engine('sqlite:///:memory:')
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def journal_service(db_session):
+    """Create JournalService instance."""
+    return JournalService(db_session)
+
+
+def add_entry(journal_service, title, content, user_id="user123", notes=None, trade_id=None, days_ago=0):
+    """Create a journal entry."""
+    return journal_service.create_journal_entry(JournalEntryCreate(
+        user_id=user_id,
+        trade_id=trade_id,
+        title=title,
+        content=content,
+        notes=notes,
+        entry_date=datetime.utcnow() - timedelta(days=days_ago)
+    ))
+
+
+def titles(entries):
+    return [entry.title for entry in entries]
+
+
+class TestJournalSearch:
+    """Tests for journal search."""
+    
+    def test_uses_fts_backend_on_sqlite(self, journal_service):
+        """Test SQLite sessions get the FTS5 index."""
+        assert isinstance(journal_service.search_backend, SQLiteFTSSearchBackend)
+    
+    def test_incomplete_backend_cannot_be_created(self, db_session):
+        """Test a backend missing index methods fails on construction."""
+        class SearchOnlyBackend(JournalSearchBackend):
+            def search(self, user_id, search_query, limit=50):
+                return []
+        
+        with pytest.raises(TypeError):
+            SearchOnlyBackend(db_session)
+    
+    def test_stemming_and_prefix(self, journal_service):
+        """Test queries match word stems and prefixes."""
+        add_entry(journal_service, "Stopped out", "My stops were hit twice on the breakout")
+        add_entry(journal_service, "Patience", "Waited for the pullback")
+        
+        assert titles(journal_service.search_journal_entries("user123", "stopping")) == ["Stopped out"]
+        assert titles(journal_service.search_journal_entries("user123", "break")) == ["Stopped out"]
+        assert titles(journal_service.search_journal_entries("user123", "pull wait")) == ["Patience"]
+        assert journal_service.search_journal_entries("user123", "pullback breakout") == []
+    
+    def test_title_matches_rank_first(self, journal_service):
+        """Test results are ordered by relevance, not date."""
+        add_entry(journal_service, "Quiet day", "Skipped a momentum setup")
+        add_entry(journal_service, "Momentum trade", "Rode the move", days_ago=10)
+        
+        results = journal_service.search_journal_entries("user123", "momentum")
+        
+        assert titles(results) == ["Momentum trade", "Quiet day"]
+    
+    def test_snippet_highlights_match(self, journal_service):
+        """Test hits carry a highlighted snippet."""
+        add_entry(journal_service, "Review", "Entered late and chased the gap higher")
+        
+        [(entry, hit)] = journal_service.search_journal_hits("user123", "chase")
+        
+        assert hit.entry_id == entry.id
+        assert "<mark>chased</mark>" in hit.snippet
+    
+    def test_index_follows_updates_and_deletes(self, journal_service):
+        """Test edits and deletions are reflected in search."""
+        entry = add_entry(journal_service, "Plan", "Scalping the open")
+        
+        journal_service.update_journal_entry(entry.id, "user123", {"content": "Swing trading earnings"})
+        assert journal_service.search_journal_entries("user123", "scalping") == []
+        assert titles(journal_service.search_journal_entries("user123", "earnings")) == ["Plan"]
+        
+        journal_service.delete_journal_entry(entry.id, "user123")
+        assert journal_service.search_journal_entries("user123", "earnings") == []
+    
+    def test_trade_tags_are_searchable(self, db_session, journal_service):
+        """Test entries match the tags of their trade."""
+        trade = Trade(
+            user_id="user123", symbol="AAPL", direction=TradeDirection.LONG,
+            entry_date=datetime.utcnow(), entry_price=150.0, quantity=10
+        )
+        db_session.add(trade)
+        db_session.commit()
+        tag = journal_service.create_tag(TagCreate(user_id="user123", name="revenge"))
+        add_entry(journal_service, "Afternoon", "Took another trade", trade_id=trade.id)
+        
+        journal_service.add_tag_to_trade(trade.id, tag.id, "user123")
+        assert titles(journal_service.search_journal_entries("user123", "revenge")) == ["Afternoon"]
+        
+        journal_service.remove_tag_from_trade(trade.id, tag.id, "user123")
+        assert journal_service.search_journal_entries("user123", "revenge") == []
+    
+    def test_results_are_per_user(self, journal_service):
+        """Test users only find their own entries."""
+        add_entry(journal_service, "Mine", "Gap fill", user_id="user123")
+        add_entry(journal_service, "Theirs", "Gap fill", user_id="user456")
+        
+        assert titles(journal_service.search_journal_entries("user123", "gap")) == ["Mine"]
+    
+    def test_query_syntax_is_ignored(self, journal_service):
+        """Test FTS operators and punctuation in queries are treated as words."""
+        add_entry(journal_service, "Notes", "Sold NEAR the high")
+        
+        assert query_terms('"near" OR (high*') == ["near", "or", "high"]
+        assert titles(journal_service.search_journal_entries("user123", "near)")) == ["Notes"]
+        assert journal_service.search_journal_entries("user123", "*?!") == []
+    
+    def test_existing_entries_are_indexed(self, db_session):
+        """Test entries written before the index existed are searchable."""
+        db_session.add(JournalEntry(
+            user_id="user123", title="Old entry", content="Iron condor adjustment",
+            entry_date=datetime.utcnow()
+        ))
+        db_session.commit()
+        
+        results = JournalService(db_session).search_journal_entries("user123", "condor")
+        
+        assert titles(results) == ["Old entry"]
+
+    
+    def test_index_survives_uncommitted_session(self, tmp_path):
+        """Test a search session closed without a commit keeps the built index."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'journal.db'}")
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        
+        with Session() as session:
+            session.add_all(
+                JournalEntry(user_id="user123", title=f"Entry {i}", content="Gap and go",
+                             entry_date=datetime.utcnow())
+                for i in range(3)
+            )
+            session.commit()
+        
+        # A read-only request: the session closes without committing
+        first = Session()
+        assert len(JournalService(first).search_journal_entries("user123", "gap")) == 3
+        first.close()
+        
+        with Session() as second:
+            assert len(JournalService(second).search_journal_entries("user123", "gap")) == 3
+        engine.dispose()
+
+
+@pytest.mark.benchmark
+def test_benchmark_search_latency(db_session, journal_service):
+    """Benchmark indexed and LIKE search latency as the journal grows."""
+    words = ["breakout", "pullback", "earnings", "gap", "reversal", "momentum",
+             "scalp", "swing", "fomo", "revenge", "discipline", "patience"]
+    like = LikeSearchBackend(db_session)
+    
+    count = 0
+    timings = {}
+    for size in (1000, 20000):
+        db_session.add_all(
+            JournalEntry(
+                user_id=f"user{i % 10}", title=f"Entry {i}",
+                content=f"{words[i % 12]} trade with {words[(i * 7) % 12]} notes"
+                        + (" overleveraged" if i % 500 == 0 else ""),
+                entry_date=datetime.utcnow()
+            )
+            for i in range(count, size)
+        )
+        db_session.flush()
+        journal_service.search_backend.rebuild()
+        db_session.commit()
+        count = size
+        
+        for name, backend in (("fts", journal_service.search_backend), ("like", like)):
+            start = time.perf_counter()
+            for _ in range(20):
+                hits = backend.search("user0", "overleveraged", limit=20)
+            timings[name, size] = time.perf_counter() - start
+            assert len(hits) == min(size // 500, 20)
+    
+    # A LIKE scan grows with the journal; the index lookup grows far less
+    fts_growth = timings["fts", 20000] / timings["fts", 1000]
+    like_growth = timings["like", 20000] / timings["like", 1000]
+    assert fts_growth < like_growth
@@ -124,6 +124,35 @@ class TestPatternAnalyzer:
         assert '10:00' in hourly
         assert '11:00' in hourly
     
+    def test_grouped_aggregates(self, pattern_analyzer, sample_trades):
+        """Test SQL-side aggregates produce per-group win/loss statistics."""
+        setups = pattern_analyzer.analyze_setup_performance(
+            user_id="test_user",
+            min_trades=1
+        )['setup_performance']
+        
+        momentum = setups['MOMENTUM']
+        assert momentum['winning_trades'] == 1
+        assert momentum['losing_trades'] == 1
+        assert momentum['average_win'] == 998.0
+        assert momentum['average_loss'] == -502.0
+        assert momentum['profit_factor'] == 1.99
+        assert momentum['max_win'] == 998.0
+        assert momentum['max_loss'] == -502.0
+        assert setups['BREAKOUT']['profit_factor'] == 0
+        
+        hourly = pattern_analyzer.analyze_time_of_day_patterns(
+            user_id="test_user"
+        )['hourly_performance']
+        assert hourly['14:00'] == {
+            'total_trades': 2,
+            'wins': 0,
+            'losses': 2,
+            'win_rate': 0.0,
+            'total_pnl': -1004.0,
+            'average_pnl': -502.0
+        }
+    
     def test_analyze_market_conditions(self, pattern_analyzer, sample_trades):
         """Test analyzing market condition performance."""
         result = pattern_analyzer.analyze_market_conditions(
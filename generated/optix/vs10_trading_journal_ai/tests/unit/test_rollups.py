@@ -0,0 +1,203 @@
+"""
+Unit tests for performance rollups.
+"""
+
+import random
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.models import (
+    Base, Trade, TradeCreate, TradeDirection, TradeStatus, PerformanceRollup
+)
+from src.analytics_engine import AnalyticsEngine
+from src.rollups import RollupService, RollupSummary, main
+from src.trade_capture import TradeCapture, BrokerageIntegrationClient
+
+
+@pytest.fixture
+def db_session():
+    """Create in-memory database session for testing."""
+    engine = create_engine('sqlite:///:memory:')
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def trade_capture(db_session):
+    """Create TradeCapture instance with a mocked VS-7 client."""
+    return TradeCapture(db_session, Mock(spec=BrokerageIntegrationClient))
+
+
+def _open_trade(trade_capture, entry_date, entry_price=100.0, user_id="test_user"):
+    return trade_capture.create_trade(TradeCreate(
+        user_id=user_id,
+        symbol="AAPL",
+        direction=TradeDirection.LONG,
+        entry_date=entry_date,
+        entry_price=entry_price,
+        quantity=10,
+        entry_commission=1.0
+    ))
+
+
+def _assert_metrics_match(actual, expected):
+    for key, value in expected.items():
+        if key in ('period_start', 'period_end'):
+            continue
+        assert actual[key] == pytest.approx(value, abs=0.011), key
+
+
+class TestRollupSummary:
+    """Tests for combining rollup summaries."""
+    
+    @pytest.mark.parametrize("seed", range(5))
+    def test_combine_matches_sequential(self, seed):
+        """Test combining split summaries equals summarizing the whole sequence."""
+        rng = random.Random(seed)
+        pnls = [rng.choice([-1, 1]) * rng.uniform(1, 100) for _ in range(60)]
+        
+        whole = RollupSummary()
+        for pnl in pnls:
+            whole.add_trade(pnl)
+        
+        cuts = sorted(rng.sample(range(1, len(pnls)), 6))
+        combined = RollupSummary()
+        for start, end in zip([0] + cuts, cuts + [len(pnls)]):
+            part = RollupSummary()
+            for pnl in pnls[start:end]:
+                part.add_trade(pnl)
+            combined = combined.combine(part)
+        
+        assert combined.total_trades == whole.total_trades
+        assert combined.net_pnl == pytest.approx(whole.net_pnl)
+        assert combined.max_drawdown == pytest.approx(whole.max_drawdown)
+        assert combined.peak_cumulative_pnl == pytest.approx(whole.peak_cumulative_pnl)
+        assert (combined.first_streak, combined.last_streak) == (whole.first_streak, whole.last_streak)
+        assert combined.max_win_streak == whole.max_win_streak
+        assert combined.max_loss_streak == whole.max_loss_streak
+
+
+class TestRollupService:
+    """Tests for RollupService."""
+    
+    def test_incremental_rollups_match_analytics(self, trade_capture, db_session):
+        """Test rollups maintained by trade capture match full recomputation."""
+        rng = random.Random(7)
+        base_date = datetime(2024, 1, 1, 9, 30)
+        
+        trades = [
+            _open_trade(trade_capture, base_date + timedelta(hours=rng.randint(0, 24 * 80)))
+            for _ in range(120)
+        ]
+        # Close in random order so some exits are back-dated into existing buckets
+        rng.shuffle(trades)
+        for trade in trades:
+            trade_capture.update_trade_exit(
+                trade_id=trade.id,
+                exit_price=round(rng.uniform(90.0, 110.0), 2),
+                exit_date=trade.entry_date + timedelta(hours=rng.randint(1, 6)),
+                exit_commission=1.0
+            )
+        
+        start_date = datetime(2023, 12, 1)
+        end_date = datetime(2024, 6, 1)
+        rollups = RollupService(db_session)
+        expected = AnalyticsEngine(db_session).calculate_performance_metrics(
+            "test_user", start_date, end_date
+        )
+        
+        _assert_metrics_match(rollups.get_performance_metrics("test_user", start_date, end_date), expected)
+        
+        # Backfill from scratch produces the same answer
+        rollups.backfill()
+        _assert_metrics_match(rollups.get_performance_metrics("test_user", start_date, end_date), expected)
+    
+    def test_partial_month_range(self, trade_capture, db_session):
+        """Test ranges mixing day and month rollups only include realized days in range."""
+        base_date = datetime(2024, 1, 20, 10, 0)
+        for day, exit_price in enumerate([110.0, 95.0, 120.0, 90.0, 105.0]):
+            trade = _open_trade(trade_capture, base_date + timedelta(days=day * 7))
+            trade_capture.update_trade_exit(
+                trade_id=trade.id,
+                exit_price=exit_price,
+                exit_date=trade.entry_date + timedelta(hours=1)
+            )
+        
+        rollups = RollupService(db_session)
+        # Jan 27 .. Feb 10 covers the 2nd, 3rd and 4th trades
+        metrics = rollups.get_performance_metrics(
+            "test_user", datetime(2024, 1, 27), datetime(2024, 2, 10)
+        )
+        assert metrics['total_trades'] == 3
+        assert metrics['net_pnl'] == pytest.approx(-51.0 + 199.0 - 101.0)
+        assert metrics['max_drawdown'] == pytest.approx(101.0)
+        
+        monthly = rollups.get_monthly_performance("test_user", 2024)
+        assert monthly['monthly']['January']['total_trades'] == 2
+        assert monthly['monthly']['February']['total_trades'] == 3
+        assert monthly['yearly_total']['total_trades'] == 5
+        
+        daily = rollups.get_daily_pnl("test_user", datetime(2024, 1, 1), datetime(2024, 12, 31))
+        assert [point['date'] for point in daily][:2] == ['2024-01-20', '2024-01-27']
+    
+    def test_reclosing_trade_is_not_double_counted(self, trade_capture, db_session):
+        """Test updating an already closed trade replaces its contribution."""
+        trade = _open_trade(trade_capture, datetime(2024, 3, 5, 10, 0))
+        trade_capture.update_trade_exit(trade.id, 110.0, datetime(2024, 3, 5, 12, 0))
+        trade_capture.update_trade_exit(trade.id, 90.0, datetime(2024, 3, 7, 12, 0))
+        
+        rollups = RollupService(db_session)
+        metrics = rollups.get_performance_metrics(
+            "test_user", datetime(2024, 3, 1), datetime(2024, 3, 31)
+        )
+        assert metrics['total_trades'] == 1
+        assert metrics['net_pnl'] == -101.0
+        
+        march_5 = db_session.query(PerformanceRollup).filter(
+            PerformanceRollup.period_type == 'day',
+            PerformanceRollup.period_start == datetime(2024, 3, 5)
+        ).one()
+        assert march_5.total_trades == 0
+    
+    def test_open_trades_are_not_rolled_up(self, trade_capture, db_session):
+        """Test open trades do not create rollups."""
+        _open_trade(trade_capture, datetime(2024, 3, 5, 10, 0))
+        assert db_session.query(PerformanceRollup).count() == 0
+    
+    def test_backfill_command(self, tmp_path):
+        """Test the backfill command rebuilds rollups for an existing database."""
+        url = f"sqlite:///{tmp_path / 'journal.db'}"
+        engine = create_engine(url)
+        Base.metadata.create_all(engine, tables=[Trade.__table__])
+        session = sessionmaker(bind=engine)()
+        for user_id, pnl in [("a", 50.0), ("a", -20.0), ("b", 10.0)]:
+            session.add(Trade(
+                user_id=user_id,
+                symbol="AAPL",
+                direction=TradeDirection.LONG,
+                status=TradeStatus.CLOSED,
+                entry_date=datetime(2024, 5, 1, 10, 0),
+                entry_price=100.0,
+                exit_date=datetime(2024, 5, 1, 11, 0),
+                exit_price=100.0,
+                quantity=1,
+                net_pnl=pnl
+            ))
+        session.commit()
+        session.close()
+        
+        main(['--database-url', url])
+        
+        session = sessionmaker(bind=engine)()
+        metrics = RollupService(session).get_performance_metrics(
+            "a", datetime(2024, 5, 1), datetime(2024, 5, 31)
+        )
+        session.close()
+        assert metrics['total_trades'] == 2
+        assert metrics['net_pnl'] == 30.0
@@ -3,6 +3,7 @@ Unit tests for trade capture functionality.
 """
 
 import pytest
+import time
 from datetime import datetime, timedelta
 from unittest.mock import Mock, AsyncMock, patch
 from sqlalchemy import create_engine
@@ -329,6 +330,116 @@ class TestTradeCapture:
         assert stats['synced'] == 1
 
 
+class TestBulkImport:
+    """Tests for bulk, idempotent trade import."""
+    
+    def broker_trade(self, i, closed=False, **overrides):
+        entry = datetime(2024, 1, 2, 9, 30) + timedelta(hours=i)
+        trade = {
+            'trade_id': f'T{i}',
+            'symbol': 'AAPL',
+            'side': 'BUY',
+            'price': 100.0,
+            'quantity': 10,
+            'execution_time': entry.isoformat(),
+            'commission': 1.0,
+            'status': 'OPEN'
+        }
+        if closed:
+            trade.update({
+                'status': 'CLOSED',
+                'exit_price': 105.0 + i,
+                'exit_date': (entry + timedelta(minutes=30)).isoformat(),
+                'exit_commission': 1.0
+            })
+        trade.update(overrides)
+        return trade
+    
+    def test_import_is_idempotent(self, trade_capture, db_session):
+        """Test re-importing the same trades inserts nothing."""
+        broker_trades = [self.broker_trade(i, closed=i % 2 == 0) for i in range(50)]
+        
+        first = trade_capture.import_trades(broker_trades, 'user123', 'alpaca')
+        second = trade_capture.import_trades(broker_trades, 'user123', 'alpaca')
+        
+        assert first['new_trades'] == 50
+        assert second['new_trades'] == 0
+        assert second['updated_trades'] == 0
+        assert db_session.query(Trade).count() == 50
+    
+    def test_closed_trades_imported_with_pnl(self, trade_capture, db_session):
+        """Test trades already closed at the broker get P&L and rollups."""
+        trade_capture.import_trades([self.broker_trade(0, closed=True)], 'user123', 'alpaca')
+        
+        trade = db_session.query(Trade).one()
+        assert trade.status == TradeStatus.CLOSED
+        assert trade.gross_pnl == pytest.approx(50.0)
+        assert trade.net_pnl == pytest.approx(48.0)
+        assert trade.exit_commission == 1.0
+        
+        monthly = trade_capture.rollups.get_monthly_performance('user123', 2024)
+        assert monthly['monthly']['January']['net_pnl'] == pytest.approx(48.0)
+    
+    def test_import_closes_open_trades(self, trade_capture, db_session):
+        """Test open trades the broker reports closed are updated."""
+        trade_capture.import_trades([self.broker_trade(i) for i in range(3)], 'user123', 'alpaca')
+        
+        stats = trade_capture.import_trades(
+            [self.broker_trade(1, closed=True), self.broker_trade(3)],
+            'user123', 'alpaca'
+        )
+        
+        assert stats['new_trades'] == 1
+        assert stats['updated_trades'] == 1
+        trade = db_session.query(Trade).filter(Trade.broker_trade_id == 'T1').one()
+        assert trade.status == TradeStatus.CLOSED
+        assert trade.net_pnl == pytest.approx(58.0)
+    
+    def test_duplicates_and_invalid_trades(self, trade_capture, db_session):
+        """Test duplicate ids collapse and invalid trades are counted as errors."""
+        stats = trade_capture.import_trades([
+            self.broker_trade(0),
+            self.broker_trade(0, price=101.0),
+            self.broker_trade(1, trade_id=None),
+            self.broker_trade(2, price=-5.0)
+        ], 'user123', 'alpaca')
+        
+        assert stats['new_trades'] == 1
+        assert stats['errors'] == 2
+        assert db_session.query(Trade).one().entry_price == 101.0
+    
+    @pytest.mark.asyncio
+    async def test_sync_resumes_from_high_water_mark(self, trade_capture, mock_vs7_client):
+        """Test later syncs start from the last sync or the oldest open trade."""
+        mock_vs7_client.get_trades.return_value = [self.broker_trade(0, closed=True)]
+        before = datetime.utcnow()
+        await trade_capture.sync_trades('user123', 'alpaca', lookback_days=365)
+        first_start = mock_vs7_client.get_trades.call_args.kwargs['start_date']
+        
+        mock_vs7_client.get_trades.return_value = [self.broker_trade(1)]
+        await trade_capture.sync_trades('user123', 'alpaca')
+        second_start = mock_vs7_client.get_trades.call_args.kwargs['start_date']
+        
+        await trade_capture.sync_trades('user123', 'alpaca')
+        third_start = mock_vs7_client.get_trades.call_args.kwargs['start_date']
+        
+        assert first_start <= before - timedelta(days=364)
+        assert second_start >= before
+        assert third_start == datetime(2024, 1, 2, 10, 30)  # Open trade T1
+    
+    def test_import_many_trades(self, trade_capture, db_session):
+        """Test a year of fills imports in one bulk pass."""
+        broker_trades = [self.broker_trade(i, closed=i % 3 != 0) for i in range(10000)]
+        
+        start = time.perf_counter()
+        stats = trade_capture.import_trades(broker_trades, 'user123', 'alpaca')
+        elapsed = time.perf_counter() - start
+        
+        assert stats['new_trades'] == 10000
+        assert db_session.query(Trade).filter(Trade.status == TradeStatus.CLOSED).count() == 6666
+        assert elapsed < 10
+
+
 class TestBrokerageIntegrationClient:
     """Tests for BrokerageIntegrationClient."""
     
@@ -6,15 +6,17 @@ Core alert evaluation engine that processes market data against alert rules,
 handles multi-condition logic, and triggers alerts based on user-defined criteria.
 """
 
+import heapq
 import logging
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple, Any
+from typing import List, Dict, Optional, Tuple, Any, Iterable, Set
 from collections import defaultdict
 
 from .models import (
     AlertRule, AlertCondition, TriggeredAlert, MarketData, Position,
     AlertStatus, AlertPriority, ConditionType, MarketSession
 )
+from .condition_compiler import CompiledRuleSet, condition_value
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +25,11 @@ class AlertEngine:
     """
     Core engine for evaluating alert rules against market data.
     Handles multi-condition logic, cooldown periods, and market hours awareness.
+    
+    Rules are indexed by symbol and condition type so that a tick only visits
+    the rules watching its symbol. Expirations and cooldowns are tracked in
+    min-heaps keyed by deadline and released lazily as time advances.
+    Snapshot evaluation uses a CompiledRuleSet rebuilt only when rules change.
     """
     
     def __init__(self):
@@ -30,15 +37,32 @@ class AlertEngine:
         self.cooldown_tracker: Dict[str, datetime] = {}
         self.market_hours_cache: Dict[str, Tuple[bool, MarketSession]] = {}
         
+        # symbol -> {rule_id: rule}, condition type -> {rule_id: rule}
+        self.symbol_index: Dict[str, Dict[str, AlertRule]] = defaultdict(dict)
+        self.condition_type_index: Dict[ConditionType, Dict[str, AlertRule]] = defaultdict(dict)
+        # Keys each rule was indexed under, so in-place edits can be unindexed
+        self._indexed_keys: Dict[str, Tuple[Set[str], Set[ConditionType]]] = {}
+        
+        # (deadline, rule_id) heaps; stale entries are skipped on pop
+        self._expiry_heap: List[Tuple[datetime, str]] = []
+        self._cooldown_heap: List[Tuple[datetime, str]] = []
+        
+        # Columnar form of the symbol index, rebuilt lazily after rule changes
+        self._compiled_rules: Optional[CompiledRuleSet] = None
+        
     def add_rule(self, rule: AlertRule) -> None:
         """Add an alert rule to the engine"""
         if rule.status == AlertStatus.ACTIVE:
+            if rule.rule_id in self.active_rules:
+                self._unindex_rule(rule.rule_id)
             self.active_rules[rule.rule_id] = rule
+            self._index_rule(rule)
             logger.info(f"Added alert rule: {rule.rule_id} - {rule.name}")
     
     def remove_rule(self, rule_id: str) -> None:
         """Remove an alert rule from the engine"""
         if rule_id in self.active_rules:
+            self._unindex_rule(rule_id)
             del self.active_rules[rule_id]
             if rule_id in self.cooldown_tracker:
                 del self.cooldown_tracker[rule_id]
@@ -47,10 +71,79 @@ class AlertEngine:
     def update_rule(self, rule: AlertRule) -> None:
         """Update an existing alert rule"""
         if rule.status == AlertStatus.ACTIVE:
+            if rule.rule_id in self.active_rules:
+                self._unindex_rule(rule.rule_id)
             self.active_rules[rule.rule_id] = rule
+            self._index_rule(rule)
         else:
             self.remove_rule(rule.rule_id)
     
+    def _index_rule(self, rule: AlertRule) -> None:
+        """Register a rule in the symbol/condition indexes and expiry heap"""
+        symbols = {cond.symbol for cond in rule.conditions}
+        condition_types = {cond.condition_type for cond in rule.conditions}
+        
+        for symbol in symbols:
+            self.symbol_index[symbol][rule.rule_id] = rule
+        for cond_type in condition_types:
+            self.condition_type_index[cond_type][rule.rule_id] = rule
+        self._indexed_keys[rule.rule_id] = (symbols, condition_types)
+        self._compiled_rules = None
+        
+        if rule.expires_at:
+            heapq.heappush(self._expiry_heap, (rule.expires_at, rule.rule_id))
+    
+    def _unindex_rule(self, rule_id: str) -> None:
+        """Drop a rule from the symbol/condition indexes"""
+        symbols, condition_types = self._indexed_keys.pop(rule_id, (set(), set()))
+        self._compiled_rules = None
+        
+        for symbol in symbols:
+            bucket = self.symbol_index.get(symbol)
+            if bucket is not None:
+                bucket.pop(rule_id, None)
+                if not bucket:
+                    del self.symbol_index[symbol]
+        for cond_type in condition_types:
+            bucket = self.condition_type_index.get(cond_type)
+            if bucket is not None:
+                bucket.pop(rule_id, None)
+                if not bucket:
+                    del self.condition_type_index[cond_type]
+    
+    def _expire_rules(self, current_time: datetime) -> None:
+        """Expire every rule whose deadline has passed"""
+        heap = self._expiry_heap
+        while heap and heap[0][0] < current_time:
+            expires_at, rule_id = heapq.heappop(heap)
+            rule = self.active_rules.get(rule_id)
+            if rule is None or rule.expires_at is None:
+                continue
+            if current_time > rule.expires_at:
+                rule.status = AlertStatus.EXPIRED
+                self.remove_rule(rule_id)
+            elif rule.expires_at != expires_at:
+                # Deadline was extended in place; reschedule under the new one
+                heapq.heappush(heap, (rule.expires_at, rule_id))
+    
+    def _release_cooldowns(self, current_time: datetime) -> None:
+        """Drop cooldown entries whose window has elapsed"""
+        heap = self._cooldown_heap
+        while heap and heap[0][0] <= current_time:
+            _, rule_id = heapq.heappop(heap)
+            last_triggered = self.cooldown_tracker.get(rule_id)
+            if last_triggered is None:
+                continue
+            rule = self.active_rules.get(rule_id)
+            if rule is None:
+                del self.cooldown_tracker[rule_id]
+                continue
+            cooldown_end = last_triggered + timedelta(minutes=rule.cooldown_minutes)
+            if cooldown_end > current_time:
+                heapq.heappush(heap, (cooldown_end, rule_id))
+            else:
+                del self.cooldown_tracker[rule_id]
+    
     def evaluate_market_data(
         self,
         market_data: MarketData,
@@ -60,30 +153,110 @@ class AlertEngine:
         Evaluate market data against all active rules.
         Returns list of triggered alerts.
         """
-        triggered_alerts = []
         current_time = datetime.utcnow()
+        self._expire_rules(current_time)
+        self._release_cooldowns(current_time)
+        
+        position_symbols = self._position_symbols(user_positions)
+        return self._evaluate_symbol(
+            market_data, user_positions, position_symbols, current_time
+        )
+    
+    def evaluate_ticks(
+        self,
+        market_snapshot: Iterable[MarketData],
+        user_positions: Optional[List[Position]] = None
+    ) -> List[TriggeredAlert]:
+        """
+        Evaluate a whole market snapshot (one MarketData per symbol).
+        Conditions are evaluated for every rule at once through the compiled
+        rule set; results match calling evaluate_market_data per tick.
+        Returns list of triggered alerts across all symbols.
+        """
+        market_snapshot = list(market_snapshot)
+        current_time = datetime.utcnow()
+        self._expire_rules(current_time)
+        self._release_cooldowns(current_time)
+        
+        position_symbols = self._position_symbols(user_positions)
+        triggered_alerts = []
+        
+        # Repeated symbols need per-tick ordering of cooldowns; interpret them
+        if len({md.symbol for md in market_snapshot}) != len(market_snapshot):
+            for market_data in market_snapshot:
+                triggered_alerts.extend(self._evaluate_symbol(
+                    market_data, user_positions, position_symbols, current_time
+                ))
+            return triggered_alerts
+        
+        compiled = self.get_compiled_rules()
+        for market_data, rule, conditions, flags in compiled.evaluate(market_snapshot):
+            # Rules may have been expired earlier in this snapshot
+            if rule.rule_id not in self.active_rules:
+                continue
+            
+            if not self._passes_filters(rule, market_data, position_symbols, current_time):
+                continue
+            
+            if flags is None:
+                triggered, matched_conditions, trigger_values = self._evaluate_rule(
+                    rule, market_data, user_positions
+                )
+                if not triggered:
+                    continue
+            else:
+                matched_conditions = []
+                trigger_values = {}
+                for condition, matched in zip(conditions, flags):
+                    if matched:
+                        matched_conditions.append(condition.condition_id)
+                        trigger_values[condition.condition_type.value] = condition_value(
+                            condition, market_data
+                        )
+            
+            triggered_alerts.append(self._record_trigger(
+                rule, market_data, matched_conditions, trigger_values,
+                user_positions, current_time
+            ))
+        
+        return triggered_alerts
+    
+    def get_compiled_rules(self) -> CompiledRuleSet:
+        """Get the compiled rule set, recompiling if rules changed"""
+        if self._compiled_rules is None:
+            self._compiled_rules = CompiledRuleSet(self.symbol_index)
+        return self._compiled_rules
+    
+    def _position_symbols(self, user_positions: Optional[List[Position]]) -> Optional[Set[str]]:
+        """Build the set of symbols held in the given positions"""
+        if not user_positions:
+            return None
+        return {pos.symbol for pos in user_positions}
+    
+    def _evaluate_symbol(
+        self,
+        market_data: MarketData,
+        user_positions: Optional[List[Position]],
+        position_symbols: Optional[Set[str]],
+        current_time: datetime
+    ) -> List[TriggeredAlert]:
+        """Evaluate the rules watching a single symbol"""
+        triggered_alerts = []
+        
+        bucket = self.symbol_index.get(market_data.symbol)
+        if not bucket:
+            return triggered_alerts
         
         # Filter rules relevant to this symbol
         relevant_rules = [
-            rule for rule in self.active_rules.values()
-            if self._is_rule_relevant(rule, market_data, user_positions)
+            rule for rule in bucket.values()
+            if self._is_rule_relevant(rule, market_data, position_symbols)
         ]
         
         logger.debug(f"Evaluating {len(relevant_rules)} rules for {market_data.symbol}")
         
         for rule in relevant_rules:
-            # Check if rule is in cooldown
-            if self._is_in_cooldown(rule, current_time):
-                continue
-            
-            # Check if rule is expired
-            if rule.expires_at and current_time > rule.expires_at:
-                rule.status = AlertStatus.EXPIRED
-                self.remove_rule(rule.rule_id)
-                continue
-            
-            # Check market hours
-            if not self._check_market_hours(rule, market_data):
+            if not self._passes_filters(rule, market_data, None, current_time):
                 continue
             
             # Evaluate conditions
@@ -92,41 +265,83 @@ class AlertEngine:
             )
             
             if triggered:
-                alert = self._create_triggered_alert(
-                    rule, market_data, matched_conditions, trigger_values, user_positions
-                )
-                triggered_alerts.append(alert)
-                
-                # Update cooldown and stats
-                self.cooldown_tracker[rule.rule_id] = current_time
-                rule.last_triggered_at = current_time
-                rule.trigger_count += 1
-                
-                logger.info(
-                    f"Alert triggered: {rule.name} for {market_data.symbol} "
-                    f"(priority: {alert.priority.value})"
-                )
+                triggered_alerts.append(self._record_trigger(
+                    rule, market_data, matched_conditions, trigger_values,
+                    user_positions, current_time
+                ))
         
         return triggered_alerts
     
-    def _is_rule_relevant(
+    def _passes_filters(
         self,
         rule: AlertRule,
         market_data: MarketData,
-        user_positions: Optional[List[Position]]
+        position_symbols: Optional[Set[str]],
+        current_time: datetime
     ) -> bool:
-        """Check if rule is relevant to current market data and positions"""
-        # Check if any condition matches the symbol
-        symbol_match = any(
-            cond.symbol == market_data.symbol for cond in rule.conditions
-        )
+        """
+        Apply position, cooldown, expiry and market hours checks to a rule.
+        Pass position_symbols=None when relevance was already checked.
+        """
+        if position_symbols is not None and not self._is_rule_relevant(
+            rule, market_data, position_symbols
+        ):
+            return False
         
-        if not symbol_match:
+        # Check if rule is in cooldown
+        if self._is_in_cooldown(rule, current_time):
+            return False
+        
+        # Check if rule is expired
+        if rule.expires_at and current_time > rule.expires_at:
+            rule.status = AlertStatus.EXPIRED
+            self.remove_rule(rule.rule_id)
             return False
         
+        # Check market hours
+        return self._check_market_hours(rule, market_data)
+    
+    def _record_trigger(
+        self,
+        rule: AlertRule,
+        market_data: MarketData,
+        matched_conditions: List[str],
+        trigger_values: Dict[str, Any],
+        user_positions: Optional[List[Position]],
+        current_time: datetime
+    ) -> TriggeredAlert:
+        """Create the triggered alert and update cooldown and stats"""
+        alert = self._create_triggered_alert(
+            rule, market_data, matched_conditions, trigger_values, user_positions
+        )
+        
+        self.cooldown_tracker[rule.rule_id] = current_time
+        heapq.heappush(
+            self._cooldown_heap,
+            (current_time + timedelta(minutes=rule.cooldown_minutes), rule.rule_id)
+        )
+        rule.last_triggered_at = current_time
+        rule.trigger_count += 1
+        
+        logger.info(
+            f"Alert triggered: {rule.name} for {market_data.symbol} "
+            f"(priority: {alert.priority.value})"
+        )
+        
+        return alert
+    
+    def _is_rule_relevant(
+        self,
+        rule: AlertRule,
+        market_data: MarketData,
+        position_symbols: Optional[Set[str]]
+    ) -> bool:
+        """
+        Check if an indexed rule is relevant to the current positions.
+        The symbol index already guarantees a condition on this symbol.
+        """
         # Check position awareness
-        if rule.position_aware and user_positions:
-            position_symbols = {pos.symbol for pos in user_positions}
+        if rule.position_aware and position_symbols:
             return market_data.symbol in position_symbols
         
         return True
@@ -385,14 +600,16 @@ class AlertEngine:
     
     def get_rules_by_symbol(self, symbol: str) -> List[AlertRule]:
         """Get all active rules monitoring a symbol"""
-        return [
-            rule for rule in self.active_rules.values()
-            if any(cond.symbol == symbol for cond in rule.conditions)
-        ]
+        return list(self.symbol_index.get(symbol, {}).values())
+    
+    def get_rules_by_condition_type(self, condition_type: ConditionType) -> List[AlertRule]:
+        """Get all active rules using a condition type"""
+        return list(self.condition_type_index.get(condition_type, {}).values())
     
     def clear_cooldowns(self) -> None:
         """Clear all cooldown trackers (for testing)"""
         self.cooldown_tracker.clear()
+        self._cooldown_heap.clear()
     
     def get_engine_stats(self) -> Dict[str, Any]:
         """Get engine statistics"""
@@ -414,5 +631,6 @@ class AlertEngine:
             "rules_in_cooldown": rules_in_cooldown,
             "rules_by_priority": dict(by_priority),
             "rules_by_category": dict(by_category),
-            "cooldown_tracker_size": len(self.cooldown_tracker)
+            "cooldown_tracker_size": len(self.cooldown_tracker),
+            "indexed_symbols": len(self.symbol_index)
         }
@@ -6,6 +6,8 @@ FastAPI-based REST API for the Smart Alerts system.
 Provides endpoints for alert management, delivery preferences, templates, and analytics.
 """
 
+import os
+
 from fastapi import FastAPI, HTTPException, Query, Body
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
@@ -14,7 +16,7 @@ from datetime import datetime
 from enum import Enum
 
 from .models import (
-    AlertRule, AlertCondition, TriggeredAlert, AlertPriority,
+    AlertRule, AlertCondition, TriggeredAlert, ConsolidatedAlert, AlertPriority,
     AlertStatus, ConditionType, DeliveryChannel, MarketSession,
     DeliveryPreference, Position, MarketData
 )
@@ -22,6 +24,7 @@ from .alert_engine import AlertEngine
 from .learning_engine import LearningEngine
 from .consolidation_engine import ConsolidationEngine
 from .notification_service import NotificationService
+from .delivery_pipeline import DeliveryPipeline
 from .template_manager import TemplateManager
 
 # Initialize FastAPI app
@@ -31,14 +34,45 @@ app = FastAPI(
     version="1.0.0"
 )
 
+def deliver_flushed_alert(consolidated: ConsolidatedAlert):
+    """Deliver alerts consolidated when their window closed"""
+    if delivery_pipeline.running:
+        notification_service.enqueue_alert(consolidated)
+    else:
+        notification_service.deliver_alert(consolidated)
+
+
 # Initialize engines
 alert_engine = AlertEngine()
 learning_engine = LearningEngine()
-consolidation_engine = ConsolidationEngine()
-notification_service = NotificationService()
+consolidation_engine = ConsolidationEngine(on_flush=deliver_flushed_alert)
+delivery_pipeline = DeliveryPipeline()
+notification_service = NotificationService(pipeline=delivery_pipeline)
 template_manager = TemplateManager()
 
 
+@app.on_event("startup")
+async def start_delivery_pipeline():
+    """Start asynchronous delivery when OPTIX_ASYNC_DELIVERY is enabled"""
+    if os.getenv("OPTIX_ASYNC_DELIVERY", "false").lower() == "true":
+        await delivery_pipeline.start()
+
+
+@app.on_event("startup")
+async def start_consolidation_timer():
+    """Flush consolidation windows as they close"""
+    await consolidation_engine.start()
+
+
+@app.on_event("shutdown")
+async def stop_delivery_pipeline():
+    """Flush pending consolidations and queued deliveries before shutting down"""
+    await consolidation_engine.stop()
+    for consolidated in consolidation_engine.force_flush_all():
+        deliver_flushed_alert(consolidated)
+    await delivery_pipeline.stop()
+
+
 # ============================================================================
 # Pydantic Models for API
 # ============================================================================
@@ -305,8 +339,11 @@ async def evaluate_market_data(market_data: MarketDataInput):
         for alert in triggered_alerts:
             consolidated = consolidation_engine.process_alert(alert)
             if consolidated:
-                # Deliver notifications
-                delivery_results = notification_service.deliver_alert(consolidated)
+                # Deliver notifications (queued when the async pipeline is running)
+                if delivery_pipeline.running:
+                    delivery_results = notification_service.enqueue_alert(consolidated)
+                else:
+                    delivery_results = notification_service.deliver_alert(consolidated)
                 consolidated_results.append({
                     "alert_id": consolidated.consolidated_id,
                     "title": consolidated.title,
@@ -0,0 +1,250 @@
+"""
+VS-9 Smart Alerts Ecosystem - Condition Compiler
+OPTIX Trading Platform
+
+Compiles alert rule conditions into a columnar form so a full market snapshot
+can be evaluated against every rule with NumPy comparisons instead of
+interpreting each AlertCondition per tick.
+"""
+
+import logging
+from typing import Dict, List, Optional, Tuple, Any, Iterator
+
+import numpy as np
+
+from .models import AlertRule, AlertCondition, MarketData, ConditionType
+
+logger = logging.getLogger(__name__)
+
+
+# Market data columns read by compiled conditions
+FIELDS = (
+    "price",
+    "price_change_percent",
+    "implied_volatility",
+    "iv_rank",
+    "volume_ratio",
+    "put_call_ratio",
+    "unusual_activity_score",
+    "spread_pct",
+    "total_delta",
+    "total_gamma",
+)
+
+# Comparison operators, mirroring AlertEngine._evaluate_condition
+OP_GT = "gt"
+OP_LT = "lt"
+OP_GE = "ge"
+OP_ABS_GE = "abs_ge"
+
+# condition type -> (field, operator)
+CONDITION_SPECS: Dict[ConditionType, Tuple[str, str]] = {
+    ConditionType.PRICE_ABOVE: ("price", OP_GT),
+    ConditionType.PRICE_BELOW: ("price", OP_LT),
+    ConditionType.PRICE_CHANGE: ("price_change_percent", OP_ABS_GE),
+    ConditionType.IV_ABOVE: ("implied_volatility", OP_GT),
+    ConditionType.IV_BELOW: ("implied_volatility", OP_LT),
+    ConditionType.IV_CHANGE: ("iv_rank", OP_ABS_GE),
+    ConditionType.VOLUME_ABOVE: ("volume_ratio", OP_GE),
+    ConditionType.FLOW_BULLISH: ("put_call_ratio", OP_LT),
+    ConditionType.FLOW_BEARISH: ("put_call_ratio", OP_GT),
+    ConditionType.UNUSUAL_ACTIVITY: ("unusual_activity_score", OP_GE),
+    ConditionType.SPREAD_WIDTH: ("spread_pct", OP_GE),
+    ConditionType.DELTA_CHANGE: ("total_delta", OP_ABS_GE),
+    ConditionType.GAMMA_EXPOSURE: ("total_gamma", OP_ABS_GE),
+}
+
+
+def field_value(market_data: MarketData, field_name: str) -> Any:
+    """Read a compiled field from market data, as the interpreter sees it"""
+    if field_name == "spread_pct":
+        spread = market_data.ask - market_data.bid
+        return (spread / market_data.price) * 100 if market_data.price > 0 else 0
+    return getattr(market_data, field_name)
+
+
+def condition_value(condition: AlertCondition, market_data: MarketData) -> Any:
+    """Trigger value reported for a matched compiled condition"""
+    field_name, _ = CONDITION_SPECS[condition.condition_type]
+    return field_value(market_data, field_name)
+
+
+def build_snapshot_columns(market_snapshot: List[MarketData]) -> Dict[str, np.ndarray]:
+    """
+    Pack a market snapshot into one float64 column per field.
+    Missing optional values become NaN, which fails every comparison.
+    A trailing NaN row is appended for conditions on symbols not in the snapshot.
+    """
+    n = len(market_snapshot)
+    columns: Dict[str, np.ndarray] = {}
+
+    for field_name in FIELDS:
+        if field_name == "spread_pct":
+            continue
+        values = [getattr(md, field_name) for md in market_snapshot]
+        column = np.array(
+            [np.nan if v is None else v for v in values] + [np.nan],
+            dtype=np.float64
+        )
+        columns[field_name] = column
+
+    bid = np.array([md.bid for md in market_snapshot] + [0.0], dtype=np.float64)
+    ask = np.array([md.ask for md in market_snapshot] + [0.0], dtype=np.float64)
+    price = columns["price"]
+    spread_pct = np.zeros(n + 1, dtype=np.float64)
+    positive = price > 0
+    spread_pct[positive] = ((ask[positive] - bid[positive]) / price[positive]) * 100
+    spread_pct[n] = np.nan
+    columns["spread_pct"] = spread_pct
+
+    return columns
+
+
+class CompiledRuleSet:
+    """
+    Columnar compilation of the rules in an AlertEngine symbol index.
+
+    Every (rule, symbol) pair the engine would evaluate on a tick becomes a
+    contiguous run of condition rows. Condition rows are grouped by
+    (field, operator) with threshold arrays, so evaluating a snapshot is one
+    vectorised comparison per group followed by AND/OR reductions per pair.
+    Rules with position-based conditions are flagged for the interpreter.
+    """
+
+    def __init__(self, symbol_index: Dict[str, Dict[str, AlertRule]]):
+        self.symbols: List[str] = list(symbol_index.keys())
+        self.symbol_ids: Dict[str, int] = {s: i for i, s in enumerate(self.symbols)}
+
+        # Per (rule, symbol) pair, in the engine's evaluation order
+        self.pair_rules: List[AlertRule] = []
+        self.pair_conditions: List[List[AlertCondition]] = []
+        pair_symbol: List[int] = []
+        pair_start: List[int] = []
+        pair_is_and: List[bool] = []
+        pair_complete: List[bool] = []
+        pair_interpreted: List[bool] = []
+
+        # Per condition row
+        row_symbol: List[int] = []
+        row_threshold: List[float] = []
+        group_rows: Dict[Tuple[str, str], List[int]] = {}
+
+        for symbol, bucket in symbol_index.items():
+            symbol_id = self.symbol_ids[symbol]
+            for rule in bucket.values():
+                conditions = [c for c in rule.conditions if c.symbol == symbol]
+                interpreted = any(
+                    c.condition_type not in CONDITION_SPECS for c in rule.conditions
+                )
+
+                self.pair_rules.append(rule)
+                self.pair_conditions.append(conditions)
+                pair_symbol.append(symbol_id)
+                pair_start.append(len(row_symbol))
+                pair_is_and.append(rule.logic == "AND")
+                pair_complete.append(len(conditions) == len(rule.conditions))
+                pair_interpreted.append(interpreted)
+
+                for condition in conditions:
+                    row = len(row_symbol)
+                    row_symbol.append(symbol_id)
+                    row_threshold.append(condition.threshold)
+                    spec = CONDITION_SPECS.get(condition.condition_type)
+                    if spec is not None and not interpreted:
+                        group_rows.setdefault(spec, []).append(row)
+
+        self.n_rows = len(row_symbol)
+        self.pair_symbol = np.array(pair_symbol, dtype=np.int64)
+        self.pair_start = np.array(pair_start, dtype=np.int64)
+        self.pair_is_and = np.array(pair_is_and, dtype=bool)
+        self.pair_complete = np.array(pair_complete, dtype=bool)
+        self.pair_interpreted = np.array(pair_interpreted, dtype=bool)
+
+        row_symbol_arr = np.array(row_symbol, dtype=np.int64)
+        row_threshold_arr = np.array(row_threshold, dtype=np.float64)
+
+        # (field, op) -> (row indices, symbol ids, thresholds)
+        self.groups: Dict[Tuple[str, str], Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        for spec, rows in group_rows.items():
+            rows_arr = np.array(rows, dtype=np.int64)
+            self.groups[spec] = (
+                rows_arr,
+                row_symbol_arr[rows_arr],
+                row_threshold_arr[rows_arr],
+            )
+
+        logger.debug(
+            f"Compiled {len(self.pair_rules)} rule/symbol pairs, "
+            f"{self.n_rows} conditions in {len(self.groups)} groups"
+        )
+
+    def evaluate_mask(
+        self,
+        columns: Dict[str, np.ndarray],
+        snapshot_rows: np.ndarray
+    ) -> np.ndarray:
+        """
+        Evaluate every compiled condition row against packed snapshot columns.
+        snapshot_rows maps compiled symbol id -> snapshot row (NaN row if absent).
+        """
+        mask = np.zeros(self.n_rows, dtype=bool)
+
+        for (field_name, op), (rows, symbols, thresholds) in self.groups.items():
+            values = columns[field_name][snapshot_rows[symbols]]
+            if op == OP_GT:
+                matched = values > thresholds
+            elif op == OP_LT:
+                matched = values < thresholds
+            elif op == OP_GE:
+                matched = values >= thresholds
+            else:
+                matched = np.abs(values) >= thresholds
+            mask[rows] = matched
+
+        return mask
+
+    def evaluate(
+        self,
+        market_snapshot: List[MarketData]
+    ) -> Iterator[Tuple[MarketData, AlertRule, List[AlertCondition], Optional[np.ndarray]]]:
+        """
+        Evaluate a snapshot with one MarketData per symbol.
+
+        Yields (market_data, rule, conditions, matched_flags) for each pair that
+        triggered, in the order the per-tick engine would visit them.
+        matched_flags is None for pairs the interpreter must evaluate.
+        """
+        if not self.pair_rules or not market_snapshot:
+            return
+
+        n = len(market_snapshot)
+        snapshot_rows = np.full(len(self.symbols), n, dtype=np.int64)
+        for row, md in enumerate(market_snapshot):
+            symbol_id = self.symbol_ids.get(md.symbol)
+            if symbol_id is not None:
+                snapshot_rows[symbol_id] = row
+
+        columns = build_snapshot_columns(market_snapshot)
+        mask = self.evaluate_mask(columns, snapshot_rows)
+
+        all_matched = np.logical_and.reduceat(mask, self.pair_start)
+        any_matched = np.logical_or.reduceat(mask, self.pair_start)
+        triggered = np.where(
+            self.pair_is_and, all_matched & self.pair_complete, any_matched
+        )
+
+        pair_rows = snapshot_rows[self.pair_symbol]
+        candidates = np.nonzero(
+            (pair_rows < n) & (triggered | self.pair_interpreted)
+        )[0]
+        order = candidates[np.argsort(pair_rows[candidates], kind="stable")]
+
+        for pair in order.tolist():
+            market_data = market_snapshot[pair_rows[pair]]
+            conditions = self.pair_conditions[pair]
+            if self.pair_interpreted[pair]:
+                yield market_data, self.pair_rules[pair], conditions, None
+            else:
+                start = self.pair_start[pair]
+                flags = mask[start:start + len(conditions)]
+                yield market_data, self.pair_rules[pair], conditions, flags
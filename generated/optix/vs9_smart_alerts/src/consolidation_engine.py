@@ -3,12 +3,16 @@ VS-9 Smart Alerts Ecosystem - Consolidation Engine
 OPTIX Trading Platform
 
 Intelligent alert consolidation to group related alerts and reduce notification fatigue.
-Implements time-window and semantic grouping strategies.
+Implements time-window and semantic grouping strategies. Consolidation windows
+are closed by a timer wheel, so pending alerts are delivered when their window
+ends even if no further alert arrives.
 """
 
+import asyncio
 import logging
+import math
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
 from collections import defaultdict
 
 from .models import (
@@ -17,6 +21,130 @@ from .models import (
 
 logger = logging.getLogger(__name__)
 
+# Priorities from lowest to highest
+PRIORITY_RANK = {priority: rank for rank, priority in enumerate(AlertPriority)}
+
+EPOCH = datetime(1970, 1, 1)
+
+# Called with each consolidated alert flushed when its window closes
+FlushCallback = Callable[[ConsolidatedAlert], None]
+
+
+def epoch_seconds(moment: datetime) -> float:
+    """Seconds since the epoch for a naive UTC datetime"""
+    return (moment - EPOCH).total_seconds()
+
+
+class TimerWheel:
+    """
+    Hierarchical timer wheel keyed by deadline.
+    
+    Level 0 has one slot per tick; each higher level has slots spanning a
+    whole turn of the level below, and its timers cascade down as the wheel
+    turns. Scheduling and cancelling are O(1), and advancing costs O(1) per
+    elapsed tick plus the timers it moves.
+    """
+    
+    def __init__(
+        self,
+        tick_seconds: float = 1.0,
+        slots_per_level: int = 64,
+        levels: int = 4,
+        start: float = 0.0
+    ):
+        self.tick_seconds = tick_seconds
+        self.slots_per_level = slots_per_level
+        self.levels = levels
+        self._wheels: List[List[Dict[Hashable, int]]] = [
+            [{} for _ in range(slots_per_level)] for _ in range(levels)
+        ]
+        self._overflow: Dict[Hashable, int] = {}  # Beyond the top level's turn
+        self._expired: Dict[Hashable, int] = {}  # Scheduled with a past deadline
+        self._buckets: Dict[Hashable, Dict[Hashable, int]] = {}
+        self._tick = int(start // tick_seconds)  # Last tick processed
+    
+    def __len__(self) -> int:
+        return len(self._buckets)
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._buckets
+    
+    def keys(self) -> List[Hashable]:
+        """Keys with a pending timer"""
+        return list(self._buckets)
+    
+    def schedule(self, key: Hashable, deadline: float) -> None:
+        """Schedule (or reschedule) key to fire once deadline has passed"""
+        self.cancel(key)
+        tick = math.ceil(deadline / self.tick_seconds)
+        if tick <= self._tick:
+            self._expired[key] = tick
+            self._buckets[key] = self._expired
+        else:
+            self._place(key, tick)
+    
+    def cancel(self, key: Hashable) -> None:
+        """Cancel key's timer, if any"""
+        bucket = self._buckets.pop(key, None)
+        if bucket is not None:
+            del bucket[key]
+    
+    def advance(self, now: float) -> List[Hashable]:
+        """Advance the wheel to now, returning the keys whose deadline passed"""
+        due = list(self._expired)
+        for key in due:
+            del self._buckets[key]
+        self._expired.clear()
+        
+        target = int(now // self.tick_seconds)
+        while self._tick < target:
+            if not self._buckets:
+                self._tick = target
+                break
+            
+            self._tick += 1
+            
+            # Cascade every level whose turn just completed, highest first
+            level = 0
+            while level + 1 < self.levels and self._tick % self.slots_per_level ** (level + 1) == 0:
+                level += 1
+            for cascade_level in range(level, 0, -1):
+                self._cascade(cascade_level)
+            
+            bucket = self._wheels[0][self._tick % self.slots_per_level]
+            for key in bucket:
+                del self._buckets[key]
+            due.extend(bucket)
+            bucket.clear()
+        
+        return due
+    
+    def _place(self, key: Hashable, tick: int) -> None:
+        delta = tick - self._tick
+        bucket = self._overflow
+        for level in range(self.levels):
+            if delta < self.slots_per_level ** (level + 1):
+                span = self.slots_per_level ** level
+                bucket = self._wheels[level][(tick // span) % self.slots_per_level]
+                break
+        
+        bucket[key] = tick
+        self._buckets[key] = bucket
+    
+    def _cascade(self, level: int) -> None:
+        """Move the timers of the slot just reached on level down the wheel"""
+        span = self.slots_per_level ** level
+        bucket = self._wheels[level][(self._tick // span) % self.slots_per_level]
+        timers = list(bucket.items())
+        if level == self.levels - 1:
+            timers.extend(self._overflow.items())
+            self._overflow.clear()
+        bucket.clear()
+        
+        for key, tick in timers:
+            self._place(key, tick)
+
+
 
 class ConsolidationEngine:
     """
@@ -24,12 +152,26 @@ class ConsolidationEngine:
     Groups alerts by symbol, time window, and semantic similarity.
     """
     
-    def __init__(self, consolidation_window_minutes: int = 5):
+    def __init__(
+        self,
+        consolidation_window_minutes: int = 5,
+        max_pending_alerts: int = 10,
+        tick_seconds: float = 1.0,
+        on_flush: Optional[FlushCallback] = None
+    ):
         self.consolidation_window_minutes = consolidation_window_minutes
+        self.max_pending_alerts = max_pending_alerts
+        self.on_flush = on_flush
         self.pending_alerts: Dict[str, List[TriggeredAlert]] = defaultdict(list)
         self.consolidation_groups: Dict[str, ConsolidatedAlert] = {}
         self.last_flush_time: Dict[str, datetime] = {}
         
+        # Window deadlines of users with pending alerts
+        self.flush_timers = TimerWheel(
+            tick_seconds=tick_seconds, start=epoch_seconds(datetime.utcnow())
+        )
+        self._flusher: Optional[asyncio.Task] = None
+        
     def process_alert(
         self,
         alert: TriggeredAlert,
@@ -56,8 +198,53 @@ class ConsolidationEngine:
         if self._should_flush(user_id):
             return self._flush_pending_alerts(user_id)
         
+        # Otherwise the window's timer flushes it
+        if user_id not in self.flush_timers:
+            deadline = self.last_flush_time[user_id] + timedelta(minutes=self.consolidation_window_minutes)
+            self.flush_timers.schedule(user_id, epoch_seconds(deadline))
+        
         return None
     
+    def flush_due(self, now: Optional[datetime] = None) -> List[ConsolidatedAlert]:
+        """
+        Flush users whose consolidation window has closed.
+        Each consolidated alert is also passed to on_flush.
+        """
+        now = now or datetime.utcnow()
+        results = []
+        
+        for user_id in self.flush_timers.advance(epoch_seconds(now)):
+            consolidated = self._flush_pending_alerts(user_id)
+            if consolidated:
+                results.append(consolidated)
+                if self.on_flush:
+                    self.on_flush(consolidated)
+        
+        return results
+    
+    async def start(self) -> None:
+        """Start flushing consolidation windows as they close"""
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._run_flusher())
+    
+    async def stop(self) -> None:
+        """Stop the window timer; pending alerts stay pending"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+    
+    async def _run_flusher(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_timers.tick_seconds)
+            try:
+                self.flush_due()
+            except Exception:
+                logger.exception("Failed to flush consolidation windows")
+    
     def _should_flush(self, user_id: str) -> bool:
         """Check if consolidation window has passed for a user"""
         if user_id not in self.last_flush_time:
@@ -69,7 +256,7 @@ class ConsolidationEngine:
         
         # Also flush if we have too many pending alerts
         alert_count = len(self.pending_alerts[user_id])
-        too_many_alerts = alert_count >= 10
+        too_many_alerts = alert_count >= self.max_pending_alerts
         
         return window_passed or too_many_alerts
     
@@ -78,7 +265,8 @@ class ConsolidationEngine:
         Flush pending alerts for a user and create consolidated alerts.
         Returns the consolidated alert if any were pending.
         """
-        pending = self.pending_alerts[user_id]
+        self.flush_timers.cancel(user_id)
+        pending = self.pending_alerts.pop(user_id, None)
         
         if not pending:
             return None
@@ -86,8 +274,7 @@ class ConsolidationEngine:
         # Group alerts by consolidation strategy
         grouped_alerts = self._group_alerts(pending)
         
-        # Clear pending for this user
-        self.pending_alerts[user_id] = []
+        # Reset this user's window
         self.last_flush_time[user_id] = datetime.utcnow()
         
         # If only one group or single alert, return it directly
@@ -170,7 +357,7 @@ class ConsolidationEngine:
             raise ValueError("Cannot consolidate empty alert list")
         
         # Determine highest priority
-        max_priority = max(alert.priority for alert in alerts)
+        max_priority = max((alert.priority for alert in alerts), key=PRIORITY_RANK.get)
         
         # Create title and summary
         title = self._create_consolidated_title(alerts)
@@ -218,7 +405,7 @@ class ConsolidationEngine:
             all_alerts.extend(cons.alerts)
             all_alert_ids.extend(cons.alert_ids)
         
-        max_priority = max(cons.priority for cons in consolidations)
+        max_priority = max((cons.priority for cons in consolidations), key=PRIORITY_RANK.get)
         
         # Create summary
         summary_parts = [
@@ -233,7 +420,7 @@ class ConsolidationEngine:
             alerts=all_alerts,
             consolidation_reason="multiple_groups",
             consolidation_group="merged",
-            title=f"{len(all_alerts)} alerts across multiple groups",
+            title=self._create_consolidated_title(all_alerts),
             summary=summary,
             priority=max_priority,
             alert_count=len(all_alerts),
@@ -317,7 +504,7 @@ class ConsolidationEngine:
     def force_flush_all(self) -> List[ConsolidatedAlert]:
         """Force flush all pending alerts"""
         results = []
-        for user_id in list(self.pending_alerts.keys()):
+        for user_id in self.flush_timers.keys():
             consolidated = self.force_flush_user(user_id)
             if consolidated:
                 results.append(consolidated)
@@ -333,6 +520,7 @@ class ConsolidationEngine:
     
     def clear_user_pending(self, user_id: str) -> None:
         """Clear pending alerts for a user without consolidating"""
+        self.flush_timers.cancel(user_id)
         if user_id in self.pending_alerts:
             del self.pending_alerts[user_id]
         if user_id in self.last_flush_time:
@@ -0,0 +1,388 @@
+"""
+VS-9 Smart Alerts Ecosystem - Delivery Pipeline
+OPTIX Trading Platform
+
+Asynchronous notification delivery. Each channel has its own bounded queue and
+worker pool; push and webhook requests share a pooled HTTP client, email is
+sent in batches over one SMTP session, and SMS batches are posted
+concurrently. Failed endpoints are retried with exponential backoff and end up
+in a dead-letter queue once their attempts are exhausted. Submitting a job
+never waits on delivery, so alert evaluation is not blocked by slow providers.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Set
+
+from .integrations import NotificationIntegrations, ProviderResult
+from .models import ConsolidatedAlert, DeliveryChannel
+
+try:  # pragma: no cover - dependency availability depends on deployment image
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+
+# Channels whose workers drain the queue in batches
+BATCHED_CHANNELS = {DeliveryChannel.EMAIL, DeliveryChannel.SMS}
+
+
+@dataclass
+class DeliveryJob:
+    """Delivery of one alert to a single endpoint of a channel"""
+    alert: ConsolidatedAlert
+    channel: DeliveryChannel
+    endpoint: str  # push token, email address, phone number, webhook URL or user id
+    payload: Dict[str, Any] = field(default_factory=dict)
+    attempts: int = 0
+    last_error: Optional[str] = None
+    enqueued_at: datetime = field(default_factory=datetime.utcnow)
+
+
+@dataclass
+class PipelineConfig:
+    """Tuning knobs for the delivery pipeline"""
+    workers_per_channel: Dict[DeliveryChannel, int] = field(
+        default_factory=lambda: {
+            DeliveryChannel.PUSH: 8,
+            DeliveryChannel.WEBHOOK: 8,
+            DeliveryChannel.EMAIL: 2,
+            DeliveryChannel.SMS: 2,
+            DeliveryChannel.IN_APP: 1,
+        }
+    )
+    queue_size: int = 10000
+    max_attempts: int = 4
+    backoff_base_seconds: float = 0.5
+    backoff_max_seconds: float = 30.0
+    batch_size: int = 50
+    batch_linger_seconds: float = 0.05
+    http_max_connections: int = 100
+    http_timeout_seconds: float = 10.0
+    dead_letter_size: int = 10000
+
+
+ResultCallback = Callable[[DeliveryJob, ProviderResult], None]
+
+
+class DeliveryPipeline:
+    """
+    Asyncio delivery pipeline with per-channel worker pools, retry with
+    backoff and a dead-letter queue.
+    """
+
+    def __init__(
+        self,
+        integrations: Optional[NotificationIntegrations] = None,
+        config: Optional[PipelineConfig] = None,
+        on_result: Optional[ResultCallback] = None,
+    ):
+        self.integrations = integrations or NotificationIntegrations.from_env()
+        self.config = config or PipelineConfig()
+        self.on_result = on_result
+
+        self.queues: Dict[DeliveryChannel, asyncio.Queue] = {}
+        self.dead_letters: Deque[DeliveryJob] = deque(maxlen=self.config.dead_letter_size)
+        self.stats: Dict[str, int] = {"submitted": 0, "sent": 0, "retried": 0, "dead_lettered": 0}
+
+        self._workers: List[asyncio.Task] = []
+        self._retry_handles: Set[asyncio.TimerHandle] = set()
+        self._client: Optional[Any] = None
+        self._in_flight = 0
+        self._idle: Optional[asyncio.Event] = None
+        self._running = False
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    async def start(self) -> None:
+        """Create the HTTP pool and start the channel workers"""
+        if self._running:
+            return
+        if httpx is None:
+            raise RuntimeError("httpx is required for the delivery pipeline")
+
+        self._client = httpx.AsyncClient(
+            timeout=self.config.http_timeout_seconds,
+            limits=httpx.Limits(
+                max_connections=self.config.http_max_connections,
+                max_keepalive_connections=self.config.http_max_connections,
+            ),
+        )
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+        for channel in DeliveryChannel:
+            self.queues[channel] = asyncio.Queue(maxsize=self.config.queue_size)
+            worker = self._batch_worker if channel in BATCHED_CHANNELS else self._worker
+            for _ in range(self.config.workers_per_channel.get(channel, 1)):
+                self._workers.append(asyncio.create_task(worker(channel)))
+
+        self._running = True
+        logger.info(f"Delivery pipeline started with {len(self._workers)} workers")
+
+    async def stop(self, drain: bool = True) -> None:
+        """Stop the workers, optionally after delivering everything queued"""
+        if not self._running:
+            return
+        if drain:
+            await self.drain()
+
+        for handle in self._retry_handles:
+            handle.cancel()
+        self._retry_handles.clear()
+
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+
+        await self._client.aclose()
+        self._client = None
+        self._running = False
+        logger.info("Delivery pipeline stopped")
+
+    async def drain(self) -> None:
+        """Wait until every submitted job is delivered or dead-lettered"""
+        if self._idle is not None:
+            await self._idle.wait()
+
+    def submit(self, job: DeliveryJob) -> bool:
+        """
+        Enqueue a job without waiting. Returns False (and dead-letters the job)
+        when the pipeline is not running or the channel queue is full.
+        """
+        self.stats["submitted"] += 1
+        if not self._running:
+            self._fail(job, ProviderResult(False, job.channel.value, error="Pipeline not running"))
+            return False
+
+        self._track(1)
+        try:
+            self.queues[job.channel].put_nowait(job)
+        except asyncio.QueueFull:
+            self._track(-1)
+            self._fail(job, ProviderResult(False, job.channel.value, error="Delivery queue full"))
+            return False
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pipeline counters and queue depths"""
+        return {
+            **self.stats,
+            "in_flight": self._in_flight,
+            "dead_letter_size": len(self.dead_letters),
+            "queue_depths": {
+                channel.value: queue.qsize() for channel, queue in self.queues.items()
+            },
+        }
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    async def _worker(self, channel: DeliveryChannel) -> None:
+        """Deliver jobs one at a time; concurrency comes from the pool size"""
+        queue = self.queues[channel]
+        while True:
+            job = await queue.get()
+            try:
+                result = await self._send(job)
+            except Exception as exc:  # pragma: no cover - defensive, senders catch their own
+                logger.error(f"Delivery worker error for {channel.value}: {exc}")
+                result = ProviderResult(False, channel.value, error=str(exc), retryable=True)
+            finally:
+                queue.task_done()
+            self._complete(job, result)
+
+    async def _batch_worker(self, channel: DeliveryChannel) -> None:
+        """Collect up to batch_size jobs (or wait batch_linger_seconds) and send together"""
+        queue = self.queues[channel]
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.config.batch_linger_seconds
+            while len(batch) < self.config.batch_size:
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                if channel == DeliveryChannel.EMAIL:
+                    results = await self._send_email_batch(batch)
+                else:
+                    results = await asyncio.gather(*(self._send(job) for job in batch))
+            except Exception as exc:  # pragma: no cover - defensive, senders catch their own
+                logger.error(f"Batch delivery error for {channel.value}: {exc}")
+                results = [
+                    ProviderResult(False, channel.value, error=str(exc), retryable=True)
+                    for _ in batch
+                ]
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+            for job, result in zip(batch, results):
+                self._complete(job, result)
+
+    # ------------------------------------------------------------------
+    # Completion, retry and dead letters
+    # ------------------------------------------------------------------
+
+    def _complete(self, job: DeliveryJob, result: ProviderResult) -> None:
+        job.attempts += 1
+        if result.success:
+            self.stats["sent"] += 1
+            self._notify(job, result)
+            self._track(-1)
+            return
+
+        job.last_error = result.error
+        if result.retryable and job.attempts < self.config.max_attempts:
+            self.stats["retried"] += 1
+            delay = min(
+                self.config.backoff_base_seconds * (2 ** (job.attempts - 1)),
+                self.config.backoff_max_seconds,
+            )
+            logger.warning(
+                f"Retrying {job.channel.value} delivery for alert "
+                f"{job.alert.consolidated_id} in {delay:.2f}s: {result.error}"
+            )
+            self._schedule_retry(job, delay)
+            return
+
+        self._track(-1)
+        self._fail(job, result)
+
+    def _schedule_retry(self, job: DeliveryJob, delay: float) -> None:
+        loop = asyncio.get_running_loop()
+
+        def requeue() -> None:
+            self._retry_handles.discard(handle)
+            try:
+                self.queues[job.channel].put_nowait(job)
+            except asyncio.QueueFull:
+                self._track(-1)
+                self._fail(job, ProviderResult(False, job.channel.value, error="Delivery queue full"))
+
+        handle = loop.call_later(delay, requeue)
+        self._retry_handles.add(handle)
+
+    def _fail(self, job: DeliveryJob, result: ProviderResult) -> None:
+        job.last_error = result.error
+        self.dead_letters.append(job)
+        self.stats["dead_lettered"] += 1
+        logger.error(
+            f"Dead-lettered {job.channel.value} delivery for alert "
+            f"{job.alert.consolidated_id} after {job.attempts} attempt(s): {result.error}"
+        )
+        self._notify(job, result)
+
+    def _notify(self, job: DeliveryJob, result: ProviderResult) -> None:
+        if self.on_result is None:
+            return
+        try:
+            self.on_result(job, result)
+        except Exception as exc:
+            logger.error(f"Delivery result callback failed: {exc}")
+
+    def _track(self, delta: int) -> None:
+        self._in_flight += delta
+        if self._idle is None:
+            return
+        if self._in_flight == 0:
+            self._idle.set()
+        else:
+            self._idle.clear()
+
+    # ------------------------------------------------------------------
+    # Channel senders
+    # ------------------------------------------------------------------
+
+    async def _send(self, job: DeliveryJob) -> ProviderResult:
+        if job.channel == DeliveryChannel.PUSH:
+            return await self._send_push(job)
+        if job.channel == DeliveryChannel.WEBHOOK:
+            return await self._send_webhook(job)
+        if job.channel == DeliveryChannel.SMS:
+            return await self._send_sms(job)
+        if job.channel == DeliveryChannel.IN_APP:
+            return self.integrations.in_app.create(job.endpoint, job.payload)
+        return ProviderResult(False, job.channel.value, error="No sender for channel")
+
+    def _simulated(self, provider: str, job: DeliveryJob) -> Optional[ProviderResult]:
+        """Result for an unconfigured provider, honouring the simulated fallback"""
+        if self.integrations.allow_simulated_fallback:
+            logger.info(f"[{provider.upper()}] Simulated delivery to {job.endpoint}")
+            return ProviderResult(True, provider, metadata={"simulated": True})
+        return ProviderResult(False, provider, error=f"{provider} provider not configured")
+
+    async def _post(
+        self,
+        provider: str,
+        url: str,
+        headers: Dict[str, str],
+        content: bytes,
+    ) -> ProviderResult:
+        try:
+            response = await self._client.post(url, content=content, headers=headers)
+        except httpx.HTTPError as exc:
+            return ProviderResult(False, provider, error=str(exc) or type(exc).__name__, retryable=True)
+
+        if 200 <= response.status_code < 300:
+            return ProviderResult(True, provider, metadata={"status": response.status_code})
+        return ProviderResult(
+            False,
+            provider,
+            error=f"HTTP {response.status_code}",
+            metadata={"status": response.status_code},
+            retryable=response.status_code >= 500 or response.status_code == 429,
+        )
+
+    async def _send_push(self, job: DeliveryJob) -> ProviderResult:
+        push = self.integrations.push
+        if not push.configured:
+            return self._simulated("fcm", job)
+        message = push.message(
+            job.endpoint, job.payload["title"], job.payload["body"], job.payload.get("data", {})
+        )
+        return await self._post(
+            "fcm", push.endpoint, push.headers, json.dumps(message).encode("utf-8")
+        )
+
+    async def _send_webhook(self, job: DeliveryJob) -> ProviderResult:
+        body = json.dumps(job.payload, default=str).encode("utf-8")
+        return await self._post("webhook", job.endpoint, self.integrations.webhook.headers, body)
+
+    async def _send_sms(self, job: DeliveryJob) -> ProviderResult:
+        sms = self.integrations.sms
+        if not sms.configured:
+            return self._simulated("twilio", job)
+        return await self._post(
+            "twilio", sms.endpoint, sms.headers, sms.form(job.endpoint, job.payload["message"])
+        )
+
+    async def _send_email_batch(self, batch: List[DeliveryJob]) -> List[ProviderResult]:
+        email = self.integrations.email
+        if not email.configured:
+            return [self._simulated("smtp", job) for job in batch]
+        messages = [
+            (job.endpoint, job.payload["subject"], job.payload["body"]) for job in batch
+        ]
+        return await asyncio.to_thread(email.send_batch, messages)
@@ -8,6 +8,7 @@ can enable real providers via environment variables.
 
 from __future__ import annotations
 
+import base64
 import json
 import logging
 import os
@@ -15,8 +16,8 @@ import smtplib
 import ssl
 from dataclasses import dataclass, field
 from email.message import EmailMessage
-from typing import Any, Dict, List, Optional
-from urllib import request
+from typing import Any, Dict, List, Optional, Tuple
+from urllib import parse, request
 from urllib.error import HTTPError, URLError
 
 logger = logging.getLogger(__name__)
@@ -31,6 +32,7 @@ class ProviderResult:
     message_id: Optional[str] = None
     error: Optional[str] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
+    retryable: bool = False
 
 
 class PushProvider:
@@ -41,40 +43,57 @@ class PushProvider:
     hard dependencies on Google SDK packages.
     """
 
-    def __init__(self, project_id: Optional[str], bearer_token: Optional[str], timeout_seconds: int = 10):
+    def __init__(
+        self,
+        project_id: Optional[str],
+        bearer_token: Optional[str],
+        timeout_seconds: int = 10,
+        base_url: str = "https://fcm.googleapis.com",
+    ):
         self.project_id = project_id
         self.bearer_token = bearer_token
         self.timeout_seconds = timeout_seconds
+        self.base_url = base_url.rstrip("/")
 
     @property
     def configured(self) -> bool:
         return bool(self.project_id and self.bearer_token)
 
+    @property
+    def endpoint(self) -> str:
+        return f"{self.base_url}/v1/projects/{self.project_id}/messages:send"
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.bearer_token}",
+            "Content-Type": "application/json",
+        }
+
+    def message(self, token: str, title: str, body: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "message": {
+                "token": token,
+                "notification": {"title": title, "body": body},
+                "data": {k: str(v) for k, v in data.items()},
+            }
+        }
+
     def send(self, tokens: List[str], title: str, body: str, data: Dict[str, Any]) -> ProviderResult:
         if not tokens:
             return ProviderResult(False, "fcm", error="No push tokens supplied")
         if not self.configured:
             return ProviderResult(False, "fcm", error="FCM project/token not configured")
 
-        endpoint = f"https://fcm.googleapis.com/v1/projects/{self.project_id}/messages:send"
         successes = 0
         failures: List[str] = []
         for token in tokens:
-            payload = {
-                "message": {
-                    "token": token,
-                    "notification": {"title": title, "body": body},
-                    "data": {k: str(v) for k, v in data.items()},
-                }
-            }
+            payload = self.message(token, title, body, data)
             try:
                 req = request.Request(
-                    endpoint,
+                    self.endpoint,
                     data=json.dumps(payload).encode("utf-8"),
-                    headers={
-                        "Authorization": f"Bearer {self.bearer_token}",
-                        "Content-Type": "application/json",
-                    },
+                    headers=self.headers,
                     method="POST",
                 )
                 with request.urlopen(req, timeout=self.timeout_seconds) as resp:
@@ -120,60 +139,115 @@ class EmailProvider:
     def configured(self) -> bool:
         return bool(self.host and self.from_email)
 
+    def build_message(self, to_email: str, subject: str, body: str) -> EmailMessage:
+        msg = EmailMessage()
+        msg["From"] = f"{self.from_name} <{self.from_email}>"
+        msg["To"] = to_email
+        msg["Subject"] = subject
+        msg.set_content(body)
+        return msg
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout_seconds)
+        if self.use_tls:
+            smtp.starttls(context=ssl.create_default_context())
+        if self.username and self.password:
+            smtp.login(self.username, self.password)
+        return smtp
+
     def send(self, to_email: str, subject: str, body: str) -> ProviderResult:
         if not self.configured:
             return ProviderResult(False, "smtp", error="SMTP host/from_email not configured")
         if not to_email:
             return ProviderResult(False, "smtp", error="No recipient email supplied")
 
-        msg = EmailMessage()
-        msg["From"] = f"{self.from_name} <{self.from_email}>"
-        msg["To"] = to_email
-        msg["Subject"] = subject
-        msg.set_content(body)
+        msg = self.build_message(to_email, subject, body)
 
         try:
-            with smtplib.SMTP(self.host, self.port, timeout=self.timeout_seconds) as smtp:
-                if self.use_tls:
-                    smtp.starttls(context=ssl.create_default_context())
-                if self.username and self.password:
-                    smtp.login(self.username, self.password)
+            with self._connect() as smtp:
                 smtp.send_message(msg)
             return ProviderResult(True, "smtp")
         except Exception as exc:  # pragma: no cover - provider/environment specific
             logger.exception("SMTP delivery failed")
             return ProviderResult(False, "smtp", error=str(exc))
 
+    def send_batch(self, messages: List[Tuple[str, str, str]]) -> List[ProviderResult]:
+        """Send (to_email, subject, body) messages over a single SMTP session."""
+        if not self.configured:
+            return [
+                ProviderResult(False, "smtp", error="SMTP host/from_email not configured")
+                for _ in messages
+            ]
+
+        try:
+            smtp = self._connect()
+        except (smtplib.SMTPException, OSError) as exc:
+            return [ProviderResult(False, "smtp", error=str(exc), retryable=True) for _ in messages]
+
+        results: List[ProviderResult] = []
+        try:
+            for to_email, subject, body in messages:
+                if not to_email:
+                    results.append(ProviderResult(False, "smtp", error="No recipient email supplied"))
+                    continue
+                try:
+                    smtp.send_message(self.build_message(to_email, subject, body))
+                    results.append(ProviderResult(True, "smtp"))
+                except smtplib.SMTPRecipientsRefused as exc:
+                    results.append(ProviderResult(False, "smtp", error=str(exc)))
+                except (smtplib.SMTPException, OSError) as exc:
+                    results.append(ProviderResult(False, "smtp", error=str(exc), retryable=True))
+        finally:
+            try:
+                smtp.quit()
+            except (smtplib.SMTPException, OSError):  # pragma: no cover - connection already gone
+                pass
+        return results
+
 
 class SMSProvider:
     """Twilio REST API adapter."""
 
-    def __init__(self, account_sid: Optional[str], auth_token: Optional[str], from_number: Optional[str], timeout_seconds: int = 10):
+    def __init__(
+        self,
+        account_sid: Optional[str],
+        auth_token: Optional[str],
+        from_number: Optional[str],
+        timeout_seconds: int = 10,
+        base_url: str = "https://api.twilio.com",
+    ):
         self.account_sid = account_sid
         self.auth_token = auth_token
         self.from_number = from_number
         self.timeout_seconds = timeout_seconds
+        self.base_url = base_url.rstrip("/")
 
     @property
     def configured(self) -> bool:
         return bool(self.account_sid and self.auth_token and self.from_number)
 
+    @property
+    def endpoint(self) -> str:
+        return f"{self.base_url}/2010-04-01/Accounts/{self.account_sid}/Messages.json"
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        token = base64.b64encode(f"{self.account_sid}:{self.auth_token}".encode("utf-8")).decode("ascii")
+        return {"Authorization": f"Basic {token}", "Content-Type": "application/x-www-form-urlencoded"}
+
+    def form(self, to_number: str, message: str) -> bytes:
+        return parse.urlencode({"To": to_number, "From": self.from_number, "Body": message}).encode("utf-8")
+
     def send(self, to_number: str, message: str) -> ProviderResult:
         if not self.configured:
             return ProviderResult(False, "twilio", error="Twilio credentials/from_number not configured")
         if not to_number:
             return ProviderResult(False, "twilio", error="No recipient phone supplied")
 
-        import base64
-        from urllib import parse
-
-        endpoint = f"https://api.twilio.com/2010-04-01/Accounts/{self.account_sid}/Messages.json"
-        form = parse.urlencode({"To": to_number, "From": self.from_number, "Body": message}).encode("utf-8")
-        token = base64.b64encode(f"{self.account_sid}:{self.auth_token}".encode("utf-8")).decode("ascii")
         req = request.Request(
-            endpoint,
-            data=form,
-            headers={"Authorization": f"Basic {token}", "Content-Type": "application/x-www-form-urlencoded"},
+            self.endpoint,
+            data=self.form(to_number, message),
+            headers=self.headers,
             method="POST",
         )
         try:
@@ -191,11 +265,13 @@ class WebhookProvider:
         self.timeout_seconds = timeout_seconds
         self.signing_secret = signing_secret
 
+    headers = {"Content-Type": "application/json", "User-Agent": "OPTIX-Smart-Alerts/1.0"}
+
     def post(self, url: str, payload: Dict[str, Any]) -> ProviderResult:
         if not url:
             return ProviderResult(False, "webhook", error="Webhook URL missing")
         body = json.dumps(payload, default=str).encode("utf-8")
-        headers = {"Content-Type": "application/json", "User-Agent": "OPTIX-Smart-Alerts/1.0"}
+        headers = dict(self.headers)
         req = request.Request(url, data=body, headers=headers, method="POST")
         try:
             with request.urlopen(req, timeout=self.timeout_seconds) as resp:
@@ -240,6 +316,7 @@ class NotificationIntegrations:
             push=PushProvider(
                 project_id=os.getenv("OPTIX_FCM_PROJECT_ID"),
                 bearer_token=os.getenv("OPTIX_FCM_BEARER_TOKEN"),
+                base_url=os.getenv("OPTIX_FCM_BASE_URL", "https://fcm.googleapis.com"),
             ),
             email=EmailProvider(
                 host=os.getenv("OPTIX_SMTP_HOST"),
@@ -254,6 +331,7 @@ class NotificationIntegrations:
                 account_sid=os.getenv("OPTIX_TWILIO_ACCOUNT_SID"),
                 auth_token=os.getenv("OPTIX_TWILIO_AUTH_TOKEN"),
                 from_number=os.getenv("OPTIX_TWILIO_FROM_NUMBER"),
+                base_url=os.getenv("OPTIX_TWILIO_BASE_URL", "https://api.twilio.com"),
             ),
             webhook=WebhookProvider(
                 timeout_seconds=int(os.getenv("OPTIX_WEBHOOK_TIMEOUT_SECONDS", "10")),
@@ -4,9 +4,12 @@ OPTIX Trading Platform
 
 Machine learning component that learns from user actions to improve alert relevance.
 Tracks user behavior patterns and adjusts alert priorities and recommendations.
+Running per-user aggregates are kept as actions are recorded, so relevance and
+profile updates do not rescan the action history.
 """
 
 import logging
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple, Any
 from collections import defaultdict, Counter
@@ -19,6 +22,86 @@ from .models import (
 
 logger = logging.getLogger(__name__)
 
+# Time constant of the exponential decay applied to action counts and response times
+RECENCY_DECAY = timedelta(days=7)
+
+# Actions counted as meaningful engagement with an alert
+POSITIVE_ACTIONS = {"opened_position", "closed_position", "adjusted_position", "acknowledged"}
+
+
+@dataclass
+class ActionStats:
+    """
+    Running totals of user actions on alerts sharing a rule, symbol or
+    condition type.
+    
+    Decayed totals weigh each action by e^(-age/RECENCY_DECAY) as of
+    decayed_at, the latest action seen.
+    """
+    total: int = 0
+    positive: int = 0
+    snoozed: int = 0
+    response_time_sum: float = 0.0
+    positive_response_time_sum: float = 0.0
+    decayed_total: float = 0.0
+    decayed_response_time_sum: float = 0.0
+    decayed_at: Optional[datetime] = None
+    
+    def add(self, is_positive: bool, response_time: float, timestamp: datetime, snoozed: bool = False) -> None:
+        """Add one action"""
+        self.total += 1
+        self.response_time_sum += response_time
+        if is_positive:
+            self.positive += 1
+            self.positive_response_time_sum += response_time
+        if snoozed:
+            self.snoozed += 1
+        
+        # Age the decayed totals to the newest action, then add this one
+        if self.decayed_at is None or timestamp > self.decayed_at:
+            if self.decayed_at is not None:
+                factor = self._decay(timestamp)
+                self.decayed_total *= factor
+                self.decayed_response_time_sum *= factor
+            self.decayed_at = timestamp
+            weight = 1.0
+        else:
+            weight = self._decay(self.decayed_at, timestamp)
+        
+        self.decayed_total += weight
+        self.decayed_response_time_sum += weight * response_time
+    
+    def recency_weight(self, now: datetime) -> float:
+        """Decayed share of actions, from 1.0 (all recent) towards 0.0"""
+        if not self.total:
+            return 0.5
+        return self.decayed_total * self._decay(now) / self.total
+    
+    def decayed_avg_response_time(self) -> float:
+        """Average response time, favouring recent actions"""
+        if not self.decayed_total:
+            return 0.0
+        return self.decayed_response_time_sum / self.decayed_total
+    
+    def _decay(self, now: datetime, then: Optional[datetime] = None) -> float:
+        age = (now - (then or self.decayed_at)).total_seconds()
+        return math.exp(-max(0.0, age) / RECENCY_DECAY.total_seconds())
+
+
+@dataclass
+class UserActionStats:
+    """Running aggregates of one user's action history"""
+    overall: ActionStats = field(default_factory=ActionStats)
+    by_rule: Dict[str, ActionStats] = field(default_factory=dict)
+    by_symbol: Dict[str, ActionStats] = field(default_factory=dict)
+    by_condition: Dict[str, ActionStats] = field(default_factory=dict)
+    
+    # Positive actions by condition type, priority and hour of day
+    positive_conditions: Counter = field(default_factory=Counter)
+    positive_priorities: Counter = field(default_factory=Counter)
+    positive_hours: Counter = field(default_factory=Counter)
+
+
 
 class LearningEngine:
     """
@@ -30,6 +113,7 @@ class LearningEngine:
         self.learning_rate = learning_rate
         self.user_profiles: Dict[str, UserAlertProfile] = {}
         self.action_history: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.action_stats: Dict[str, UserActionStats] = defaultdict(UserActionStats)
         self.min_samples_for_learning = 10
         
     def record_user_action(
@@ -55,8 +139,7 @@ class LearningEngine:
         response_time = (action_timestamp - alert.triggered_at).total_seconds()
         
         # Determine if this was a positive action (user engaged meaningfully)
-        positive_actions = {"opened_position", "closed_position", "adjusted_position", "acknowledged"}
-        is_positive = action_type in positive_actions
+        is_positive = action_type in POSITIVE_ACTIONS
         
         # Record action
         action_record = {
@@ -73,6 +156,7 @@ class LearningEngine:
         }
         
         self.action_history[user_id].append(action_record)
+        self._update_stats(self.action_stats[user_id], action_record)
         
         # Update alert's action tracking
         alert.user_acted = is_positive
@@ -89,28 +173,20 @@ class LearningEngine:
         Update a rule's relevance score based on user behavior.
         Returns the new relevance score.
         """
-        if user_id not in self.action_history:
-            return rule.relevance_score
-        
-        # Get actions for this rule
-        rule_actions = [
-            action for action in self.action_history[user_id]
-            if action["rule_id"] == rule.rule_id
-        ]
+        stats = self.action_stats.get(user_id)
+        rule_stats = stats.by_rule.get(rule.rule_id) if stats else None
         
-        if len(rule_actions) < self.min_samples_for_learning:
+        if rule_stats is None or rule_stats.total < self.min_samples_for_learning:
             return rule.relevance_score
         
         # Calculate action rate
-        positive_actions = sum(1 for a in rule_actions if a["is_positive"])
-        action_rate = positive_actions / len(rule_actions)
+        action_rate = rule_stats.positive / rule_stats.total
         
-        # Calculate average response time (lower is better)
-        avg_response_time = sum(a["response_time"] for a in rule_actions) / len(rule_actions)
-        response_time_score = self._score_response_time(avg_response_time)
+        # Score response time (lower is better), favouring recent actions
+        response_time_score = self._score_response_time(rule_stats.decayed_avg_response_time())
         
         # Calculate recency weight (recent actions matter more)
-        recency_weight = self._calculate_recency_weight(rule_actions)
+        recency_weight = rule_stats.recency_weight(datetime.utcnow())
         
         # Combine scores
         raw_score = (action_rate * 0.6) + (response_time_score * 0.2) + (recency_weight * 0.2)
@@ -123,7 +199,7 @@ class LearningEngine:
         
         logger.debug(
             f"Updated relevance for rule {rule.rule_id}: {rule.relevance_score:.3f} "
-            f"(action_rate: {action_rate:.2f}, samples: {len(rule_actions)})"
+            f"(action_rate: {action_rate:.2f}, samples: {rule_stats.total})"
         )
         
         return new_score
@@ -133,63 +209,49 @@ class LearningEngine:
         Learn and update user's alert profile based on behavior history.
         Returns the updated profile.
         """
-        if user_id not in self.action_history:
+        if user_id not in self.action_stats:
             return UserAlertProfile(user_id=user_id)
         
-        actions = self.action_history[user_id]
+        stats = self.action_stats[user_id]
+        overall = stats.overall
         
-        if len(actions) < self.min_samples_for_learning:
+        if overall.total < self.min_samples_for_learning:
             # Not enough data yet
             return self.user_profiles.get(user_id, UserAlertProfile(user_id=user_id))
         
         # Get or create profile
         profile = self.user_profiles.get(user_id, UserAlertProfile(user_id=user_id))
         
-        # Analyze most acted-upon condition types
-        positive_actions = [a for a in actions if a["is_positive"]]
-        condition_counter = Counter()
-        
-        for action in positive_actions:
-            for cond_type in action.get("trigger_values", {}).keys():
-                try:
-                    condition_counter[ConditionType(cond_type)] += 1
-                except ValueError:
-                    continue
-        
+        # Most acted-upon condition types
         profile.most_acted_conditions = [
-            cond_type for cond_type, _ in condition_counter.most_common(5)
+            cond_type for cond_type, _ in stats.positive_conditions.most_common(5)
         ]
         
-        # Analyze preferred priorities
-        priority_counter = Counter(a["priority"] for a in positive_actions)
+        # Preferred priorities
         profile.preferred_priorities = [
-            priority for priority, _ in priority_counter.most_common(3)
+            priority for priority, _ in stats.positive_priorities.most_common(3)
         ]
         
-        # Analyze active trading hours
-        profile.active_trading_hours = self._identify_active_hours(actions)
+        # Active trading hours
+        profile.active_trading_hours = [hour for hour, _ in stats.positive_hours.most_common(5)]
         
         # Calculate symbol interests
-        profile.symbol_interests = self._calculate_symbol_interests(actions)
+        profile.symbol_interests = self._calculate_symbol_interests(stats)
         
         # Calculate condition relevance
-        profile.condition_relevance = self._calculate_condition_relevance(actions)
+        profile.condition_relevance = self._calculate_condition_relevance(stats)
         
         # Calculate engagement metrics
-        if positive_actions:
-            profile.avg_response_time_seconds = sum(
-                a["response_time"] for a in positive_actions
-            ) / len(positive_actions)
-        
-        profile.action_rate = len(positive_actions) / len(actions) if actions else 0.0
+        if overall.positive:
+            profile.avg_response_time_seconds = overall.positive_response_time_sum / overall.positive
         
-        snoozed_count = sum(1 for a in actions if a["action_type"] == "snoozed")
-        profile.snooze_rate = snoozed_count / len(actions) if actions else 0.0
+        profile.action_rate = overall.positive / overall.total
+        profile.snooze_rate = overall.snoozed / overall.total
         
         # Store ML features for advanced models
         profile.features = {
-            "total_actions": len(actions),
-            "positive_actions": len(positive_actions),
+            "total_actions": overall.total,
+            "positive_actions": overall.positive,
             "action_rate": profile.action_rate,
             "avg_response_time": profile.avg_response_time_seconds,
             "snooze_rate": profile.snooze_rate,
@@ -369,75 +431,54 @@ class LearningEngine:
         score = math.exp(-response_time_seconds / tau)
         return score
     
-    def _calculate_recency_weight(self, actions: List[Dict[str, Any]]) -> float:
-        """Calculate weight based on recency of actions"""
-        if not actions:
-            return 0.5
-        
-        now = datetime.utcnow()
-        recent_actions = [
-            a for a in actions
-            if (now - a["timestamp"]).days <= 7
-        ]
-        
-        return len(recent_actions) / len(actions)
-    
-    def _identify_active_hours(self, actions: List[Dict[str, Any]]) -> List[str]:
-        """Identify hours when user is most active"""
-        hour_counter = Counter()
-        
-        for action in actions:
-            if action["is_positive"]:
-                hour = action["timestamp"].strftime("%H:00")
-                hour_counter[hour] += 1
-        
-        # Return top 5 active hours
-        return [hour for hour, _ in hour_counter.most_common(5)]
+    def _update_stats(self, stats: UserActionStats, action: Dict[str, Any]) -> None:
+        """Add a recorded action to a user's running aggregates"""
+        is_positive = action["is_positive"]
+        response_time = action["response_time"]
+        timestamp = action["timestamp"]
+        snoozed = action["action_type"] == "snoozed"
+        
+        keyed_stats = [stats.overall, stats.by_rule.setdefault(action["rule_id"], ActionStats())]
+        if action["symbol"]:
+            keyed_stats.append(stats.by_symbol.setdefault(action["symbol"], ActionStats()))
+        for cond_type in action.get("trigger_values", {}).keys():
+            keyed_stats.append(stats.by_condition.setdefault(cond_type, ActionStats()))
+        
+        for action_stats in keyed_stats:
+            action_stats.add(is_positive, response_time, timestamp, snoozed)
+        
+        if not is_positive:
+            return
+        
+        for cond_type in action.get("trigger_values", {}).keys():
+            try:
+                stats.positive_conditions[ConditionType(cond_type)] += 1
+            except ValueError:
+                continue
+        stats.positive_priorities[action["priority"]] += 1
+        stats.positive_hours[timestamp.strftime("%H:00")] += 1
     
-    def _calculate_symbol_interests(
-        self,
-        actions: List[Dict[str, Any]]
-    ) -> Dict[str, float]:
+    def _calculate_symbol_interests(self, stats: UserActionStats) -> Dict[str, float]:
         """Calculate user's interest level in different symbols"""
-        symbol_stats = defaultdict(lambda: {"total": 0, "positive": 0})
-        
-        for action in actions:
-            symbol = action.get("symbol")
-            if symbol:
-                symbol_stats[symbol]["total"] += 1
-                if action["is_positive"]:
-                    symbol_stats[symbol]["positive"] += 1
-        
         # Calculate interest score (action rate with volume weighting)
         interests = {}
-        total_actions = len(actions)
+        total_actions = stats.overall.total
         
-        for symbol, stats in symbol_stats.items():
-            action_rate = stats["positive"] / stats["total"] if stats["total"] > 0 else 0
-            volume_weight = stats["total"] / total_actions
+        for symbol, symbol_stats in stats.by_symbol.items():
+            action_rate = symbol_stats.positive / symbol_stats.total
+            volume_weight = symbol_stats.total / total_actions
             interest_score = action_rate * (0.7 + 0.3 * volume_weight)
             interests[symbol] = min(1.0, interest_score)
         
         return interests
     
-    def _calculate_condition_relevance(
-        self,
-        actions: List[Dict[str, Any]]
-    ) -> Dict[str, float]:
+    def _calculate_condition_relevance(self, stats: UserActionStats) -> Dict[str, float]:
         """Calculate relevance scores for different condition types"""
-        condition_stats = defaultdict(lambda: {"total": 0, "positive": 0})
-        
-        for action in actions:
-            for cond_type in action.get("trigger_values", {}).keys():
-                condition_stats[cond_type]["total"] += 1
-                if action["is_positive"]:
-                    condition_stats[cond_type]["positive"] += 1
-        
         # Calculate relevance (action rate)
         relevance = {}
-        for cond_type, stats in condition_stats.items():
-            if stats["total"] >= self.min_samples_for_learning:
-                relevance[cond_type] = stats["positive"] / stats["total"]
+        for cond_type, cond_stats in stats.by_condition.items():
+            if cond_stats.total >= self.min_samples_for_learning:
+                relevance[cond_type] = cond_stats.positive / cond_stats.total
         
         return relevance
     
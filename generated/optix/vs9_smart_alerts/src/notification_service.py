@@ -7,15 +7,17 @@ Handles delivery preferences, rate limiting, and quiet hours.
 """
 
 import logging
-from datetime import datetime, time, timedelta
-from typing import Dict, List, Optional, Set, Any
-from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Deque, Dict, List, Optional, Set, Any, Tuple
+from collections import defaultdict, deque
 from enum import Enum
 
 from .models import (
     ConsolidatedAlert, TriggeredAlert, DeliveryPreference,
     DeliveryChannel, AlertPriority, AlertStatus
 )
+from .delivery_pipeline import DeliveryJob, DeliveryPipeline
+from .integrations import ProviderResult
 
 logger = logging.getLogger(__name__)
 
@@ -34,14 +36,25 @@ class NotificationService:
     """
     Multi-channel notification delivery service with intelligent routing,
     rate limiting, and user preference management.
+    
+    deliver_alert delivers synchronously through the built-in handlers.
+    enqueue_alert hands the same routing decisions to an asynchronous
+    DeliveryPipeline and returns immediately.
     """
     
-    def __init__(self):
+    def __init__(self, pipeline: Optional[DeliveryPipeline] = None):
         self.delivery_preferences: Dict[str, DeliveryPreference] = {}
         self.delivery_history: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
-        self.rate_limit_trackers: Dict[str, Dict[str, List[datetime]]] = defaultdict(
-            lambda: defaultdict(list)
+        # Sliding one-hour windows of send times, oldest first
+        self.rate_limit_trackers: Dict[str, Dict[str, Deque[datetime]]] = defaultdict(
+            lambda: defaultdict(deque)
         )
+        # user_id -> (day, SMS sent that day)
+        self.sms_daily_counts: Dict[str, Tuple[date, int]] = {}
+        
+        self.pipeline = pipeline
+        if pipeline is not None and pipeline.on_result is None:
+            pipeline.on_result = self._on_pipeline_result
         
         # Mock delivery handlers (in production, these would be real integrations)
         self.delivery_handlers = {
@@ -135,6 +148,141 @@ class NotificationService:
         
         return delivery_results
     
+    def enqueue_alert(
+        self,
+        alert: ConsolidatedAlert
+    ) -> Dict[DeliveryChannel, DeliveryStatus]:
+        """
+        Route a consolidated alert and hand it to the delivery pipeline.
+        Returns immediately with PENDING for queued channels; final results
+        are recorded in the delivery history as the pipeline completes.
+        Rate-limit slots are reserved at enqueue time so bursts are capped.
+        """
+        if self.pipeline is None or not self.pipeline.running:
+            raise RuntimeError("Delivery pipeline is not running")
+        
+        user_id = alert.user_id
+        preferences = self.get_user_preferences(user_id)
+        channels = self._select_channels(alert.priority, preferences)
+        
+        if self._is_quiet_hours(preferences) and alert.priority.value != AlertPriority.URGENT.value:
+            logger.info(f"Alert {alert.consolidated_id} suppressed due to quiet hours")
+            return {
+                channel: DeliveryStatus.QUIET_HOURS
+                for channel in channels
+            }
+        
+        delivery_results = {}
+        
+        for channel in channels:
+            if self._is_rate_limited(user_id, channel, preferences):
+                delivery_results[channel] = DeliveryStatus.RATE_LIMITED
+                logger.warning(
+                    f"Rate limit exceeded for user {user_id} on channel {channel.value}"
+                )
+                continue
+            
+            jobs = self._build_delivery_jobs(alert, channel, preferences)
+            if not jobs:
+                delivery_results[channel] = DeliveryStatus.CHANNEL_DISABLED
+                continue
+            
+            queued = [self.pipeline.submit(job) for job in jobs]
+            if any(queued):
+                delivery_results[channel] = DeliveryStatus.PENDING
+                self._update_rate_limit(user_id, channel)
+            else:
+                delivery_results[channel] = DeliveryStatus.FAILED
+        
+        return delivery_results
+    
+    def _build_delivery_jobs(
+        self,
+        alert: ConsolidatedAlert,
+        channel: DeliveryChannel,
+        preferences: DeliveryPreference
+    ) -> List[DeliveryJob]:
+        """Build one pipeline job per endpoint configured for a channel"""
+        if channel == DeliveryChannel.PUSH:
+            payload = {
+                "title": alert.title,
+                "body": alert.summary,
+                "data": {
+                    "consolidated_id": alert.consolidated_id,
+                    "user_id": alert.user_id,
+                    "priority": alert.priority.value,
+                    "alert_count": alert.alert_count,
+                    "timestamp": alert.created_at.isoformat()
+                }
+            }
+            return [
+                DeliveryJob(alert=alert, channel=channel, endpoint=token, payload=payload)
+                for token in preferences.push_tokens
+            ]
+        
+        if channel == DeliveryChannel.EMAIL:
+            if not preferences.email:
+                return []
+            payload = {
+                "subject": f"[OPTIX Alert] {alert.title}",
+                "body": self._format_email_body(alert)
+            }
+            return [DeliveryJob(alert=alert, channel=channel, endpoint=preferences.email, payload=payload)]
+        
+        if channel == DeliveryChannel.SMS:
+            if not preferences.phone:
+                return []
+            payload = {"message": f"OPTIX: {alert.title[:100]}"}
+            return [DeliveryJob(alert=alert, channel=channel, endpoint=preferences.phone, payload=payload)]
+        
+        if channel == DeliveryChannel.WEBHOOK:
+            if not preferences.webhook_url:
+                return []
+            payload = {
+                "event": "alert.triggered",
+                "alert_id": alert.consolidated_id,
+                "user_id": alert.user_id,
+                "title": alert.title,
+                "summary": alert.summary,
+                "priority": alert.priority.value,
+                "alert_count": alert.alert_count,
+                "alerts": [
+                    {
+                        "alert_id": a.alert_id,
+                        "rule_id": a.rule_id,
+                        "symbol": a.metadata.get("symbol"),
+                        "trigger_values": a.trigger_values
+                    }
+                    for a in alert.alerts
+                ],
+                "timestamp": alert.created_at.isoformat()
+            }
+            return [DeliveryJob(alert=alert, channel=channel, endpoint=preferences.webhook_url, payload=payload)]
+        
+        if channel == DeliveryChannel.IN_APP:
+            payload = {
+                "user_id": alert.user_id,
+                "alert_id": alert.consolidated_id,
+                "title": alert.title,
+                "message": alert.summary,
+                "priority": alert.priority.value,
+                "timestamp": alert.created_at.isoformat(),
+                "read": False
+            }
+            return [DeliveryJob(alert=alert, channel=channel, endpoint=alert.user_id, payload=payload)]
+        
+        return []
+    
+    def _on_pipeline_result(self, job: DeliveryJob, result: ProviderResult) -> None:
+        """Record the final outcome of a pipeline job"""
+        status = DeliveryStatus.SENT if result.success else DeliveryStatus.FAILED
+        self._record_delivery(job.alert.user_id, job.alert, job.channel, status)
+        
+        if result.success and job.alert.alerts:
+            delivered = job.alert.alerts[0].delivered_channels
+            if job.channel not in delivered:
+                delivered.append(job.channel)
+    
     def _select_channels(
         self,
         priority: AlertPriority,
@@ -187,12 +335,10 @@ class NotificationService:
         # Get recent deliveries for this channel
         recent_deliveries = self.rate_limit_trackers[user_id][channel.value]
         
-        # Clean up old entries
-        recent_deliveries = [
-            dt for dt in recent_deliveries
-            if now - dt < timedelta(hours=1)
-        ]
-        self.rate_limit_trackers[user_id][channel.value] = recent_deliveries
+        # Expire entries that have left the one-hour window
+        cutoff = now - timedelta(hours=1)
+        while recent_deliveries and recent_deliveries[0] <= cutoff:
+            recent_deliveries.popleft()
         
         # Check hourly limit
         if len(recent_deliveries) >= preferences.max_alerts_per_hour:
@@ -200,16 +346,22 @@ class NotificationService:
         
         # Check SMS daily limit
         if channel == DeliveryChannel.SMS:
-            day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-            daily_sms = [dt for dt in recent_deliveries if dt >= day_start]
-            if len(daily_sms) >= preferences.max_sms_per_day:
+            day, sent_today = self.sms_daily_counts.get(user_id, (None, 0))
+            if day == now.date() and sent_today >= preferences.max_sms_per_day:
                 return True
         
         return False
     
     def _update_rate_limit(self, user_id: str, channel: DeliveryChannel) -> None:
         """Update rate limit tracker for a successful delivery"""
-        self.rate_limit_trackers[user_id][channel.value].append(datetime.utcnow())
+        now = datetime.utcnow()
+        self.rate_limit_trackers[user_id][channel.value].append(now)
+        
+        if channel == DeliveryChannel.SMS:
+            day, sent_today = self.sms_daily_counts.get(user_id, (None, 0))
+            if day != now.date():
+                day, sent_today = now.date(), 0
+            self.sms_daily_counts[user_id] = (day, sent_today + 1)
     
     def _deliver_to_channel(
         self,
@@ -402,6 +554,7 @@ class NotificationService:
         """Record delivery attempt for analytics"""
         record = {
             "timestamp": datetime.utcnow(),
+            "user_id": user_id,
             "alert_id": alert.consolidated_id,
             "channel": channel.value,
             "status": status.value,
@@ -446,6 +446,131 @@ class TestAlertEngine:
         
         alerts = self.engine.evaluate_market_data(market_data)
         assert len(alerts) == 1
+    
+    def test_symbol_index_tracks_rule_changes(self):
+        """Test symbol/condition indexes follow add, update and remove"""
+        rule = AlertRule(
+            user_id="user1",
+            name="Indexed Rule",
+            conditions=[
+                AlertCondition(
+                    condition_type=ConditionType.PRICE_ABOVE,
+                    symbol="AAPL",
+                    threshold=150.0
+                )
+            ]
+        )
+        
+        self.engine.add_rule(rule)
+        assert self.engine.get_rules_by_condition_type(ConditionType.PRICE_ABOVE) == [rule]
+        
+        # Retarget the rule in place and push the update
+        rule.conditions = [
+            AlertCondition(
+                condition_type=ConditionType.IV_ABOVE,
+                symbol="TSLA",
+                threshold=50.0
+            )
+        ]
+        self.engine.update_rule(rule)
+        assert self.engine.get_rules_by_symbol("AAPL") == []
+        assert self.engine.get_rules_by_symbol("TSLA") == [rule]
+        assert self.engine.get_rules_by_condition_type(ConditionType.PRICE_ABOVE) == []
+        
+        self.engine.remove_rule(rule.rule_id)
+        assert self.engine.get_rules_by_symbol("TSLA") == []
+        assert "TSLA" not in self.engine.symbol_index
+    
+    def test_evaluate_ticks_snapshot(self):
+        """Test batch evaluation of a market snapshot"""
+        aapl_rule = AlertRule(
+            user_id="user1",
+            name="AAPL Breakout",
+            conditions=[
+                AlertCondition(
+                    condition_type=ConditionType.PRICE_ABOVE,
+                    symbol="AAPL",
+                    threshold=150.0
+                )
+            ],
+            market_hours_only=False
+        )
+        spy_rule = AlertRule(
+            user_id="user2",
+            name="SPY Breakdown",
+            conditions=[
+                AlertCondition(
+                    condition_type=ConditionType.PRICE_BELOW,
+                    symbol="SPY",
+                    threshold=400.0
+                )
+            ],
+            market_hours_only=False
+        )
+        
+        self.engine.add_rule(aapl_rule)
+        self.engine.add_rule(spy_rule)
+        
+        snapshot = [
+            MarketData(symbol="AAPL", price=155.0, bid=154.95, ask=155.05),
+            MarketData(symbol="SPY", price=410.0, bid=409.95, ask=410.05),
+            MarketData(symbol="MSFT", price=300.0, bid=299.95, ask=300.05),
+        ]
+        
+        alerts = self.engine.evaluate_ticks(snapshot)
+        assert [a.rule_id for a in alerts] == [aapl_rule.rule_id]
+    
+    def test_expiry_heap_expires_unrelated_symbols(self):
+        """Test expired rules are retired even when their symbol does not tick"""
+        rule = AlertRule(
+            user_id="user1",
+            name="Expired TSLA",
+            conditions=[
+                AlertCondition(
+                    condition_type=ConditionType.PRICE_ABOVE,
+                    symbol="TSLA",
+                    threshold=200.0
+                )
+            ],
+            expires_at=datetime.utcnow() - timedelta(minutes=1)
+        )
+        
+        self.engine.add_rule(rule)
+        self.engine.evaluate_market_data(MarketData(symbol="AAPL", price=150.0))
+        
+        assert rule.status == AlertStatus.EXPIRED
+        assert self.engine.get_active_rules_count() == 0
+        assert self.engine.get_rules_by_symbol("TSLA") == []
+    
+    def test_cooldown_heap_releases_elapsed_cooldowns(self):
+        """Test cooldown entries are dropped once the window has passed"""
+        rule = AlertRule(
+            user_id="user1",
+            name="Short Cooldown",
+            conditions=[
+                AlertCondition(
+                    condition_type=ConditionType.PRICE_ABOVE,
+                    symbol="AAPL",
+                    threshold=150.0
+                )
+            ],
+            cooldown_minutes=5,
+            market_hours_only=False
+        )
+        
+        self.engine.add_rule(rule)
+        market_data = MarketData(symbol="AAPL", price=155.0, bid=154.95, ask=155.05)
+        assert len(self.engine.evaluate_market_data(market_data)) == 1
+        assert rule.rule_id in self.engine.cooldown_tracker
+        
+        # Pretend the trigger happened outside the cooldown window
+        past = datetime.utcnow() - timedelta(minutes=10)
+        self.engine.cooldown_tracker[rule.rule_id] = past
+        self.engine._cooldown_heap = [(past + timedelta(minutes=5), rule.rule_id)]
+        
+        quiet_data = MarketData(symbol="AAPL", price=145.0, bid=144.95, ask=145.05)
+        assert self.engine.evaluate_market_data(quiet_data) == []
+        assert self.engine.get_engine_stats()["rules_in_cooldown"] == 0
 
 
 if __name__ == "__main__":
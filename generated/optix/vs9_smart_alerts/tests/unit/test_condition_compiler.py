@@ -0,0 +1,152 @@
+"""
+Unit tests for VS-9 Condition Compiler
+"""
+
+import random
+
+import pytest
+from datetime import datetime, timedelta
+from src.alert_engine import AlertEngine
+from src.condition_compiler import CompiledRuleSet, CONDITION_SPECS
+from src.models import (
+    AlertRule, AlertCondition, MarketData, Position,
+    ConditionType, MarketSession
+)
+
+
+SYMBOLS = ["AAPL", "SPY", "TSLA", "NVDA", "QQQ"]
+
+
+def _random_rule(rng: random.Random) -> AlertRule:
+    """Build a random rule, occasionally spanning symbols or using positions"""
+    condition_types = list(ConditionType)
+    conditions = []
+    for _ in range(rng.randint(1, 3)):
+        conditions.append(AlertCondition(
+            condition_type=rng.choice(condition_types),
+            symbol=rng.choice(SYMBOLS[:3]) if rng.random() < 0.3 else "AAPL",
+            threshold=round(rng.uniform(-5.0, 200.0), 2)
+        ))
+    return AlertRule(
+        user_id=f"user{rng.randint(1, 5)}",
+        name=f"Rule {rng.randint(1, 10000)}",
+        conditions=conditions,
+        logic=rng.choice(["AND", "OR"]),
+        market_hours_only=rng.random() < 0.3,
+        position_aware=rng.random() < 0.2,
+        cooldown_minutes=rng.choice([0, 5])
+    )
+
+
+def _random_market_data(rng: random.Random, symbol: str) -> MarketData:
+    """Build a random tick with some optional fields missing"""
+    def maybe(value):
+        return None if rng.random() < 0.2 else value
+
+    price = rng.choice([0.0, round(rng.uniform(1.0, 300.0), 2)])
+    return MarketData(
+        symbol=symbol,
+        price=price,
+        bid=price - 0.05,
+        ask=price + 0.05,
+        price_change_percent=round(rng.uniform(-10.0, 10.0), 2),
+        volume_ratio=round(rng.uniform(0.0, 5.0), 2),
+        implied_volatility=maybe(round(rng.uniform(10.0, 120.0), 2)),
+        iv_rank=maybe(round(rng.uniform(-100.0, 100.0), 2)),
+        put_call_ratio=maybe(round(rng.uniform(0.1, 3.0), 2)),
+        unusual_activity_score=maybe(round(rng.uniform(0.0, 100.0), 2)),
+        total_delta=maybe(round(rng.uniform(-1e5, 1e5), 2)),
+        total_gamma=maybe(round(rng.uniform(-1e5, 1e5), 2)),
+        session=rng.choice(list(MarketSession))
+    )
+
+
+def _summary(alerts):
+    return [
+        (a.rule_id, a.matched_conditions, a.trigger_values, a.title, a.message)
+        for a in alerts
+    ]
+
+
+class TestCompiledRuleSet:
+    """Test compiled rule evaluation"""
+
+    def test_position_conditions_are_interpreted(self):
+        """Test rules with position conditions fall back to the interpreter"""
+        engine = AlertEngine()
+        rule = AlertRule(
+            user_id="user1",
+            name="PnL",
+            conditions=[
+                AlertCondition(
+                    condition_type=ConditionType.POSITION_PNL,
+                    symbol="AAPL",
+                    threshold=10.0
+                )
+            ],
+            market_hours_only=False
+        )
+        engine.add_rule(rule)
+
+        compiled = CompiledRuleSet(engine.symbol_index)
+        assert ConditionType.POSITION_PNL not in CONDITION_SPECS
+        assert compiled.pair_interpreted.tolist() == [True]
+
+        positions = [Position(symbol="AAPL", unrealized_pnl_percent=12.5)]
+        alerts = engine.evaluate_ticks([MarketData(symbol="AAPL", price=150.0)], positions)
+        assert len(alerts) == 1
+        assert alerts[0].trigger_values == {"position_pnl": 12.5}
+
+    def test_recompiles_after_rule_changes(self):
+        """Test the compiled set is invalidated by add/remove"""
+        engine = AlertEngine()
+        rule = AlertRule(
+            user_id="user1",
+            name="Price",
+            conditions=[
+                AlertCondition(
+                    condition_type=ConditionType.PRICE_ABOVE,
+                    symbol="AAPL",
+                    threshold=150.0
+                )
+            ],
+            market_hours_only=False
+        )
+        engine.add_rule(rule)
+        compiled = engine.get_compiled_rules()
+        assert engine.get_compiled_rules() is compiled
+
+        engine.remove_rule(rule.rule_id)
+        assert engine.get_compiled_rules() is not compiled
+        assert engine.evaluate_ticks([MarketData(symbol="AAPL", price=155.0)]) == []
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_matches_interpreter(self, seed):
+        """Test vectorised snapshots match per-tick interpretation exactly"""
+        rng = random.Random(seed)
+        rules = [_random_rule(rng) for _ in range(300)]
+        positions = [
+            Position(
+                symbol="AAPL",
+                unrealized_pnl_percent=25.0,
+                expiration=datetime.utcnow() + timedelta(days=3)
+            )
+        ]
+
+        interpreted = AlertEngine()
+        vectorised = AlertEngine()
+        for rule in rules:
+            interpreted.add_rule(rule)
+        for rule in rules:
+            copy = AlertRule(**{**rule.__dict__})
+            vectorised.add_rule(copy)
+
+        for _ in range(3):
+            snapshot = [_random_market_data(rng, symbol) for symbol in SYMBOLS]
+
+            expected = []
+            for market_data in snapshot:
+                expected.extend(interpreted.evaluate_market_data(market_data, positions))
+            actual = vectorised.evaluate_ticks(snapshot, positions)
+
+            assert _summary(actual) == _summary(expected)
@@ -3,8 +3,9 @@ Unit tests for VS-9 Consolidation Engine
 """
 
 import pytest
+import asyncio
 from datetime import datetime, timedelta
-from src.consolidation_engine import ConsolidationEngine
+from src.consolidation_engine import ConsolidationEngine, TimerWheel
 from src.models import TriggeredAlert, AlertPriority, AlertStatus
 
 
@@ -298,5 +299,119 @@ class TestConsolidationEngine:
             assert alert.consolidated_alert_id == consolidated.consolidated_id
 
 
+class TestTimerWheel:
+    """Test the hierarchical flush timer wheel"""
+    
+    def test_timers_fire_at_deadline_across_levels(self):
+        """Test timers on every level fire once their deadline passes"""
+        wheel = TimerWheel(tick_seconds=1.0, slots_per_level=4, levels=3, start=0.0)
+        deadlines = {"a": 2.5, "b": 7.0, "c": 30.0, "d": 200.0}  # Level 0, 1, 2 and overflow
+        for key, deadline in deadlines.items():
+            wheel.schedule(key, deadline)
+        
+        fired = {}
+        for now in range(0, 260):
+            for key in wheel.advance(float(now)):
+                fired[key] = now
+        
+        assert fired == {"a": 3, "b": 7, "c": 30, "d": 200}
+        assert len(wheel) == 0
+    
+    def test_cancel_reschedule_and_past_deadline(self):
+        """Test cancelled timers never fire and past deadlines fire next advance"""
+        wheel = TimerWheel(tick_seconds=1.0, slots_per_level=4, levels=2, start=0.0)
+        wheel.advance(10.0)
+        wheel.schedule("late", 5.0)
+        wheel.schedule("cancelled", 12.0)
+        wheel.schedule("moved", 11.0)
+        wheel.cancel("cancelled")
+        wheel.schedule("moved", 14.0)
+        
+        assert wheel.advance(10.0) == ["late"]
+        assert wheel.advance(13.0) == []
+        assert wheel.advance(14.0) == ["moved"]
+    
+    def test_idle_wheel_skips_ahead(self):
+        """Test advancing an empty wheel does not walk every tick"""
+        wheel = TimerWheel(tick_seconds=1.0, start=0.0)
+        
+        assert wheel.advance(1e9) == []
+        
+        wheel.schedule("a", 1e9 + 2)
+        assert wheel.advance(1e9 + 2) == ["a"]
+
+
+class TestTimerFlush:
+    """Test consolidation windows closed by the timer"""
+    
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.flushed = []
+        self.engine = ConsolidationEngine(consolidation_window_minutes=5, on_flush=self.flushed.append)
+    
+    def make_alert(self, user_id="user123", symbol="AAPL"):
+        alert = TriggeredAlert(
+            rule_id="rule1",
+            user_id=user_id,
+            title="Alert",
+            message="Test",
+            priority=AlertPriority.MEDIUM
+        )
+        alert.metadata["symbol"] = symbol
+        return alert
+    
+    def test_window_flushes_without_new_alerts(self):
+        """Test pending alerts are delivered when the window closes"""
+        start = datetime.utcnow()
+        self.engine.process_alert(self.make_alert())
+        self.engine.process_alert(self.make_alert())
+        
+        assert self.engine.flush_due(start + timedelta(minutes=4)) == []
+        
+        [consolidated] = self.engine.flush_due(start + timedelta(minutes=5, seconds=2))
+        
+        assert consolidated.alert_count == 2
+        assert self.flushed == [consolidated]
+        assert self.engine.get_pending_count("user123") == 0
+    
+    def test_inline_flush_cancels_timer(self):
+        """Test flushing on the max pending count clears the window timer"""
+        for _ in range(10):
+            self.engine.process_alert(self.make_alert())
+        
+        assert "user123" not in self.engine.flush_timers
+        assert self.engine.flush_due(datetime.utcnow() + timedelta(minutes=10)) == []
+    
+    def test_force_flush_all_visits_pending_users(self):
+        """Test force flush covers exactly the users with pending alerts"""
+        self.engine.process_alert(self.make_alert(user_id="user1"))
+        self.engine.process_alert(self.make_alert(user_id="user2"))
+        self.engine.force_flush_user("user1")
+        
+        results = self.engine.force_flush_all()
+        
+        assert [c.user_id for c in results] == ["user2"]
+        assert len(self.engine.flush_timers) == 0
+    
+    def test_timer_task_flushes(self):
+        """Test the background task flushes closed windows"""
+        engine = ConsolidationEngine(
+            consolidation_window_minutes=0, tick_seconds=0.01, on_flush=self.flushed.append
+        )
+        
+        async def run():
+            await engine.start()
+            engine.process_alert(self.make_alert())
+            for _ in range(50):
+                await asyncio.sleep(0.01)
+                if self.flushed:
+                    break
+            await engine.stop()
+        
+        asyncio.run(run())
+        
+        assert len(self.flushed) == 1
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
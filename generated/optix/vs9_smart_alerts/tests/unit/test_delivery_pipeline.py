@@ -0,0 +1,298 @@
+"""
+Unit tests for VS-9 Delivery Pipeline
+"""
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from src.delivery_pipeline import DeliveryJob, DeliveryPipeline, PipelineConfig
+from src.integrations import (
+    EmailProvider, InAppNotificationStore, NotificationIntegrations,
+    PushProvider, SMSProvider, WebhookProvider
+)
+from src.notification_service import NotificationService, DeliveryStatus
+from src.models import (
+    ConsolidatedAlert, TriggeredAlert, DeliveryPreference,
+    DeliveryChannel, AlertPriority
+)
+
+
+class StubHTTPServer:
+    """Local HTTP server that records requests and replays canned statuses"""
+
+    def __init__(self, statuses=None):
+        self.requests = []
+        self.statuses = list(statuses or [])
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                stub.requests.append((self.path, self.rfile.read(length)))
+                status = stub.statuses.pop(0) if stub.statuses else 200
+                self.send_response(status)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"{}")
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class StubSMTPServer:
+    """Minimal asyncio SMTP server counting sessions and messages"""
+
+    def __init__(self):
+        self.sessions = 0
+        self.messages = []
+        self.server = None
+        self.port = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        self.sessions += 1
+        writer.write(b"220 stub ESMTP\r\n")
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            command = line.decode().strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                writer.write(b"250 stub\r\n")
+            elif command == "DATA":
+                writer.write(b"354 end with .\r\n")
+                await writer.drain()
+                data = []
+                while True:
+                    chunk = await reader.readline()
+                    if chunk in (b".\r\n", b""):
+                        break
+                    data.append(chunk)
+                self.messages.append(b"".join(data))
+                writer.write(b"250 queued\r\n")
+            elif command == "QUIT":
+                writer.write(b"221 bye\r\n")
+                await writer.drain()
+                break
+            else:
+                writer.write(b"250 ok\r\n")
+            await writer.drain()
+        writer.close()
+
+
+def _integrations(smtp_port=None, fcm_url="http://127.0.0.1:9", simulated=True):
+    return NotificationIntegrations(
+        push=PushProvider(project_id="optix", bearer_token="token", base_url=fcm_url),
+        email=EmailProvider(
+            host="127.0.0.1" if smtp_port else None,
+            port=smtp_port or 25,
+            from_email="alerts@optix.test",
+            use_tls=False
+        ),
+        sms=SMSProvider(account_sid=None, auth_token=None, from_number=None),
+        webhook=WebhookProvider(),
+        in_app=InAppNotificationStore(),
+        allow_simulated_fallback=simulated
+    )
+
+
+def _alert(user_id="user123", priority=AlertPriority.HIGH, title="Test Alert"):
+    alert = TriggeredAlert(
+        rule_id="rule123",
+        user_id=user_id,
+        title=title,
+        message="Test message",
+        priority=priority,
+        metadata={"symbol": "AAPL"}
+    )
+    return ConsolidatedAlert(
+        user_id=user_id,
+        alerts=[alert],
+        alert_ids=[alert.alert_id],
+        title=title,
+        summary="Test summary",
+        priority=priority,
+        alert_count=1,
+        consolidation_reason="test"
+    )
+
+
+class TestDeliveryPipeline:
+    """Test DeliveryPipeline against local stub servers"""
+
+    def test_webhook_and_push_delivery(self):
+        """Test pooled HTTP delivery records results in the service"""
+        async def scenario(stub):
+            pipeline = DeliveryPipeline(integrations=_integrations(fcm_url=stub.url))
+            service = NotificationService(pipeline=pipeline)
+            service.set_user_preferences("user123", DeliveryPreference(
+                enabled_channels=[DeliveryChannel.WEBHOOK, DeliveryChannel.PUSH],
+                priority_channel_map={
+                    AlertPriority.HIGH: [DeliveryChannel.WEBHOOK, DeliveryChannel.PUSH]
+                },
+                webhook_url=f"{stub.url}/hooks/alerts",
+                push_tokens=["device-a", "device-b"]
+            ))
+
+            await pipeline.start()
+            consolidated = _alert()
+            results = service.enqueue_alert(consolidated)
+            await pipeline.stop()
+            return service, consolidated, results
+
+        with StubHTTPServer() as stub:
+            service, consolidated, results = asyncio.run(scenario(stub))
+
+        assert results == {
+            DeliveryChannel.WEBHOOK: DeliveryStatus.PENDING,
+            DeliveryChannel.PUSH: DeliveryStatus.PENDING
+        }
+        paths = sorted(path for path, _ in stub.requests)
+        assert paths == [
+            "/hooks/alerts",
+            "/v1/projects/optix/messages:send",
+            "/v1/projects/optix/messages:send"
+        ]
+        webhook_body = next(json.loads(body) for path, body in stub.requests if path == "/hooks/alerts")
+        assert webhook_body["alert_id"] == consolidated.consolidated_id
+
+        history = service.get_delivery_history("user123")
+        assert len(history) == 3
+        assert all(record["status"] == "sent" for record in history)
+        assert set(consolidated.alerts[0].delivered_channels) == {
+            DeliveryChannel.WEBHOOK, DeliveryChannel.PUSH
+        }
+
+    def test_retry_with_backoff(self):
+        """Test transient failures are retried until delivered"""
+        async def scenario(stub):
+            config = PipelineConfig(backoff_base_seconds=0.01, max_attempts=3)
+            pipeline = DeliveryPipeline(integrations=_integrations(), config=config)
+            await pipeline.start()
+            job = DeliveryJob(
+                alert=_alert(),
+                channel=DeliveryChannel.WEBHOOK,
+                endpoint=f"{stub.url}/hook",
+                payload={"event": "alert.triggered"}
+            )
+            pipeline.submit(job)
+            await pipeline.stop()
+            return pipeline, job
+
+        with StubHTTPServer(statuses=[503, 429]) as stub:
+            pipeline, job = asyncio.run(scenario(stub))
+
+        assert len(stub.requests) == 3
+        assert job.attempts == 3
+        assert pipeline.stats["sent"] == 1
+        assert pipeline.stats["retried"] == 2
+        assert len(pipeline.dead_letters) == 0
+
+    def test_dead_letter_after_exhausted_attempts(self):
+        """Test endpoints that keep failing land in the dead-letter queue"""
+        async def scenario(stub):
+            config = PipelineConfig(backoff_base_seconds=0.01, max_attempts=2)
+            pipeline = DeliveryPipeline(integrations=_integrations(), config=config)
+            service = NotificationService(pipeline=pipeline)
+            await pipeline.start()
+            for url in (f"{stub.url}/down", f"{stub.url}/gone"):
+                pipeline.submit(DeliveryJob(
+                    alert=_alert(),
+                    channel=DeliveryChannel.WEBHOOK,
+                    endpoint=url,
+                    payload={}
+                ))
+            await pipeline.stop()
+            return pipeline, service
+
+        with StubHTTPServer(statuses=[500, 404, 500]) as stub:
+            pipeline, service = asyncio.run(scenario(stub))
+
+        # 5xx is retried once, 404 is permanent
+        assert len(stub.requests) == 3
+        assert pipeline.stats["dead_lettered"] == 2
+        assert {job.last_error for job in pipeline.dead_letters} == {"HTTP 500", "HTTP 404"}
+        stats = service.get_delivery_stats("user123")
+        assert stats["by_status"] == {"failed": 2}
+
+    def test_email_batched_over_one_session(self):
+        """Test queued emails share a single SMTP session"""
+        async def scenario():
+            smtp = StubSMTPServer()
+            await smtp.start()
+            config = PipelineConfig(
+                workers_per_channel={DeliveryChannel.EMAIL: 1},
+                batch_linger_seconds=0.1
+            )
+            pipeline = DeliveryPipeline(integrations=_integrations(smtp_port=smtp.port), config=config)
+            service = NotificationService(pipeline=pipeline)
+            await pipeline.start()
+            for i in range(5):
+                user_id = f"user{i}"
+                service.set_user_preferences(user_id, DeliveryPreference(
+                    enabled_channels=[DeliveryChannel.EMAIL],
+                    email=f"{user_id}@example.com"
+                ))
+                service.enqueue_alert(_alert(user_id=user_id, title=f"Alert {i}"))
+            await pipeline.stop()
+            await smtp.stop()
+            return smtp, pipeline
+
+        smtp, pipeline = asyncio.run(scenario())
+
+        assert smtp.sessions == 1
+        assert len(smtp.messages) == 5
+        assert pipeline.stats["sent"] == 5
+
+    def test_queue_full_is_dead_lettered(self):
+        """Test submission never blocks when a channel queue is full"""
+        async def scenario():
+            config = PipelineConfig(
+                queue_size=1,
+                workers_per_channel={channel: 0 for channel in DeliveryChannel}
+            )
+            pipeline = DeliveryPipeline(integrations=_integrations(), config=config)
+            await pipeline.start()
+            accepted = [
+                pipeline.submit(DeliveryJob(
+                    alert=_alert(),
+                    channel=DeliveryChannel.WEBHOOK,
+                    endpoint="http://127.0.0.1:9/hook"
+                ))
+                for _ in range(3)
+            ]
+            await pipeline.stop(drain=False)
+            return pipeline, accepted
+
+        pipeline, accepted = asyncio.run(scenario())
+
+        assert accepted == [True, False, False]
+        assert [job.last_error for job in pipeline.dead_letters] == ["Delivery queue full"] * 2
+
+    def test_enqueue_requires_running_pipeline(self):
+        """Test enqueue_alert fails fast without a running pipeline"""
+        service = NotificationService()
+        with pytest.raises(RuntimeError):
+            service.enqueue_alert(_alert())
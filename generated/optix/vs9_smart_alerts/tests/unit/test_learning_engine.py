@@ -3,6 +3,8 @@ Unit tests for VS-9 Learning Engine
 """
 
 import pytest
+import math
+import time
 from datetime import datetime, timedelta
 from src.learning_engine import LearningEngine
 from src.models import (
@@ -320,5 +322,118 @@ class TestLearningEngine:
         assert stats["learning_rate"] == 0.1
 
 
+class TestActionAggregates:
+    """Test running action aggregates"""
+    
+    def setup_method(self):
+        """Setup test fixtures"""
+        self.engine = LearningEngine(learning_rate=0.1)
+    
+    def record(self, rule_id, action_type, symbol="AAPL", triggered_ago=timedelta(seconds=30), at=None):
+        at = at or datetime.utcnow()
+        alert = TriggeredAlert(
+            rule_id=rule_id,
+            user_id="user123",
+            title="Test",
+            message="Test",
+            trigger_values={"price_above": 150.0}
+        )
+        alert.triggered_at = at - triggered_ago
+        alert.metadata["symbol"] = symbol
+        self.engine.record_user_action("user123", alert, action_type, at)
+    
+    def test_aggregates_match_history(self):
+        """Test per-rule and per-symbol aggregates match the recorded history"""
+        for i in range(12):
+            self.record("rule1", "opened_position" if i % 3 else "snoozed", symbol="AAPL" if i < 8 else "SPY")
+        self.record("rule2", "dismissed", symbol="SPY")
+        
+        stats = self.engine.action_stats["user123"]
+        
+        assert stats.overall.total == len(self.engine.action_history["user123"]) == 13
+        assert stats.overall.snoozed == 4
+        assert (stats.by_rule["rule1"].total, stats.by_rule["rule1"].positive) == (12, 8)
+        assert (stats.by_symbol["SPY"].total, stats.by_symbol["SPY"].positive) == (5, 3)
+        assert stats.by_condition["price_above"].total == 13
+        assert stats.positive_conditions == {ConditionType.PRICE_ABOVE: 8}
+    
+    def test_decayed_counts_favour_recent_actions(self):
+        """Test old actions lose weight in recency and response time"""
+        now = datetime.utcnow()
+        for _ in range(10):
+            self.record("old", "opened_position", triggered_ago=timedelta(minutes=30), at=now - timedelta(days=30))
+            self.record("new", "opened_position", triggered_ago=timedelta(minutes=30), at=now - timedelta(days=30))
+            self.record("new", "opened_position", triggered_ago=timedelta(seconds=10), at=now)
+        
+        old = self.engine.action_stats["user123"].by_rule["old"]
+        new = self.engine.action_stats["user123"].by_rule["new"]
+        
+        assert old.recency_weight(now) == pytest.approx(math.exp(-30 / 7))
+        assert new.recency_weight(now) > 0.5
+        assert new.decayed_avg_response_time() < 60
+        assert new.response_time_sum / new.total > 900
+    
+    def test_out_of_order_actions(self):
+        """Test actions recorded late are decayed by their own age"""
+        now = datetime.utcnow()
+        self.record("rule1", "opened_position", at=now)
+        self.record("rule1", "opened_position", at=now - timedelta(days=7))
+        
+        stats = self.engine.action_stats["user123"].by_rule["rule1"]
+        
+        assert stats.decayed_at == now
+        assert stats.decayed_total == pytest.approx(1 + math.exp(-1))
+    
+    def test_relevance_prefers_recent_engagement(self):
+        """Test a rule acted on recently scores above one acted on long ago"""
+        now = datetime.utcnow()
+        for _ in range(10):
+            self.record("stale", "opened_position", at=now - timedelta(days=60))
+            self.record("fresh", "opened_position", at=now)
+        
+        stale = AlertRule(rule_id="stale", user_id="user123", name="Stale", conditions=[], relevance_score=0.5)
+        fresh = AlertRule(rule_id="fresh", user_id="user123", name="Fresh", conditions=[], relevance_score=0.5)
+        
+        assert self.engine.update_rule_relevance(fresh, "user123") > self.engine.update_rule_relevance(stale, "user123")
+
+
+def make_history(actions):
+    """Learning engine with a history of actions on 50 rules"""
+    engine = LearningEngine()
+    for i in range(actions):
+        alert = TriggeredAlert(
+            rule_id=f"rule{i % 50}",
+            user_id="user123",
+            trigger_values={"price_above": 150.0}
+        )
+        alert.metadata["symbol"] = f"SYM{i % 20}"
+        engine.record_user_action("user123", alert, "opened_position" if i % 3 else "dismissed")
+    return engine
+
+
+def time_updates(engine):
+    """Seconds for 1000 relevance and 20 profile updates"""
+    rules = [
+        AlertRule(rule_id=f"rule{i}", user_id="user123", name=f"Rule {i}", conditions=[])
+        for i in range(50)
+    ]
+    start = time.perf_counter()
+    for _ in range(20):
+        for rule in rules:
+            engine.update_rule_relevance(rule, "user123")
+        engine.learn_user_profile("user123")
+    return time.perf_counter() - start
+
+
+@pytest.mark.benchmark
+def test_benchmark_relevance_updates():
+    """Benchmark relevance and profile updates against the history length"""
+    short = min(time_updates(make_history(500)) for _ in range(3))
+    long = min(time_updates(make_history(50_000)) for _ in range(3))
+    
+    # Updates read running aggregates, so 100x the history costs about the same
+    assert long < short * 10
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -429,6 +429,22 @@ class TestNotificationService:
         
         if DeliveryChannel.WEBHOOK in results:
             assert results[DeliveryChannel.WEBHOOK] == DeliveryStatus.SENT
+    
+    def test_rate_limit_window_expires(self):
+        """Test sends older than an hour leave the rate limit window"""
+        prefs = DeliveryPreference(user_id="user123", max_alerts_per_hour=2)
+        self.service.set_user_preferences("user123", prefs)
+        
+        tracker = self.service.rate_limit_trackers["user123"][DeliveryChannel.PUSH.value]
+        tracker.append(datetime.utcnow() - timedelta(hours=2))
+        tracker.append(datetime.utcnow() - timedelta(minutes=90))
+        
+        assert not self.service._is_rate_limited("user123", DeliveryChannel.PUSH, prefs)
+        assert len(tracker) == 0
+        
+        self.service._update_rate_limit("user123", DeliveryChannel.PUSH)
+        self.service._update_rate_limit("user123", DeliveryChannel.PUSH)
+        assert self.service._is_rate_limited("user123", DeliveryChannel.PUSH, prefs)
 
 
 if __name__ == "__main__":